@@ -7,6 +7,8 @@ Created on Wed Apr  2 09:54:51 2025
 
 from collections import deque          # Importa deque para operaciones eficientes
 
+from grafo_csr import GrafoCSR           # Grafo compacto para búsquedas por niveles
+
 class Grafo:                          # Clase para representar un grafo no dirigido
     def __init__(self):               # Constructor que inicializa el grafo
         self.grafo = {}               # Diccionario: {nodo: [vecinos]}
@@ -22,6 +24,9 @@ class Grafo:                          # Clase para representar un grafo no dirig
         self.grafo[nodo1].append(nodo2)# Añade nodo2 como vecino de nodo1
         self.grafo[nodo2].append(nodo1)# Añade nodo1 como vecino de nodo2 (no dirigido)
 
+    def compilar(self):               # Convierte a CSR (arreglos NumPy)
+        return GrafoCSR.desde_adyacencia(self.grafo, simetrico=True)
+
     def dfs(self, inicio):            # Búsqueda en Profundidad (iterativa)
         visitados = set()             # Conjunto para nodos visitados
         pila = [inicio]              # Pila para nodos por explorar (LIFO)
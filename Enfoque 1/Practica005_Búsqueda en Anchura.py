@@ -7,6 +7,8 @@ Created on Wed Apr  2 10:41:27 2025
 
 from collections import deque                     # Importa deque para colas eficientes
 
+from grafo_csr import GrafoCSR                      # Grafo compacto para búsquedas por niveles
+
 class Grafo:                                     # Clase para representar un grafo
     def __init__(self):                          # Constructor
         self.adyacencia = {}                     # Diccionario de adyacencia {nodo: [vecinos]}
@@ -19,6 +21,9 @@ class Grafo:                                     # Clase para representar un gra
         self.adyacencia[u].append(v)             # Añade v como vecino de u
         self.adyacencia[v].append(u)             # Grafo no dirigido: añade u como vecino de v
 
+    def compilar(self):                          # Convierte a CSR (arreglos NumPy)
+        return GrafoCSR.desde_adyacencia(self.adyacencia, simetrico=True)
+
     def bfs(self, inicio):                       # Algoritmo Búsqueda en Anchura
         visitados = set()                        # Conjunto para nodos visitados
         cola = deque([inicio])                   # Cola para nodos por visitar
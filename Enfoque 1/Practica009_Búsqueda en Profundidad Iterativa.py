@@ -7,6 +7,8 @@ Created on Wed Apr  2 10:48:51 2025
 
 from collections import deque, defaultdict       # Estructuras de datos eficientes
 
+from grafo_csr import GrafoCSR                     # Grafo compacto para búsquedas por niveles
+
 class Grafo:                                    # Clase para representar un grafo
     def __init__(self, dirigido=False):         # Constructor con parámetro dirigido
         self.grafo = defaultdict(list)          # Diccionario de listas de adyacencia
@@ -17,6 +19,10 @@ class Grafo:                                    # Clase para representar un graf
         if not self.dirigido:                   # Si no es dirigido
             self.grafo[v].append((u, peso))     # Añade arista v -> u
 
+    def compilar(self):                         # Convierte a CSR (sin pesos)
+        return GrafoCSR.desde_adyacencia(self.grafo, ponderado=True,
+                                         simetrico=not self.dirigido)
+
     def bfs(self, inicio, meta=None):           # Búsqueda en Anchura
         visitados = set()                       # Conjunto de nodos visitados
         cola = deque([(inicio, [inicio])])      # Cola de tuplas (nodo, camino)
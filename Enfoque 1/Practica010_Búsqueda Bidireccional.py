@@ -7,6 +7,8 @@ Created on Wed Apr  2 10:48:51 2025
 
 from collections import deque                     # Importa deque para colas eficientes
 
+from grafo_csr import GrafoCSR, busqueda_bidireccional  # Versión CSR por niveles
+
 class Grafo:                                     # Clase para representar un grafo
     def __init__(self):                          # Constructor
         self.grafo = {}                          # Diccionario: {nodo: [vecinos]}
@@ -19,6 +21,9 @@ class Grafo:                                     # Clase para representar un gra
         self.grafo[u].append(v)                  # Añade v como vecino de u
         self.grafo[v].append(u)                  # Grafo no dirigido (bidireccional)
 
+    def compilar(self):                          # Convierte a CSR (arreglos NumPy)
+        return GrafoCSR.desde_adyacencia(self.grafo, simetrico=True)
+
     def busqueda_bidireccional(self, inicio, meta): # Algoritmo bidireccional
         if inicio == meta:                       # Caso trivial: inicio es meta
             return [inicio]
@@ -99,4 +104,8 @@ if __name__ == "__main__":
     if camino:                                   # Si encontró solución
         print("Camino encontrado:", " -> ".join(camino))
     else:
-        print("No se encontró camino válido")
\ No newline at end of file
+        print("No se encontró camino válido")
+
+    csr = g.compilar()                          # Misma búsqueda sobre CSR
+    camino = busqueda_bidireccional(csr, inicio, meta, paralelo=True)
+    print("Camino CSR (2 procesos):", " -> ".join(camino))
\ No newline at end of file
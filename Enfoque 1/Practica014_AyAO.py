@@ -10,24 +10,13 @@ Incluye clases para nodos y funciones de búsqueda con heurísticas.
 
 import heapq  # Importa módulo para colas de prioridad
 
-class NodoAEstrella:
-    """
-    Clase que representa un nodo en el algoritmo A*.
-    Almacena información del estado, costos y heurísticas.
-    """
-    def __init__(self, estado, padre=None):
-        self.estado = estado        # Identificador único del nodo (ej: coordenadas)
-        self.padre  = padre         # Referencia al nodo padre en el camino
-        self.g      = 0             # Costo acumulado desde el nodo inicial
-        self.h      = 0             # Valor heurístico (estimación a meta)
-        self.f      = 0             # Costo total (g + h)
-    
-    def __lt__(self, otro):         # Método para comparación de nodos
-        return self.f < otro.f      # Ordena por costo total (para heapq)
+from busqueda_informada import a_estrella_grafo  # Motor A* con montículo indexado
 
 def a_estrella(grafo, inicio, meta, heuristica):
     """
     Implementación del algoritmo A* para búsqueda de caminos óptimos.
+    Usa el motor compartido: estados internados a ids y montículo indexado
+    con decrease-key, sin nodos duplicados en abiertos.
     
     Parámetros:
         grafo:      Diccionario de adyacencia del grafo         (dict)
@@ -38,47 +27,7 @@ def a_estrella(grafo, inicio, meta, heuristica):
     Retorna:
         Lista con el camino óptimo o None si no hay solución    (list/None)
     """
-    abiertos  = []                  # Cola de prioridad (nodos por explorar)
-    cerrados  = set()               # Conjunto de nodos ya explorados
-    
-    nodo_inicio       = NodoAEstrella(inicio)          # Crea nodo inicial
-    nodo_inicio.h     = heuristica(inicio, meta)       # Calcula heurística
-    nodo_inicio.f     = nodo_inicio.g + nodo_inicio.h  # Costo total inicial
-    heapq.heappush(abiertos, nodo_inicio)              # Agrega a abiertos
-    
-    while abiertos:                                     # Mientras haya nodos
-        actual = heapq.heappop(abiertos)                # Extrae el mejor nodo
-        
-        if actual.estado == meta:                       # Si es solución
-            camino = []                                 # Reconstruye camino
-            while actual:
-                camino.append(actual.estado)
-                actual = actual.padre
-            return camino[::-1]                         # Devuelve camino invertido
-        
-        cerrados.add(actual.estado)                    # Marca como explorado
-        
-        for vecino, costo in grafo[actual.estado]:     # Expande vecinos
-            if vecino in cerrados:                     # Si ya fue explorado
-                continue                               # Lo ignora
-            
-            nuevo_g       = actual.g + costo           # Calcula nuevo costo
-            nuevo_nodo    = NodoAEstrella(vecino, actual)  # Crea nodo vecino
-            nuevo_nodo.g  = nuevo_g                    # Asigna costo acumulado
-            nuevo_nodo.h  = heuristica(vecino, meta)   # Calcula heurística
-            nuevo_nodo.f  = nuevo_nodo.g + nuevo_nodo.h  # Costo total
-            
-            # Verifica si ya está en abiertos con menor costo
-            en_abiertos = False
-            for nodo in abiertos:
-                if nodo.estado == vecino and nodo.f <= nuevo_nodo.f:
-                    en_abiertos = True
-                    break
-            
-            if not en_abiertos:                        # Si es nuevo o mejor
-                heapq.heappush(abiertos, nuevo_nodo)   # Agrega a abiertos
-    
-    return None                                        # No encontró solución
+    return a_estrella_grafo(grafo, inicio, meta, heuristica)  # Aristas (vecino, costo)
 
 class NodoAOEstrella:
     """
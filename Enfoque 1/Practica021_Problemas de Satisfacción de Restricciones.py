@@ -8,104 +8,7 @@ Implementación de un resolvedor CSP (Constraint Satisfaction Problem)
 para problemas como Sudoku, usando backtracking con heurísticas MRV y LCV.
 """
 
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa una instancia CSP con variables, dominios y restricciones.
-        
-        Parámetros:
-            variables:    Lista de variables del problema          (list)
-            dominios:     Diccionario {variable: valores_posibles} (dict)
-            restricciones: Lista de pares de variables restringidas (list)
-        """
-        self.variables     = variables       # Lista de variables del problema
-        self.dominios      = dominios        # Dominios para cada variable
-        self.restricciones = restricciones   # Restricciones entre variables
-        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
-        
-        for (v1, v2) in restricciones:      # Construye relación de vecindad
-            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
-            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
-
-def backtracking(asignacion, csp):
-    """
-    Algoritmo de backtracking recursivo con heurísticas MRV y LCV.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Solución completa o None si no hay solución   (dict/None)
-    """
-    if len(asignacion) == len(csp.variables):  # Si asignación está completa
-        return asignacion.copy()               # Retorna copia de la solución
-    
-    # Selección de variable con heurística MRV (Mínimos Valores Restantes)
-    var = min([v for v in csp.variables if v not in asignacion],  # Variables no asignadas
-              key=lambda v: len(csp.dominios[v]))                 # Ordena por dominio
-    
-    # Orden de valores con heurística LCV (Valores Menos Restrictivos)
-    for valor in sorted(csp.dominios[var],                       # Valores ordenados
-                       key=lambda v: contar_conflictos(var, v, asignacion, csp)):
-        
-        if consistente(var, valor, asignacion, csp):              # Si es consistente
-            asignacion[var] = valor                              # Realiza asignación
-            
-            resultado = backtracking(asignacion, csp)            # Llamada recursiva
-            if resultado is not None:                            # Si hay solución
-                return resultado                                 # Retórnala
-            
-            del asignacion[var]                                  # Backtrack (deshacer)
-    
-    return None                                                 # No hay solución
-
-def contar_conflictos(var, valor, asignacion, csp):
-    """
-    Cuenta cuántas restricciones violaría asignar este valor.
-    
-    Parámetros:
-        var:        Variable a evaluar                 (any)
-        valor:      Valor potencial a asignar          (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Número de conflictos potenciales              (int)
-    """
-    return sum(1 for vecino in csp.vecinos[var]               # Para cada vecino
-              if vecino in asignacion and                      # Si está asignado
-              not cumple_restriccion(valor, asignacion[vecino]))  # Y hay conflicto
-
-def consistente(var, valor, asignacion, csp):
-    """
-    Verifica si una asignación es consistente con las restricciones.
-    
-    Parámetros:
-        var:        Variable a asignar                 (any)
-        valor:      Valor a verificar                  (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        True si es consistente, False si no           (bool)
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])  # Todas las
-              for vecino in csp.vecinos[var]                  # restricciones
-              if vecino in asignacion)                        # deben cumplirse
-
-def cumple_restriccion(valor1, valor2):
-    """
-    Función genérica de restricción (para Sudoku: valores diferentes).
-    
-    Parámetros:
-        valor1: Primer valor a comparar               (any)
-        valor2: Segundo valor a comparar              (any)
-    
-    Retorna:
-        True si cumplen restricción, False si no      (bool)
-    """
-    return valor1 != valor2                           # Restricción básica
+from nucleo_csp import CSP, backtracking  # Núcleo CSP compartido con dominios de bits
 
 def crear_sudoku_4x4():
     """
@@ -8,171 +8,7 @@ Implementación de algoritmo CSP con Forward Checking para problemas de restricc
 Incluye solución para Sudoku 4x4 con propagación de restricciones.
 """
 
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP (Constraint Satisfaction Problem).
-        
-        Parámetros:
-            variables:    Lista de variables del problema          (list)
-            dominios:     Diccionario {variable: valores_posibles} (dict)
-            restricciones: Lista de pares de variables restringidas (list)
-        """
-        self.variables     = variables       # Lista de variables del problema
-        self.dominios      = dominios        # Dominios para cada variable
-        self.restricciones = restricciones   # Restricciones entre variables
-        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
-        
-        for (v1, v2) in restricciones:      # Construye relación de vecindad
-            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
-            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
-
-def forward_checking(asignacion, csp, dominios):
-    """
-    Algoritmo de forward checking recursivo con heurísticas MRV y LCV.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-        dominios:   Dominios actuales de variables     (dict)
-    
-    Retorna:
-        Solución completa o None si no hay solución   (dict/None)
-    """
-    if len(asignacion) == len(csp.variables):  # Si asignación está completa
-        return asignacion                      # Retorna solución
-    
-    var = seleccionar_variable(asignacion, dominios)  # Selecciona variable (MRV)
-    
-    for valor in orden_valores(var, asignacion, csp, dominios):  # Orden LCV
-        if consistente(var, valor, asignacion, csp):             # Si es consistente
-            asignacion[var] = valor                             # Realiza asignación
-            nuevos_dominios = actualizar_dominios(               # Propaga restricciones
-                var, valor, asignacion, csp, dominios)
-            
-            if dominios_consistentes(nuevos_dominios):           # Si dominios válidos
-                resultado = forward_checking(                    # Llamada recursiva
-                    asignacion, csp, nuevos_dominios)
-                if resultado is not None:                        # Si encontró solución
-                    return resultado                             # Retórnala
-            
-            del asignacion[var]                                  # Backtrack (deshacer)
-    
-    return None                                                  # No hay solución
-
-def actualizar_dominios(var, valor, asignacion, csp, dominios):
-    """
-    Reduce dominios de variables vecinas mediante propagación de restricciones.
-    
-    Parámetros:
-        var:        Variable recién asignada          (any)
-        valor:      Valor asignado                    (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-        dominios:   Dominios actuales                 (dict)
-    
-    Retorna:
-        Nuevos dominios actualizados                 (dict)
-    """
-    nuevos_dominios = {v: list(dominios[v]) for v in dominios}  # Copia dominios
-    nuevos_dominios[var] = [valor]                             # Fija valor asignado
-    
-    for vecino in csp.vecinos[var]:                            # Para cada vecino
-        if vecino not in asignacion:                           # No asignado aún
-            nuevos_dominios[vecino] = [                        # Filtra valores
-                v for v in nuevos_dominios[vecino] 
-                if cumple_restriccion(valor, v)                # Consistentes
-            ]
-    return nuevos_dominios
-
-def dominios_consistentes(dominios):
-    """
-    Verifica si todos los dominios contienen al menos un valor posible.
-    
-    Parámetros:
-        dominios: Diccionario de dominios actuales    (dict)
-    
-    Retorna:
-        True si todos los dominios son consistentes    (bool)
-    """
-    return all(len(dominios[v]) > 0 for v in dominios)  # Ningún dominio vacío
-
-def seleccionar_variable(asignacion, dominios):
-    """
-    Selecciona variable no asignada usando heurística MRV.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        dominios:   Dominios actuales de variables     (dict)
-    
-    Retorna:
-        Variable no asignada con menor dominio         (any)
-    """
-    no_asignadas = [v for v in dominios if v not in asignacion]  # Variables libres
-    return min(no_asignadas, key=lambda v: len(dominios[v]))     # Menor dominio
-
-def orden_valores(var, asignacion, csp, dominios):
-    """
-    Ordena valores usando heurística LCV (Least Constraining Value).
-    
-    Parámetros:
-        var:        Variable a ordenar valores         (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-        dominios:   Dominios actuales                 (dict)
-    
-    Retorna:
-        Valores ordenados por menor restricción        (list)
-    """
-    return sorted(dominios[var],                      # Ordena valores
-                key=lambda v: contar_conflictos(var, v, asignacion, csp))
-
-def contar_conflictos(var, valor, asignacion, csp):
-    """
-    Cuenta conflictos potenciales para una asignación.
-    
-    Parámetros:
-        var:        Variable a evaluar                 (any)
-        valor:      Valor potencial a asignar          (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Número de conflictos potenciales              (int)
-    """
-    return sum(1 for vecino in csp.vecinos[var]       # Cuenta vecinos
-              if vecino in asignacion and              # asignados que
-              not cumple_restriccion(valor, asignacion[vecino]))  # incumplen
-
-def cumple_restriccion(valor1, valor2):
-    """
-    Función genérica de restricción (para Sudoku: valores diferentes).
-    
-    Parámetros:
-        valor1: Primer valor a comparar               (any)
-        valor2: Segundo valor a comparar              (any)
-    
-    Retorna:
-        True si cumplen restricción, False si no      (bool)
-    """
-    return valor1 != valor2                           # Restricción básica
-
-def consistente(var, valor, asignacion, csp):
-    """
-    Verifica si una asignación es consistente.
-    
-    Parámetros:
-        var:        Variable a asignar                 (any)
-        valor:      Valor a verificar                  (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        True si es consistente, False si no           (bool)
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])  # Todas las
-              for vecino in csp.vecinos[var]                  # restricciones
-              if vecino in asignacion)                        # deben cumplirse
+from nucleo_csp import CSP, forward_checking  # Núcleo CSP compartido con dominios de bits
 
 def crear_sudoku_4x4():
     """
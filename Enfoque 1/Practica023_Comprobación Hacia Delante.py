@@ -8,181 +8,7 @@ Implementación de CSP con AC-3 y Backtracking para resolver Sudoku 9x9.
 Incluye propagación de restricciones y heurísticas de selección de variables.
 """
 
-from collections import deque  # Importa deque para cola eficiente
-
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP (Constraint Satisfaction Problem).
-        
-        Parámetros:
-            variables:    Lista de variables del problema          (list)
-            dominios:     Diccionario {variable: valores_posibles} (dict)
-            restricciones: Lista de pares de variables restringidas (list)
-        """
-        self.variables     = variables       # Lista de variables del problema
-        self.dominios      = dominios        # Dominios para cada variable
-        self.restricciones = restricciones   # Restricciones entre variables
-        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
-        
-        for (v1, v2) in restricciones:      # Construye relación de vecindad
-            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
-            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
-
-def ac3(csp, dominios=None):
-    """
-    Algoritmo AC-3 para propagación de restricciones arco-consistencia.
-    
-    Parámetros:
-        csp:      Instancia del problema CSP        (CSP)
-        dominios: Dominios actuales (opcional)      (dict)
-    
-    Retorna:
-        Dominios reducidos o False si inconsistencia (dict/bool)
-    """
-    dominios = dominios or {v: list(csp.dominios[v]) for v in csp.variables}  # Copia dominios
-    cola = deque((xi, xj) for xi in csp.variables for xj in csp.vecinos[xi])  # Todos los arcos
-    
-    while cola:                                # Mientras haya arcos por revisar
-        xi, xj = cola.popleft()               # Extrae un arco (xi, xj)
-        if revisar(xi, xj, dominios, csp):    # Si se modificó el dominio de xi
-            if not dominios[xi]:               # Si dominio quedó vacío
-                return False                   # Problema inconsistente
-            for xk in csp.vecinos[xi]:        # Agrega arcos (xk, xi) a revisar
-                if xk != xj:                  # Excepto el que ya revisamos
-                    cola.append((xk, xi))
-    return dominios                           # Retorna dominios consistentes
-
-def revisar(xi, xj, dominios, csp):
-    """
-    Elimina valores inconsistentes de xi respecto a restricciones con xj.
-    
-    Parámetros:
-        xi:       Variable a revisar                 (any)
-        xj:       Variable vecina                    (any)
-        dominios: Dominios actuales                  (dict)
-        csp:      Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        True si se eliminó algún valor, False si no  (bool)
-    """
-    revisado = False                             # Bandera de modificación
-    for x in list(dominios[xi]):                 # Para cada valor en xi
-        if not any(cumple_restriccion(x, y)      # Si no hay valor en xj
-                  for y in dominios[xj]):        # que cumpla restricción
-            dominios[xi].remove(x)               # Elimina valor inconsistente
-            revisado = True                      # Marca como modificado
-    return revisado
-
-def backtracking_ac3(asignacion, csp, dominios):
-    """
-    Backtracking con propagación AC-3 para CSP.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-        dominios:   Dominios actuales                 (dict)
-    
-    Retorna:
-        Solución completa o None si no hay solución   (dict/None)
-    """
-    if len(asignacion) == len(csp.variables):  # Si asignación está completa
-        return asignacion                      # Retorna solución
-    
-    var = seleccionar_variable(asignacion, dominios)  # Selecciona variable (MRV)
-    
-    for valor in orden_valores(var, asignacion, csp, dominios):  # Orden LCV
-        if consistente(var, valor, asignacion, csp):             # Si es consistente
-            asignacion[var] = valor                             # Realiza asignación
-            nuevos_dominios = {v: list(dominios[v]) for v in dominios}  # Copia
-            nuevos_dominios[var] = [valor]                      # Fija valor
-            
-            if ac3(csp, nuevos_dominios):                       # Si AC-3 exitoso
-                resultado = backtracking_ac3(                   # Llamada recursiva
-                    asignacion, csp, nuevos_dominios)
-                if resultado is not None:                       # Si encontró solución
-                    return resultado                            # Retórnala
-            
-            del asignacion[var]                                 # Backtrack (deshacer)
-    
-    return None                                                 # No hay solución
-
-def seleccionar_variable(asignacion, dominios):
-    """
-    Selecciona variable no asignada usando heurística MRV.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        dominios:   Dominios actuales de variables     (dict)
-    
-    Retorna:
-        Variable no asignada con menor dominio         (any)
-    """
-    no_asignadas = [v for v in dominios if v not in asignacion]  # Variables libres
-    return min(no_asignadas, key=lambda v: len(dominios[v]))     # Menor dominio
-
-def orden_valores(var, asignacion, csp, dominios):
-    """
-    Ordena valores usando heurística LCV (Least Constraining Value).
-    
-    Parámetros:
-        var:        Variable a ordenar valores         (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-        dominios:   Dominios actuales                 (dict)
-    
-    Retorna:
-        Valores ordenados por menor restricción        (list)
-    """
-    return sorted(dominios[var],                      # Ordena valores
-                key=lambda v: contar_conflictos(var, v, asignacion, csp))
-
-def contar_conflictos(var, valor, asignacion, csp):
-    """
-    Cuenta conflictos potenciales para una asignación.
-    
-    Parámetros:
-        var:        Variable a evaluar                 (any)
-        valor:      Valor potencial a asignar          (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Número de conflictos potenciales              (int)
-    """
-    return sum(1 for vecino in csp.vecinos[var]       # Cuenta vecinos
-              if vecino in asignacion and              # asignados que
-              not cumple_restriccion(valor, asignacion[vecino]))  # incumplen
-
-def cumple_restriccion(valor1, valor2):
-    """
-    Función genérica de restricción (para Sudoku: valores diferentes).
-    
-    Parámetros:
-        valor1: Primer valor a comparar               (any)
-        valor2: Segundo valor a comparar              (any)
-    
-    Retorna:
-        True si cumplen restricción, False si no      (bool)
-    """
-    return valor1 != valor2                           # Restricción básica
-
-def consistente(var, valor, asignacion, csp):
-    """
-    Verifica si una asignación es consistente.
-    
-    Parámetros:
-        var:        Variable a asignar                 (any)
-        valor:      Valor a verificar                  (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        True si es consistente, False si no           (bool)
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])  # Todas las
-              for vecino in csp.vecinos[var]                  # restricciones
-              if vecino in asignacion)                        # deben cumplirse
+from nucleo_csp import CSP, ac3, backtracking_ac3  # Núcleo CSP compartido con dominios de bits
 
 def crear_sudoku_9x9():
     """
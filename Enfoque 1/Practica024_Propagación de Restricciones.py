@@ -8,147 +8,7 @@ Implementación de Backjumping (salto atrás dirigido por conflictos) para CSP.
 Algoritmo que mejora el backtracking tradicional evitando explorar ramas conflictivas.
 """
 
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP (Constraint Satisfaction Problem).
-        
-        Parámetros:
-            variables:    Lista de variables del problema          (list)
-            dominios:     Diccionario {variable: valores_posibles} (dict)
-            restricciones: Lista de pares de variables restringidas (list)
-        """
-        self.variables     = variables       # Lista de variables del problema
-        self.dominios      = dominios        # Dominios para cada variable
-        self.restricciones = restricciones   # Restricciones entre variables
-        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
-        
-        for (v1, v2) in restricciones:      # Construye relación de vecindad
-            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
-            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
-
-def backjumping(asignacion, csp, nivel=0, conflictos=None):
-    """
-    Algoritmo de Backjumping con seguimiento de conflictos.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-        nivel:      Profundidad actual en la búsqueda (int)
-        conflictos: Diccionario de conflictos         (dict)
-    
-    Retorna:
-        Solución completa o None si no hay solución   (dict/None)
-    """
-    if len(asignacion) == len(csp.variables):  # Si asignación está completa
-        return asignacion                      # Retorna solución
-    
-    conflictos = conflictos or {v: set() for v in csp.variables}  # Inicializa
-    var = seleccionar_variable(asignacion, csp)                   # Selecciona var
-    
-    for valor in orden_valores(var, asignacion, csp):              # Orden LCV
-        if consistente(var, valor, asignacion, csp):               # Si es consistente
-            asignacion[var] = valor                               # Realiza asignación
-            resultado = backjumping(                              # Llamada recursiva
-                asignacion, csp, nivel+1, conflictos)
-            if resultado is not None:                             # Si encontró solución
-                return resultado                                  # Retórnala
-            del asignacion[var]                                   # Backtrack (deshacer)
-        else:
-            # Registrar conflictos con variables asignadas
-            for vecino in csp.vecinos[var]:                       # Para cada vecino
-                if vecino in asignacion:                          # Si está asignado
-                    conflictos[var].add(nivel_dict[vecino])       # Agrega nivel conflicto
-    
-    # Determinar nivel de salto (máximo nivel de conflicto)
-    if conflictos[var]:                                           # Si hay conflictos
-        nivel_salto = max(conflictos[var])                        # Nivel máximo
-        # Propagación de conflictos a variables anteriores
-        for v in conflictos:                                      # Para cada variable
-            if nivel_dict[v] < nivel_dict[var]:                   # Si es anterior
-                conflictos[v].update(conflictos[var])             # Propaga conflictos
-        return backjumping(asignacion, csp, nivel_salto, conflictos)  # Salta
-    else:
-        return None                                               # No hay solución
-
-def seleccionar_variable(asignacion, csp):
-    """
-    Selecciona variable no asignada usando heurística MRV.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Variable no asignada con menor dominio        (any)
-    """
-    no_asignadas = [v for v in csp.variables if v not in asignacion]  # Variables libres
-    return min(no_asignadas, key=lambda v: len(csp.dominios[v]))      # Menor dominio
-
-def orden_valores(var, asignacion, csp):
-    """
-    Ordena valores usando heurística LCV (Least Constraining Value).
-    
-    Parámetros:
-        var:        Variable a ordenar valores         (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Valores ordenados por menor restricción        (list)
-    """
-    return sorted(csp.dominios[var],                  # Ordena valores
-                key=lambda v: contar_conflictos(var, v, asignacion, csp))
-
-def contar_conflictos(var, valor, asignacion, csp):
-    """
-    Cuenta conflictos potenciales para una asignación.
-    
-    Parámetros:
-        var:        Variable a evaluar                 (any)
-        valor:      Valor potencial a asignar          (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        Número de conflictos potenciales              (int)
-    """
-    return sum(1 for vecino in csp.vecinos[var]       # Cuenta vecinos
-              if vecino in asignacion and              # asignados que
-              not cumple_restriccion(valor, asignacion[vecino]))  # incumplen
-
-def cumple_restriccion(valor1, valor2):
-    """
-    Función genérica de restricción (para Sudoku: valores diferentes).
-    
-    Parámetros:
-        valor1: Primer valor a comparar               (any)
-        valor2: Segundo valor a comparar              (any)
-    
-    Retorna:
-        True si cumplen restricción, False si no      (bool)
-    """
-    return valor1 != valor2                           # Restricción básica
-
-def consistente(var, valor, asignacion, csp):
-    """
-    Verifica si una asignación es consistente.
-    
-    Parámetros:
-        var:        Variable a asignar                 (any)
-        valor:      Valor a verificar                  (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        True si es consistente, False si no           (bool)
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])  # Todas las
-              for vecino in csp.vecinos[var]                  # restricciones
-              if vecino in asignacion)                        # deben cumplirse
-
-# Mapeo de variables a niveles (para seguimiento de conflictos)
-nivel_dict = {}                                      # Diccionario global
+from nucleo_csp import CSP, backjumping  # Núcleo CSP compartido con dominios de bits
 
 def crear_sudoku_4x4():
     """
@@ -165,7 +25,6 @@ def crear_sudoku_4x4():
     # Restricciones de filas y columnas
     for i in range(4):                                # Para cada celda
         for j in range(4):
-            nivel_dict[(i,j)] = i*4 + j               # Asigna nivel único
             for k in range(4):
                 if k != j: restricciones.append(((i,j), (i,k)))  # Misma fila
                 if k != i: restricciones.append(((i,j), (k,j)))  # Misma columna
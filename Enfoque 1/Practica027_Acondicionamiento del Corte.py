@@ -10,25 +10,7 @@ para resolver problemas CSP mediante descomposición en subproblemas más peque
 
 import networkx as nx  # Importa NetworkX para manipulación de grafos
 import random         # Importa módulo para generación de números aleatorios
-
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP (Constraint Satisfaction Problem).
-        
-        Parámetros:
-            variables:    Lista de variables del problema          (list)
-            dominios:     Diccionario {variable: valores_posibles} (dict)
-            restricciones: Lista de pares de variables restringidas (list)
-        """
-        self.variables     = variables       # Lista de variables del problema
-        self.dominios      = dominios        # Dominios para cada variable
-        self.restricciones = restricciones   # Restricciones entre variables
-        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
-        
-        for (v1, v2) in restricciones:      # Construye relación de vecindad
-            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
-            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
+from nucleo_csp import CSP, backtracking  # Núcleo CSP compartido con dominios de bits
 
 def cut_conditioning(csp, corte=None):
     """
@@ -120,64 +102,6 @@ def combinar_soluciones(soluciones, corte):
         solucion_final.update(sol)              # Agrega asignaciones
     return solucion_final                       # Retorna solución completa
 
-def backtracking(asignacion, csp):
-    """
-    Algoritmo de Backtracking básico para resolver subproblemas CSP.
-    
-    Parámetros:
-        asignacion: Asignación parcial actual    (dict)
-        csp:        Instancia del problema CSP   (CSP)
-    
-    Retorna:
-        Solución completa o None si no hay solución (dict/None)
-    """
-    if len(asignacion) == len(csp.variables):   # Si asignación completa
-        return asignacion                       # Retorna solución
-    
-    # Selecciona variable no asignada con MRV
-    var = min([v for v in csp.variables if v not in asignacion],
-              key=lambda v: len(csp.dominios[v]))
-    
-    for valor in csp.dominios[var]:             # Prueba valores en orden
-        if consistente(var, valor, asignacion, csp):  # Si es consistente
-            asignacion[var] = valor             # Realiza asignación
-            resultado = backtracking(asignacion, csp)  # Llamada recursiva
-            if resultado is not None:            # Si encontró solución
-                return resultado                # Retórnala
-            del asignacion[var]                 # Backtrack (deshacer)
-    
-    return None                                # No hay solución
-
-def consistente(var, valor, asignacion, csp):
-    """
-    Verifica si una asignación es consistente con las restricciones.
-    
-    Parámetros:
-        var:        Variable a asignar          (any)
-        valor:      Valor a verificar           (any)
-        asignacion: Asignación parcial actual   (dict)
-        csp:        Instancia del problema CSP  (CSP)
-    
-    Retorna:
-        True si es consistente, False si no     (bool)
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])  # Todas las
-              for vecino in csp.vecinos[var]                  # restricciones
-              if vecino in asignacion)                        # deben cumplirse
-
-def cumple_restriccion(valor1, valor2):
-    """
-    Función de restricción para Sudoku (valores diferentes).
-    
-    Parámetros:
-        valor1: Primer valor a comparar        (any)
-        valor2: Segundo valor a comparar       (any)
-    
-    Retorna:
-        True si cumplen restricción, False si no (bool)
-    """
-    return valor1 != valor2                    # Restricción básica
-
 def crear_sudoku_4x4():
     """
     Crea una instancia CSP para un Sudoku 4x4.
@@ -5,8 +5,9 @@ Created on Wed Apr  9 13:46:32 2025
 @author: elvin
 """
 
+import time                          # Importa time para medir los barridos del ejemplo
 import numpy as np                   # Importa numpy para operaciones numéricas
-from collections import defaultdict  # Importa defaultdict para diccionarios con valores por defecto
+from mdp_disperso import MDPDisperso, mdp_rejilla  # Núcleo MDP con transiciones en CSR
 
 class AgenteUtilidad:                # Clase para representar un agente basado en utilidad
     def __init__(self, estados, acciones, funcion_utilidad, funcion_transicion, gamma=0.9):
@@ -14,15 +15,20 @@ class AgenteUtilidad:                # Clase para representar un agente basado e
         Constructor del agente:
         estados: Lista de estados posibles
         acciones: Lista de acciones posibles
-        funcion_utilidad: dict {estado: valor_utilidad}
-        funcion_transicion: dict {(estado, accion): {'estado': nuevo_estado, 'prob': probabilidad}}
+        funcion_utilidad: dict {estado: valor_utilidad} (recompensa por llegar al estado
+                          y utilidad inicial)
+        funcion_transicion: dict {(estado, accion): [{'estado': nuevo_estado, 'prob': probabilidad}]}
         gamma: Factor de descuento (0-1)
         """
         self.estados = estados       # Almacena los estados posibles
         self.acciones = acciones     # Almacena las acciones posibles
+        self.recompensa = funcion_utilidad.copy()  # Recompensa fija de cada estado
         self.utilidad = funcion_utilidad.copy()  # Copia la función de utilidad
         self.transicion = funcion_transicion  # Almacena la función de transición
         self.gamma = gamma           # Factor de descuento para recompensas futuras
+        # Transiciones compiladas a CSR (una fila por par estado-acción)
+        self.mdp = MDPDisperso.desde_diccionarios(estados, acciones, funcion_transicion,
+                                                  self.recompensa, gamma)
     
     def tomar_decision(self, estado_actual):
         """Selecciona la acción que maximiza la utilidad esperada"""
@@ -47,29 +53,23 @@ class AgenteUtilidad:                # Clase para representar un agente basado e
         for resultado in self.transicion[(estado, accion)]:  # Itera sobre resultados posibles
             nuevo_estado = resultado['estado']    # Obtiene el nuevo estado
             probabilidad = resultado['prob']       # Obtiene la probabilidad
-            recompensa = self.utilidad[nuevo_estado]  # Obtiene la recompensa
+            recompensa = self.recompensa[nuevo_estado]  # Obtiene la recompensa
             # Calcula la utilidad esperada con factor de descuento
             utilidad_esperada += probabilidad * (recompensa + self.gamma * self.utilidad[nuevo_estado])
         
         return utilidad_esperada     # Devuelve la utilidad esperada calculada
     
-    def actualizar_utilidades(self, iteraciones=100):
-        """Iteración de valor para calcular utilidades óptimas"""
-        for _ in range(iteraciones): # Realiza el número especificado de iteraciones
-            nuevas_utilidades = defaultdict(float)  # Crea un diccionario para nuevas utilidades
-            
-            for estado in self.estados:  # Itera sobre todos los estados
-                max_utilidad = -np.inf   # Inicializa la máxima utilidad
-                
-                for accion in self.acciones:  # Itera sobre todas las acciones
-                    utilidad_accion = self.calcular_utilidad_accion(estado, accion)
-                    if utilidad_accion > max_utilidad:  # Si encontramos mejor utilidad
-                        max_utilidad = utilidad_accion  # Actualiza la máxima utilidad
-                
-                # Asigna la nueva utilidad (mantiene la actual si no hay acciones válidas)
-                nuevas_utilidades[estado] = max_utilidad if max_utilidad != -np.inf else self.utilidad[estado]
-            
-            self.utilidad = dict(nuevas_utilidades)  # Actualiza las utilidades del agente
+    def actualizar_utilidades(self, iteraciones=100, tol=1e-6, metodo="jacobi"):
+        """
+        Iteración de valor para calcular utilidades óptimas
+        iteraciones: Máximo de barridos
+        tol: Tolerancia del criterio span (la política resultante es tol-óptima)
+        metodo: "jacobi", "gauss-seidel" o "priorizado"
+        """
+        V0 = np.array([self.utilidad[s] for s in self.estados], dtype=float)  # Utilidades actuales
+        resultado = self.mdp.iteracion_valores(V0, tol=tol, max_iter=iteraciones, metodo=metodo)
+        self.utilidad = self.mdp.a_diccionario(resultado["V"])  # Actualiza las utilidades del agente
+        return resultado             # Devuelve iteraciones y convergencia
 
 # Ejemplo: Decisión de inversión
 if __name__ == "__main__":            # Bloque principal de ejecución
@@ -110,4 +110,14 @@ if __name__ == "__main__":            # Bloque principal de ejecución
     # Tomar decisiones en diferentes estados
     for estado in estados:           # Itera sobre todos los estados
         decision = agente.tomar_decision(estado)  # Obtiene la mejor decisión
-        print(f"En estado '{estado}', la mejor acción es '{decision}'")  # Muestra resultado
\ No newline at end of file
+        print(f"En estado '{estado}', la mejor acción es '{decision}'")  # Muestra resultado
+
+    # Rejilla de 10^6 estados: respaldos de Bellman como productos dispersos
+    inicio = time.perf_counter()     # Mide la compilación de la rejilla
+    rejilla = mdp_rejilla(1000, 1000, gamma=0.95)  # 4 acciones por estado
+    print(f"\nRejilla 1000x1000 compilada en {time.perf_counter() - inicio:.1f} s")
+    inicio = time.perf_counter()     # Mide un barrido completo
+    rejilla.respaldo(np.zeros(rejilla.n))
+    print(f"Un barrido de Bellman sobre {rejilla.n} estados: {time.perf_counter() - inicio:.2f} s")
+    resultado = rejilla.iteracion_valores(tol=1e-3, max_iter=20)  # Algunos barridos
+    print(f"20 barridos: cambio span {resultado['cambio']:.4f}, V(inicio) = {resultado['V'][0]:.3f}")
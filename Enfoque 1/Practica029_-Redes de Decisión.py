@@ -6,159 +6,118 @@ Created on Wed Apr  9 13:48:24 2025
 """
 
 import numpy as np                   # Importa numpy para operaciones numéricas
-from collections import defaultdict  # Importa defaultdict para diccionarios con valores por defecto
-import random                       # Importa random para generación de números aleatorios
+from nucleo_csp import CSP, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
+from pomdp_vectorizado import CreenciasCSP  # Creencias por variable como matrices
 
-class POMDP_CSP:                    # Clase para representar un CSP como POMDP
+class POMDP_CSP(CSP):               # Clase para representar un CSP como POMDP
     def __init__(self, variables, dominios, restricciones):
         """Constructor del POMDP-CSP:
         variables: Lista de variables del problema
         dominios: Diccionario {variable: valores_posibles}
         restricciones: Lista de tuplas (var1, var2) indicando restricciones
         """
-        self.variables = variables   # Almacena las variables del problema
-        self.dominios = dominios     # Almacena los dominios de cada variable
-        self.restricciones = restricciones  # Almacena las restricciones
+        super().__init__(variables, dominios, restricciones)  # Dominios, restricciones y vecinos
         
-        # Crea diccionario de vecinos para cada variable
-        self.vecinos = {v: set() for v in variables}
-        for (v1, v2) in restricciones:  # Construye la lista de vecinos
-            self.vecinos[v1].add(v2)     # Añade v2 como vecino de v1
-            self.vecinos[v2].add(v1)     # Añade v1 como vecino de v2 (no dirigido)
-        
-        # Espacio de creencias (distribución de probabilidad sobre estados)
+        # Espacio de creencias: matriz (variables x valores), una distribución por fila
         self.belief = self.initial_belief()  # Inicializa la creencia
     
     def initial_belief(self):
-        """Inicializa la creencia como distribución uniforme sobre asignaciones posibles"""
-        belief = {}                     # Diccionario para almacenar las creencias
-        for var in self.variables:       # Para cada variable en el problema
-            # Crea distribución uniforme sobre su dominio
-            belief[var] = {val: 1.0/len(self.dominios[var]) for val in self.dominios[var]}
-        return belief                   # Devuelve la creencia inicializada
+        """Inicializa la creencia como distribución uniforme sobre asignaciones posibles
+        (compila los dominios actuales: volver a llamarla si cambian, p. ej. al fijar pistas)"""
+        self.creencias = CreenciasCSP(self)  # Índices, máscaras e incompatibilidades
+        return self.creencias.uniforme()     # Devuelve la creencia inicializada
     
-    def update_belief(self, var, val, obs_conflictos):
+    def update_belief(self, var, val, obs_conflictos, veces=1):
         """Actualiza la creencia basada en una acción y observación:
         var: Variable que se ha asignado
         val: Valor asignado
         obs_conflictos: Número de conflictos observados
+        veces: Repeticiones de la misma observación (se combinan en una sola potencia)
         """
-        for v in self.belief:           # Actualiza la creencia para cada variable
-            if v == var:                # Para la variable asignada
-                self.belief[v] = {val: 1.0}  # Certeza absoluta después de la asignación
-            else:                      # Para las demás variables
-                if obs_conflictos > 0:  # Si hay conflictos observados
-                    # Reduce probabilidad de valores conflictivos
-                    for val_v in self.belief[v]:
-                        # Cuenta conflictos con vecinos
-                        conflictos = sum(1 for vecino in self.vecinos[v] 
-                                      if vecino == var and not cumple_restriccion(val_v, val))
-                        # Reduce probabilidad exponencialmente con conflictos
-                        self.belief[v][val_v] *= (0.5 ** conflictos)
-                
-                # Normaliza la distribución de probabilidad
-                total = sum(self.belief[v].values())
-                if total > 0:           # Evita división por cero
-                    for val_v in self.belief[v]:
-                        self.belief[v][val_v] /= total  # Normaliza
+        i = self.creencias.indice[var]       # Fila de la variable
+        k = self.creencias.valores[i].index(val)  # Columna del valor
+        # Certeza sobre var y penalización 0.5 por cada observación con conflictos
+        self.belief = self.creencias.actualizar(self.belief, i, k, veces if obs_conflictos > 0 else 0)
 
-def pomdp_solve_csp(csp, max_iter=100, horizon=10, n_samples=100):
+def pomdp_solve_csp(csp, max_iter=100, horizon=10, n_samples=100, semilla=None):
     """Resuelve el CSP usando aproximación de POMDP:
     csp: Instancia del problema POMDP_CSP
-    max_iter: Número máximo de iteraciones
+    max_iter: Máximo de iteraciones
     horizon: Horizonte de planificación
     n_samples: Número de muestras por iteración
+    semilla: Semilla del generador de muestras
     """
-    # Función de valor Q aproximada
-    Q = defaultdict(float)             # Diccionario para valores Q
+    rng = np.random.default_rng(semilla)
+    c = csp.creencias                # Compilación de la creencia
+    # Función de valor Q aproximada (variable x valor)
+    Q = np.zeros(c.mascara.shape)
     
-    # Historial de mejores políticas encontradas
-    best_policy = None                 # Mejor política encontrada
-    best_score = -float('inf')         # Mejor puntuación encontrada
+    # Historial de mejores políticas
+    best_policy = None               # Mejor política encontrada
+    best_score = -float('inf')       # Mejor puntuación encontrada
     
-    for _ in range(max_iter):          # Realiza máximo de iteraciones
-        # Muestrear estados de la creencia actual
-        states = [sample_state(csp.belief) for _ in range(n_samples)]
+    for _ in range(max_iter):        # Realiza máximo de iteraciones
+        # Muestrea estados de la creencia actual: lote (muestras x variables)
+        estados = c.muestrear(csp.belief, n_samples, rng)
+        asignadas = np.ones(estados.shape, dtype=bool)  # Los estados muestreados son completos
         
-        # Evaluar política greedy basada en Q actual
-        policy = {}                   # Política actual
-        total_score = 0               # Puntuación acumulada
+        # Evalúa política greedy basada en Q actual
+        policy = {}                  # Política actual
+        total_score = 0              # Puntuación acumulada
         
-        for t in range(horizon):      # Planifica hasta el horizonte
-            # Seleccionar acción para cada estado muestreado
-            action_counts = defaultdict(int)  # Contador de acciones
+        for t in range(horizon):     # Planifica hasta el horizonte
+            libres = ~asignadas      # Variables no asignadas de cada estado
+            activos = libres.any(axis=1)
+            if not activos.any():    # Si no hay acciones posibles
+                break               # Termina esta iteración
             
-            for state in states:       # Para cada estado muestreado
-                # Encuentra variables no asignadas
-                unassigned = [v for v in csp.variables if v not in state]
-                if not unassigned:    # Si todas asignadas, continuar
-                    continue
-                
-                # Selecciona variable con mayor incertidumbre (entropía)
-                var = max(unassigned, key=lambda v: entropy(csp.belief[v]))
-                
-                # Selecciona mejor valor según Q y creencia
-                best_val = max(csp.dominios[var], 
-                             key=lambda val: Q.get((var, val), 0) * csp.belief[var].get(val, 0))
-                
-                action_counts[(var, best_val)] += 1  # Cuenta esta acción
+            # Selecciona variable con mayor incertidumbre (entropía) en cada estado
+            H = np.where(libres[activos], c.entropias(csp.belief), -np.inf)
+            var_i = H.argmax(axis=1)
+            # Selecciona mejor valor según Q y creencia
+            val_k = np.where(c.mascara, Q * csp.belief, -np.inf)[var_i].argmax(axis=1)
             
-            if not action_counts:      # Si no hay acciones posibles
-                break                 # Termina esta iteración
-                
-            # Selecciona acción más frecuente
-            action = max(action_counts.items(), key=lambda x: x[1])[0]
-            var, val = action        # Desempaqueta la acción
-            policy[var] = val         # Añade a la política
+            # Selecciona acción más frecuente (en empate, la que apareció primero)
+            _, primero, cuenta = np.unique(np.stack([var_i, val_k], axis=1), axis=0,
+                                           return_index=True, return_counts=True)
+            elegida = primero[cuenta == cuenta.max()].min()
+            i, k = var_i[elegida], val_k[elegida]
+            var, val = c.variables[i], c.valores[i][k]
+            policy[var] = val       # Añade a la política
             
-            # Simular acción y observación para cada estado
-            new_states = []           # Nuevos estados después de la acción
-            total_score = 0           # Reinicia puntuación
+            # Aplica acción en los estados donde var no estaba asignada
+            seleccion = libres[:, i]
+            estados, asignadas = estados[seleccion], asignadas[seleccion]
+            estados[:, i], asignadas[:, i] = k, True
             
-            for state in states:      # Para cada estado muestreado
-                if var in state:      # Si ya está asignada, saltar
-                    continue
-                
-                # Aplicar acción (asignar valor)
-                new_state = state.copy()
-                new_state[var] = val
-                
-                # Observar conflictos (simulado)
-                obs_conflictos = sum(1 for vecino in csp.vecinos[var] 
-                                   if vecino in new_state and 
-                                   not cumple_restriccion(val, new_state[vecino]))
-                
-                # Actualizar creencia (simulado)
-                csp.update_belief(var, val, obs_conflictos)
-                
-                # Calcular recompensa (negativa de conflictos)
-                reward = -obs_conflictos
-                total_score += reward  # Acumula puntuación
-                
-                new_states.append(new_state)  # Añade nuevo estado
+            # Observa conflictos (simulado) y actualiza la creencia una vez por lote
+            obs_conflictos = c.conflictos(estados, asignadas, i, k)
+            if len(estados):
+                csp.update_belief(var, val, 1, veces=int((obs_conflictos > 0).sum()))
             
-            states = new_states       # Actualiza estados para siguiente paso
+            # Calcula recompensa (negativa de conflictos)
+            total_score = -int(obs_conflictos.sum())
             
-            if not states:            # Si no quedan estados
-                break                # Termina esta iteración
+            if not len(estados):     # Si no quedan estados
+                break               # Termina esta iteración
         
-        # Actualizar mejor política si corresponde
-        if total_score > best_score:  # Si mejora la puntuación
+        # Actualiza mejor política si corresponde
+        if total_score > best_score:  # Si mejora puntuación
             best_score = total_score  # Actualiza mejor puntuación
             best_policy = policy      # Actualiza mejor política
     
-    # Verificar si la política es solución válida
+    # Verifica si la política es solución válida
     if best_policy and all(consistente(var, best_policy[var], best_policy, csp) 
                          for var in csp.variables if var in best_policy):
-        # Completar asignación si es necesario
-        for var in csp.variables:
+        # Completa asignación si es necesario
+        mas_probable = np.where(c.mascara, csp.belief, -np.inf).argmax(axis=1)
+        for i, var in enumerate(c.variables):
             if var not in best_policy:
                 # Asigna valor más probable según creencia
-                best_policy[var] = max(csp.dominios[var], 
-                                     key=lambda val: csp.belief[var].get(val, 0))
+                best_policy[var] = c.valores[i][mas_probable[i]]
         return best_policy            # Devuelve solución encontrada
     else:
-        # Usar búsqueda con información de creencia
+        # Usa búsqueda con información de creencia
         return pomdp_backtracking({}, csp)  # Intenta con backtracking
 
 def pomdp_backtracking(asignacion, csp):
@@ -170,24 +129,26 @@ def pomdp_backtracking(asignacion, csp):
         return asignacion                     # Devuelve solución
     
     # Selecciona variable con mayor entropía (más incertidumbre)
-    unassigned = [v for v in csp.variables if v not in asignacion]
-    var = max(unassigned, key=lambda v: entropy(csp.belief[v]))
+    c = csp.creencias
+    libres = np.array([v not in asignacion for v in c.variables])
+    i = int(np.where(libres, c.entropias(csp.belief), -np.inf).argmax())
+    var = c.variables[i]
     
-    # Ordena valores por probabilidad en la creencia (mayor a menor)
-    valores_ordenados = sorted(csp.dominios[var], 
-                             key=lambda val: -csp.belief[var].get(val, 0))
+    # Ordena valores por probabilidad en creencia (mayor a menor, estable)
+    orden = np.argsort(-csp.belief[i, :len(c.valores[i])], kind="stable")
     
-    for valor in valores_ordenados:   # Prueba valores en orden
+    for k in orden:                   # Prueba valores en orden
+        valor = c.valores[i][k]
         if consistente(var, valor, asignacion, csp):  # Si es consistente
             asignacion[var] = valor   # Asigna valor
             
             # Simula observación de conflictos
             obs_conflictos = sum(1 for vecino in csp.vecinos[var] 
-                           if vecino in asignacion and 
-                           not cumple_restriccion(valor, asignacion[vecino]))
+                               if vecino in asignacion and 
+                               not cumple_restriccion(valor, asignacion[vecino]))
             
-            # Guarda creencia anterior y actualiza localmente
-            old_belief = {v: dict(csp.belief[v]) for v in csp.belief}
+            # Guarda creencia anterior (update_belief crea una matriz nueva)
+            old_belief = csp.belief
             csp.update_belief(var, valor, obs_conflictos)
             
             # Llama recursivamente
@@ -200,39 +161,6 @@ def pomdp_backtracking(asignacion, csp):
             del asignacion[var]       # Deshace asignación
     return None                      # No encontró solución
 
-def sample_state(belief):
-    """Muestrea un estado de la distribución de creencia:
-    belief: Distribución de probabilidad sobre estados
-    """
-    state = {}                       # Estado muestreado
-    for var in belief:               # Para cada variable
-        probs = list(belief[var].values())  # Probabilidades
-        vals = list(belief[var].keys())     # Valores posibles
-        # Muestrea valor según distribución
-        state[var] = random.choices(vals, weights=probs)[0]
-    return state                     # Devuelve estado muestreado
-
-def entropy(dist):
-    """Calcula la entropía de una distribución discreta:
-    dist: Diccionario {valor: probabilidad}
-    """
-    probs = [p for p in dist.values() if p > 0]  # Filtra probabilidades > 0
-    return -sum(p * np.log(p) for p in probs) if probs else 0  # Calcula entropía
-
-def consistente(var, valor, asignacion, csp):
-    """Verifica si una asignación es consistente:
-    var: Variable asignada
-    valor: Valor asignado
-    asignacion: Asignación parcial actual
-    csp: Instancia del problema
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])
-              for vecino in csp.vecinos[var] if vecino in asignacion)
-
-def cumple_restriccion(valor1, valor2):
-    """Función de restricción simple (valores diferentes)"""
-    return valor1 != valor2           # Restricción de desigualdad
-
 # Ejemplo: Sudoku 4x4
 def crear_sudoku_4x4():
     """Crea una instancia de Sudoku 4x4 como POMDP_CSP"""
@@ -257,10 +185,6 @@ def crear_sudoku_4x4():
     return POMDP_CSP(variables, dominios, restricciones)  # Crea instancia
 
 if __name__ == "__main__":
-    # Configura semillas para reproducibilidad
-    np.random.seed(42)
-    random.seed(42)
-    
     # Crea instancia de Sudoku 4x4
     sudoku = crear_sudoku_4x4()
     
@@ -268,10 +192,10 @@ if __name__ == "__main__":
     pistas = {(0,0):1, (0,2):3, (1,1):4, (3,3):2}
     for (i,j), val in pistas.items():
         sudoku.dominios[(i,j)] = [val]            # Fija dominio a valor pista
-        sudoku.belief[(i,j)] = {val: 1.0}         # Certeza absoluta en pistas
+    sudoku.belief = sudoku.initial_belief()       # Certeza absoluta en pistas
     
-    # Resuelve con POMDP
-    solucion = pomdp_solve_csp(sudoku)
+    # Resuelve con POMDP (semilla fija para reproducibilidad)
+    solucion = pomdp_solve_csp(sudoku, semilla=42)
     
     # Muestra solución
     if solucion:
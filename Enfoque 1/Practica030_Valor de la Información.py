@@ -9,23 +9,7 @@ import numpy as np                   # Importa numpy para operaciones numéricas
 from collections import defaultdict  # Importa defaultdict para diccionarios con valores por defecto
 import math                         # Importa math para funciones matemáticas
 import random                       # Importa random para generación de números aleatorios
-
-class CSP:                          # Clase para representar un Problema de Satisfacción de Restricciones
-    def __init__(self, variables, dominios, restricciones):
-        """Constructor del CSP:
-        variables: Lista de variables del problema
-        dominios: Diccionario {variable: valores_posibles}
-        restricciones: Lista de tuplas (var1, var2) indicando restricciones entre variables
-        """
-        self.variables = variables   # Almacena las variables del problema
-        self.dominios = dominios     # Almacena los dominios de cada variable
-        self.restricciones = restricciones  # Almacena las restricciones entre variables
-        
-        # Crea diccionario de vecinos para cada variable
-        self.vecinos = {v: set() for v in variables}  # Inicializa conjuntos vacíos
-        for (v1, v2) in restricciones:  # Para cada restricción
-            self.vecinos[v1].add(v2)    # Añade v2 como vecino de v1
-            self.vecinos[v2].add(v1)    # Añade v1 como vecino de v2 (grafo no dirigido)
+from nucleo_csp import CSP, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
 
 def voi_solve_csp(csp, max_iter=100, exploration_factor=0.1):
     """Resuelve CSP usando el concepto de Valor de la Información:
@@ -89,7 +73,7 @@ def select_variable_by_voi(unassigned, csp, conflict_history, asignacion, explor
         for val in csp.dominios[var]: # Para cada valor posible
             # Simular asignación y estimar nueva entropía
             temp_conflicts = estimate_conflicts(var, val, asignacion, csp)
-            new_probabilities = [(conflict_history[var][v] + (1 if v == val else 0)*temp_conflicts/(total_conflicts+1) 
+            new_probabilities = [(conflict_history[var][v] + (1 if v == val else 0)*temp_conflicts)/(total_conflicts+1)
                               for v in csp.dominios[var]]
             new_entropy = -sum((p/(sum(new_probabilities)+1e-6)) * math.log((p/(sum(new_probabilities)+1e-6))+1e-6) 
                          for p in new_probabilities)
@@ -124,7 +108,7 @@ def select_value_by_voi(var, csp, conflict_history, asignacion):
         
         # Balance entre explotación (valores conocidos) y exploración (valores poco probados)
         total_trials = sum(conflict_history[var].values())
-        exploration_bonus = math.sqrt(2 * math.log(total_trials + 1) / (conflict_history[var][val] + 1)
+        exploration_bonus = math.sqrt(2 * math.log(total_trials + 1) / (conflict_history[var][val] + 1))
         
         conflict_scores.append(conflict_score + historical_conflict - exploration_bonus)
     
@@ -186,24 +170,3 @@ def repair_solution(asignacion, csp, conflict_history):
         return asignacion            # Devuelve solución reparada
     else:
         return None                  # No se pudo reparar
-
-def consistente(var, valor, asignacion, csp):
-    """Verifica si una asignación es consistente:
-    var: Variable asignada
-    valor: Valor asignado
-    asignacion: Asignación actual
-    csp: Instancia del problema CSP
-    """
-    # Verifica restricciones con todas las variables vecinas asignadas
-    for vecino in csp.vecinos[var]:  # Para cada variable vecina
-        if vecino in asignacion:      # Si está asignada
-            if not cumple_restriccion(valor, asignacion[vecino]):  # Si hay conflicto
-                return False          # Asignación no es consistente
-    return True                       # Asignación es consistente
-
-def cumple_restriccion(valor1, valor2):
-    """Función de restricción genérica (puede ser personalizada):
-    valor1: Valor de la primera variable
-    valor2: Valor de la segunda variable
-    """
-    return valor1 != valor2           # Restricción básica de desigualdad
\ No newline at end of file
@@ -9,26 +9,51 @@ para resolver problemas de satisfacción de restricciones.
 """
 
 import networkx as nx      # Importa NetworkX para manipulación de grafos
+import numpy as np         # Vectores de valores
 from collections import deque  # Importa deque para estructuras de datos eficientes
+from scipy import sparse   # Matriz de consistencia en CSR
+from mdp_disperso import MDPDisperso  # Núcleo de respaldos dispersos
+from nucleo_csp import CSP, backtracking, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
 
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP (Constraint Satisfaction Problem).
-        
-        Parámetros:
-            variables:    Lista de variables del problema          (list)
-            dominios:     Diccionario {variable: valores_posibles} (dict)
-            restricciones: Lista de pares de variables restringidas (list)
-        """
-        self.variables     = variables       # Lista de variables del problema
-        self.dominios      = dominios        # Dominios para cada variable
-        self.restricciones = restricciones   # Restricciones entre variables
-        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
-        
-        for (v1, v2) in restricciones:      # Construye relación de vecindad
-            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
-            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
+def compilar_consistencia(csp):
+    """
+    Compila la actualización de valores del CSP como matriz dispersa.
+
+    Cada par (variable, valor) es un estado; la fila de (var, val) tiene
+    1/(|D(var)|·|vecinos(var)|) en cada (vecino, valor_vecino) compatible,
+    así que una iteración completa es un producto matriz-vector. La
+    restricción se evalúa una sola vez por par de valores distintos.
+
+    Parámetros:
+        csp: Instancia del problema CSP        (CSP)
+
+    Retorna:
+        (MDP de una acción, lista de pares (variable, valor)) (tuple)
+    """
+    restriccion = getattr(csp, "restriccion", cumple_restriccion)
+    pares = [(var, val) for var in csp.variables for val in csp.dominios[var]]
+    inicio = {}                                 # Primer índice de cada variable
+    for i, (var, _) in enumerate(pares):
+        inicio.setdefault(var, i)
+    compatibles = {}                            # (val, vec_val) -> bool, evaluado una vez
+    filas, columnas, pesos = [], [], []
+    for var in csp.variables:
+        dominio = csp.dominios[var]
+        divisor = max(1, len(dominio) * len(csp.vecinos[var]))
+        for vecino in csp.vecinos[var]:
+            for i, val in enumerate(dominio):
+                for j, vec_val in enumerate(csp.dominios[vecino]):
+                    clave = (val, vec_val)
+                    if clave not in compatibles:
+                        compatibles[clave] = restriccion(val, vec_val)
+                    if compatibles[clave]:
+                        filas.append(inicio[var] + i)
+                        columnas.append(inicio[vecino] + j)
+                        pesos.append(1.0 / divisor)
+    n = len(pares)
+    M = sparse.csr_matrix((pesos, (filas, columnas)), shape=(n, n))
+    # Una sola acción siempre disponible, sin recompensa y sin descuento: V' = M V
+    return MDPDisperso(M, np.zeros((1, n)), 1.0, np.ones((1, n), dtype=bool), pares), pares
 
 def value_iteration_csp(csp, max_iter=100, tol=1e-4):
     """
@@ -42,37 +67,13 @@ def value_iteration_csp(csp, max_iter=100, tol=1e-4):
     Retorna:
         Asignación solución o None si no converge   (dict/None)
     """
-    # Inicializar valores (probabilidades o puntuaciones)
-    values = {
-        var: {val: 1.0 for val in csp.dominios[var]}  # Valores iniciales uniformes
-        for var in csp.variables
-    }
-    
-    for _ in range(max_iter):               # Bucle principal de iteración
-        delta = 0                           # Para medir cambio máximo
-        new_values = {var: {} for var in csp.variables}  # Nuevos valores
-        
-        # Actualizar valores para cada variable
-        for var in csp.variables:           # Para cada variable en CSP
-            for val in csp.dominios[var]:   # Para cada valor posible
-                total = 0                   # Acumulador de consistencia
-                
-                # Calcular consistencia con vecinos
-                for vecino in csp.vecinos[var]:  # Para cada variable vecina
-                    for vec_val in csp.dominios[vecino]:  # Para cada valor vecino
-                        if cumple_restriccion(val, vec_val):  # Si son consistentes
-                            total += values[vecino][vec_val]  # Suma valor actual
-                
-                # Normalizar y almacenar nuevo valor
-                divisor = max(1, len(csp.dominios[var]) * len(csp.vecinos[var]))
-                new_val = total / divisor   # Promedio de consistencia
-                new_values[var][val] = new_val  # Almacena nuevo valor
-                delta = max(delta, abs(new_val - values[var][val]))  # Actualiza delta
-        
-        values = new_values                 # Actualiza valores para siguiente iteración
-        
-        if delta < tol:                     # Verificar convergencia
-            break                           # Salir si convergió
+    # Iteraciones como productos dispersos desde valores uniformes
+    mdp, pares = compilar_consistencia(csp)
+    resultado = mdp.iteracion_valores(np.ones(len(pares)), tol=tol, max_iter=max_iter,
+                                      criterio="max")  # Mismo cambio máximo que antes
+    values = {var: {} for var in csp.variables}
+    for (var, val), v in zip(pares, resultado["V"]):
+        values[var][val] = v
     
     # Seleccionar asignación más probable
     asignacion = {
@@ -100,55 +101,9 @@ def backtracking_value_guided(asignacion, csp, values):
     Retorna:
         Solución completa o None si no hay solución   (dict/None)
     """
-    if len(asignacion) == len(csp.variables):  # Si asignación completa
-        return asignacion                      # Retorna solución
-    
-    # Seleccionar variable no asignada con MRV
-    var = min([v for v in csp.variables if v not in asignacion],
-              key=lambda v: len(csp.dominios[v]))
-    
-    # Ordenar valores por score descendente (guiado por values)
-    valores_ordenados = sorted(csp.dominios[var],
-                              key=lambda val: -values[var][val])
-    
-    for valor in valores_ordenados:          # Probar valores en orden guiado
-        if consistente(var, valor, asignacion, csp):  # Si es consistente
-            asignacion[var] = valor         # Realizar asignación
-            resultado = backtracking_value_guided(asignacion, csp, values)
-            if resultado is not None:       # Si encontró solución
-                return resultado            # Retórnala
-            del asignacion[var]             # Backtrack (deshacer)
-    return None                             # No hay solución
-
-def consistente(var, valor, asignacion, csp):
-    """
-    Verifica si una asignación es consistente con las restricciones.
-    
-    Parámetros:
-        var:        Variable a asignar                 (any)
-        valor:      Valor a verificar                  (any)
-        asignacion: Asignación parcial actual          (dict)
-        csp:        Instancia del problema CSP        (CSP)
-    
-    Retorna:
-        True si es consistente, False si no           (bool)
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])  # Todas las
-              for vecino in csp.vecinos[var]                  # restricciones
-              if vecino in asignacion)                        # deben cumplirse
-
-def cumple_restriccion(valor1, valor2):
-    """
-    Función de restricción para Sudoku (valores diferentes).
-    
-    Parámetros:
-        valor1: Primer valor a comparar               (any)
-        valor2: Segundo valor a comparar              (any)
-    
-    Retorna:
-        True si cumplen restricción, False si no      (bool)
-    """
-    return valor1 != valor2                           # Restricción básica
+    # Mismo backtracking del núcleo, con los valores de mayor score primero
+    return backtracking(asignacion, csp,
+                        clave_valor=lambda var, val: -values[var][val])
 
 def crear_sudoku_4x4():
     """
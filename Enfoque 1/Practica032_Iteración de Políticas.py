@@ -5,48 +5,72 @@ Created on Wed Apr  9 13:59:11 2025
 @author: elvin
 """
 
-import networkx as nx                # Importa networkx para operaciones con grafos
-from collections import defaultdict  # Importa defaultdict para diccionarios por defecto
+import random                        # Política inicial aleatoria
+import numpy as np                   # Vectores de valores y puntuaciones
+from scipy import sparse             # Matriz de compatibilidad en CSR
+from nucleo_csp import CSP, backtracking, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
 
-class CSP:                          # Clase para representar un Problema de Satisfacción de Restricciones
-    def __init__(self, variables, dominios, restricciones):
-        """Constructor que inicializa el CSP:
-        variables: Lista de variables del problema
-        dominios: Diccionario {variable: valores_posibles}
-        restricciones: Lista de tuplas (var1, var2) con restricciones
-        """
-        self.variables = variables   # Almacena las variables del problema
-        self.dominios = dominios     # Almacena los dominios de cada variable
-        self.restricciones = restricciones  # Almacena las restricciones
-        
-        # Diccionario de vecinos para cada variable
-        self.vecinos = {v: set() for v in variables}  # Inicializa conjuntos vacíos
-        for (v1, v2) in restricciones:  # Para cada restricción
-            self.vecinos[v1].add(v2)    # Añade v2 como vecino de v1
-            self.vecinos[v2].add(v1)    # Añade v1 como vecino de v2 (no dirigido)
+def compilar_politicas(csp):
+    """Compila el CSP para evaluar y mejorar políticas con productos dispersos:
+    csp: Instancia del problema CSP
+
+    Retorna un dict con "pares" (variable, valor) contiguos por variable,
+    "inicio" (primer par de cada variable), "variable_de" (variable de cada
+    par), "grado" (vecinos de cada variable) y "C", la matriz CSR
+    pares x pares con 1 en ((var, val), (vecino, valor_vecino)) si los
+    valores son compatibles.
+    """
+    restriccion = getattr(csp, "restriccion", cumple_restriccion)
+    pares = [(var, val) for var in csp.variables for val in csp.dominios[var]]
+    posicion = {var: i for i, var in enumerate(csp.variables)}
+    inicio = np.zeros(len(csp.variables), dtype=np.intp)
+    for k in range(len(pares) - 1, -1, -1):  # Primer par de cada variable
+        inicio[posicion[pares[k][0]]] = k
+    compatibles = {}                # (val, valor_vecino) -> bool, evaluado una vez
+    filas, columnas = [], []
+    for var in csp.variables:
+        for vecino in csp.vecinos[var]:
+            for i, val in enumerate(csp.dominios[var]):
+                for j, vec_val in enumerate(csp.dominios[vecino]):
+                    clave = (val, vec_val)
+                    if clave not in compatibles:
+                        compatibles[clave] = restriccion(val, vec_val)
+                    if compatibles[clave]:
+                        filas.append(inicio[posicion[var]] + i)
+                        columnas.append(inicio[posicion[vecino]] + j)
+    n = len(pares)
+    return {
+        "pares": pares,
+        "inicio": inicio,
+        "variable_de": np.array([posicion[var] for var, _ in pares], dtype=np.intp),
+        "grado": np.array([len(csp.vecinos[var]) for var in csp.variables], dtype=float),
+        "C": sparse.csr_matrix((np.ones(len(filas)), (filas, columnas)), shape=(n, n)),
+    }
 
 def policy_iteration_csp(csp, max_iter=100, tol=1e-4):
     """Resuelve CSP usando Iteración de Políticas:
     csp: Instancia del problema CSP
     max_iter: Máximo de iteraciones permitidas
-    tol: Tolerancia para convergencia
+    tol: Tolerancia para empates entre puntuaciones
     """
-    # Inicializa política con valores aleatorios
-    politica = {var: random.choice(csp.dominios[var]) for var in csp.variables}
+    compilado = compilar_politicas(csp)
+    pares = compilado["pares"]
+    # Inicializa política con valores aleatorios (índice del par elegido por variable)
+    eleccion = compilado["inicio"] + np.array(
+        [random.randrange(len(csp.dominios[var])) for var in csp.variables], dtype=np.intp)
     
-    for _ in range(max_iter):        # Realiza máximo de iteraciones
+    for _ in range(max_iter):        # Cada ciclo evalúa sólo si la política cambió
         # Paso de Evaluación: Calcular calidad de la política actual
-        valores = evaluate_policy(politica, csp)
+        valores = evaluate_policy(eleccion, compilado)
         
         # Paso de Mejora: Actualizar política basada en valores
-        politica_mejorada, policy_changed = improve_policy(politica, valores, csp)
+        eleccion, policy_changed = improve_policy(eleccion, valores, compilado, tol)
         
         # Verificar convergencia (si política no cambió)
         if not policy_changed:
             break                   # Termina el bucle si convergió
-            
-        politica = politica_mejorada # Actualiza la política
     
+    politica = {var: pares[k][1] for var, k in zip(csp.variables, eleccion)}
     # Verificar si la política final es solución válida
     if all(consistente(var, politica[var], politica, csp) 
            for var in csp.variables):
@@ -55,54 +79,39 @@ def policy_iteration_csp(csp, max_iter=100, tol=1e-4):
         # Si no es válida, usa backtracking guiado por política
         return backtracking_policy_guided({}, csp, politica)
 
-def evaluate_policy(politica, csp):
+def evaluate_policy(eleccion, compilado):
     """Evalúa la política actual calculando valores:
-    politica: Asignación actual (diccionario)
-    csp: Instancia del problema CSP
+    eleccion: Par (variable, valor) elegido por cada variable (ndarray)
+    compilado: Resultado de compilar_politicas
     """
-    valores = defaultdict(float)     # Diccionario para almacenar valores
-    
-    # Calcula calidad para cada variable en la política
-    for var in csp.variables:       # Para cada variable
-        val = politica[var]         # Valor asignado en la política
-        # Cuenta conflictos con vecinos
-        conflictos = sum(1 for vecino in csp.vecinos[var] 
-                      if not cumple_restriccion(val, politica[vecino]))
-        # Valor inversamente proporcional a conflictos
-        valores[var] = 1.0 / (1.0 + conflictos)  
-    
-    return valores                  # Retorna valores calculados
+    elegidos = np.zeros(len(compilado["pares"]))
+    elegidos[eleccion] = 1.0
+    # Vecinos compatibles con el valor elegido: fila del par elegido por el vector de elegidos
+    compatibles = compilado["C"][eleccion] @ elegidos
+    conflictos = compilado["grado"] - compatibles
+    return 1.0 / (1.0 + conflictos)  # Valor inversamente proporcional a conflictos
 
-def improve_policy(politica, valores, csp):
+def improve_policy(eleccion, valores, compilado, tol=1e-4):
     """Mejora la política basada en los valores:
-    politica: Política actual a mejorar
+    eleccion: Política actual a mejorar
     valores: Valores calculados en evaluate_policy
-    csp: Instancia del problema CSP
+    compilado: Resultado de compilar_politicas
+    tol: Diferencia mínima para cambiar de valor
+
+    La puntuación de cada (var, val) es la suma de los valores de los
+    vecinos cuyo valor elegido es compatible con val. Se conserva el valor
+    actual si empata con el mejor, así la política sólo cambia (y se vuelve
+    a evaluar) cuando hay una mejora estricta.
     """
-    nueva_politica = {}             # Nueva política a construir
-    policy_changed = False          # Flag para detectar cambios
-    
-    for var in csp.variables:       # Para cada variable
-        best_val = None             # Mejor valor encontrado
-        best_score = -float('inf')  # Mejor puntuación encontrada
-        
-        for val in csp.dominios[var]:  # Evalúa cada valor posible
-            score = 0               # Puntuación para este valor
-            for vecino in csp.vecinos[var]:
-                # Suma valores de vecinos si no hay conflicto
-                if cumple_restriccion(val, politica[vecino]):
-                    score += valores[vecino]
-            
-            # Actualiza mejor valor (con aleatoriedad para evitar estancamiento)
-            if score > best_score or (score == best_score and random.random() < 0.1):
-                best_score = score
-                best_val = val
-        
-        nueva_politica[var] = best_val  # Asigna mejor valor
-        if best_val != politica[var]:    # Verifica si hubo cambio
-            policy_changed = True
-    
-    return nueva_politica, policy_changed  # Retorna nueva política y flag
+    ponderados = np.zeros(len(compilado["pares"]))
+    ponderados[eleccion] = valores
+    puntuacion = compilado["C"] @ ponderados
+    mejor = np.maximum.reduceat(puntuacion, compilado["inicio"])  # Máximo por variable
+    # Primer par de cada variable que alcanza el máximo (salvo redondeo)
+    alcanzan = np.flatnonzero(puntuacion >= mejor[compilado["variable_de"]] - tol)
+    _, primero = np.unique(compilado["variable_de"][alcanzan], return_index=True)
+    nueva = np.where(puntuacion[eleccion] >= mejor - tol, eleccion, alcanzan[primero])
+    return nueva, bool((nueva != eleccion).any())
 
 def backtracking_policy_guided(asignacion, csp, politica):
     """Backtracking guiado por la política:
@@ -110,43 +119,9 @@ def backtracking_policy_guided(asignacion, csp, politica):
     csp: Instancia del problema CSP
     politica: Política para guiar la búsqueda
     """
-    if len(asignacion) == len(csp.variables):  # Si asignación completa
-        return asignacion                     # Retorna solución
-    
-    # Selecciona variable no asignada con dominio más pequeño
-    var = min([v for v in csp.variables if v not in asignacion],
-              key=lambda v: len(csp.dominios[v]))
-    
-    # Ordena valores por proximidad al valor de la política
-    valores_ordenados = sorted(csp.dominios[var],
-                             key=lambda val: abs(val - politica[var]))
-    
-    for valor in valores_ordenados:   # Prueba valores en orden
-        if consistente(var, valor, asignacion, csp):  # Si es consistente
-            asignacion[var] = valor   # Asigna valor
-            # Llama recursivamente
-            resultado = backtracking_policy_guided(asignacion, csp, politica)
-            if resultado is not None:  # Si encontró solución
-                return resultado       # Retorna solución
-            del asignacion[var]       # Deshace asignación
-    return None                      # No encontró solución
-
-def consistente(var, valor, asignacion, csp):
-    """Verifica si una asignación es consistente:
-    var: Variable a verificar
-    valor: Valor asignado
-    asignacion: Asignación parcial actual
-    csp: Instancia del problema CSP
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])
-              for vecino in csp.vecinos[var] if vecino in asignacion)
-
-def cumple_restriccion(valor1, valor2):
-    """Función de restricción básica (valores diferentes):
-    valor1: Primer valor a comparar
-    valor2: Segundo valor a comparar
-    """
-    return valor1 != valor2           # Restricción de desigualdad
+    # Mismo backtracking del núcleo, ordenando por cercanía a la política
+    return backtracking(asignacion, csp,
+                        clave_valor=lambda var, val: abs(val - politica[var]))
 
 def crear_sudoku_4x4():
     """Crea una instancia de Sudoku 4x4 como CSP"""
@@ -171,8 +146,6 @@ def crear_sudoku_4x4():
     return CSP(variables, dominios, restricciones)  # Retorna instancia CSP
 
 if __name__ == "__main__":            # Bloque principal de ejecución
-    import random                     # Importa random para generación aleatoria
-    
     sudoku = crear_sudoku_4x4()       # Crea instancia de Sudoku 4x4
     
     # Asigna algunas pistas iniciales
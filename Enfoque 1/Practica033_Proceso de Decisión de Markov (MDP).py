@@ -5,76 +5,58 @@ Created on Wed Apr  9 14:13:41 2025
 @author: elvin
 """
 
+import time                          # Medición de tiempos en la demostración
 import numpy as np                   # Importa numpy para operaciones numéricas
-from collections import defaultdict  # Importa defaultdict para diccionarios por defecto
+from scipy import sparse             # Transiciones del MDP en CSR
+from mdp_disperso import MDPDisperso, mdp_aleatorio  # Núcleo MDP disperso compartido
+from nucleo_csp import CSP, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
 
-class CSP:                          # Clase para representar un Problema de Satisfacción de Restricciones
-    def __init__(self, variables, dominios, restricciones):
-        """Constructor que inicializa el CSP:
-        variables: Lista de variables del problema
-        dominios: Diccionario {variable: valores_posibles}
-        restricciones: Lista de tuplas (var1, var2) con restricciones
-        """
-        self.variables = variables   # Almacena las variables del problema
-        self.dominios = dominios     # Almacena los dominios de cada variable
-        self.restricciones = restricciones  # Almacena las restricciones
-        
-        # Diccionario de vecinos para cada variable
-        self.vecinos = {v: set() for v in variables}  # Inicializa conjuntos vacíos
-        for (v1, v2) in restricciones:  # Para cada restricción
-            self.vecinos[v1].add(v2)    # Añade v2 como vecino de v1
-            self.vecinos[v2].add(v1)    # Añade v1 como vecino de v2 (no dirigido)
+def compilar_mdp_csp(csp, gamma=0.9):
+    """Compila el CSP como MDP disperso:
+    csp: Instancia del problema CSP
+    gamma: Factor de descuento para recompensas futuras
+
+    Cada par (variable, valor) es un estado y cada valor compatible de un
+    vecino es una acción determinista hacia ese par. La actualización
+    V(s) = r({}, s) + γ·max[r({s}, s') + γ·V(s')] equivale a un MDP con
+    recompensa γ·r({s}, s') por acción y descuento γ²; r({}, s) siempre es 0.
+    Retorna (MDP compilado, lista de pares (variable, valor)).
+    """
+    restriccion = getattr(csp, "restriccion", cumple_restriccion)
+    pares = [(var, val) for var in csp.variables for val in csp.dominios[var]]
+    indice = {par: i for i, par in enumerate(pares)}
+    acciones = [[] for _ in pares]      # Por estado: (destino, recompensa)
+    for var in csp.variables:
+        for val in csp.dominios[var]:
+            s = indice[(var, val)]
+            for vecino in csp.vecinos[var]:
+                for vec_val in csp.dominios[vecino]:
+                    if restriccion(val, vec_val):
+                        # Conflicto de (vecino, vec_val) con la asignación {var: val}
+                        conflicto = 0.0 if restriccion(vec_val, val) else -1.0
+                        acciones[s].append((indice[(vecino, vec_val)], gamma * conflicto))
+    n, m = len(pares), max((len(a) for a in acciones), default=0)
+    filas, columnas, R = [], [], np.zeros((max(m, 1), n))
+    for s, opciones in enumerate(acciones):
+        for a, (destino, r) in enumerate(opciones):
+            filas.append(a * n + s)
+            columnas.append(destino)
+            R[a, s] = r
+    P = sparse.csr_matrix((np.ones(len(filas)), (filas, columnas)), shape=(max(m, 1) * n, n))
+    return MDPDisperso(P, R, gamma ** 2, estados=pares), pares
 
 def mdp_solve_csp(csp, gamma=0.9, max_iter=100, tol=1e-4):
     """Resuelve un CSP modelándolo como un MDP (Proceso de Decisión Markoviano):
     csp: Instancia del problema CSP
     gamma: Factor de descuento para recompensas futuras
-    max_iter: Máximo de iteraciones permitidas
+    max_iter: Máximo de ciclos evaluación-mejora
     tol: Tolerancia para convergencia
     """
-    # Inicializar función de valor para cada asignación posible
-    V = defaultdict(float)           # Diccionario para almacenar valores
-    
-    # Función de recompensa: penaliza conflictos entre variables
-    def recompensa(asignacion, var, val):
-        """Calcula recompensa por asignar un valor a una variable:
-        asignacion: Asignación parcial actual
-        var: Variable que se está asignando
-        val: Valor que se está probando
-        """
-        conflictos = sum(1 for vecino in csp.vecinos[var] 
-                      if vecino in asignacion and not cumple_restriccion(val, asignacion[vecino]))
-        return -conflictos            # Recompensa negativa por conflictos
-    
-    # Iteración de valor para actualizar V
-    for _ in range(max_iter):        # Realiza máximo de iteraciones
-        delta = 0                    # Para medir cambio en valores
-        # Actualizar valores para cada variable y valor posible
-        for var in csp.variables:    # Para cada variable en el CSP
-            for val in csp.dominios[var]:  # Para cada valor posible
-                old_v = V[(var, val)] # Guarda valor anterior
-                max_q = -float('inf') # Inicializa máximo valor Q
-                
-                # Considerar el mejor valor para los vecinos
-                for vecino in csp.vecinos[var]:  # Para cada variable vecina
-                    for vec_val in csp.dominios[vecino]:  # Para cada valor posible
-                        if cumple_restriccion(val, vec_val):  # Si no hay conflicto
-                            # Calcula valor Q para esta acción
-                            q_val = recompensa({var: val}, vecino, vec_val) + gamma * V[(vecino, vec_val)]
-                            if q_val > max_q:    # Actualiza máximo
-                                max_q = q_val
-                
-                # Actualiza valor V para esta asignación
-                if csp.vecinos[var]:  # Si tiene vecinos
-                    V[(var, val)] = recompensa({}, var, val) + gamma * (max_q if max_q != -float('inf') else 0)
-                else:                 # Si no tiene vecinos
-                    V[(var, val)] = recompensa({}, var, val)
-                
-                # Actualiza delta para verificar convergencia
-                delta = max(delta, abs(V[(var, val)] - old_v))
-        
-        if delta < tol:              # Si convergió
-            break                    # Termina las iteraciones
+    # Iteración de políticas sobre el MDP compilado: evaluación con BiCGSTAB
+    # y nueva evaluación sólo si la política cambia
+    mdp, pares = compilar_mdp_csp(csp, gamma)
+    resultado = mdp.iteracion_politicas(tol=tol, max_iter=max_iter)
+    V = mdp.a_diccionario(resultado["V"])  # Valor de cada par (variable, valor)
     
     # Extraer la política óptima (asignación de valores)
     politica = {}                   # Diccionario para política óptima
@@ -116,23 +98,6 @@ def mdp_backtracking(asignacion, csp, V):
             del asignacion[var]       # Deshace asignación
     return None                      # No encontró solución
 
-def consistente(var, valor, asignacion, csp):
-    """Verifica si una asignación es consistente:
-    var: Variable que se está verificando
-    valor: Valor asignado
-    asignacion: Asignación parcial actual
-    csp: Instancia del problema CSP
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])
-              for vecino in csp.vecinos[var] if vecino in asignacion)
-
-def cumple_restriccion(valor1, valor2):
-    """Función de restricción básica (valores diferentes):
-    valor1: Primer valor a comparar
-    valor2: Segundo valor a comparar
-    """
-    return valor1 != valor2           # Restricción de desigualdad
-
 def crear_sudoku_4x4():
     """Crea una instancia de Sudoku 4x4 como CSP"""
     variables = [(i,j) for i in range(4) for j in range(4)]  # 16 celdas
@@ -171,4 +136,18 @@ if __name__ == "__main__":            # Bloque principal de ejecución
         for i in range(4):             # Imprime el tablero solución
             print([solucion[(i,j)] for j in range(4)])
     else:
-        print("No se encontró solución")  # Mensaje si no hay solución
\ No newline at end of file
+        print("No se encontró solución")  # Mensaje si no hay solución
+    
+    # Iteración de valores vs. iteración de políticas en un MDP grande
+    mdp = mdp_aleatorio(200000, 4, semilla=0)
+    print("\nMDP aleatorio: 200000 estados, 4 acciones")
+    inicio = time.perf_counter()
+    vi = mdp.iteracion_valores(tol=1e-8)
+    print(f"  Iteración de valores:   {vi['iteraciones']:3d} barridos, "
+          f"{time.perf_counter() - inicio:.2f} s")
+    for evaluacion in ("bicgstab", "k-pasos"):
+        inicio = time.perf_counter()
+        pi = mdp.iteracion_politicas(evaluacion=evaluacion, tol=1e-8)
+        print(f"  Políticas ({evaluacion:8s}): {pi['iteraciones']:3d} mejoras,  "
+              f"{time.perf_counter() - inicio:.2f} s, cambios {pi['cambios']}")
+    print(f"  Máxima diferencia de valores: {np.abs(pi['V'] - vi['V']).max():.1e}")
@@ -5,145 +5,104 @@ Created on Wed Apr  9 14:13:42 2025
 @author: elvin
 """
 
+import time                          # Medición de tiempos en la demostración
 import numpy as np                   # Importa numpy para operaciones numéricas
-from collections import defaultdict  # Importa defaultdict para diccionarios por defecto
-import random                       # Importa random para generación aleatoria
+from nucleo_csp import CSP, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
+from pomdp_vectorizado import CreenciasCSP, pomdp_rejilla, pomdp_tigre  # Creencias y solucionadores vectorizados
 
-class POMDP_CSP:                    # Clase para CSP con incertidumbre (POMDP)
+class POMDP_CSP(CSP):               # Clase para CSP con incertidumbre (POMDP)
     def __init__(self, variables, dominios, restricciones):
         """Constructor que inicializa el POMDP-CSP:
         variables: Lista de variables del problema
         dominios: Diccionario {variable: valores_posibles}
         restricciones: Lista de tuplas de variables con restricciones
         """
-        self.variables = variables   # Almacena las variables del problema
-        self.dominios = dominios     # Almacena los dominios de cada variable
-        self.restricciones = restricciones  # Almacena las restricciones
+        super().__init__(variables, dominios, restricciones)  # Dominios, restricciones y vecinos
         
-        # Diccionario de vecinos para cada variable
-        self.vecinos = {v: set() for v in variables}  # Inicializa conjuntos vacíos
-        for (v1, v2) in restricciones:  # Para cada restricción
-            self.vecinos[v1].add(v2)    # Añade v2 como vecino de v1
-            self.vecinos[v2].add(v1)    # Añade v1 como vecino de v2 (no dirigido)
-        
-        # Espacio de creencias (distribución de probabilidad sobre estados)
+        # Espacio de creencias: matriz (variables x valores), una distribución por fila
         self.belief = self.initial_belief()  # Inicializa la creencia
     
     def initial_belief(self):
         """Inicializa la creencia como distribución uniforme:
+        Compila los dominios actuales (volver a llamarla si cambian, p. ej. al fijar pistas)
         Returns:
-            Diccionario con distribución inicial uniforme
+            Matriz (variables x valores) con distribución inicial uniforme
         """
-        belief = {}                   # Diccionario para almacenar creencias
-        for var in self.variables:    # Para cada variable
-            # Crea distribución uniforme sobre su dominio
-            belief[var] = {val: 1.0/len(self.dominios[var]) for val in self.dominios[var]}
-        return belief                 # Retorna creencia inicializada
+        self.creencias = CreenciasCSP(self)  # Índices, máscaras e incompatibilidades
+        return self.creencias.uniforme()     # Retorna creencia inicializada
     
-    def update_belief(self, var, val, obs_conflictos):
+    def update_belief(self, var, val, obs_conflictos, veces=1):
         """Actualiza la creencia basada en acción y observación:
         var: Variable que fue asignada
         val: Valor que fue asignado
         obs_conflictos: Número de conflictos observados
+        veces: Repeticiones de la misma observación (se combinan en una sola potencia)
         """
-        # Actualiza creencia para todas las variables
-        for v in self.belief:         # Para cada variable en la creencia
-            if v == var:              # Para la variable asignada
-                self.belief[v] = {val: 1.0}  # Certeza absoluta (asignación conocida)
-            else:                     # Para otras variables
-                if obs_conflictos > 0:  # Si hubo conflictos observados
-                    # Reduce probabilidad de valores conflictivos
-                    for val_v in self.belief[v]:
-                        # Cuenta conflictos con la variable asignada
-                        conflictos = sum(1 for vecino in self.vecinos[v] 
-                                      if vecino == var and not cumple_restriccion(val_v, val))
-                        # Reduce probabilidad exponencialmente con conflictos
-                        self.belief[v][val_v] *= (0.5 ** conflictos)
-                
-                # Normaliza la distribución de probabilidad
-                total = sum(self.belief[v].values())
-                if total > 0:         # Evita división por cero
-                    for val_v in self.belief[v]:
-                        self.belief[v][val_v] /= total  # Normaliza probabilidades
+        i = self.creencias.indice[var]       # Fila de la variable
+        k = self.creencias.valores[i].index(val)  # Columna del valor
+        # Certeza sobre var y penalización 0.5 por cada observación con conflictos
+        self.belief = self.creencias.actualizar(self.belief, i, k, veces if obs_conflictos > 0 else 0)
 
-def pomdp_solve_csp(csp, max_iter=100, horizon=10, n_samples=100):
+def pomdp_solve_csp(csp, max_iter=100, horizon=10, n_samples=100, semilla=None):
     """Resuelve CSP usando aproximación POMDP:
     csp: Instancia del problema POMDP_CSP
     max_iter: Máximo de iteraciones
     horizon: Horizonte de planificación
     n_samples: Número de muestras por iteración
+    semilla: Semilla del generador de muestras
     """
-    # Función de valor Q aproximada
-    Q = defaultdict(float)           # Diccionario para valores Q
+    rng = np.random.default_rng(semilla)
+    c = csp.creencias                # Compilación de la creencia
+    # Función de valor Q aproximada (variable x valor)
+    Q = np.zeros(c.mascara.shape)
     
     # Historial de mejores políticas
     best_policy = None               # Mejor política encontrada
     best_score = -float('inf')       # Mejor puntuación encontrada
     
     for _ in range(max_iter):        # Realiza máximo de iteraciones
-        # Muestrea estados de la creencia actual
-        states = [sample_state(csp.belief) for _ in range(n_samples)]
+        # Muestrea estados de la creencia actual: lote (muestras x variables)
+        estados = c.muestrear(csp.belief, n_samples, rng)
+        asignadas = np.ones(estados.shape, dtype=bool)  # Los estados muestreados son completos
         
         # Evalúa política greedy basada en Q actual
         policy = {}                  # Política actual
         total_score = 0              # Puntuación acumulada
         
         for t in range(horizon):     # Planifica hasta el horizonte
-            # Selecciona acción para cada estado muestreado
-            action_counts = defaultdict(int)  # Contador de acciones
+            libres = ~asignadas      # Variables no asignadas de cada estado
+            activos = libres.any(axis=1)
+            if not activos.any():    # Si no hay acciones posibles
+                break               # Termina esta iteración
             
-            for state in states:     # Para cada estado muestreado
-                # Encuentra variables no asignadas
-                unassigned = [v for v in csp.variables if v not in state]
-                if not unassigned:   # Si todas asignadas, continuar
-                    continue
-                
-                # Selecciona variable con mayor incertidumbre (entropía)
-                var = max(unassigned, key=lambda v: entropy(csp.belief[v]))
-                
-                # Selecciona mejor valor según Q y creencia
-                best_val = max(csp.dominios[var], 
-                             key=lambda val: Q.get((var, val), 0) * csp.belief[var].get(val, 0))
-                
-                action_counts[(var, best_val)] += 1  # Cuenta esta acción
+            # Selecciona variable con mayor incertidumbre (entropía) en cada estado
+            H = np.where(libres[activos], c.entropias(csp.belief), -np.inf)
+            var_i = H.argmax(axis=1)
+            # Selecciona mejor valor según Q y creencia
+            val_k = np.where(c.mascara, Q * csp.belief, -np.inf)[var_i].argmax(axis=1)
             
-            if not action_counts:    # Si no hay acciones posibles
-                break               # Termina esta iteración
-                
-            # Selecciona acción más frecuente
-            action = max(action_counts.items(), key=lambda x: x[1])[0]
-            var, val = action       # Desempaqueta la acción
+            # Selecciona acción más frecuente (en empate, la que apareció primero)
+            _, primero, cuenta = np.unique(np.stack([var_i, val_k], axis=1), axis=0,
+                                           return_index=True, return_counts=True)
+            elegida = primero[cuenta == cuenta.max()].min()
+            i, k = var_i[elegida], val_k[elegida]
+            var, val = c.variables[i], c.valores[i][k]
             policy[var] = val       # Añade a la política
             
-            # Simula acción y observación para cada estado
-            new_states = []         # Nuevos estados después de acción
-            total_score = 0         # Reinicia puntuación
+            # Aplica acción en los estados donde var no estaba asignada
+            seleccion = libres[:, i]
+            estados, asignadas = estados[seleccion], asignadas[seleccion]
+            estados[:, i], asignadas[:, i] = k, True
             
-            for state in states:    # Para cada estado muestreado
-                if var in state:    # Si ya está asignada, saltar
-                    continue
-                
-                # Aplica acción (asignar valor)
-                new_state = state.copy()
-                new_state[var] = val
-                
-                # Observa conflictos (simulado)
-                obs_conflictos = sum(1 for vecino in csp.vecinos[var] 
-                                   if vecino in new_state and 
-                                   not cumple_restriccion(val, new_state[vecino]))
-                
-                # Actualiza creencia (simulado)
-                csp.update_belief(var, val, obs_conflictos)
-                
-                # Calcula recompensa (negativa de conflictos)
-                reward = -obs_conflictos
-                total_score += reward  # Acumula puntuación
-                
-                new_states.append(new_state)  # Añade nuevo estado
+            # Observa conflictos (simulado) y actualiza la creencia una vez por lote
+            obs_conflictos = c.conflictos(estados, asignadas, i, k)
+            if len(estados):
+                csp.update_belief(var, val, 1, veces=int((obs_conflictos > 0).sum()))
             
-            states = new_states      # Actualiza estados para siguiente paso
+            # Calcula recompensa (negativa de conflictos)
+            total_score = -int(obs_conflictos.sum())
             
-            if not states:           # Si no quedan estados
+            if not len(estados):     # Si no quedan estados
                 break               # Termina esta iteración
         
         # Actualiza mejor política si corresponde
@@ -155,11 +114,11 @@ def pomdp_solve_csp(csp, max_iter=100, horizon=10, n_samples=100):
     if best_policy and all(consistente(var, best_policy[var], best_policy, csp) 
                          for var in csp.variables if var in best_policy):
         # Completa asignación si es necesario
-        for var in csp.variables:
+        mas_probable = np.where(c.mascara, csp.belief, -np.inf).argmax(axis=1)
+        for i, var in enumerate(c.variables):
             if var not in best_policy:
                 # Asigna valor más probable según creencia
-                best_policy[var] = max(csp.dominios[var], 
-                                     key=lambda val: csp.belief[var].get(val, 0))
+                best_policy[var] = c.valores[i][mas_probable[i]]
         return best_policy            # Retorna solución encontrada
     else:
         # Usa búsqueda con información de creencia
@@ -174,14 +133,16 @@ def pomdp_backtracking(asignacion, csp):
         return asignacion                     # Retorna solución
     
     # Selecciona variable con mayor entropía (más incertidumbre)
-    unassigned = [v for v in csp.variables if v not in asignacion]
-    var = max(unassigned, key=lambda v: entropy(csp.belief[v]))
+    c = csp.creencias
+    libres = np.array([v not in asignacion for v in c.variables])
+    i = int(np.where(libres, c.entropias(csp.belief), -np.inf).argmax())
+    var = c.variables[i]
     
-    # Ordena valores por probabilidad en creencia (mayor a menor)
-    valores_ordenados = sorted(csp.dominios[var], 
-                             key=lambda val: -csp.belief[var].get(val, 0))
+    # Ordena valores por probabilidad en creencia (mayor a menor, estable)
+    orden = np.argsort(-csp.belief[i, :len(c.valores[i])], kind="stable")
     
-    for valor in valores_ordenados:   # Prueba valores en orden
+    for k in orden:                   # Prueba valores en orden
+        valor = c.valores[i][k]
         if consistente(var, valor, asignacion, csp):  # Si es consistente
             asignacion[var] = valor   # Asigna valor
             
@@ -190,8 +151,8 @@ def pomdp_backtracking(asignacion, csp):
                                if vecino in asignacion and 
                                not cumple_restriccion(valor, asignacion[vecino]))
             
-            # Guarda creencia anterior y actualiza localmente
-            old_belief = {v: dict(csp.belief[v]) for v in csp.belief}
+            # Guarda creencia anterior (update_belief crea una matriz nueva)
+            old_belief = csp.belief
             csp.update_belief(var, valor, obs_conflictos)
             
             # Llama recursivamente
@@ -204,42 +165,6 @@ def pomdp_backtracking(asignacion, csp):
             del asignacion[var]       # Deshace asignación
     return None                      # No encontró solución
 
-def sample_state(belief):
-    """Muestrea un estado de la distribución de creencia:
-    belief: Distribución de probabilidad sobre estados
-    """
-    state = {}                       # Estado a muestrear
-    for var in belief:               # Para cada variable
-        probs = list(belief[var].values())  # Probabilidades
-        vals = list(belief[var].keys())     # Valores posibles
-        # Muestrea valor según distribución
-        state[var] = random.choices(vals, weights=probs)[0]
-    return state                     # Retorna estado muestreado
-
-def entropy(dist):
-    """Calcula la entropía de una distribución discreta:
-    dist: Diccionario {valor: probabilidad}
-    """
-    probs = [p for p in dist.values() if p > 0]  # Filtra probabilidades > 0
-    return -sum(p * np.log(p) for p in probs) if probs else 0  # Calcula entropía
-
-def consistente(var, valor, asignacion, csp):
-    """Verifica si una asignación es consistente:
-    var: Variable asignada
-    valor: Valor asignado
-    asignacion: Asignación parcial actual
-    csp: Instancia del problema
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])
-              for vecino in csp.vecinos[var] if vecino in asignacion)
-
-def cumple_restriccion(valor1, valor2):
-    """Función de restricción básica (valores diferentes):
-    valor1: Primer valor a comparar
-    valor2: Segundo valor a comparar
-    """
-    return valor1 != valor2           # Restricción de desigualdad
-
 def crear_sudoku_4x4():
     """Crea una instancia de Sudoku 4x4 como POMDP_CSP"""
     variables = [(i,j) for i in range(4) for j in range(4)]  # 16 celdas
@@ -263,19 +188,16 @@ def crear_sudoku_4x4():
     return POMDP_CSP(variables, dominios, restricciones)  # Retorna instancia
 
 if __name__ == "__main__":            # Bloque principal de ejecución
-    np.random.seed(42)                # Fija semilla para reproducibilidad
-    random.seed(42)                   # Fija semilla para aleatoriedad
-    
     sudoku = crear_sudoku_4x4()       # Crea instancia de Sudoku
     
     # Asigna algunas pistas iniciales
     pistas = {(0,0):1, (0,2):3, (1,1):4, (3,3):2}
     for (i,j), val in pistas.items():
         sudoku.dominios[(i,j)] = [val]  # Fija dominio a valor pista
-        sudoku.belief[(i,j)] = {val: 1.0}  # Certeza absoluta en pistas
+    sudoku.belief = sudoku.initial_belief()  # Certeza absoluta en pistas
     
     # Resuelve con enfoque POMDP
-    solucion = pomdp_solve_csp(sudoku)
+    solucion = pomdp_solve_csp(sudoku, semilla=42)
     
     # Muestra resultados
     if solucion:                      # Si encontró solución
@@ -283,4 +205,37 @@ if __name__ == "__main__":            # Bloque principal de ejecución
         for i in range(4):            # Imprime el tablero solución
             print([solucion.get((i,j), 0) for j in range(4)])
     else:
-        print("No se encontró solución")  # Mensaje si no hay solución
\ No newline at end of file
+        print("No se encontró solución")  # Mensaje si no hay solución
+    
+    # POMDP explícito: problema del tigre con PBVI y Perseus
+    tigre = pomdp_tigre()
+    creencias = tigre.recolectar_creencias([0.5, 0.5], 200, semilla=0)
+    b0 = np.array([0.5, 0.5])
+    for nombre in ("pbvi", "perseus"):
+        r = getattr(tigre, nombre)(creencias, max_iter=1000)
+        print(f"\nTigre ({nombre}): V(b0) = {tigre.valor(b0, r['alfas'])[0]:.3f}, "
+              f"{len(r['alfas'])} vectores alfa, {r['iteraciones']} iteraciones")
+    
+    # Navegación con localización incierta en una rejilla 10x10
+    rejilla = pomdp_rejilla(10, 10)
+    b0 = np.full(rejilla.S, 1.0 / rejilla.S)
+    creencias = rejilla.recolectar_creencias(b0, 1000, semilla=0)
+    inicio = time.perf_counter()
+    r = rejilla.perseus(creencias, tol=1e-2, semilla=0)
+    print(f"\nRejilla 10x10 (Perseus sobre {len(creencias)} creencias): "
+          f"{len(r['alfas'])} vectores, {r['iteraciones']} etapas, {time.perf_counter() - inicio:.2f} s")
+    
+    # Seguimiento de creencias de 10000 agentes a la vez con la política obtenida
+    rng = np.random.default_rng(1)
+    agentes = 10000
+    s = rng.integers(rejilla.S, size=agentes)
+    B = np.repeat(b0[None], agentes, axis=0)
+    retorno = np.zeros(agentes)
+    inicio = time.perf_counter()
+    for paso in range(30):
+        a = rejilla.politica(B, r["alfas"], r["acciones"])
+        s, z, recompensa = rejilla.simular(s, a, rng)
+        B, _ = rejilla.actualizar_creencias(B, a, z)
+        retorno += rejilla.gamma ** paso * recompensa
+    print(f"  {agentes} agentes x 30 pasos en {time.perf_counter() - inicio:.2f} s; "
+          f"retorno medio {retorno.mean():.3f} (V(b0) = {rejilla.valor(b0, r['alfas'])[0]:.3f})")
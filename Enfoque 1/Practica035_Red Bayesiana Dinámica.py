@@ -10,23 +10,16 @@ from collections import defaultdict  # Importa defaultdict para diccionarios por
 import random                       # Importa random para generación aleatoria
 from pgmpy.models import DynamicBayesianNetwork as DBN  # Importa DBN de pgmpy
 from pgmpy.factors.discrete import TabularCPD          # Importa CPDs tabulares
+from nucleo_csp import CSP, consistente, cumple_restriccion  # Núcleo CSP compartido con dominios de bits
 
-class DBN_CSP:                      # Clase para CSP con Red Bayesiana Dinámica
+class DBN_CSP(CSP):                 # Clase para CSP con Red Bayesiana Dinámica
     def __init__(self, variables, dominios, restricciones):
         """Constructor que inicializa el DBN-CSP:
         variables: Lista de variables del problema
         dominios: Diccionario {variable: valores_posibles}
         restricciones: Lista de tuplas de variables con restricciones
         """
-        self.variables = variables   # Almacena las variables del problema
-        self.dominios = dominios     # Almacena los dominios de cada variable
-        self.restricciones = restricciones  # Almacena las restricciones
-        
-        # Diccionario de vecinos para cada variable
-        self.vecinos = {v: set() for v in variables}  # Inicializa conjuntos vacíos
-        for (v1, v2) in restricciones:  # Para cada restricción
-            self.vecinos[v1].add(v2)    # Añade v2 como vecino de v1
-            self.vecinos[v2].add(v1)    # Añade v1 como vecino de v2 (no dirigido)
+        super().__init__(variables, dominios, restricciones)  # Dominios, restricciones y vecinos
         
         # Mapeo de variables a índices para la DBN
         self.var_to_idx = {v: i for i, v in enumerate(variables)}  # Variable -> índice
@@ -194,23 +187,6 @@ class DBN_CSP:                      # Clase para CSP con Red Bayesiana Dinámica
         sample = self.sample_trajectory(dbn_infer, steps)  # Muestrea trayectoria
         return sample                 # Devuelve la muestra (puede mejorarse)
 
-def cumple_restriccion(valor1, valor2):
-    """Función de restricción para el sudoku (valores diferentes):
-    valor1: Primer valor a comparar
-    valor2: Segundo valor a comparar
-    """
-    return valor1 != valor2           # Restricción básica de desigualdad
-
-def consistente(var, valor, asignacion, csp):
-    """Verifica consistencia de una asignación:
-    var: Variable asignada
-    valor: Valor asignado
-    asignacion: Asignación parcial actual
-    csp: Instancia del problema CSP
-    """
-    return all(cumple_restriccion(valor, asignacion[vecino])
-              for vecino in csp.vecinos[var] if vecino in asignacion)
-
 # Ejemplo: Sudoku 4x4
 def crear_sudoku_4x4():
     """Crea una instancia de Sudoku 4x4 como DBN_CSP"""
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Motor único de búsqueda primero el mejor: A*, costo uniforme y voraz.
+
+Cada estado se interna una sola vez con un id entero; el costo g, el padre
+y la acción de cada nodo viven en arreglos paralelos (array) en lugar de
+objetos Nodo. La frontera es un montículo indexado por id con
+decrease-key, así que nunca hay duplicados de un mismo estado, y admite
+borrado perezoso de entradas.
+
+Modos:
+    "a*":       f = g + h
+    "uniforme": f = g
+    "voraz":    f = h (cada estado se encola una sola vez)
+"""
+
+from array import array                             # Arreglos compactos de números
+
+FUERA = -1                                          # Posición de un id fuera del montículo
+
+class ColaIndexada:
+    """Montículo binario de ids enteros con decrease-key y borrado perezoso."""
+
+    def __init__(self):
+        self.monticulo = []                         # ids ordenados por (prioridad, id)
+        self.prioridad = array('d')                 # Prioridad de cada id
+        self.posicion = array('q')                  # Índice en el montículo o FUERA
+        self.borrado = bytearray()                  # Marca de borrado perezoso
+        self.borrados = 0                           # Entradas marcadas pendientes
+
+    def __len__(self):
+        return len(self.monticulo) - self.borrados
+
+    def _menor(self, a, b):
+        pa, pb = self.prioridad[a], self.prioridad[b]
+        return pa < pb or (pa == pb and a < b)      # Empate: el id más antiguo primero
+
+    def _subir(self, k):
+        monticulo, posicion = self.monticulo, self.posicion
+        nodo = monticulo[k]
+        while k > 0:
+            padre = (k - 1) >> 1
+            if not self._menor(nodo, monticulo[padre]):
+                break
+            monticulo[k] = monticulo[padre]
+            posicion[monticulo[k]] = k
+            k = padre
+        monticulo[k] = nodo
+        posicion[nodo] = k
+
+    def _bajar(self, k):
+        monticulo, posicion = self.monticulo, self.posicion
+        n, nodo = len(monticulo), monticulo[k]
+        while True:
+            hijo = 2 * k + 1
+            if hijo >= n:
+                break
+            if hijo + 1 < n and self._menor(monticulo[hijo + 1], monticulo[hijo]):
+                hijo += 1
+            if not self._menor(monticulo[hijo], nodo):
+                break
+            monticulo[k] = monticulo[hijo]
+            posicion[monticulo[k]] = k
+            k = hijo
+        monticulo[k] = nodo
+        posicion[nodo] = k
+
+    def actualizar(self, nodo, prioridad):
+        """
+        Inserta un id o baja su prioridad si ya está en la cola.
+
+        Parámetros:
+            nodo:      Id entero del estado            (int)
+            prioridad: Nueva prioridad                 (float)
+
+        Retorna:
+            True si la cola cambió                     (bool)
+        """
+        while len(self.posicion) <= nodo:           # Crece con los ids
+            self.posicion.append(FUERA)
+            self.prioridad.append(0.0)
+            self.borrado.append(0)
+        k = self.posicion[nodo]
+        if k >= 0:
+            if self.borrado[nodo]:                  # Se reactiva la entrada marcada
+                self.borrado[nodo] = 0
+                self.borrados -= 1
+                self.prioridad[nodo] = prioridad
+                self._subir(k)
+                self._bajar(self.posicion[nodo])
+                return True
+            if prioridad >= self.prioridad[nodo]:
+                return False
+            self.prioridad[nodo] = prioridad        # Decrease-key
+            self._subir(k)
+            return True
+        self.prioridad[nodo] = prioridad
+        self.monticulo.append(nodo)
+        self._subir(len(self.monticulo) - 1)
+        return True
+
+    def descartar(self, nodo):
+        """Marca un id para ignorarlo al extraer (borrado perezoso O(1))."""
+        if nodo < len(self.posicion) and self.posicion[nodo] >= 0 and not self.borrado[nodo]:
+            self.borrado[nodo] = 1                  # Sigue en el montículo hasta salir
+            self.borrados += 1
+
+    def extraer(self):
+        """
+        Saca el id de menor prioridad, saltando los borrados.
+
+        Retorna:
+            Id extraído o None si la cola está vacía  (int/None)
+        """
+        monticulo, posicion = self.monticulo, self.posicion
+        while monticulo:
+            nodo = monticulo[0]
+            ultimo = monticulo.pop()
+            if monticulo:
+                monticulo[0] = ultimo
+                posicion[ultimo] = 0
+                self._bajar(0)
+            posicion[nodo] = FUERA
+            if self.borrado[nodo]:
+                self.borrado[nodo] = 0
+                self.borrados -= 1
+                continue
+            return nodo
+        return None
+
+class MotorBusqueda:
+    def __init__(self, sucesores, heuristica=None, modo="a*", clave=None):
+        """
+        Prepara el motor para un espacio de estados.
+
+        Parámetros:
+            sucesores:  estado -> iterable de (acción, sucesor, costo) (callable)
+            heuristica: estado -> estimación al objetivo (callable, opcional)
+            modo:       "a*", "uniforme" o "voraz"      (str)
+            clave:      estado -> valor hashable que lo identifica (callable, opcional)
+        """
+        if modo not in ("a*", "uniforme", "voraz"):
+            raise ValueError(f"Modo de búsqueda no válido: {modo}")
+        self.sucesores = sucesores
+        self.heuristica = heuristica or (lambda estado: 0.0)
+        self.modo = modo
+        self.clave = clave
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Vacía el almacén de nodos."""
+        self.ids = {}                               # clave -> id
+        self.estados = []                           # id -> estado
+        self.g = array('d')                         # id -> costo acumulado
+        self.padre = array('q')                     # id -> id padre (-1 en la raíz)
+        self.accion = array('q')                    # id -> índice en self.acciones
+        self.acciones = []                          # Acciones internadas
+        self._id_accion = {}
+        self.generados = self.expandidos = 0
+
+    def _internar(self, estado):
+        """Retorna (id, es_nuevo) del estado."""
+        clave = estado if self.clave is None else self.clave(estado)
+        nodo = self.ids.get(clave)
+        if nodo is not None:
+            return nodo, False
+        nodo = len(self.estados)
+        self.ids[clave] = nodo
+        self.estados.append(estado)
+        self.g.append(float("inf"))
+        self.padre.append(-1)
+        self.accion.append(-1)
+        return nodo, True
+
+    def _indice_accion(self, accion):
+        try:
+            indice = self._id_accion.get(accion)
+        except TypeError:                           # Acción no hashable
+            self.acciones.append(accion)
+            return len(self.acciones) - 1
+        if indice is None:
+            indice = self._id_accion[accion] = len(self.acciones)
+            self.acciones.append(accion)
+        return indice
+
+    def buscar(self, inicio, es_meta, max_generados=None):
+        """
+        Ejecuta la búsqueda desde un estado inicial.
+
+        Parámetros:
+            inicio:        Estado inicial               (any)
+            es_meta:       estado -> bool               (callable)
+            max_generados: Límite de estados encolados  (int, opcional)
+
+        Retorna:
+            Id del nodo meta o None si no hay solución (int/None)
+        """
+        self.reiniciar()
+        a_estrella, voraz = self.modo == "a*", self.modo == "voraz"
+        h = self.heuristica
+        g, padre, estados = self.g, self.padre, self.estados
+        cola = ColaIndexada()
+
+        raiz, _ = self._internar(inicio)
+        g[raiz] = 0.0
+        cola.actualizar(raiz, h(inicio) if (a_estrella or voraz) else 0.0)
+
+        while len(cola):
+            if max_generados is not None and self.generados >= max_generados:
+                break
+            nodo = cola.extraer()
+            estado = estados[nodo]
+            if es_meta(estado):                     # Prueba de meta al expandir
+                return nodo
+            self.expandidos += 1
+
+            for accion, sucesor, costo in self.sucesores(estado):
+                hijo, nuevo = self._internar(sucesor)
+                if voraz:                           # Voraz: sólo el primer descubrimiento
+                    if not nuevo:
+                        continue
+                    prioridad = h(sucesor)
+                else:
+                    nuevo_g = g[nodo] + costo
+                    if nuevo_g >= g[hijo]:
+                        continue
+                    prioridad = nuevo_g + h(sucesor) if a_estrella else nuevo_g
+                g[hijo] = g[nodo] + costo
+                padre[hijo] = nodo
+                self.accion[hijo] = self._indice_accion(accion)
+                cola.actualizar(hijo, prioridad)    # Reabre si mejoró un cerrado
+                self.generados += 1
+        return None
+
+    def nodos_camino(self, nodo):
+        """Ids desde la raíz hasta el nodo dado."""
+        camino = []
+        while nodo >= 0:
+            camino.append(nodo)
+            nodo = self.padre[nodo]
+        camino.reverse()
+        return camino
+
+    def camino(self, nodo):
+        """Estados desde el inicial hasta el nodo dado."""
+        return [self.estados[k] for k in self.nodos_camino(nodo)]
+
+    def acciones_de(self, nodo):
+        """Acciones aplicadas para llegar al nodo dado."""
+        return [self.acciones[self.accion[k]] for k in self.nodos_camino(nodo)[1:]]
+
+def buscar(inicio, sucesores, es_meta, heuristica=None, modo="a*", clave=None,
+           max_generados=None):
+    """
+    Atajo: ejecuta el motor y retorna el camino de estados.
+
+    Parámetros:
+        inicio:        Estado inicial                   (any)
+        sucesores:     estado -> iterable de (acción, sucesor, costo) (callable)
+        es_meta:       estado -> bool                   (callable)
+        heuristica:    estado -> estimación (callable, opcional)
+        modo:          "a*", "uniforme" o "voraz"       (str)
+        clave:         estado -> valor hashable (callable, opcional)
+        max_generados: Límite de estados encolados      (int, opcional)
+
+    Retorna:
+        Lista de estados del camino o None             (list/None)
+    """
+    motor = MotorBusqueda(sucesores, heuristica, modo, clave)
+    meta = motor.buscar(inicio, es_meta, max_generados)
+    return None if meta is None else motor.camino(meta)
+
+def a_estrella_grafo(grafo, inicio, meta, heuristica, ponderado=True, modo="a*"):
+    """
+    A* sobre un diccionario de adyacencia como los de las prácticas.
+
+    Parámetros:
+        grafo:      {nodo: [(vecino, costo), ...]} o {nodo: [vecino, ...]} (dict)
+        inicio:     Nodo inicial                      (any)
+        meta:       Nodo objetivo                     (any)
+        heuristica: (nodo, meta) -> estimación        (callable)
+        ponderado:  Si las aristas traen costo        (bool)
+        modo:       "a*", "uniforme" o "voraz"        (str)
+
+    Retorna:
+        Lista de nodos del camino o None              (list/None)
+    """
+    if ponderado:
+        sucesores = lambda nodo: ((None, vecino, costo) for vecino, costo in grafo[nodo])
+    else:
+        sucesores = lambda nodo: ((None, vecino, 1) for vecino in grafo[nodo])
+    return buscar(inicio, sucesores, lambda nodo: nodo == meta,
+                  lambda nodo: heuristica(nodo, meta), modo)
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+Grafo en formato CSR (compressed sparse row) y búsquedas por niveles.
+
+Los Grafo de las prácticas guardan la adyacencia como diccionario de
+listas; aquí los nodos se numeran 0..n-1 y las aristas quedan en dos
+arreglos NumPy (inicio, destinos). La BFS expande una frontera completa
+por paso con operaciones vectorizadas, y la búsqueda bidireccional puede
+repartir cada sentido en un proceso sobre memoria compartida.
+"""
+
+import multiprocessing as mp                        # Procesos para la bidireccional
+from multiprocessing import shared_memory           # Arreglos compartidos entre procesos
+
+import numpy as np                                  # Arreglos y operaciones vectorizadas
+
+SIN_VISITAR = -1                                    # Distancia de un nodo no alcanzado
+
+def _tipo_indice(n):
+    return np.int32 if n < 2**31 else np.int64      # Índices compactos si caben
+
+class GrafoCSR:
+    def __init__(self, inicio, destinos, nodos=None, simetrico=False):
+        """
+        Grafo dirigido en formato CSR.
+
+        Parámetros:
+            inicio:    Desplazamientos por nodo, longitud n+1 (ndarray)
+            destinos:  Vecinos concatenados                   (ndarray)
+            nodos:     Objeto original de cada índice   (list, opcional)
+            simetrico: Cada arista existe en ambos sentidos   (bool)
+        """
+        self.inicio = np.asarray(inicio, dtype=np.int64)
+        self.n = len(self.inicio) - 1
+        self.destinos = np.asarray(destinos, dtype=_tipo_indice(self.n))
+        self.nodos = nodos                          # None: los nodos ya son 0..n-1
+        self.indice = None if nodos is None else {v: i for i, v in enumerate(nodos)}
+        self._inverso = self if simetrico else None  # No dirigido: es su propio inverso
+
+    @classmethod
+    def desde_aristas(cls, origen, destino, n=None, dirigido=False, nodos=None):
+        """
+        Construye el CSR a partir de arreglos de aristas sin pasar por dict.
+
+        Parámetros:
+            origen:   Índice de origen de cada arista    (ndarray)
+            destino:  Índice de destino de cada arista   (ndarray)
+            n:        Número de nodos (int, opcional)
+            dirigido: Si False se añade cada arista en ambos sentidos (bool)
+            nodos:    Objeto original de cada índice   (list, opcional)
+
+        Retorna:
+            Grafo compilado                            (GrafoCSR)
+        """
+        origen = np.asarray(origen, dtype=np.int64)
+        destino = np.asarray(destino, dtype=np.int64)
+        if not dirigido:
+            origen, destino = (np.concatenate((origen, destino)),
+                               np.concatenate((destino, origen)))
+        if n is None:
+            n = int(max(origen.max(initial=-1), destino.max(initial=-1))) + 1
+        orden = np.argsort(origen, kind="stable")   # Conserva el orden de inserción
+        inicio = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origen, minlength=n), out=inicio[1:])
+        return cls(inicio, destino[orden], nodos, simetrico=not dirigido)
+
+    @classmethod
+    def desde_adyacencia(cls, adyacencia, ponderado=False, simetrico=False):
+        """
+        Compila un diccionario de listas de adyacencia.
+
+        Parámetros:
+            adyacencia: {nodo: [vecino, ...]} o {nodo: [(vecino, peso), ...]} (dict)
+            ponderado:  Si cada vecino viene como (vecino, peso) (bool)
+            simetrico:  Si el grafo es no dirigido       (bool)
+
+        Retorna:
+            Grafo compilado                            (GrafoCSR)
+        """
+        nodos = list(adyacencia)
+        indice = {v: i for i, v in enumerate(nodos)}
+        origen, destino = [], []
+        for v, vecinos in adyacencia.items():
+            i = indice[v]
+            for w in vecinos:
+                if ponderado:
+                    w = w[0]                        # El peso no cuenta en saltos
+                j = indice.get(w)
+                if j is None:                       # Vecino sin lista propia
+                    j = indice[w] = len(nodos)
+                    nodos.append(w)
+                origen.append(i)
+                destino.append(j)
+        grafo = cls.desde_aristas(origen, destino, len(nodos), dirigido=True, nodos=nodos)
+        if simetrico:
+            grafo._inverso = grafo
+        return grafo
+
+    def id(self, nodo):
+        return nodo if self.indice is None else self.indice[nodo]
+
+    def nombres(self, ids):
+        ids = [int(i) for i in ids]
+        return ids if self.nodos is None else [self.nodos[i] for i in ids]
+
+    def inverso(self):
+        """Grafo con las aristas invertidas (para buscar hacia atrás)."""
+        if self._inverso is None:
+            grados = np.diff(self.inicio)
+            origen = np.repeat(np.arange(self.n, dtype=self.destinos.dtype), grados)
+            self._inverso = GrafoCSR.desde_aristas(self.destinos, origen, self.n,
+                                                   dirigido=True, nodos=self.nodos)
+            self._inverso._inverso = self
+        return self._inverso
+
+    def expandir(self, frontera):
+        """
+        Vecinos de toda una frontera de una sola vez.
+
+        Parámetros:
+            frontera: Índices de nodos                (ndarray)
+
+        Retorna:
+            (vecinos, padre de cada vecino)           (tuple)
+        """
+        ini, fin = self.inicio[frontera], self.inicio[frontera + 1]
+        grados = fin - ini
+        total = int(grados.sum())
+        if total == 0:
+            vacio = np.empty(0, dtype=self.destinos.dtype)
+            return vacio, vacio
+        # Posición de cada arista: inicio del nodo + desplazamiento dentro de él
+        saltos = np.repeat(ini - np.cumsum(grados) + grados, grados)
+        posiciones = saltos + np.arange(total)
+        return self.destinos[posiciones], np.repeat(frontera, grados)
+
+def _nivel(grafo, frontera, distancia, padre, nivel):
+    """Expande un nivel y marca los nodos nuevos; retorna la nueva frontera."""
+    vecinos, origen = grafo.expandir(frontera)
+    libres = distancia[vecinos] == SIN_VISITAR
+    vecinos, origen = vecinos[libres], origen[libres]
+    nuevos, primero = np.unique(vecinos, return_index=True)  # Un padre por nodo
+    distancia[nuevos] = nivel
+    padre[nuevos] = origen[primero]
+    return nuevos
+
+def bfs(grafo, fuente, meta=None):
+    """
+    BFS síncrona por niveles.
+
+    Parámetros:
+        grafo:  Grafo compilado                        (GrafoCSR)
+        fuente: Nodo inicial (objeto original)         (any)
+        meta:   Nodo donde detenerse (any, opcional)
+
+    Retorna:
+        (distancia, padre) por índice; -1 = no alcanzado (tuple)
+    """
+    tipo = grafo.destinos.dtype
+    distancia = np.full(grafo.n, SIN_VISITAR, dtype=tipo)
+    padre = np.full(grafo.n, SIN_VISITAR, dtype=tipo)
+    s = grafo.id(fuente)
+    objetivo = None if meta is None else grafo.id(meta)
+    distancia[s] = 0
+    frontera, nivel = np.array([s], dtype=tipo), 0
+    while len(frontera) and (objetivo is None or distancia[objetivo] == SIN_VISITAR):
+        nivel += 1
+        frontera = _nivel(grafo, frontera, distancia, padre, nivel)
+    return distancia, padre
+
+def _subir(padre, nodo):
+    camino = []
+    while nodo != SIN_VISITAR:
+        camino.append(int(nodo))
+        nodo = padre[nodo]
+    return camino
+
+def camino_mas_corto(grafo, fuente, meta):
+    """
+    Camino de menos saltos con la BFS por niveles.
+
+    Retorna:
+        Lista de nodos o None si no hay camino       (list/None)
+    """
+    distancia, padre = bfs(grafo, fuente, meta)
+    objetivo = grafo.id(meta)
+    if distancia[objetivo] == SIN_VISITAR:
+        return None
+    return grafo.nombres(_subir(padre, objetivo)[::-1])
+
+def _encuentro(nuevos, otra_distancia, propia_distancia):
+    """Mejor nodo de la capa nueva que ya alcanzó el otro sentido."""
+    comunes = nuevos[otra_distancia[nuevos] != SIN_VISITAR]
+    if not len(comunes):
+        return None
+    sumas = propia_distancia[comunes].astype(np.int64) + otra_distancia[comunes]
+    k = int(np.argmin(sumas))
+    return int(sumas[k]), int(comunes[k])
+
+def _unir(padre_ida, padre_vuelta, nodo):
+    return _subir(padre_ida, nodo)[::-1] + _subir(padre_vuelta, nodo)[1:]
+
+def busqueda_bidireccional(grafo, fuente, meta, paralelo=False):
+    """
+    Búsqueda bidireccional por niveles completos.
+
+    Se expande siempre la frontera más pequeña; al detectar intersección se
+    toma el nodo común con menor suma de distancias, que es óptimo porque
+    cada paso cierra un nivel entero.
+
+    Parámetros:
+        grafo:    Grafo compilado                      (GrafoCSR)
+        fuente:   Nodo inicial                         (any)
+        meta:     Nodo objetivo                        (any)
+        paralelo: Un proceso por sentido               (bool)
+
+    Retorna:
+        Lista de nodos del camino o None              (list/None)
+    """
+    s, t = grafo.id(fuente), grafo.id(meta)
+    if s == t:
+        return grafo.nombres([s])
+    if paralelo:
+        return _bidireccional_procesos(grafo, s, t)
+
+    tipo = grafo.destinos.dtype
+    lados = []
+    for g, origen in ((grafo, s), (grafo.inverso(), t)):
+        distancia = np.full(grafo.n, SIN_VISITAR, dtype=tipo)
+        padre = np.full(grafo.n, SIN_VISITAR, dtype=tipo)
+        distancia[origen] = 0
+        lados.append([g, distancia, padre, np.array([origen], dtype=tipo), 0])
+
+    while len(lados[0][3]) and len(lados[1][3]):
+        k = 0 if len(lados[0][3]) <= len(lados[1][3]) else 1  # Frontera menor
+        g, distancia, padre, frontera, nivel = lados[k]
+        lados[k][4] = nivel = nivel + 1
+        lados[k][3] = nuevos = _nivel(g, frontera, distancia, padre, nivel)
+        encuentro = _encuentro(nuevos, lados[1 - k][1], distancia)
+        if encuentro is not None:
+            return grafo.nombres(_unir(lados[0][2], lados[1][2], encuentro[1]))
+    return None
+
+def _compartir(arreglo):
+    """Copia un arreglo a memoria compartida; retorna (bloque, descriptor)."""
+    bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+    np.ndarray(arreglo.shape, arreglo.dtype, buffer=bloque.buf)[:] = arreglo
+    return bloque, (bloque.name, arreglo.shape, arreglo.dtype.str)
+
+def _abrir(descriptor):
+    nombre, forma, tipo = descriptor
+    bloque = shared_memory.SharedMemory(name=nombre)
+    return bloque, np.ndarray(forma, np.dtype(tipo), buffer=bloque.buf)
+
+def _trabajador(lado, csr, estado, origen, barrera, conexion):
+    """
+    Expande un sentido de la búsqueda nivel a nivel.
+
+    Cada ronda: expandir (escribe sólo sus arreglos) -> barrera -> comparar
+    la capa nueva con las distancias del otro sentido -> informar y esperar.
+    """
+    bloques, arreglos = [], []
+    for descriptor in csr + estado:
+        bloque, arreglo = _abrir(descriptor)
+        bloques.append(bloque)
+        arreglos.append(arreglo)
+    inicio, destinos, distancias, padres = arreglos
+    grafo = GrafoCSR(inicio, destinos)
+    distancia, padre, otra = distancias[lado], padres[lado], distancias[1 - lado]
+    frontera = np.array([origen], dtype=destinos.dtype)
+    nivel = 0
+    try:
+        while True:
+            nivel += 1
+            frontera = _nivel(grafo, frontera, distancia, padre, nivel)
+            barrera.wait()                          # Ambos niveles ya escritos
+            conexion.send((len(frontera), _encuentro(frontera, otra, distancia)))
+            if not conexion.recv():                 # El coordinador decide
+                break
+    finally:
+        del grafo, inicio, destinos, distancias, padres, distancia, padre, otra, arreglos
+        for bloque in bloques:
+            bloque.close()
+
+def _bidireccional_procesos(grafo, s, t):
+    """Bidireccional con un proceso por sentido sobre memoria compartida."""
+    tipo = grafo.destinos.dtype
+    inverso = grafo.inverso()
+    distancias = np.full((2, grafo.n), SIN_VISITAR, dtype=tipo)
+    distancias[0, s] = distancias[1, t] = 0
+    padres = np.full((2, grafo.n), SIN_VISITAR, dtype=tipo)
+
+    bloques, descriptores = [], []
+    for arreglo in (grafo.inicio, grafo.destinos, inverso.inicio, inverso.destinos,
+                    distancias, padres):
+        bloque, descriptor = _compartir(arreglo)
+        bloques.append(bloque)
+        descriptores.append(descriptor)
+    estado = descriptores[4:]
+
+    contexto = mp.get_context()
+    barrera = contexto.Barrier(2)
+    conexiones, procesos = [], []
+    for lado, (csr, origen) in enumerate(((descriptores[0:2], s), (descriptores[2:4], t))):
+        propia, remota = contexto.Pipe()
+        proceso = contexto.Process(target=_trabajador,
+                                   args=(lado, csr, estado, origen, barrera, remota))
+        proceso.start()
+        conexiones.append(propia)
+        procesos.append(proceso)
+    try:
+        mejor = None
+        while True:
+            informes = [c.recv() for c in conexiones]
+            encuentros = [e for _, e in informes if e is not None]
+            if encuentros:
+                mejor = min(encuentros)[1]
+            seguir = mejor is None and all(tam for tam, _ in informes)
+            for c in conexiones:
+                c.send(seguir)
+            if not seguir:
+                break
+        for proceso in procesos:
+            proceso.join()
+        if mejor is None:
+            return None
+        padres = np.ndarray(padres.shape, padres.dtype, buffer=bloques[5].buf)
+        camino = _unir(padres[0], padres[1], mejor)
+        del padres                                  # Libera la vista antes de cerrar
+        return grafo.nombres(camino)
+    finally:
+        for proceso in procesos:
+            if proceso.is_alive():
+                proceso.terminate()
+        for bloque in bloques:
+            bloque.close()
+            bloque.unlink()
+
+def grafo_aleatorio(n, m, semilla=None):
+    """
+    Grafo no dirigido aleatorio de n nodos y m aristas, para pruebas de carga.
+
+    Retorna:
+        Grafo compilado                               (GrafoCSR)
+    """
+    rng = np.random.default_rng(semilla)
+    return GrafoCSR.desde_aristas(rng.integers(n, size=m), rng.integers(n, size=m), n)
+
+if __name__ == "__main__":
+    import time                                     # Medición de tiempos
+
+    g = grafo_aleatorio(1_000_000, 3_000_000, semilla=0)
+    print(f"Grafo: {g.n} nodos, {len(g.destinos)} aristas dirigidas")
+    for nombre, funcion in (("BFS por niveles", lambda: camino_mas_corto(g, 0, 1)),
+                            ("Bidireccional", lambda: busqueda_bidireccional(g, 0, 1)),
+                            ("Bidireccional (2 procesos)",
+                             lambda: busqueda_bidireccional(g, 0, 1, paralelo=True))):
+        inicio = time.perf_counter()
+        camino = funcion()
+        print(f"{nombre}: {len(camino) - 1 if camino else '-'} saltos "
+              f"en {time.perf_counter() - inicio:.3f} s")
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Resolución de Sudokus por lotes sobre el núcleo CSP compartido.
+
+Lee un archivo con un Sudoku por línea (81 símbolos para 9x9, 256 para
+16x16, ...; '.' o '0' marcan celdas vacías), reparte los puzzles en bloques
+entre procesos con ProcessPoolExecutor y emite, en el orden de entrada y a
+medida que terminan, la solución y el tiempo de cada puzzle.
+
+Uso:
+    python lote_sudoku.py puzzles.txt --estrategia ac3 --procesos 8 --bloque 64
+"""
+
+import argparse                                      # Argumentos de línea de comandos
+import math                                          # Raíz cuadrada entera
+import os                                            # Número de CPUs
+import sys                                           # Flujos de entrada/salida
+import time                                          # Medición de tiempos
+from collections import deque                        # Bloques en vuelo
+from concurrent.futures import ProcessPoolExecutor   # Pool de procesos
+
+from minimos_conflictos_np import minimos_conflictos  # Tabla de conflictos incremental
+from nucleo_csp import (CSP, backjumping, backtracking_ac3,  # Núcleo CSP compartido
+                        forward_checking)
+
+SIMBOLOS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"         # Símbolo de cada valor 1..35
+VACIOS = ".0"                                        # Marcas de celda vacía
+
+def _forward_checking(csp):
+    return forward_checking({}, csp)
+
+def _backtracking_ac3(csp):
+    return backtracking_ac3({}, csp)
+
+def _backjumping(csp):
+    return backjumping({}, csp)
+
+def _minimos_conflictos(csp):
+    return minimos_conflictos(csp, max_iter=200000, tabu=3)
+
+ESTRATEGIAS = {                                      # Nombre -> resolvedor(csp)
+    "fc":  _forward_checking,                        # Forward checking
+    "ac3": _backtracking_ac3,                        # Backtracking + AC-2001 (MAC)
+    "cbj": _backjumping,                             # Salto atrás por conflictos
+    "mc":  _minimos_conflictos,                      # Mínimos conflictos
+}
+
+def crear_sudoku(lado):
+    """
+    Crea una instancia CSP para un Sudoku de lado x lado (lado = caja²).
+
+    Parámetros:
+        lado: Número de filas del tablero (4, 9, 16, 25...) (int)
+
+    Retorna:
+        Problema CSP configurado para el Sudoku       (CSP)
+    """
+    caja = math.isqrt(lado)
+    if caja * caja != lado:
+        raise ValueError(f"El lado {lado} no es un cuadrado perfecto")
+    variables = [(i, j) for i in range(lado) for j in range(lado)]
+    dominios = {v: list(range(1, lado + 1)) for v in variables}
+
+    restricciones = []                               # Lista de restricciones
+    for i, j in variables:                           # Cada par una sola vez
+        for k in range(j + 1, lado):
+            restricciones.append(((i, j), (i, k)))   # Misma fila
+        for k in range(i + 1, lado):
+            restricciones.append(((i, j), (k, j)))   # Misma columna
+        bi, bj = i - i % caja, j - j % caja          # Esquina de la caja
+        for k in range(i + 1, bi + caja):            # Misma caja, otra fila
+            for l in range(bj, bj + caja):           # y otra columna
+                if l != j:
+                    restricciones.append(((i, j), (k, l)))
+
+    return CSP(variables, dominios, restricciones)   # Retorna CSP configurado
+
+def leer_puzzle(linea):
+    """
+    Convierte una línea de texto en un CSP con las pistas fijadas.
+
+    Parámetros:
+        linea: Puzzle como cadena de símbolos         (str)
+
+    Retorna:
+        Problema CSP con dominios de pistas fijados   (CSP)
+    """
+    linea = linea.strip()
+    lado = math.isqrt(len(linea))
+    if lado * lado != len(linea) or lado > len(SIMBOLOS):
+        raise ValueError(f"Longitud de puzzle no válida: {len(linea)}")
+    csp = crear_sudoku(lado)
+    for idx, simbolo in enumerate(linea):            # Fija cada pista
+        if simbolo not in VACIOS:
+            valor = SIMBOLOS.index(simbolo.upper()) + 1
+            if valor > lado:
+                raise ValueError(f"Símbolo fuera de rango: {simbolo!r}")
+            csp.dominios[(idx // lado, idx % lado)] = [valor]
+    return csp
+
+def escribir_solucion(solucion, lado):
+    """
+    Convierte una solución en una línea de símbolos.
+
+    Parámetros:
+        solucion: Asignación {(fila, columna): valor} (dict)
+        lado:     Número de filas del tablero          (int)
+
+    Retorna:
+        Tablero resuelto como cadena                  (str)
+    """
+    return "".join(SIMBOLOS[solucion[(i, j)] - 1]
+                   for i in range(lado) for j in range(lado))
+
+def resolver_linea(linea, estrategia="ac3"):
+    """
+    Resuelve un puzzle y mide su tiempo.
+
+    Parámetros:
+        linea:      Puzzle como cadena de símbolos     (str)
+        estrategia: Clave de ESTRATEGIAS               (str)
+
+    Retorna:
+        (solución como cadena o None, segundos)       (tuple)
+    """
+    inicio = time.perf_counter()
+    try:
+        csp = leer_puzzle(linea)
+        solucion = ESTRATEGIAS[estrategia](csp)
+    except ValueError:                               # Puzzle mal formado
+        solucion = None
+    segundos = time.perf_counter() - inicio
+    if solucion is None:
+        return None, segundos
+    return escribir_solucion(solucion, math.isqrt(len(linea.strip()))), segundos
+
+def _resolver_bloque(bloque, estrategia):
+    """Resuelve en un proceso trabajador un bloque de (índice, línea)."""
+    return [(indice,) + resolver_linea(linea, estrategia) for indice, linea in bloque]
+
+def _bloques(lineas, tam_bloque):
+    """Agrupa las líneas no vacías en bloques de (índice, línea)."""
+    bloque = []
+    for indice, linea in enumerate(lineas):
+        if linea.strip():
+            bloque.append((indice, linea))
+            if len(bloque) == tam_bloque:
+                yield bloque
+                bloque = []
+    if bloque:
+        yield bloque
+
+def resolver_lote(lineas, estrategia="ac3", procesos=None, tam_bloque=64):
+    """
+    Resuelve muchos puzzles en paralelo y entrega los resultados en orden.
+
+    Sólo se mantienen en vuelo unos pocos bloques por proceso, así que el
+    archivo de entrada se lee de forma perezosa aunque tenga millones de líneas.
+
+    Parámetros:
+        lineas:     Puzzles, uno por línea             (iterable)
+        estrategia: Clave de ESTRATEGIAS               (str)
+        procesos:   Número de procesos (None = CPUs)   (int)
+        tam_bloque: Puzzles por tarea enviada          (int)
+
+    Retorna:
+        Generador de (índice de línea, solución o None, segundos) (generator)
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia}")
+    procesos = procesos or os.cpu_count() or 1
+    max_en_vuelo = 2 * procesos                      # Limita memoria de futuros
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo = deque()
+        for bloque in _bloques(lineas, tam_bloque):
+            en_vuelo.append(pool.submit(_resolver_bloque, bloque, estrategia))
+            if len(en_vuelo) >= max_en_vuelo:        # Espera al más antiguo
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:                              # Vacía lo pendiente
+            yield from en_vuelo.popleft().result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resuelve Sudokus por lotes.")
+    parser.add_argument("archivo", help="Puzzles, uno por línea ('-' = stdin)")
+    parser.add_argument("--estrategia", choices=sorted(ESTRATEGIAS), default="ac3")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--bloque", type=int, default=64, help="Puzzles por tarea")
+    args = parser.parse_args(argv)
+
+    entrada = sys.stdin if args.archivo == "-" else open(args.archivo, encoding="utf-8")
+    resueltos = total = 0
+    tiempo_total = 0.0
+    inicio = time.perf_counter()
+    with entrada:
+        for indice, solucion, segundos in resolver_lote(
+                entrada, args.estrategia, args.procesos, args.bloque):
+            total += 1
+            resueltos += solucion is not None
+            tiempo_total += segundos
+            print(f"{indice}\t{solucion or '-'}\t{segundos:.6f}")
+    pared = time.perf_counter() - inicio
+    print(f"Resueltos {resueltos}/{total} en {pared:.2f} s "
+          f"(CPU por puzzle {tiempo_total / max(total, 1) * 1000:.2f} ms, "
+          f"{total / max(pared, 1e-9):.1f} puzzles/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo MDP sobre matrices dispersas (scipy.sparse).
+
+Los estados se numeran 0..n-1 y las acciones 0..m-1. Las transiciones de
+todas las acciones se apilan en una sola matriz CSR de (m·n x n): la fila
+a·n + s es la distribución de s' al tomar a en s. Un respaldo de Bellman
+de todos los estados es un producto matriz-vector seguido de un máximo
+sobre el eje de acciones; las acciones no disponibles quedan en -inf y los
+estados sin acciones conservan su valor.
+
+Variantes de iteración de valores:
+    "jacobi":       respaldo síncrono de todos los estados
+    "gauss-seidel": por bloques de estados; cada bloque usa los valores
+                    ya actualizados de los bloques anteriores y el sentido
+                    del barrido se alterna (Gauss-Seidel simétrico)
+    "priorizado":   barrido priorizado por lotes; tras actualizar los
+                    estados con mayor residuo sólo se recalculan sus
+                    predecesores (rinde cuando los residuos son locales,
+                    p. ej. al replanificar desde una solución previa)
+
+El criterio de parada por defecto es la seminorma span del cambio,
+sp(V' - V) = max(V' - V) - min(V' - V), con el umbral tol·(1-γ)/γ que
+garantiza una política voraz tol-óptima. Como V puede seguir desplazada
+por una constante, al terminar se aplica un respaldo más y se devuelve el
+punto medio de las cotas de MacQueen, V' + γ/(1-γ)·(max + min)/2.
+
+Iteración de políticas (modificada): la evaluación de una política π
+resuelve (I - γPπ) V = rπ con un método iterativo de Krylov (BiCGSTAB
+o GMRES; la matriz no es simétrica, así que gradiente conjugado no
+aplica) partiendo del V anterior, o aplica k respaldos de π. La mejora es
+un argmax por columnas de Q; una acción empatada con la mejor se conserva,
+así que la política sólo cambia (y sólo se vuelve a evaluar) cuando hay
+una acción estrictamente mejor.
+"""
+
+import warnings                                     # MatrixRankWarning de spsolve como error
+
+import numpy as np                                  # Vectores de valores y recompensas
+from scipy import sparse                            # Transiciones en CSR
+from scipy.sparse import linalg as splinalg         # Solucionadores iterativos
+
+class MDPDisperso:
+    def __init__(self, P, R, gamma, validas=None, estados=None, acciones=None):
+        """
+        MDP compilado.
+
+        Parámetros:
+            P:        Transiciones apiladas (m·n x n) o una matriz (n x n) por acción (sparse/list)
+            R:        Recompensa esperada r(s, a), forma (m, n) (ndarray)
+            gamma:    Factor de descuento                       (float)
+            validas:  Acción disponible en cada estado, (m, n)  (ndarray bool, opcional;
+                      por defecto, las filas de P que no están vacías)
+            estados:  Objeto original de cada índice            (list, opcional)
+            acciones: Objeto original de cada acción            (list, opcional)
+        """
+        if isinstance(P, (list, tuple)):
+            P = sparse.vstack([sparse.csr_matrix(Pa) for Pa in P])
+        self.P = sparse.csr_matrix(P, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.m, self.n = self.R.shape
+        if self.P.shape != (self.m * self.n, self.n):
+            raise ValueError(f"P tiene forma {self.P.shape}; se esperaba {(self.m * self.n, self.n)}")
+        self.gamma = gamma
+        if validas is None:
+            validas = (np.diff(self.P.indptr) > 0).reshape(self.m, self.n)
+        self.validas = np.asarray(validas, dtype=bool)
+        self.sin_acciones = ~self.validas.any(axis=0)  # Estados terminales: conservan su valor
+        self.estados = estados
+        self.acciones = acciones
+        self._bloques = {}                          # Número de bloques -> filas de P ya cortadas
+        self._predecesores = None                   # CSR (n x n): fila s' = estados que llegan a s'
+
+    @classmethod
+    def desde_diccionarios(cls, estados, acciones, transicion, recompensa, gamma):
+        """
+        Compila un MDP en formato de diccionarios.
+
+        Parámetros:
+            estados:    Lista de estados                         (list)
+            acciones:   Lista de acciones                        (list)
+            transicion: {(estado, accion): [{'estado': s2, 'prob': p}]} (dict)
+            recompensa: {estado: recompensa por llegar a él}      (dict)
+            gamma:      Factor de descuento                       (float)
+
+        Retorna:
+            MDP compilado                                         (MDPDisperso)
+        """
+        n, m = len(estados), len(acciones)
+        indice = {s: i for i, s in enumerate(estados)}
+        filas, columnas, probs = [], [], []
+        validas = np.zeros((m, n), dtype=bool)
+        for a, accion in enumerate(acciones):
+            for s, estado in enumerate(estados):
+                resultados = transicion.get((estado, accion))
+                if resultados is None:
+                    continue                        # Acción no permitida en el estado
+                validas[a, s] = True
+                for resultado in resultados:
+                    filas.append(a * n + s)
+                    columnas.append(indice[resultado['estado']])
+                    probs.append(resultado['prob'])
+        P = sparse.csr_matrix((probs, (filas, columnas)), shape=(m * n, n))
+        r = np.array([recompensa[s] for s in estados], dtype=float)
+        R = (P @ r).reshape(m, n)                   # r(s, a) = suma de p(s'|s,a) · r(s')
+        return cls(P, R, gamma, validas, estados, acciones)
+
+    # ------------------------------------------------------------------
+    # Respaldos de Bellman
+    # ------------------------------------------------------------------
+
+    def valores_q(self, V, estados=None):
+        """
+        Q(s, a) = r(s, a) + γ Σ p(s'|s,a) V(s'), con -inf en acciones no válidas.
+
+        Parámetros:
+            V:       Valores de todos los estados          (ndarray)
+            estados: Índices de los estados a calcular (ndarray, opcional; todos)
+
+        Retorna:
+            Matriz (m x estados)                           (ndarray)
+        """
+        if estados is None:
+            Q = self.R + self.gamma * (self.P @ V).reshape(self.m, self.n)
+            return np.where(self.validas, Q, -np.inf)
+        filas = (np.arange(self.m)[:, None] * self.n + estados).ravel()
+        Q = self.R[:, estados] + self.gamma * (self.P[filas] @ V).reshape(self.m, len(estados))
+        return np.where(self.validas[:, estados], Q, -np.inf)
+
+    def _maximo(self, Q, V_actual, sin_acciones):
+        """Máximo y acción voraz por columna; los estados sin acciones conservan su valor."""
+        politica = Q.argmax(axis=0)
+        V = Q[politica, np.arange(Q.shape[1])]
+        V = np.where(sin_acciones, V_actual, V)
+        politica[sin_acciones] = -1
+        return V, politica
+
+    def respaldo(self, V):
+        """
+        Un respaldo de Bellman síncrono.
+
+        Retorna:
+            (nuevos valores, acción voraz de cada estado; -1 si no tiene) (tuple)
+        """
+        return self._maximo(self.valores_q(V), V, self.sin_acciones)
+
+    def politica_voraz(self, V):
+        """Índice de la mejor acción en cada estado (-1 en estados sin acciones)."""
+        return self.respaldo(V)[1]
+
+    # ------------------------------------------------------------------
+    # Iteración de valores
+    # ------------------------------------------------------------------
+
+    def iteracion_valores(self, V0=None, tol=1e-6, max_iter=1000, metodo="jacobi",
+                          criterio="span", bloques=64, lote=None):
+        """
+        Iteración de valores hasta cumplir el criterio de parada.
+
+        Parámetros:
+            V0:       Valores iniciales (ndarray, opcional; ceros)
+            tol:      Tolerancia                          (float)
+            max_iter: Máximo de barridos (en "priorizado", equivalentes a n respaldos) (int)
+            metodo:   "jacobi", "gauss-seidel" o "priorizado" (str)
+            criterio: "span" (seminorma, umbral tol·(1-γ)/γ) o "max" (norma infinito) (str)
+            bloques:  Bloques de estados en Gauss-Seidel  (int)
+            lote:     Estados por paso en "priorizado" (int, opcional; n/100)
+
+        Retorna:
+            dict con "V", "politica", "iteraciones", "cambio" (última medida) y
+            "convergio"; con criterio "span", "cotas" (inferior, superior) de V*
+        """
+        if metodo not in ("jacobi", "gauss-seidel", "priorizado"):
+            raise ValueError(f"Método desconocido: {metodo}")
+        if criterio not in ("span", "max"):
+            raise ValueError(f"Criterio desconocido: {criterio}")
+        V = np.zeros(self.n) if V0 is None else np.array(V0, dtype=float)
+        activos = ~self.sin_acciones
+        if criterio == "span":
+            umbral = tol * (1 - self.gamma) / self.gamma if 0 < self.gamma < 1 else tol
+            def medida(d):
+                minimo, maximo = self._extremos(d[activos])
+                return maximo - minimo
+        else:
+            umbral = tol
+            medida = lambda d: float(np.abs(d[activos]).max()) if activos.any() else 0.0
+
+        if metodo == "priorizado":
+            V, iteraciones, cambio = self._priorizado(V, umbral, medida, max_iter, lote)
+        else:
+            barrido = self._barrido_gauss_seidel if metodo == "gauss-seidel" else None
+            iteraciones, cambio = 0, np.inf
+            while iteraciones < max_iter and cambio >= umbral:
+                if barrido is None:
+                    V_nuevo, _ = self.respaldo(V)
+                else:
+                    V_nuevo = barrido(V, bloques, inverso=iteraciones % 2 == 1)
+                cambio = medida(V_nuevo - V)
+                V = V_nuevo
+                iteraciones += 1
+        resultado = {"iteraciones": iteraciones, "cambio": cambio, "convergio": cambio < umbral}
+        V_nuevo, politica = self.respaldo(V)
+        if criterio == "span" and 0 < self.gamma < 1:
+            minimo, maximo = self._extremos((V_nuevo - V)[activos])  # Cotas de MacQueen sobre V*
+            k = self.gamma / (1 - self.gamma)
+            # Los estados sin acciones conservan su valor: no se desplazan
+            inferior = np.where(activos, V_nuevo + k * minimo, V_nuevo)
+            superior = np.where(activos, V_nuevo + k * maximo, V_nuevo)
+            resultado["cotas"] = (inferior, superior)
+            V = (inferior + superior) / 2
+        resultado.update(V=V, politica=politica)
+        return resultado
+
+    def _extremos(self, d):
+        """
+        (min, max) del residuo d de los estados con acciones para las cotas de MacQueen.
+
+        Con estados sin acciones (valor fijo) el operador es subestocástico sobre
+        el resto: T(V + c) = TV + γ·c·Pπ1 con Pπ1 <= 1, así que las cotas sólo
+        valen con min(d) <= 0 <= max(d).
+        """
+        if not len(d):
+            return 0.0, 0.0
+        minimo, maximo = float(d.min()), float(d.max())
+        if self.sin_acciones.any():
+            minimo, maximo = min(minimo, 0.0), max(maximo, 0.0)
+        return minimo, maximo
+
+    def _cortes(self, bloques):
+        """Filas de P (todas las acciones) de cada bloque de estados, cortadas una vez."""
+        if bloques not in self._bloques:
+            limites = np.linspace(0, self.n, min(bloques, self.n) + 1).astype(int)
+            cortes = []
+            for i0, i1 in zip(limites[:-1], limites[1:]):
+                estados = np.arange(i0, i1)
+                filas = (np.arange(self.m)[:, None] * self.n + estados).ravel()
+                cortes.append((i0, i1, self.P[filas]))
+            self._bloques[bloques] = cortes
+        return self._bloques[bloques]
+
+    def _barrido_gauss_seidel(self, V, bloques, inverso=False):
+        V = V.copy()
+        cortes = self._cortes(bloques)
+        for i0, i1, P_bloque in (reversed(cortes) if inverso else cortes):
+            Q = self.R[:, i0:i1] + self.gamma * (P_bloque @ V).reshape(self.m, i1 - i0)
+            Q = np.where(self.validas[:, i0:i1], Q, -np.inf)
+            V[i0:i1], _ = self._maximo(Q, V[i0:i1], self.sin_acciones[i0:i1])
+        return V
+
+    def predecesores(self):
+        """CSR (n x n) cuya fila s' son los estados con alguna acción que lleva a s'."""
+        if self._predecesores is None:
+            coo = self.P.tocoo()
+            origen = coo.row % self.n
+            M = sparse.csr_matrix((np.ones(len(origen)), (coo.col, origen)), shape=(self.n, self.n))
+            M.sum_duplicates()
+            self._predecesores = M
+        return self._predecesores
+
+    def _priorizado(self, V, umbral, medida, max_iter, lote):
+        """Barrido priorizado por lotes con residuos exactos de Bellman (TV - V)."""
+        lote = max(1, min(self.n, lote or self.n // 100))
+        predecesores = self.predecesores()
+        nuevo, _ = self.respaldo(V)
+        residuo = nuevo - V
+        actualizaciones = 0
+        cambio = medida(residuo)
+        while cambio >= umbral and actualizaciones < max_iter * self.n:
+            if lote < self.n:
+                k = np.argpartition(-np.abs(residuo), lote - 1)[:lote]
+            else:
+                k = np.arange(self.n)
+            V[k] = nuevo[k]
+            actualizaciones += len(k)
+            # Sólo cambian los residuos de los estados actualizados y de sus predecesores
+            afectados = np.union1d(k, predecesores[k].indices)
+            if len(afectados) > self.n // 4:        # Cortar tantas filas cuesta más que un respaldo completo
+                nuevo, _ = self.respaldo(V)
+                residuo = nuevo - V
+            else:
+                nuevo[afectados], _ = self._maximo(self.valores_q(V, afectados), V[afectados],
+                                                   self.sin_acciones[afectados])
+                residuo[afectados] = nuevo[afectados] - V[afectados]
+            cambio = medida(residuo)
+        return V, actualizaciones / self.n, cambio
+
+    # ------------------------------------------------------------------
+    # Iteración de políticas
+    # ------------------------------------------------------------------
+
+    def matriz_politica(self, politica, V=None):
+        """
+        Sistema de una política fija: V = rπ + γ Pπ V.
+
+        Los estados sin acción (-1) quedan con fila vacía y rπ = V(s), de
+        modo que conservan su valor actual.
+
+        Parámetros:
+            politica: Índice de acción por estado         (ndarray int)
+            V:        Valores actuales (ndarray, opcional; ceros)
+
+        Retorna:
+            (Pπ CSR n x n, rπ)                            (tuple)
+        """
+        politica = np.asarray(politica)
+        activos = politica >= 0
+        accion = np.where(activos, politica, 0)
+        P_pi = self.P[accion * self.n + np.arange(self.n)]
+        if not activos.all():
+            P_pi = sparse.csr_matrix(sparse.diags(activos.astype(float)) @ P_pi)
+        V = np.zeros(self.n) if V is None else V
+        r_pi = np.where(activos, self.R[accion, np.arange(self.n)], V)
+        return P_pi, r_pi
+
+    def evaluar_politica(self, politica, V0=None, metodo="bicgstab", k=20, tol=1e-8):
+        """
+        Valores de una política fija.
+
+        Parámetros:
+            politica: Índice de acción por estado         (ndarray int)
+            V0:       Punto de partida (ndarray, opcional; ceros)
+            metodo:   "bicgstab", "gmres", "directo" (factorización LU)
+                      o "k-pasos" (k respaldos de la política) (str)
+            k:        Respaldos en "k-pasos"              (int)
+            tol:      Tolerancia relativa de los métodos iterativos (float)
+
+        Si BiCGSTAB o GMRES no convergen (info != 0, p. ej. ruptura con γ = 1)
+        se resuelve con LU; si el sistema es singular se lanza LinAlgError.
+
+        Retorna:
+            Valores de la política                        (ndarray)
+        """
+        V0 = np.zeros(self.n) if V0 is None else np.asarray(V0, dtype=float)
+        P_pi, r_pi = self.matriz_politica(politica, V0)
+        if metodo == "k-pasos":
+            V = V0
+            for _ in range(k):
+                V = r_pi + self.gamma * (P_pi @ V)
+            return V
+        A = sparse.identity(self.n, format="csr") - self.gamma * P_pi
+        if metodo == "gmres":
+            V, info = splinalg.gmres(A, r_pi, x0=V0, rtol=tol, atol=0.0, restart=50)
+        elif metodo == "bicgstab":
+            V, info = splinalg.bicgstab(A, r_pi, x0=V0, rtol=tol, atol=0.0)
+        elif metodo != "directo":
+            raise ValueError(f"Método de evaluación desconocido: {metodo}")
+        if metodo == "directo" or info != 0:        # Ruptura o sin convergencia: LU
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", splinalg.MatrixRankWarning)
+                try:
+                    V = splinalg.spsolve(A.tocsc(), r_pi)
+                except splinalg.MatrixRankWarning:
+                    V = np.full(self.n, np.nan)
+            if not np.all(np.isfinite(V)):
+                raise np.linalg.LinAlgError("El sistema de evaluación de la política es singular")
+        return V
+
+    def iteracion_politicas(self, politica0=None, V0=None, evaluacion="bicgstab", k=20,
+                            tol=1e-8, max_iter=100):
+        """
+        Iteración de políticas; con evaluacion="k-pasos" es la versión modificada.
+
+        Parámetros:
+            politica0:  Política inicial (ndarray int, opcional; voraz sobre V0)
+            V0:         Valores iniciales (ndarray, opcional; ceros)
+            evaluacion: Método de evaluar_politica         (str)
+            k:          Respaldos por evaluación en "k-pasos" (int)
+            tol:        Tolerancia del solucionador y de los empates (float)
+            max_iter:   Máximo de ciclos evaluación-mejora (int)
+
+        Retorna:
+            dict con "V", "politica", "iteraciones", "cambios" (estados que
+            cambiaron de acción en cada mejora), "residuo" (max |TπV - V| de la
+            política devuelta) y "convergio". En "k-pasos" el criterio de parada
+            es la seminorma span, como en iteracion_valores, y V se corrige al
+            punto medio de las cotas de MacQueen
+        """
+        V = np.zeros(self.n) if V0 is None else np.array(V0, dtype=float)
+        politica = self.politica_voraz(V) if politica0 is None else np.array(politica0, dtype=np.intp)
+        columnas = np.arange(self.n)
+        exacta = evaluacion != "k-pasos"
+        umbral = tol * (1 - self.gamma) / self.gamma if 0 < self.gamma < 1 else tol
+        cambios, residuo, convergio = [], np.inf, False
+        for _ in range(max_iter):
+            V = self.evaluar_politica(politica, V, evaluacion, k, tol)
+            Q = self.valores_q(V)
+            mejor = Q.max(axis=0)
+            actual = Q[np.maximum(politica, 0), columnas]
+            # Se conserva la acción actual si empata con la mejor: evita ciclos entre empates
+            nueva = np.where(actual >= mejor - tol * (1 + np.abs(mejor)), politica, Q.argmax(axis=0))
+            nueva[self.sin_acciones] = -1
+            # Residuo de la política elegida (los empates aceptados no cuentan como error)
+            elegida = Q[np.maximum(nueva, 0), columnas]
+            d = (elegida - V)[~self.sin_acciones]
+            residuo = float(np.abs(d).max()) if len(d) else 0.0
+            minimo, maximo = self._extremos(d)
+            cambios.append(int((nueva != politica).sum()))
+            politica = nueva
+            if cambios[-1] == 0 and (exacta or maximo - minimo < umbral):
+                if not exacta and 0 < self.gamma < 1:
+                    # Evaluación parcial: punto medio de las cotas de MacQueen sobre Vπ
+                    # (los estados sin acciones conservan su valor)
+                    V = np.where(self.sin_acciones, V,
+                                 elegida + self.gamma / (1 - self.gamma) * (maximo + minimo) / 2)
+                convergio = True
+                break
+        return {"V": V, "politica": politica, "iteraciones": len(cambios), "cambios": cambios,
+                "residuo": residuo, "convergio": convergio}
+
+    def a_diccionario(self, V):
+        """{estado: valor} usando los objetos originales de los estados."""
+        estados = self.estados if self.estados is not None else range(self.n)
+        return {s: float(v) for s, v in zip(estados, V)}
+
+def mdp_rejilla(filas, columnas, gamma=0.95, deslizamiento=0.2, costo=-0.04, meta=None):
+    """
+    Mundo rejilla de navegación: 4 acciones (N, S, E, O) que avanzan con
+    probabilidad 1 - deslizamiento y se desvían a cada lado con la mitad del
+    resto; los bordes rebotan. Llegar a la meta da +1 y la meta es absorbente.
+
+    Parámetros:
+        filas, columnas: Tamaño de la rejilla             (int)
+        gamma:           Factor de descuento              (float)
+        deslizamiento:   Probabilidad de desviarse        (float)
+        costo:           Recompensa por paso              (float)
+        meta:            (fila, columna) de la meta (tuple, opcional; esquina final)
+
+    Retorna:
+        MDP compilado con n = filas·columnas estados      (MDPDisperso)
+    """
+    n = filas * columnas
+    f, c = np.divmod(np.arange(n), columnas)
+    meta = (filas - 1, columnas - 1) if meta is None else meta
+    s_meta = meta[0] * columnas + meta[1]
+    movimientos = [(-1, 0), (1, 0), (0, 1), (0, -1)]  # N, S, E, O
+    laterales = {0: (2, 3), 1: (2, 3), 2: (0, 1), 3: (0, 1)}
+
+    def destino(k):
+        df, dc = movimientos[k]
+        nf, nc = f + df, c + dc
+        fuera = (nf < 0) | (nf >= filas) | (nc < 0) | (nc >= columnas)
+        return np.where(fuera, np.arange(n), nf * columnas + nc)
+
+    destinos = [destino(k) for k in range(4)]
+    bloques, R = [], np.empty((4, n))
+    recompensa = np.full(n, costo)
+    recompensa[s_meta] = 1.0
+    for a in range(4):
+        cols = np.concatenate([destinos[a]] + [destinos[k] for k in laterales[a]])
+        probs = np.concatenate([np.full(n, 1 - deslizamiento), np.full(2 * n, deslizamiento / 2)])
+        rows = np.tile(np.arange(n), 3)
+        fuera_meta = rows != s_meta                 # Meta absorbente sin recompensa
+        rows = np.append(rows[fuera_meta], s_meta)
+        cols = np.append(cols[fuera_meta], s_meta)
+        probs = np.append(probs[fuera_meta], 1.0)
+        Pa = sparse.csr_matrix((probs, (rows, cols)), shape=(n, n))
+        R[a] = Pa @ recompensa
+        R[a, s_meta] = 0.0
+        bloques.append(Pa)
+    return MDPDisperso(bloques, R, gamma)
+
+def mdp_aleatorio(n, m, sucesores=5, gamma=0.95, semilla=None):
+    """
+    MDP aleatorio disperso: cada par (estado, acción) lleva a `sucesores`
+    estados al azar con probabilidades de Dirichlet y recompensa N(0, 1).
+
+    Parámetros:
+        n, m:      Estados y acciones                    (int)
+        sucesores: Estados alcanzables por par           (int)
+        gamma:     Factor de descuento                   (float)
+        semilla:   Semilla del generador (int, opcional)
+
+    Retorna:
+        MDP compilado                                    (MDPDisperso)
+    """
+    rng = np.random.default_rng(semilla)
+    filas = np.repeat(np.arange(m * n), sucesores)
+    columnas = rng.integers(0, n, size=m * n * sucesores)
+    probs = rng.dirichlet(np.ones(sucesores), size=m * n).ravel()
+    P = sparse.csr_matrix((probs, (filas, columnas)), shape=(m * n, n))  # Duplicados se suman
+    return MDPDisperso(P, rng.standard_normal((m, n)), gamma)
+
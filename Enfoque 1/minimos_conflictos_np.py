@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Mínimos conflictos vectorizado con tabla de conflictos incremental.
+
+La tabla conflictos[i, v] cuenta cuántos vecinos de i violarían una
+restricción si i tomara el valor v. Al reasignar una variable sólo se
+actualizan las filas de sus vecinos (O(grado·d) con NumPy) y las variables
+en conflicto se guardan en una lista perezosa, así que cada paso ya no
+recorre todo el problema.
+
+Modelos disponibles:
+    ModeloGrafo:  cualquier CSP binario de nucleo_csp (Sudoku, coloreado...)
+    ModeloReinas: N-Reinas; la tabla n×n queda implícita en contadores de
+                  filas y diagonales para poder llegar a n ≥ 10⁵.
+
+Opciones de búsqueda: lista tabú de (variable, valor) abandonados y
+reinicios aleatorios cuando no mejora el total de conflictos.
+"""
+
+import numpy as np                   # Importa numpy para operaciones vectorizadas
+
+from nucleo_csp import bits_de       # Núcleo CSP compartido con dominios de bits
+
+PROHIBIDO = np.iinfo(np.int64).max // 4              # Costo de un valor fuera del dominio
+
+class ModeloGrafo:
+    def __init__(self, csp):
+        """
+        Compila un CSP binario a arreglos de índices y tabla de conflictos.
+
+        Parámetros:
+            csp: Instancia del problema CSP            (CSP)
+        """
+        cb = csp.compilar()                          # Índices, valores y compatibles
+        self.cb = cb
+        self.n, self.d = len(cb.variables), len(cb.valores)
+
+        grados = [len(v) for v in cb.vecinos]        # Vecinos en formato CSR
+        self.inicio = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(grados, out=self.inicio[1:])
+        self.indices = np.fromiter((j for v in cb.vecinos for j in v),
+                                   dtype=np.int64, count=int(self.inicio[-1]))
+
+        # incompatibles[v, w] = 1 si (v, w) viola la restricción
+        self.desigualdad = cb.desigualdad
+        self.incompatibles = np.array(
+            [[0 if (cb.compatibles[v] >> w) & 1 else 1 for w in range(self.d)]
+             for v in range(self.d)], dtype=np.int64)
+
+        self.permitidos = np.zeros((self.n, self.d), dtype=bool)  # Dominios
+        for i, mascara in enumerate(cb.dominios):
+            self.permitidos[i, list(bits_de(mascara))] = True
+        self.movibles = self.permitidos.sum(axis=1) > 1  # Las pistas no se mueven
+        self.castigo = np.where(self.permitidos, 0, PROHIBIDO)
+
+    def vecinos(self, i):
+        return self.indices[self.inicio[i]:self.inicio[i + 1]]
+
+    def inicial(self, rng):
+        """Asignación aleatoria dentro de cada dominio."""
+        azar = rng.random((self.n, self.d)) * self.permitidos
+        return np.argmax(azar, axis=1)
+
+    def reiniciar(self, asig):
+        """Reconstruye la tabla de conflictos para una asignación completa."""
+        self.asig = asig
+        origen = np.repeat(np.arange(self.n), np.diff(self.inicio))
+        cuenta = np.zeros((self.n, self.d), dtype=np.int64)
+        np.add.at(cuenta, (origen, asig[self.indices]), 1)  # Valores de los vecinos
+        if self.desigualdad:
+            self.tabla = cuenta
+        else:
+            self.tabla = cuenta @ self.incompatibles   # Relación simétrica
+
+    def conflictos(self, variables):
+        """Conflictos actuales de una o varias variables."""
+        return self.tabla[variables, self.asig[variables]]
+
+    def costos(self, i):
+        return self.tabla[i] + self.castigo[i]
+
+    def mover(self, i, viejo, nuevo):
+        """
+        Reasigna i y actualiza sólo las filas de sus vecinos.
+
+        Retorna:
+            Variables cuyo conteo pudo cambiar         (ndarray)
+        """
+        vecinos = self.vecinos(i)
+        if self.desigualdad:                         # Sólo cambian dos columnas
+            self.tabla[vecinos, viejo] -= 1
+            self.tabla[vecinos, nuevo] += 1
+        else:
+            self.tabla[vecinos] += self.incompatibles[nuevo] - self.incompatibles[viejo]
+        self.asig[i] = nuevo
+        return vecinos
+
+    def decodificar(self, asig):
+        return self.cb.decodificar(asig.tolist())
+
+class ModeloReinas:
+    def __init__(self, n):
+        """
+        N-Reinas: variable = columna, valor = fila.
+
+        Parámetros:
+            n: Número de reinas                        (int)
+        """
+        self.n = self.d = n
+        self.movibles = np.ones(n, dtype=bool)
+
+    def inicial(self, rng):
+        """Permutación aleatoria: sin conflictos de fila desde el inicio."""
+        return rng.permutation(self.n)
+
+    def reiniciar(self, asig):
+        n = self.n
+        self.asig = asig
+        columnas = np.arange(n)
+        self.filas = np.bincount(asig, minlength=n)
+        self.diag1 = np.bincount(asig + columnas, minlength=2 * n - 1)
+        self.diag2 = np.bincount(asig - columnas + n - 1, minlength=2 * n - 1)
+        # Suma de columnas por línea: con dos reinas, la otra es suma - c
+        self.sumas = [np.bincount(indice, weights=columnas, minlength=largo).astype(np.int64)
+                      for indice, largo in ((asig, n), (asig + columnas, 2 * n - 1),
+                                            (asig - columnas + n - 1, 2 * n - 1))]
+
+    def conflictos(self, columnas):
+        n, f = self.n, self.asig[columnas]
+        return (self.filas[f] + self.diag1[f + columnas]
+                + self.diag2[f - columnas + n - 1] - 3)
+
+    def costos(self, c):
+        n = self.n                                   # Diagonales de c: tramos contiguos
+        costos = self.filas + self.diag1[c:c + n] + self.diag2[n - 1 - c:2 * n - 1 - c]
+        costos[self.asig[c]] -= 3                    # Sin contarse a sí misma
+        return costos
+
+    def mover(self, c, viejo, nuevo):
+        """
+        Mueve la reina c actualizando contadores y sumas de sus líneas.
+
+        Retorna:
+            c y las reinas que quedan a solas con ella en una línea (ndarray)
+        """
+        n = self.n
+        afectados = [c]
+        for fila, signo in ((viejo, -1), (nuevo, 1)):
+            for cuenta, suma, linea in ((self.filas, self.sumas[0], fila),
+                                        (self.diag1, self.sumas[1], fila + c),
+                                        (self.diag2, self.sumas[2], fila - c + n - 1)):
+                cuenta[linea] += signo
+                suma[linea] += signo * c
+                if signo > 0 and cuenta[linea] == 2:  # Nuevo conflicto con una sola reina
+                    afectados.append(int(suma[linea]) - c)
+        self.asig[c] = nuevo
+        return np.array(afectados)
+
+    def decodificar(self, asig):
+        return {c: int(f) for c, f in enumerate(asig)}
+
+def buscar(modelo, max_pasos=100000, tabu=0, reinicios=0, paciencia=None, semilla=None):
+    """
+    Motor de mínimos conflictos sobre un modelo con tabla incremental.
+
+    Parámetros:
+        modelo:    ModeloGrafo o ModeloReinas          (object)
+        max_pasos: Máximo número de reasignaciones     (int)
+        tabu:      Pasos que un (var, valor) abandonado queda prohibido (int)
+        reinicios: Reinicios aleatorios permitidos     (int)
+        paciencia: Pasos sin mejorar antes de reiniciar (int, opcional)
+        semilla:   Semilla del generador aleatorio     (int, opcional)
+
+    Retorna:
+        Asignación solución (ndarray) o None          (ndarray/None)
+    """
+    rng = np.random.default_rng(semilla)
+    paciencia = paciencia or max(1000, 10 * modelo.n)
+    pasos = 0
+    for ronda in range(reinicios + 1):
+        limite = paciencia if ronda < reinicios else max_pasos  # El último intento agota los pasos
+        asig = modelo.inicial(rng)
+        modelo.reiniciar(asig)
+        actuales = modelo.conflictos(np.arange(modelo.n))
+        total = int(actuales.sum())                  # Cada conflicto cuenta doble
+        mejor, desde_mejor = total, 0
+        candidatas = np.flatnonzero((actuales > 0) & modelo.movibles).tolist()
+        en_lista = np.zeros(modelo.n, dtype=bool)
+        en_lista[candidatas] = True
+        prohibidos = {}                              # var -> {valor: paso límite}
+
+        while pasos < max_pasos and desde_mejor <= limite:
+            if total == 0:
+                return asig
+            # Toma una candidata al azar; las que ya no están en conflicto se descartan
+            i = -1
+            for _ in range(2):                       # Segundo intento tras reescanear
+                while candidatas:
+                    pos = int(rng.integers(len(candidatas)))
+                    j = candidatas[pos]
+                    if modelo.conflictos(j) > 0:
+                        i = j
+                        break
+                    candidatas[pos] = candidatas[-1] # Borrado perezoso O(1)
+                    candidatas.pop()
+                    en_lista[j] = False
+                if i >= 0:
+                    break
+                actuales = modelo.conflictos(np.arange(modelo.n))  # Reescaneo vectorizado
+                candidatas = np.flatnonzero((actuales > 0) & modelo.movibles).tolist()
+                en_lista[candidatas] = True
+            if i < 0:                                # Sólo quedan pistas en conflicto
+                return None
+
+            costos = modelo.costos(i)
+            viejo = int(asig[i])
+            if tabu:                                 # Movimiento forzado fuera de lo tabú
+                vigentes = {v: h for v, h in prohibidos.get(i, {}).items() if h > pasos}
+                prohibidos[i] = vigentes
+                libres = costos.copy()
+                libres[list(vigentes) + [viejo]] = PROHIBIDO
+                if libres.min() < PROHIBIDO:         # Si todo está vetado, se queda igual
+                    costos = libres
+            minimo = costos.min()
+            empates = np.flatnonzero(costos == minimo)
+            nuevo = int(empates[rng.integers(len(empates))])
+            pasos += 1
+            if nuevo == viejo:
+                desde_mejor += 1
+                continue
+
+            total += 2 * (int(minimo) - int(modelo.conflictos(i)))
+            afectados = modelo.mover(i, viejo, nuevo)
+            if tabu:
+                prohibidos.setdefault(i, {})[viejo] = pasos + tabu
+
+            # Encola las variables que acaban de entrar en conflicto
+            nuevos = afectados[(modelo.conflictos(afectados) > 0)
+                               & ~en_lista[afectados] & modelo.movibles[afectados]]
+            en_lista[nuevos] = True
+            candidatas.extend(nuevos.tolist())
+
+            if total < mejor:
+                mejor, desde_mejor = total, 0
+            else:
+                desde_mejor += 1
+        if pasos >= max_pasos:
+            break
+    return None
+
+def minimos_conflictos(csp, max_iter=1000, tabu=0, reinicios=0, semilla=None):
+    """
+    Mínimos conflictos vectorizado para un CSP de nucleo_csp.
+
+    Parámetros:
+        csp:       Instancia del problema CSP        (CSP)
+        max_iter:  Máximo número de iteraciones      (int)
+        tabu:      Permanencia tabú en pasos         (int)
+        reinicios: Reinicios aleatorios permitidos   (int)
+        semilla:   Semilla del generador aleatorio   (int, opcional)
+
+    Retorna:
+        Asignación solución o None si no converge   (dict/None)
+    """
+    modelo = ModeloGrafo(csp)
+    asig = buscar(modelo, max_iter, tabu=tabu, reinicios=reinicios,
+                  paciencia=max_iter // (reinicios + 1) if reinicios else None,
+                  semilla=semilla)
+    return None if asig is None else modelo.decodificar(asig)
+
+def n_reinas(n, max_pasos=None, semilla=None):
+    """
+    Resuelve N-Reinas con mínimos conflictos.
+
+    Parámetros:
+        n:         Número de reinas                  (int)
+        max_pasos: Máximo de reasignaciones          (int, opcional)
+        semilla:   Semilla del generador aleatorio   (int, opcional)
+
+    Retorna:
+        Fila de la reina de cada columna o None     (dict/None)
+    """
+    modelo = ModeloReinas(n)
+    asig = buscar(modelo, max_pasos or 50 * n, semilla=semilla)
+    return None if asig is None else modelo.decodificar(asig)
+
+if __name__ == "__main__":
+    import time                                      # Medición de tiempos
+
+    for n in (8, 1000, 100000):                      # N-Reinas de distintos tamaños
+        inicio = time.perf_counter()
+        solucion = n_reinas(n, semilla=0)
+        print(f"{n}-Reinas: {'resuelto' if solucion else 'sin solución'} "
+              f"en {time.perf_counter() - inicio:.2f} s")
@@ -0,0 +1,636 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo CSP compartido por las prácticas de Enfoque 1 (Practica020–035).
+
+Los dominios se guardan como máscaras de bits enteras (bit k = valor k del
+universo de valores) y los vecinos como tuplas de índices precalculadas.
+Podar un dominio es un AND, comprobar un valor es un desplazamiento y cada
+poda queda registrada en un rastro, de modo que deshacer una rama del
+backtracking consiste en restaurar las entradas del rastro en lugar de
+copiar todos los dominios.
+
+La arco-consistencia sigue AC-2001: para cada (arco, valor) se recuerda el
+último soporte encontrado y sólo se busca uno nuevo cuando ese soporte
+desaparece del dominio vecino. Los soportes también se guardan en el rastro
+para que el backtracking los restaure junto con los dominios.
+
+La clase CSP conserva la interfaz de las prácticas (variables, dominios,
+restricciones, vecinos) y se compila a CSPBits justo antes de resolver,
+así que las pistas fijadas sobre csp.dominios después de construirlo se
+respetan.
+"""
+
+import random  # Importa random para búsqueda local y desempates
+
+def cumple_restriccion(valor1, valor2):
+    """
+    Función de restricción por defecto (para Sudoku: valores diferentes).
+
+    Parámetros:
+        valor1: Primer valor a comparar               (any)
+        valor2: Segundo valor a comparar              (any)
+
+    Retorna:
+        True si cumplen restricción, False si no      (bool)
+    """
+    return valor1 != valor2                           # Restricción básica
+
+def bits_de(mascara):
+    """
+    Recorre las posiciones de los bits encendidos de una máscara.
+
+    Parámetros:
+        mascara: Conjunto de valores como entero      (int)
+
+    Retorna:
+        Generador de índices de valor ascendentes     (generator)
+    """
+    while mascara:                                    # Mientras queden bits
+        bajo = mascara & -mascara                     # Bit encendido más bajo
+        yield bajo.bit_length() - 1                   # Su posición
+        mascara ^= bajo                               # Lo apaga
+
+class CSP:
+    def __init__(self, variables, dominios, restricciones, restriccion=cumple_restriccion):
+        """
+        Inicializa un problema CSP (Constraint Satisfaction Problem).
+
+        Parámetros:
+            variables:     Lista de variables del problema          (list)
+            dominios:      Diccionario {variable: valores_posibles} (dict)
+            restricciones: Lista de pares de variables restringidas (list)
+            restriccion:   Relación binaria simétrica entre valores (callable)
+        """
+        self.variables     = variables       # Lista de variables del problema
+        self.dominios      = dominios        # Dominios para cada variable
+        self.restricciones = restricciones   # Restricciones entre variables
+        self.restriccion   = restriccion     # Relación que deben cumplir los pares
+        self.vecinos       = {v: set() for v in variables}  # Grafo de vecindad
+
+        for (v1, v2) in restricciones:      # Construye relación de vecindad
+            self.vecinos[v1].add(v2)        # Agrega v2 como vecino de v1
+            self.vecinos[v2].add(v1)        # Agrega v1 como vecino de v2
+
+    def compilar(self, dominios=None):
+        """
+        Compila el problema a su representación de bits.
+
+        Parámetros:
+            dominios: Dominios a usar en lugar de self.dominios (dict, opcional)
+
+        Retorna:
+            Problema compilado listo para los algoritmos   (CSPBits)
+        """
+        return CSPBits(self, dominios)
+
+class CSPBits:
+    def __init__(self, csp, dominios=None):
+        """
+        Vista compilada de un CSP con dominios como máscaras de bits.
+
+        Parámetros:
+            csp:      Problema original                      (CSP)
+            dominios: Dominios a compilar (por defecto los del CSP) (dict)
+        """
+        dominios = dominios if dominios is not None else csp.dominios
+        restriccion = getattr(csp, "restriccion", cumple_restriccion)
+
+        self.variables = list(csp.variables)          # Índice -> variable
+        self.indice = {v: i for i, v in enumerate(self.variables)}  # Variable -> índice
+
+        valores = []                                  # Universo de valores
+        vistos = set()
+        for var in self.variables:                    # Une todos los dominios
+            for val in dominios[var]:
+                if val not in vistos:
+                    vistos.add(val)
+                    valores.append(val)
+        try:
+            valores.sort()                            # Orden natural si existe
+        except TypeError:
+            pass                                      # Si no, orden de aparición
+        self.valores = valores                        # Índice -> valor
+        self.posicion = {val: k for k, val in enumerate(valores)}  # Valor -> bit
+        self.completo = (1 << len(valores)) - 1       # Máscara con todos los valores
+
+        self.dominios = [self.mascara(dominios[v]) for v in self.variables]
+        self.vecinos = [tuple(sorted(self.indice[w] for w in csp.vecinos[v]))
+                        for v in self.variables]      # Vecinos como índices
+
+        # compatibles[k]: valores m tales que restriccion(valores[k], valores[m])
+        self.desigualdad = restriccion is cumple_restriccion
+        if self.desigualdad:                          # Caso Sudoku: desigualdad
+            self.compatibles = [self.completo ^ (1 << k) for k in range(len(valores))]
+        else:
+            self.compatibles = [
+                sum(1 << m for m, y in enumerate(valores) if restriccion(x, y))
+                for x in valores
+            ]
+
+        # Arcos dirigidos numerados: arcos[a] = (i, j); entrantes[j] = arcos (k, j)
+        self.arcos = [(i, j) for i, vs in enumerate(self.vecinos) for j in vs]
+        self.entrantes = [[] for _ in self.variables]
+        for a, (i, j) in enumerate(self.arcos):
+            self.entrantes[j].append(a)
+        self.entrantes = [tuple(e) for e in self.entrantes]
+        self.ultimo = None                            # Soportes AC-2001 (se crean al usarlos)
+        self.en_cola = None                           # Marcas de la cola de arcos
+
+        self.rastro = []                              # Pila de (lista, índice, valor previo)
+
+    def mascara(self, valores):
+        """
+        Convierte una colección de valores en máscara de bits.
+
+        Parámetros:
+            valores: Valores a codificar                  (iterable)
+
+        Retorna:
+            Máscara con los bits de esos valores          (int)
+        """
+        mascara = 0
+        for val in valores:                           # Enciende un bit por valor
+            mascara |= 1 << self.posicion[val]
+        return mascara
+
+    def lista(self, mascara):
+        """
+        Convierte una máscara de bits en lista de valores.
+
+        Parámetros:
+            mascara: Conjunto de valores como entero      (int)
+
+        Retorna:
+            Valores representados por la máscara          (list)
+        """
+        return [self.valores[k] for k in bits_de(mascara)]
+
+    def podar(self, i, mascara):
+        """
+        Restringe el dominio de una variable registrando el cambio en el rastro.
+
+        Parámetros:
+            i:       Índice de la variable                  (int)
+            mascara: Valores que se conservan               (int)
+
+        Retorna:
+            Dominio resultante (0 si quedó vacío)         (int)
+        """
+        previo = self.dominios[i]                     # Dominio actual
+        nuevo = previo & mascara                      # Intersección en O(1)
+        if nuevo != previo:                           # Sólo registra cambios reales
+            self.rastro.append((self.dominios, i, previo))
+            self.dominios[i] = nuevo
+        return nuevo
+
+    def marca(self):
+        """
+        Punto de restauración del rastro.
+
+        Retorna:
+            Longitud actual del rastro                    (int)
+        """
+        return len(self.rastro)
+
+    def deshacer(self, marca):
+        """
+        Restaura dominios y soportes modificados desde una marca.
+
+        Parámetros:
+            marca: Valor devuelto por marca()             (int)
+        """
+        rastro = self.rastro
+        while len(rastro) > marca:                    # Deshace en orden inverso
+            lista, i, previo = rastro.pop()
+            lista[i] = previo
+
+    def codificar(self, asignacion):
+        """
+        Convierte una asignación {variable: valor} en lista de índices.
+
+        Parámetros:
+            asignacion: Asignación parcial               (dict)
+
+        Retorna:
+            Índice de valor por variable (-1 libre)       (list)
+        """
+        asig = [-1] * len(self.variables)
+        for var, val in asignacion.items():
+            asig[self.indice[var]] = self.posicion[val]
+        return asig
+
+    def decodificar(self, asig):
+        """
+        Convierte una lista de índices en asignación {variable: valor}.
+
+        Parámetros:
+            asig: Índice de valor por variable (-1 libre)  (list)
+
+        Retorna:
+            Asignación con las variables asignadas        (dict)
+        """
+        return {self.variables[i]: self.valores[k]
+                for i, k in enumerate(asig) if k >= 0}
+
+    def permitidos(self, i, asig):
+        """
+        Valores del dominio de i compatibles con sus vecinos asignados.
+
+        Parámetros:
+            i:    Índice de la variable                   (int)
+            asig: Índice de valor por variable            (list)
+
+        Retorna:
+            Máscara de valores consistentes               (int)
+        """
+        mascara = self.dominios[i]
+        compatibles = self.compatibles
+        for n in self.vecinos[i]:                     # Cada vecino asignado
+            k = asig[n]                               # restringe por simetría
+            if k >= 0:
+                mascara &= compatibles[k]
+        return mascara
+
+def consistente(var, valor, asignacion, csp):
+    """
+    Verifica si una asignación es consistente.
+
+    Parámetros:
+        var:        Variable a asignar                 (any)
+        valor:      Valor a verificar                  (any)
+        asignacion: Asignación parcial actual          (dict)
+        csp:        Instancia del problema CSP        (CSP)
+
+    Retorna:
+        True si es consistente, False si no           (bool)
+    """
+    restriccion = getattr(csp, "restriccion", cumple_restriccion)
+    for vecino in csp.vecinos[var]:                   # Para cada vecino
+        if vecino in asignacion and not restriccion(valor, asignacion[vecino]):
+            return False                              # Restricción violada
+    return True                                       # Todas se cumplen
+
+def contar_conflictos(var, valor, asignacion, csp):
+    """
+    Cuenta las restricciones que violaría una asignación.
+
+    Parámetros:
+        var:        Variable a evaluar                 (any)
+        valor:      Valor potencial a asignar          (any)
+        asignacion: Asignación parcial actual          (dict)
+        csp:        Instancia del problema CSP        (CSP)
+
+    Retorna:
+        Número de conflictos                          (int)
+    """
+    restriccion = getattr(csp, "restriccion", cumple_restriccion)
+    total = 0
+    for vecino in csp.vecinos[var]:                   # Cuenta vecinos asignados
+        if vecino in asignacion and not restriccion(valor, asignacion[vecino]):
+            total += 1                                # que incumplen
+    return total
+
+def seleccionar_mrv(cb, asig):
+    """
+    Selecciona la variable libre con menos valores (MRV) contando bits.
+
+    Parámetros:
+        cb:   Problema compilado                      (CSPBits)
+        asig: Índice de valor por variable            (list)
+
+    Retorna:
+        Índice de la variable o -1 si todas asignadas (int)
+    """
+    mejor, tam_mejor = -1, 1 << 30
+    for i, mascara in enumerate(cb.dominios):         # Recorre variables libres
+        if asig[i] < 0:
+            tam = mascara.bit_count()                 # Popcount del dominio
+            if tam < tam_mejor:
+                mejor, tam_mejor = i, tam
+                if tam <= 1:                          # No hay nada menor
+                    break
+    return mejor
+
+def orden_lcv(cb, i, asig, mascara):
+    """
+    Ordena valores por LCV: primero los que menos podan a los vecinos libres.
+
+    Parámetros:
+        cb:      Problema compilado                    (CSPBits)
+        i:       Índice de la variable                 (int)
+        asig:    Índice de valor por variable          (list)
+        mascara: Valores candidatos                    (int)
+
+    Retorna:
+        Índices de valor ordenados                    (list)
+    """
+    candidatos = list(bits_de(mascara))
+    if len(candidatos) < 2:                           # Nada que ordenar
+        return candidatos
+    libres = [cb.dominios[n] for n in cb.vecinos[i] if asig[n] < 0]
+    compatibles = cb.compatibles
+    return sorted(candidatos, key=lambda k: sum(
+        (d & ~compatibles[k]).bit_count() for d in libres))
+
+def _resolver(csp, asignacion, dominios, busqueda):
+    """Compila, siembra la asignación inicial y ejecuta una búsqueda de bits."""
+    cb = csp.compilar(dominios)
+    asig = cb.codificar(asignacion)
+    for i, k in enumerate(asig):                      # Fija lo ya asignado
+        if k >= 0:
+            cb.dominios[i] &= 1 << k
+    if not busqueda(cb, asig):
+        return None
+    asignacion.update(cb.decodificar(asig))           # Conserva la interfaz dict
+    return asignacion
+
+def _backtracking_bits(cb, asig, clave):
+    i = seleccionar_mrv(cb, asig)
+    if i < 0:                                         # Asignación completa
+        return True
+    mascara = cb.permitidos(i, asig)                  # Valores consistentes
+    if clave is None:
+        valores = orden_lcv(cb, i, asig, mascara)
+    else:
+        var = cb.variables[i]
+        valores = sorted(bits_de(mascara), key=lambda k: clave(var, cb.valores[k]))
+    for k in valores:
+        asig[i] = k                                   # Realiza asignación
+        if _backtracking_bits(cb, asig, clave):
+            return True
+    asig[i] = -1                                      # Backtrack (deshacer)
+    return False
+
+def backtracking(asignacion, csp, clave_valor=None):
+    """
+    Backtracking cronológico con MRV y LCV sobre dominios de bits.
+
+    Parámetros:
+        asignacion:  Asignación parcial actual          (dict)
+        csp:         Instancia del problema CSP        (CSP)
+        clave_valor: Orden alternativo f(var, valor)   (callable, opcional)
+
+    Retorna:
+        Solución completa o None si no hay solución   (dict/None)
+    """
+    return _resolver(csp, asignacion, None,
+                     lambda cb, asig: _backtracking_bits(cb, asig, clave_valor))
+
+def _forward_checking_bits(cb, asig):
+    i = seleccionar_mrv(cb, asig)
+    if i < 0:                                         # Asignación completa
+        return True
+    vecinos, compatibles = cb.vecinos[i], cb.compatibles
+    for k in orden_lcv(cb, i, asig, cb.dominios[i]):
+        marca = cb.marca()                            # Punto de restauración
+        cb.podar(i, 1 << k)                           # Fija valor
+        asig[i] = k
+        ok = True
+        for n in vecinos:                             # Propaga a vecinos libres
+            if asig[n] < 0 and not cb.podar(n, compatibles[k]):
+                ok = False                            # Dominio vacío
+                break
+        if ok and _forward_checking_bits(cb, asig):
+            return True
+        asig[i] = -1
+        cb.deshacer(marca)                            # Restaura dominios
+    return False
+
+def forward_checking(asignacion, csp, dominios=None):
+    """
+    Forward checking con MRV y LCV; poda con AND y deshace con el rastro.
+
+    Parámetros:
+        asignacion: Asignación parcial actual          (dict)
+        csp:        Instancia del problema CSP        (CSP)
+        dominios:   Dominios actuales (opcional)      (dict)
+
+    Retorna:
+        Solución completa o None si no hay solución   (dict/None)
+    """
+    def busqueda(cb, asig):
+        for i, k in enumerate(asig):                  # Propaga la asignación inicial
+            if k >= 0:
+                for n in cb.vecinos[i]:
+                    if asig[n] < 0 and not cb.podar(n, cb.compatibles[k]):
+                        return False
+        return _forward_checking_bits(cb, asig)
+    return _resolver(csp, asignacion, dominios, busqueda)
+
+def revisar(cb, a):
+    """
+    Revisión AC-2001 del arco a = (i, j): elimina de i los valores sin
+    soporte en j, reanudando la búsqueda después del último soporte.
+
+    Parámetros:
+        cb: Problema compilado                        (CSPBits)
+        a:  Índice del arco dirigido                  (int)
+
+    Retorna:
+        True si se eliminó algún valor, False si no   (bool)
+    """
+    i, j = cb.arcos[a]
+    di, dj = cb.dominios[i], cb.dominios[j]
+    if cb.desigualdad:                                # Con != sólo un j unitario
+        if dj & (dj - 1) or not di & dj:              # deja sin soporte a un valor
+            return False
+        cb.podar(i, ~dj)
+        return True
+    compatibles, ultimo, rastro = cb.compatibles, cb.ultimo, cb.rastro
+    base = a * len(cb.valores)                        # Fila de soportes del arco
+    soportados = di
+    for k in bits_de(di):
+        s = ultimo[base + k]
+        if s >= 0 and (dj >> s) & 1:                  # El último soporte sigue vivo
+            continue
+        candidatos = compatibles[k] & dj & (-1 << (s + 1))  # Soportes posteriores a s
+        if candidatos:
+            rastro.append((ultimo, base + k, s))      # Restaurable al retroceder
+            ultimo[base + k] = (candidatos & -candidatos).bit_length() - 1
+        else:
+            soportados ^= 1 << k                      # Valor sin soporte
+    if soportados == di:
+        return False
+    cb.podar(i, soportados)
+    return True
+
+def arco_consistencia(cb, arcos=None):
+    """
+    AC-2001 sobre el problema compilado; podas y soportes quedan en el rastro.
+
+    Parámetros:
+        cb:    Problema compilado                      (CSPBits)
+        arcos: Arcos iniciales (por defecto todos)     (iterable, opcional)
+
+    Retorna:
+        True si es arco-consistente, False si hay dominio vacío (bool)
+    """
+    if cb.ultimo is None:                             # Reserva perezosa
+        cb.ultimo = [-1] * (len(cb.arcos) * len(cb.valores))
+        cb.en_cola = bytearray(len(cb.arcos))
+    if arcos is None:
+        arcos = range(len(cb.arcos))
+    en_cola, lista_arcos, entrantes = cb.en_cola, cb.arcos, cb.entrantes
+    dominios, desigualdad = cb.dominios, cb.desigualdad
+    cola = []
+    for a in arcos:                                   # Encola sin duplicados
+        if not en_cola[a]:
+            dj = dominios[lista_arcos[a][1]]
+            if desigualdad and dj & (dj - 1):         # Con != sólo poda un j unitario
+                continue
+            en_cola[a] = 1
+            cola.append(a)
+    inicio = 0
+    while inicio < len(cola):                         # Cola FIFO sobre lista
+        a = cola[inicio]
+        inicio += 1
+        en_cola[a] = 0
+        if revisar(cb, a):                            # Si se podó i
+            i, j = lista_arcos[a]
+            di = dominios[i]
+            if not di:
+                for b in cola[inicio:]:               # Limpia marcas pendientes
+                    en_cola[b] = 0
+                return False                          # Inconsistente
+            if desigualdad and di & (di - 1):         # i aún no es unitario
+                continue
+            for b in entrantes[i]:                    # Reencola arcos (k, i)
+                if not en_cola[b] and lista_arcos[b][0] != j:
+                    en_cola[b] = 1
+                    cola.append(b)
+    return True
+
+def ac3(csp, dominios=None):
+    """
+    Arco-consistencia (AC-2001) con dominios de bits.
+
+    Parámetros:
+        csp:      Instancia del problema CSP        (CSP)
+        dominios: Dominios actuales (opcional)      (dict)
+
+    Retorna:
+        Dominios reducidos o False si inconsistencia (dict/bool)
+    """
+    cb = csp.compilar(dominios)
+    if not arco_consistencia(cb):
+        return False
+    return {v: cb.lista(cb.dominios[i]) for i, v in enumerate(cb.variables)}
+
+def _mac_bits(cb, asig):
+    i = seleccionar_mrv(cb, asig)
+    if i < 0:                                         # Asignación completa
+        return True
+    for k in orden_lcv(cb, i, asig, cb.dominios[i]):
+        marca = cb.marca()
+        cb.podar(i, 1 << k)                           # Fija valor
+        asig[i] = k
+        if arco_consistencia(cb, cb.entrantes[i]) and _mac_bits(cb, asig):
+            return True
+        asig[i] = -1
+        cb.deshacer(marca)                            # Restaura dominios y soportes
+    return False
+
+def backtracking_ac3(asignacion, csp, dominios=None):
+    """
+    Backtracking manteniendo arco-consistencia (MAC) con AC-2001; cada nodo
+    deshace sus podas con el rastro en lugar de copiar los dominios.
+
+    Parámetros:
+        asignacion: Asignación parcial actual          (dict)
+        csp:        Instancia del problema CSP        (CSP)
+        dominios:   Dominios actuales (opcional)      (dict)
+
+    Retorna:
+        Solución completa o None si no hay solución   (dict/None)
+    """
+    return _resolver(csp, asignacion, dominios,
+                     lambda cb, asig: arco_consistencia(cb) and _mac_bits(cb, asig))
+
+def _backjumping_bits(cb, asig, orden, nivel, profundidad):
+    if profundidad == len(orden):                     # Asignación completa
+        return True, 0
+    i = orden[profundidad]
+    if asig[i] >= 0:                                  # Ya asignada de antemano
+        return _backjumping_bits(cb, asig, orden, nivel, profundidad + 1)
+    compatibles = cb.compatibles
+    conflicto = 0                                     # Conjunto de conflicto (bits)
+    for k in bits_de(cb.dominios[i]):
+        culpable = -1                                 # Vecino más antiguo en conflicto
+        for n in cb.vecinos[i]:
+            m = asig[n]
+            if m >= 0 and not (compatibles[k] >> m) & 1:
+                if culpable < 0 or nivel[n] < nivel[culpable]:
+                    culpable = n
+        if culpable >= 0:
+            conflicto |= 1 << culpable
+            continue
+        asig[i], nivel[i] = k, profundidad            # Realiza asignación
+        exito, hijo = _backjumping_bits(cb, asig, orden, nivel, profundidad + 1)
+        if exito:
+            return True, 0
+        asig[i] = -1                                  # Backtrack (deshacer)
+        if not (hijo >> i) & 1:                       # i no causa el fallo:
+            return False, hijo                        # salta por encima de i
+        conflicto |= hijo & ~(1 << i)                 # Absorbe el conflicto
+    return False, conflicto
+
+def backjumping(asignacion, csp):
+    """
+    Salto atrás dirigido por conflictos (CBJ); los conjuntos de conflicto
+    son máscaras de bits sobre los índices de variable.
+
+    Parámetros:
+        asignacion: Asignación parcial actual          (dict)
+        csp:        Instancia del problema CSP        (CSP)
+
+    Retorna:
+        Solución completa o None si no hay solución   (dict/None)
+    """
+    def busqueda(cb, asig):
+        orden = sorted(range(len(cb.variables)),      # Orden estático MRV
+                       key=lambda i: cb.dominios[i].bit_count())
+        nivel = [-1] * len(cb.variables)              # Profundidad de asignación
+        return _backjumping_bits(cb, asig, orden, nivel, 0)[0]
+    return _resolver(csp, asignacion, None, busqueda)
+
+def minimos_conflictos(csp, max_iter=1000):
+    """
+    Mínimos conflictos sobre índices, con conteo de conflictos incremental.
+
+    Parámetros:
+        csp:      Instancia del problema CSP        (CSP)
+        max_iter: Máximo número de iteraciones      (int)
+
+    Retorna:
+        Asignación solución o None si no converge   (dict/None)
+    """
+    cb = csp.compilar()
+    compatibles, vecinos = cb.compatibles, cb.vecinos
+    candidatos = [list(bits_de(d)) for d in cb.dominios]
+    asig = [random.choice(c) for c in candidatos]     # Asignación inicial aleatoria
+
+    def conflictos_de(i, k):
+        return sum(1 for n in vecinos[i] if not (compatibles[k] >> asig[n]) & 1)
+
+    conflictos = [conflictos_de(i, asig[i]) for i in range(len(asig))]
+    for _ in range(max_iter):
+        en_conflicto = [i for i, c in enumerate(conflictos) if c]
+        if not en_conflicto:                          # Solución encontrada
+            return cb.decodificar(asig)
+        movibles = [i for i in en_conflicto if len(candidatos[i]) > 1]
+        if not movibles:                              # Sólo pistas en conflicto
+            return None
+        i = random.choice(movibles)                   # Variable conflictiva aleatoria
+        costos = [(conflictos_de(i, k), k) for k in candidatos[i]]
+        minimo = min(c for c, _ in costos)
+        nuevo = random.choice([k for c, k in costos if c == minimo])
+        viejo = asig[i]
+        if nuevo == viejo:
+            continue
+        asig[i] = nuevo
+        conflictos[i] = minimo
+        for n in vecinos[i]:                          # Actualiza sólo los vecinos
+            m = asig[n]
+            conflictos[n] += ((not (compatibles[nuevo] >> m) & 1)
+                              - (not (compatibles[viejo] >> m) & 1))
+    return None                                       # No convergió en max_iter
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+"""
+POMDP vectorizado: creencias por lotes y solucionadores basados en puntos.
+
+El modelo se guarda como tensores NumPy:
+    T[a, s, s'] = P(s' | s, a)
+    O[a, s', z] = P(z | s', a)
+    R[a, s]     = recompensa esperada de a en s
+Una creencia es un vector de S probabilidades y un lote de N creencias una
+matriz (N x S). Actualizar el lote tras (a, z) es un producto matricial
+por acción, una multiplicación elemento a elemento por la columna de O y
+una normalización por filas.
+
+La función de valor es un conjunto de vectores alfa guardado como matriz
+(K x S), con la acción de cada vector; V(b) = max_k b·α_k. El respaldo
+basado en puntos de un lote de creencias precalcula
+    G[a, z, k, s] = γ Σ_s' T[a, s, s'] O[a, s', z] α_k(s')
+y elige, para cada creencia, acción y observación, el α_k que maximiza
+b·G[a, z, k]. Solucionadores:
+    pbvi:    respalda todas las creencias en cada iteración
+    perseus: respalda lotes al azar de creencias aún no mejoradas hasta
+             que todas mejoran (Spaan y Vlassis); el valor nunca baja
+Tras cada iteración se podan los vectores repetidos, los dominados punto
+a punto y los que no son máximos en ninguna creencia del conjunto.
+
+Al final, CreenciasCSP lleva creencias factorizadas (una distribución por
+variable) para CSPs cuyo espacio conjunto de estados no es enumerable.
+"""
+
+import numpy as np                                  # Tensores del modelo y lotes de creencias
+
+class POMDPVectorizado:
+    def __init__(self, T, O, R, gamma, estados=None, acciones=None, observaciones=None):
+        """
+        POMDP compilado.
+
+        Parámetros:
+            T:             Transiciones, forma (A, S, S)        (ndarray)
+            O:             Observaciones, forma (A, S, Z)       (ndarray)
+            R:             Recompensa esperada, forma (A, S)    (ndarray)
+            gamma:         Factor de descuento                  (float)
+            estados:       Objeto original de cada estado       (list, opcional)
+            acciones:      Objeto original de cada acción       (list, opcional)
+            observaciones: Objeto original de cada observación  (list, opcional)
+        """
+        self.T = np.asarray(T, dtype=float)
+        self.O = np.asarray(O, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.A, self.S = self.R.shape
+        self.Z = self.O.shape[2]
+        if self.T.shape != (self.A, self.S, self.S):
+            raise ValueError(f"T tiene forma {self.T.shape}; se esperaba {(self.A, self.S, self.S)}")
+        if self.O.shape[:2] != (self.A, self.S):
+            raise ValueError(f"O tiene forma {self.O.shape}; se esperaba {(self.A, self.S, self.Z)}")
+        self.gamma = gamma
+        self.estados = estados
+        self.acciones = acciones
+        self.observaciones = observaciones
+        self._T_acumulada = np.cumsum(self.T, axis=2)  # Para simular s' por lotes
+        self._O_acumulada = np.cumsum(self.O, axis=2)  # Para simular z por lotes
+
+    # ------------------------------------------------------------------
+    # Creencias
+    # ------------------------------------------------------------------
+
+    def predecir(self, B, a):
+        """
+        Creencias tras la acción, antes de observar: B·T[a].
+
+        Parámetros:
+            B: Creencias (N x S) o una sola (S)                 (ndarray)
+            a: Acción común o una por creencia                  (int/ndarray)
+
+        Retorna:
+            Creencias predichas, con la forma de B              (ndarray)
+        """
+        B = np.asarray(B, dtype=float)
+        if np.ndim(a) == 0:
+            return B @ self.T[a]
+        a = np.asarray(a)
+        prediccion = np.empty_like(B)
+        for accion in np.unique(a):                 # Un producto matricial por acción
+            filas = a == accion
+            prediccion[filas] = B[filas] @ self.T[accion]
+        return prediccion
+
+    def actualizar_creencias(self, B, a, z):
+        """
+        Filtro bayesiano de un lote: b'(s') ∝ O[a, s', z] Σ_s b(s) T[a, s, s'].
+
+        Una observación imposible (probabilidad 0) deja la creencia predicha.
+
+        Parámetros:
+            B: Creencias (N x S) o una sola (S)                 (ndarray)
+            a: Acción común o una por creencia                  (int/ndarray)
+            z: Observación común o una por creencia             (int/ndarray)
+
+        Retorna:
+            (creencias actualizadas, P(z | b, a) de cada una)   (tuple)
+        """
+        B = np.asarray(B, dtype=float)
+        una = B.ndim == 1
+        B = np.atleast_2d(B)
+        n = len(B)
+        a = np.broadcast_to(a, n)
+        z = np.broadcast_to(z, n)
+        prediccion = self.predecir(B, a)
+        nuevas = prediccion * self.O[a[:, None], np.arange(self.S), z[:, None]]
+        prob = nuevas.sum(axis=1)
+        posibles = prob > 0
+        nuevas[posibles] /= prob[posibles, None]
+        nuevas[~posibles] = prediccion[~posibles]
+        return (nuevas[0], prob[0]) if una else (nuevas, prob)
+
+    def probabilidades_observacion(self, B, a):
+        """P(z | b, a) para cada creencia de B (N x Z) y una acción común."""
+        return self.predecir(B, a) @ self.O[a]
+
+    def simular(self, s, a, rng):
+        """
+        Un paso del entorno para N agentes a la vez.
+
+        Parámetros:
+            s:   Estado de cada agente                           (ndarray int)
+            a:   Acción de cada agente (o común)                 (ndarray int/int)
+            rng: Generador aleatorio                             (np.random.Generator)
+
+        Retorna:
+            (estados siguientes, observaciones, recompensas)     (tuple)
+        """
+        s = np.asarray(s)
+        a = np.broadcast_to(a, s.shape)
+        u = rng.random(s.shape) * self._T_acumulada[a, s, -1]
+        siguiente = (self._T_acumulada[a, s] <= u[:, None]).sum(axis=1)
+        siguiente = np.minimum(siguiente, self.S - 1)   # Redondeo en el último umbral
+        u = rng.random(s.shape) * self._O_acumulada[a, siguiente, -1]
+        z = np.minimum((self._O_acumulada[a, siguiente] <= u[:, None]).sum(axis=1), self.Z - 1)
+        return siguiente, z, self.R[a, s]
+
+    def recolectar_creencias(self, b0, n, profundidad=20, agentes=100, semilla=None):
+        """
+        Conjunto de creencias alcanzables con acciones al azar.
+
+        Parámetros:
+            b0:          Creencia inicial                        (ndarray)
+            n:           Creencias a devolver (como máximo)      (int)
+            profundidad: Pasos por trayectoria                   (int)
+            agentes:     Trayectorias simuladas en paralelo      (int)
+            semilla:     Semilla del generador                   (int, opcional)
+
+        Retorna:
+            Matriz (≤ n x S) de creencias distintas, b0 primero  (ndarray)
+        """
+        rng = np.random.default_rng(semilla)
+        b0 = np.asarray(b0, dtype=float)
+        puntos, vistos = [b0[None]], {np.round(b0, 6).tobytes()}
+        total, anterior = 1, 0
+        while anterior < total < n:                 # Para si una ronda no aporta creencias
+            anterior = total
+            B = np.repeat(b0[None], agentes, axis=0)
+            s = rng.choice(self.S, size=agentes, p=b0 / b0.sum())
+            for _ in range(profundidad):
+                a = rng.integers(self.A, size=agentes)
+                s, z, _ = self.simular(s, a, rng)
+                B, _ = self.actualizar_creencias(B, a, z)
+                claves = [fila.tobytes() for fila in np.round(B, 6)]
+                nuevas = [i for i, c in enumerate(claves) if c not in vistos and not vistos.add(c)]
+                if nuevas:
+                    puntos.append(B[nuevas])
+                    total += len(nuevas)
+                if total >= n:
+                    break
+        return np.concatenate(puntos)[:n]
+
+    # ------------------------------------------------------------------
+    # Vectores alfa
+    # ------------------------------------------------------------------
+
+    def valor(self, B, alfas):
+        """V(b) = max_k b·α_k para cada creencia de B."""
+        return (np.atleast_2d(B) @ alfas.T).max(axis=1)
+
+    def politica(self, B, alfas, acciones):
+        """Acción del vector alfa máximo para cada creencia de B."""
+        return acciones[(np.atleast_2d(B) @ alfas.T).argmax(axis=1)]
+
+    def _proyecciones(self, alfas):
+        """G[a, z, k, s] = γ Σ_s' T[a, s, s'] O[a, s', z] α_k(s')."""
+        G = np.einsum("ast,atz,kt->azks", self.T, self.O, alfas, optimize=True)
+        return np.ascontiguousarray(G) * self.gamma   # Contigua: el respaldo la usa como matriz
+
+    def respaldo(self, B, alfas, G=None, lote=256):
+        """
+        Respaldo basado en puntos de un lote de creencias.
+
+        Parámetros:
+            B:     Creencias (N x S)                              (ndarray)
+            alfas: Vectores actuales (K x S)                      (ndarray)
+            G:     Proyecciones ya calculadas (opcional)          (ndarray)
+            lote:  Creencias procesadas juntas (acota memoria)    (int)
+
+        Retorna:
+            (nuevos vectores N x S, acción de cada uno)           (tuple)
+        """
+        G = self._proyecciones(alfas) if G is None else G
+        nuevos = np.empty((len(B), self.S))
+        acciones = np.empty(len(B), dtype=np.intp)
+        z = np.arange(self.Z)
+        for i0 in range(0, len(B), lote):
+            b = B[i0:i0 + lote]
+            proyeccion = (b @ G.reshape(-1, self.S).T).reshape(len(b), self.A, self.Z, -1)
+            mejor_k = proyeccion.argmax(axis=3)                       # (n, A, Z)
+            maximo = np.take_along_axis(proyeccion, mejor_k[..., None], axis=3)[..., 0]
+            valor_a = b @ self.R.T + maximo.sum(axis=2)
+            a = valor_a.argmax(axis=1)
+            k = mejor_k[np.arange(len(b)), a]                          # (n, Z)
+            nuevos[i0:i0 + lote] = self.R[a] + G[a[:, None], z, k].sum(axis=1)
+            acciones[i0:i0 + lote] = a
+        return nuevos, acciones
+
+    def podar(self, alfas, acciones, B=None, decimales=10):
+        """
+        Quita vectores repetidos, dominados punto a punto y (si se da B)
+        los que no son máximos en ninguna creencia de B.
+
+        Retorna:
+            (vectores, acciones) podados                          (tuple)
+        """
+        _, unicos = np.unique(np.round(alfas, decimales), axis=0, return_index=True)
+        unicos.sort()
+        alfas, acciones = alfas[unicos], acciones[unicos]
+        if B is not None:
+            utiles = np.unique((B @ alfas.T).argmax(axis=1))
+            alfas, acciones = alfas[utiles], acciones[utiles]
+        dominado = np.zeros(len(alfas), dtype=bool)
+        for i0 in range(0, len(alfas), 64):         # Comparación por bloques (K x K x S)
+            bloque = alfas[i0:i0 + 64]
+            mayor_igual = (alfas[None] >= bloque[:, None]).all(axis=2)
+            mayor = (alfas[None] > bloque[:, None]).any(axis=2)
+            dominado[i0:i0 + 64] = (mayor_igual & mayor).any(axis=1)
+        return alfas[~dominado], acciones[~dominado]
+
+    def alfas_ciegos(self):
+        """
+        Cota inferior de políticas ciegas: repetir siempre la acción a,
+        α_a = (I - γT[a])⁻¹ R[a], un vector por acción (ya podados).
+        """
+        I = np.eye(self.S)
+        alfas = np.stack([np.linalg.solve(I - self.gamma * self.T[a], self.R[a]) for a in range(self.A)])
+        return self.podar(alfas, np.arange(self.A))
+
+    def pbvi(self, B, max_iter=100, tol=1e-6, alfas=None, acciones=None):
+        """
+        Iteración de valores basada en puntos sobre el conjunto fijo B.
+
+        Parámetros:
+            B:        Creencias (N x S)                           (ndarray)
+            max_iter: Máximo de respaldos del conjunto            (int)
+            tol:      Cambio máximo de V sobre B para parar       (float)
+            alfas, acciones: Punto de partida (opcional; alfas_ciegos)
+
+        Retorna:
+            dict con "alfas", "acciones", "valores" (V sobre B),
+            "iteraciones", "cambio" y "convergio"
+        """
+        if alfas is None:
+            alfas, acciones = self.alfas_ciegos()
+        V = self.valor(B, alfas)
+        cambio, iteraciones = np.inf, 0
+        while iteraciones < max_iter and cambio >= tol:
+            nuevos, acc = self.respaldo(B, alfas)
+            alfas, acciones = self.podar(nuevos, acc, B)
+            V_nuevo = self.valor(B, alfas)
+            cambio = float(np.abs(V_nuevo - V).max())
+            V = V_nuevo
+            iteraciones += 1
+        return {"alfas": alfas, "acciones": acciones, "valores": V,
+                "iteraciones": iteraciones, "cambio": cambio, "convergio": cambio < tol}
+
+    def perseus(self, B, max_iter=100, tol=1e-6, alfas=None, acciones=None, lote=None, semilla=None):
+        """
+        Perseus: iteración de valores aleatorizada basada en puntos.
+
+        En cada etapa se respaldan lotes al azar de creencias cuyo valor aún
+        no mejoró; un respaldo que no mejora su creencia se sustituye por el
+        mejor vector anterior, así V nunca baja en B. Una etapa con mejora
+        menor que tol se confirma con el respaldo de todas las creencias.
+
+        Parámetros:
+            B:        Creencias (N x S)                           (ndarray)
+            max_iter: Máximo de etapas                            (int)
+            tol:      Mejora máxima de V sobre B para parar       (float)
+            alfas, acciones: Punto de partida (opcional; alfas_ciegos)
+            lote:     Creencias respaldadas juntas (int, opcional; N/10)
+            semilla:  Semilla del generador                       (int, opcional)
+
+        Retorna:
+            dict como pbvi, con "respaldos" (total de creencias respaldadas)
+        """
+        rng = np.random.default_rng(semilla)
+        if alfas is None:
+            alfas, acciones = self.alfas_ciegos()
+        lote = max(1, lote or len(B) // 10)
+        V = self.valor(B, alfas)
+        cambio, iteraciones, respaldos = np.inf, 0, 0
+        while iteraciones < max_iter and cambio >= tol:
+            G = self._proyecciones(alfas)
+            nuevos, nuevas_acc = [], []
+            V_nuevo = np.full(len(B), -np.inf)
+            mejorada = np.zeros(len(B), dtype=bool)
+            margen = 1e-12 * (1 + np.abs(V))        # Redondeo de productos con otra forma
+            pendientes = np.arange(len(B))
+            while len(pendientes):
+                muestra = rng.choice(pendientes, size=min(lote, len(pendientes)), replace=False)
+                b = B[muestra]
+                candidatos, acc = self.respaldo(b, alfas, G)
+                respaldos += len(muestra)
+                peor = np.einsum("ns,ns->n", b, candidatos) < V[muestra]
+                if peor.any():                       # Conserva el mejor vector anterior
+                    previo = (b[peor] @ alfas.T).argmax(axis=1)
+                    candidatos[peor], acc[peor] = alfas[previo], acciones[previo]
+                nuevos.append(candidatos)
+                nuevas_acc.append(acc)
+                V_nuevo = np.maximum(V_nuevo, (B @ candidatos.T).max(axis=1))
+                mejorada[muestra] = True            # Su vector vale al menos V(b)
+                mejorada |= V_nuevo >= V - margen
+                pendientes = np.flatnonzero(~mejorada)
+            alfas, acciones = self.podar(np.concatenate(nuevos), np.concatenate(nuevas_acc), B)
+            V_nuevo = self.valor(B, alfas)
+            cambio = float((V_nuevo - V).max())
+            if cambio < tol:
+                # Una etapa sin mejora puede deberse sólo a las creencias sorteadas:
+                # se confirma con el respaldo de todo B
+                completos, acc = self.respaldo(B, alfas)
+                respaldos += len(B)
+                mejora = np.einsum("ns,ns->n", B, completos) - V_nuevo
+                cambio = max(cambio, float(mejora.max()))
+                if cambio >= tol:
+                    alfas, acciones = self.podar(np.concatenate([alfas, completos[mejora > 0]]),
+                                                 np.concatenate([acciones, acc[mejora > 0]]), B)
+                    V_nuevo = self.valor(B, alfas)
+            V = V_nuevo
+            iteraciones += 1
+        return {"alfas": alfas, "acciones": acciones, "valores": V, "iteraciones": iteraciones,
+                "cambio": cambio, "convergio": cambio < tol, "respaldos": respaldos}
+
+# ----------------------------------------------------------------------
+# Problemas de ejemplo
+# ----------------------------------------------------------------------
+
+def pomdp_tigre(gamma=0.95, precision=0.85):
+    """
+    Problema del tigre (Kaelbling, Littman y Cassandra): escuchar cuesta 1 y
+    acierta con probabilidad `precision`; abrir la puerta del tigre cuesta
+    100, la otra da 10, y abrir reinicia el problema.
+
+    Retorna:
+        POMDP con estados (izquierda, derecha), acciones (escuchar,
+        abrir-izq, abrir-der) y observaciones (oye-izq, oye-der) (POMDPVectorizado)
+    """
+    T = np.empty((3, 2, 2))
+    T[0] = np.eye(2)                                # Escuchar no mueve al tigre
+    T[1:] = 0.5                                     # Abrir reinicia al azar
+    O = np.full((3, 2, 2), 0.5)
+    O[0] = [[precision, 1 - precision], [1 - precision, precision]]
+    R = np.array([[-1.0, -1.0], [-100.0, 10.0], [10.0, -100.0]])
+    return POMDPVectorizado(T, O, R, gamma, ["tigre-izq", "tigre-der"],
+                            ["escuchar", "abrir-izq", "abrir-der"], ["oye-izq", "oye-der"])
+
+def pomdp_rejilla(filas, columnas, gamma=0.95, deslizamiento=0.2, ruido=0.1, meta=None):
+    """
+    Navegación con localización incierta sobre mdp_rejilla: el agente no ve
+    su celda, sólo un sensor de paredes (N, S, E, O) en el que cada bit se
+    invierte con probabilidad `ruido` (16 observaciones).
+
+    Retorna:
+        POMDP con filas·columnas estados y 4 acciones         (POMDPVectorizado)
+    """
+    from mdp_disperso import mdp_rejilla            # Reutiliza las transiciones del MDP
+    mdp = mdp_rejilla(filas, columnas, gamma, deslizamiento, meta=meta)
+    S = mdp.n
+    T = mdp.P.toarray().reshape(4, S, S)
+    f, c = np.divmod(np.arange(S), columnas)
+    paredes = np.stack([f == 0, f == filas - 1, c == columnas - 1, c == 0], axis=1)  # (S, 4)
+    bits = (np.arange(16)[:, None] >> np.arange(4)) & 1                              # (Z, 4)
+    coincide = paredes[:, None, :] == bits[None].astype(bool)                        # (S, Z, 4)
+    O_estado = np.where(coincide, 1 - ruido, ruido).prod(axis=2)
+    O = np.broadcast_to(O_estado, (4, S, 16)).copy()
+    return POMDPVectorizado(T, O, mdp.R, gamma)
+
+# ----------------------------------------------------------------------
+# Creencias factorizadas de un CSP
+# ----------------------------------------------------------------------
+
+class CreenciasCSP:
+    def __init__(self, csp):
+        """
+        Compila un CSP para llevar creencias por variable como matrices.
+
+        Una creencia es una matriz (variables x D) con D el mayor dominio;
+        las columnas fuera del dominio de cada variable valen 0. Un lote de
+        N creencias es un arreglo (N x variables x D).
+
+        Parámetros:
+            csp: Instancia con variables, dominios, vecinos y restriccion (CSP)
+        """
+        from nucleo_csp import cumple_restriccion   # Relación por defecto de los CSP del curso
+        restriccion = getattr(csp, "restriccion", cumple_restriccion)
+        self.variables = list(csp.variables)
+        self.indice = {var: i for i, var in enumerate(self.variables)}
+        self.valores = [list(csp.dominios[var]) for var in self.variables]
+        n, D = len(self.variables), max((len(v) for v in self.valores), default=0)
+        self.mascara = np.zeros((n, D), dtype=bool)   # Columnas dentro del dominio
+        for i, valores in enumerate(self.valores):
+            self.mascara[i, :len(valores)] = True
+        self.vecinos = [np.array([self.indice[w] for w in csp.vecinos[var]], dtype=np.intp)
+                        for var in self.variables]
+        # incompatibles[i, k, j, m]: j es vecino de i y valores[j][m] viola la
+        # restricción con valores[i][k]
+        self.incompatibles = np.zeros((n, D, n, D), dtype=bool)
+        for i, valores in enumerate(self.valores):
+            for j in self.vecinos[i]:
+                for k, val in enumerate(valores):
+                    for m, val_j in enumerate(self.valores[j]):
+                        self.incompatibles[i, k, j, m] = not restriccion(val_j, val)
+
+    def uniforme(self):
+        """Creencia inicial: uniforme sobre el dominio de cada variable."""
+        return self.mascara / self.mascara.sum(axis=1, keepdims=True)
+
+    def actualizar(self, B, var, val, veces=1):
+        """
+        Asigna var = val y penaliza los valores incompatibles de sus vecinos.
+
+        Cada una de las `veces` observaciones con conflictos multiplica por
+        0.5 la probabilidad de los valores de los vecinos que violan la
+        restricción con val; después se normaliza cada variable. Varias
+        observaciones del mismo (var, val) se combinan en una sola potencia.
+
+        Parámetros:
+            B:     Creencia (variables x D) o lote (N x variables x D) (ndarray)
+            var:   Índice de la variable (o uno por creencia)  (int/ndarray)
+            val:   Índice del valor en su dominio (o uno por creencia) (int/ndarray)
+            veces: Observaciones con conflictos (o una cuenta por creencia) (int/ndarray)
+
+        Retorna:
+            Creencias actualizadas (nuevo arreglo)             (ndarray)
+        """
+        una = B.ndim == 2
+        B = np.array(B[None] if una else B, dtype=float)
+        filas = np.arange(len(B))
+        var = np.broadcast_to(var, len(B))
+        val = np.broadcast_to(val, len(B))
+        veces = np.broadcast_to(veces, len(B))
+        B *= 0.5 ** (self.incompatibles[var, val] * veces[:, None, None])
+        B[filas, var] = 0.0
+        B[filas, var, val] = 1.0                    # Certeza sobre la variable asignada
+        total = B.sum(axis=2, keepdims=True)
+        np.divide(B, total, out=B, where=total > 0)
+        return B[0] if una else B
+
+    def conflictos(self, estados, asignadas, var, val):
+        """
+        Conflictos de var = val con los vecinos asignados, para N estados.
+
+        Parámetros:
+            estados:   Índices de valor por variable (N x variables) (ndarray)
+            asignadas: Variables asignadas en cada estado (N x variables) (ndarray bool)
+            var, val:  Índices de variable y valor              (int)
+
+        Retorna:
+            Número de conflictos de cada estado                 (ndarray int)
+        """
+        j = self.vecinos[var]
+        choca = self.incompatibles[var, val, j[None, :], estados[:, j]]
+        return (choca & asignadas[:, j]).sum(axis=1)
+
+    def muestrear(self, B, n, rng):
+        """Estados completos (n x variables, índices de valor) muestreados de B."""
+        acumulada = np.cumsum(B, axis=1)
+        u = rng.random((n, len(self.variables), 1)) * acumulada[None, :, -1:]
+        return np.minimum((acumulada[None] <= u).sum(axis=2),
+                          self.mascara.sum(axis=1) - 1)
+
+    def entropias(self, B):
+        """Entropía de la distribución de cada variable (último eje de B)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return -np.where(B > 0, B * np.log(B), 0.0).sum(axis=-1)
+
+    def a_diccionario(self, B):
+        """{variable: {valor: probabilidad}} con los valores de probabilidad positiva."""
+        return {var: {val: float(p) for val, p in zip(self.valores[i], B[i]) if p > 0}
+                for i, var in enumerate(self.variables)}
@@ -1,33 +1,90 @@
 # Importación de librerías necesarias
 from collections import defaultdict  # Para diccionarios con valores por defecto
 import itertools  # Para generar combinaciones de valores
+import numpy as np  # Tablas de probabilidad densas
+from factores import Factor  # Factores NumPy con ejes con nombre
+from arbol_uniones import ArbolUniones  # Árbol de uniones compilado
 
 class RedBayesiana:
     def __init__(self):
         """Inicializa la red bayesiana vacía"""
         self.nodos = {}  # Diccionario {nombre: Nodo} para almacenar nodos
         self.estructura = defaultdict(list)  # Diccionario {padre: [hijos]} para estructura de la red
+        self.arbol = None  # Árbol de uniones compilado (se invalida al cambiar la red)
     
     class Nodo:
-        def __init__(self, nombre):
+        def __init__(self, nombre, valores=(True, False)):
             """Inicializa un nodo de la red"""
             self.nombre = nombre  # Nombre identificador del nodo
+            self.valores = tuple(valores)  # Dominio del nodo (binario por defecto)
             self.padres = []  # Lista de nodos padres
-            self.tabla_prob = {}  # Tabla de probabilidades condicionales {(val_padres): prob}
+            self.tabla_prob = {}  # Tabla de probabilidades condicionales {(val_padres): {valor: prob}}
     
-    def agregar_nodo(self, nombre):
+    def agregar_nodo(self, nombre, valores=(True, False)):
         """Añade un nuevo nodo a la red"""
-        self.nodos[nombre] = self.Nodo(nombre)  # Crea y almacena el nodo
+        self.nodos[nombre] = self.Nodo(nombre, valores)  # Crea y almacena el nodo
+        self.arbol = None  # La red cambió: hay que recompilar
         return self.nodos[nombre]  # Devuelve el nodo creado
     
     def agregar_relacion(self, padre, hijo):
         """Establece una relación de dependencia entre nodos"""
         self.nodos[hijo].padres.append(self.nodos[padre])  # Añade padre al hijo
         self.estructura[padre].append(hijo)  # Registra la relación en la estructura
+        self.arbol = None  # La red cambió: hay que recompilar
     
     def definir_probabilidad(self, nodo, prob_dict):
         """Define la tabla de probabilidad condicional para un nodo"""
         self.nodos[nodo].tabla_prob = prob_dict  # Asigna la tabla de probabilidades
+        self.arbol = None  # La red cambió: hay que recompilar
+    
+    def factor(self, nombre):
+        """Convierte la tabla de un nodo en un Factor (ejes: nodo, padres...)"""
+        nodo = self.nodos[nombre]
+        indice = {v: i for i, v in enumerate(nodo.valores)}
+        tabla = np.zeros([len(nodo.valores)] + [len(p.valores) for p in nodo.padres])
+        if not nodo.padres:  # Nodo raíz: {valor: prob}
+            for valor, prob in nodo.tabla_prob.items():
+                tabla[indice[valor]] = prob
+        else:  # Nodo con padres: {(val_padres): {valor: prob}}
+            for padres_vals, dist in nodo.tabla_prob.items():
+                ejes = tuple(dict(zip(p.valores, range(len(p.valores))))[v]
+                             for p, v in zip(nodo.padres, padres_vals))
+                for valor, prob in dist.items():
+                    tabla[(indice[valor],) + ejes] = prob
+        return Factor([nombre] + [p.nombre for p in nodo.padres], tabla)
+    
+    def compilar(self):
+        """Compila la red a un árbol de uniones (una sola vez por estructura)"""
+        if self.arbol is None:
+            self.arbol = ArbolUniones([self.factor(n) for n in self.nodos])
+        return self.arbol
+    
+    def marginal(self, nodo, evidencias={}):
+        """
+        Distribución P(nodo|evidencias) con el árbol de uniones
+        
+        Con la misma evidencia, las consultas repetidas no recalculan nada; al
+        cambiarla sólo se recalculan los mensajes afectados.
+        
+        Returns:
+            dict: {valor: probabilidad}
+        """
+        arbol = self.compilar()
+        arbol.fijar_evidencia({n: self.nodos[n].valores.index(v) for n, v in evidencias.items()})
+        return dict(zip(self.nodos[nodo].valores, arbol.marginal(nodo).tolist()))
+    
+    def inferencia(self, consulta, evidencias={}):
+        """
+        P(consulta|evidencias) exacta sobre el árbol de uniones compilado
+        
+        Args:
+            consulta: Tupla (nodo, valor) que queremos calcular
+            evidencias: Diccionario {nodo: valor} de variables observadas
+            
+        Returns:
+            float: Probabilidad P(consulta|evidencias)
+        """
+        return self.marginal(consulta[0], evidencias)[consulta[1]]
     
     def inferencia_por_enumeracion(self, consulta, evidencias={}):
         """
@@ -43,16 +100,15 @@ class RedBayesiana:
         # Obtener nodos en orden topológico (padres antes que hijos)
         nodos_ordenados = self.orden_topologico()
         
-        # Identificar variables ocultas (no consulta ni evidencias)
-        ocultos = [n for n in nodos_ordenados 
-                  if n != consulta[0] and n not in evidencias]
+        # Variables a enumerar: ocultas y la de consulta (se normaliza sobre todos sus valores)
+        ocultos = [n for n in nodos_ordenados if n not in evidencias]
         
         # Inicializar acumuladores de probabilidad
         prob = 0.0  # Acumulador para P(consulta,evidencias)
         prob_normalizacion = 0.0  # Acumulador para P(evidencias)
         
         # Generar todas las combinaciones posibles de variables ocultas
-        valores_posibles = {n: [True, False] for n in ocultos}  # Valores binarios
+        valores_posibles = {n: self.nodos[n].valores for n in ocultos}  # Dominio de cada nodo
         combinaciones = itertools.product(*[valores_posibles[n] for n in ocultos])
         
         # Evaluar cada combinación posible
@@ -60,7 +116,6 @@ class RedBayesiana:
             # Crear instancia completa de variables
             instancia = dict(zip(ocultos, combo))  # Asigna valores a ocultos
             instancia.update(evidencias)  # Añade evidencias
-            instancia[consulta[0]] = consulta[1]  # Añade valor de consulta
             
             # Calcular probabilidad conjunta para esta instancia
             prob_conjunta = 1.0  # Inicializar probabilidad conjunta
@@ -133,17 +188,23 @@ if __name__ == "__main__":
     
     # Tabla P(Alarma | Robo, Terremoto)
     rb.definir_probabilidad("Alarma", {
-        (True, True): 0.95,    # Robo y Terremoto: alta probabilidad
-        (True, False): 0.94,   # Solo Robo: probabilidad alta
-        (False, True): 0.29,   # Solo Terremoto: probabilidad media
-        (False, False): 0.001  # Ninguno: probabilidad muy baja
+        (True, True): {True: 0.95, False: 0.05},    # Robo y Terremoto: alta probabilidad
+        (True, False): {True: 0.94, False: 0.06},   # Solo Robo: probabilidad alta
+        (False, True): {True: 0.29, False: 0.71},   # Solo Terremoto: probabilidad media
+        (False, False): {True: 0.001, False: 0.999} # Ninguno: probabilidad muy baja
     })
     
     # Tabla P(JuanLlama | Alarma)
-    rb.definir_probabilidad("JuanLlama", {True: 0.9, False: 0.1})
+    rb.definir_probabilidad("JuanLlama", {
+        (True,): {True: 0.9, False: 0.1},    # Alarma activada
+        (False,): {True: 0.05, False: 0.95}  # Alarma no activada
+    })
     
     # Tabla P(MariaLlama | Alarma)
-    rb.definir_probabilidad("MariaLlama", {True: 0.7, False: 0.3})
+    rb.definir_probabilidad("MariaLlama", {
+        (True,): {True: 0.7, False: 0.3},    # Alarma activada
+        (False,): {True: 0.01, False: 0.99}  # Alarma no activada
+    })
     
     # 4. Realizar consulta de inferencia
     # P(Robo=True | JuanLlama=True, MariaLlama=True)
@@ -155,4 +216,12 @@ if __name__ == "__main__":
     # 5. Mostrar resultados
     print(f"\nProbabilidad de robo dado que Juan y María llaman:")
     print(f"P(Robo=True | JuanLlama=True, MariaLlama=True) = {probabilidad:.6f}")
+    
+    # 6. Misma consulta con el árbol de uniones: se compila una vez y cada
+    #    marginal bajo la misma evidencia sale de la calibración ya hecha
+    evidencias = {"JuanLlama": True, "MariaLlama": True}
+    print(f"Árbol de uniones: P(Robo=True | ...) = {rb.inferencia(('Robo', True), evidencias):.6f}")
+    print("\nMarginales dadas las llamadas:")
+    for nodo in ("Robo", "Terremoto", "Alarma"):
+        print(f"  P({nodo}=True) = {rb.marginal(nodo, evidencias)[True]:.6f}")
 
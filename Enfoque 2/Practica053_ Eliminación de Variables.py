@@ -1,25 +1,31 @@
-from collections import defaultdict, OrderedDict  # Importa estructuras de datos especializadas
-import itertools                                 # Importa herramientas para combinaciones
+import numpy as np                               # Tablas de probabilidad densas
+from factores import (Factor, eliminacion_variables,  # Factores NumPy con ejes con nombre
+                      eliminar_variable)
 
 class RedBayesianaVE:                            # Clase para Red Bayesiana con Eliminación de Variables
     def __init__(self):
         """Constructor que inicializa la red bayesiana"""
         self.nodos = {}                          # Diccionario de nodos {nombre: objeto Nodo}
-        self.factores = defaultdict(dict)        # Almacena tablas de probabilidad condicional
+        self.factores = {}                       # Almacena tablas de probabilidad condicional
+        self._compilados = {}                    # Caché {nombre: Factor NumPy}
     
     class Nodo:
-        def __init__(self, nombre):
+        def __init__(self, nombre, valores=(True, False)):
             """Inicializa un nodo de la red:
             nombre: Identificador del nodo
+            valores: Dominio de la variable (cualquier número de valores)
             """
             self.nombre = nombre                 # Nombre del nodo
+            self.valores = tuple(valores)        # Valores posibles
+            self.indice = {v: i for i, v in enumerate(self.valores)}  # Valor -> eje
             self.padres = []                     # Lista de nodos padres (inicialmente vacía)
     
-    def agregar_nodo(self, nombre):
+    def agregar_nodo(self, nombre, valores=(True, False)):
         """Añade un nodo a la red:
         nombre: Identificador del nuevo nodo
+        valores: Dominio de la variable (binaria por defecto)
         """
-        self.nodos[nombre] = self.Nodo(nombre)   # Crea y almacena el nodo
+        self.nodos[nombre] = self.Nodo(nombre, valores)  # Crea y almacena el nodo
         return self.nodos[nombre]                # Devuelve el nodo creado
     
     def agregar_relacion(self, padre, hijo):
@@ -28,13 +34,31 @@ class RedBayesianaVE:                            # Clase para Red Bayesiana con
         hijo: Nombre del nodo hijo
         """
         self.nodos[hijo].padres.append(self.nodos[padre])  # Añade padre a la lista del hijo
+        self._compilados.pop(hijo, None)         # La tabla del hijo cambia de forma
     
     def definir_probabilidad(self, nodo, prob_dict):
         """Define la tabla de probabilidad condicional para un nodo:
         nodo: Nombre del nodo
         prob_dict: Diccionario con probabilidades P(nodo|padres)
+                   {(valores de los padres): {valor: probabilidad}}
         """
         self.factores[nodo] = prob_dict          # Almacena la tabla de probabilidad
+        self._compilados.pop(nodo, None)         # Invalida el factor compilado
+    
+    def factor(self, nombre):
+        """Compila la CPT de un nodo a un Factor (ejes: nodo, padres...):
+        nombre: Nombre del nodo
+        """
+        if nombre not in self._compilados:
+            nodo = self.nodos[nombre]
+            forma = [len(nodo.valores)] + [len(p.valores) for p in nodo.padres]
+            tabla = np.zeros(forma)              # Entradas no definidas valen 0
+            for valores_padres, distribucion in self.factores.get(nombre, {}).items():
+                ejes_padres = tuple(p.indice[v] for p, v in zip(nodo.padres, valores_padres))
+                for valor, prob in distribucion.items():
+                    tabla[(nodo.indice[valor],) + ejes_padres] = prob
+            self._compilados[nombre] = Factor([nombre] + [p.nombre for p in nodo.padres], tabla)
+        return self._compilados[nombre]
     
     def eliminar_variable(self, factores, variable):
         """
@@ -42,127 +66,53 @@ class RedBayesianaVE:                            # Clase para Red Bayesiana con
         factores: Lista de factores actuales
         variable: Variable a eliminar
         """
-        nuevos_factores = []                     # Lista para factores resultantes
-        
-        # Identificar factores que contienen la variable
-        factores_relevantes = [f for f in factores if variable in f['variables']]
-        
-        if not factores_relevantes:              # Si no hay factores relevantes
-            return factores                      # Retorna factores sin cambios
-            
-        # Paso 1: Multiplicar factores que contienen la variable
-        producto = {'variables': [], 'prob': {}} # Factor producto
-        vars_comunes = set()                     # Variables compartidas
-        
-        for f in factores_relevantes:            # Para cada factor relevante
-            vars_comunes.update(f['variables'])  # Acumula variables
-            # Multiplica probabilidades
-            for asignacion, valor in f['prob'].items():
-                if asignacion in producto['prob']:
-                    producto['prob'][asignacion] *= valor
-                else:
-                    producto['prob'][asignacion] = val
-        
-        # Variables restantes después de eliminar la variable objetivo
-        vars_comunes.remove(variable)
-        producto['variables'] = list(vars_comunes)
-        
-        # Paso 2: Sumar sobre la variable (marginalización)
-        nuevo_factor = {'variables': producto['variables'], 'prob': defaultdict(float)}
-        
-        for asignacion, valor in producto['prob'].items():
-            # Nueva asignación sin la variable eliminada
-            nueva_asignacion = tuple(v for v, var in zip(asignacion, producto['variables']) 
-                                   if var != variable)
-            nuevo_factor['prob'][nueva_asignacion] += valor
-        
-        # Conservar factores no afectados
-        for f in factores:
-            if variable not in f['variables']:
-                nuevos_factores.append(f)
+        # Producto de los factores que la contienen y suma en una sola llamada a einsum
+        return eliminar_variable(factores, variable)
+    
+    def _ancestros(self, nombres):
+        """Nodos de los que dependen los nombres dados (incluidos ellos mismos)"""
+        vistos, pila = set(), list(nombres)
+        while pila:
+            nombre = pila.pop()
+            if nombre not in vistos:
+                vistos.add(nombre)
+                pila.extend(p.nombre for p in self.nodos[nombre].padres)
+        return vistos
+    
+    def distribucion(self, variable, evidencias={}, orden_eliminacion=None, heuristica="min-fill"):
+        """
+        Distribución posterior completa de una variable:
+        variable: Nombre del nodo consultado
+        evidencias: Diccionario {nodo: valor} observado
+        orden_eliminacion: Orden opcional para eliminar variables
+        heuristica: "min-fill" o "min-degree" si no se da el orden
         
-        nuevos_factores.append(nuevo_factor)     # Añade el nuevo factor
-        return nuevos_factores                   # Retorna factores actualizados
-    
-    def inferencia(self, consulta, evidencias={}, orden_eliminacion=None):
+        Retorna {valor: P(variable=valor|evidencias)}
+        """
+        # Los nodos que no son ancestros de la consulta ni de la evidencia suman 1: se podan
+        relevantes = self._ancestros([variable] + list(evidencias))
+        factores = [self.factor(n) for n in self.nodos if n in relevantes]
+        evidencia = {n: self.nodos[n].indice[v] for n, v in evidencias.items()}
+        if variable in evidencias:               # Consulta sobre una variable observada
+            return {v: float(v == evidencias[variable]) for v in self.nodos[variable].valores}
+        if orden_eliminacion is not None:
+            orden_eliminacion = [v for v in orden_eliminacion if v in relevantes and v not in evidencia]
+        posterior = eliminacion_variables(factores, [variable], evidencia,
+                                          orden_eliminacion, heuristica)
+        return dict(zip(self.nodos[variable].valores, posterior.tabla.tolist()))
+    
+    def inferencia(self, consulta, evidencias={}, orden_eliminacion=None, heuristica="min-fill"):
         """
         Realiza inferencia por eliminación de variables:
         consulta: Tupla (nodo, valor) a calcular
         evidencias: Diccionario {nodo: valor} observado
         orden_eliminacion: Orden opcional para eliminar variables
-        """
-        # Paso 1: Inicializar factores
-        factores = []                            # Lista de factores iniciales
-        
-        for nodo in self.nodos.values():         # Para cada nodo en la red
-            # Variables en este factor (nodo + padres)
-            vars_factor = [nodo.nombre] + [p.nombre for p in nodo.padres]
-            prob = {}                            # Diccionario de probabilidades
-            
-            # Generar todas las combinaciones de valores binarios
-            valores_posibles = itertools.product(*[(True, False) for _ in vars_factor])
-            
-            for vals in valores_posibles:        # Para cada combinación
-                clave = dict(zip(vars_factor, vals))
-                # Obtener P(nodo|padres) de la tabla
-                prob[vals] = self.factores[nodo.nombre].get(
-                    tuple(clave[p.nombre] for p in nodo.padres), {}).get(clave[nodo.nombre], 0)
-            
-            factores.append({'variables': vars_factor, 'prob': prob})
-        
-        # Paso 2: Aplicar evidencias (reducir factores)
-        for nodo, valor in evidencias.items():   # Para cada evidencia
-            nuevos_factores = []                 # Factores actualizados
-            
-            for f in factores:                   # Para cada factor
-                if nodo in f['variables']:       # Si el factor contiene la evidencia
-                    nuevo_prob = {}              # Nuevas probabilidades
-                    idx = f['variables'].index(nodo)  # Índice de la evidencia
-                    
-                    # Filtrar asignaciones consistentes con la evidencia
-                    for asignacion, prob_val in f['prob'].items():
-                        if asignacion[idx] == valor:
-                            nueva_asign = tuple(v for i, v in enumerate(asignacion) 
-                                         if i != idx)
-                            nuevo_prob[nueva_asign] = prob_val
-                    
-                    # Actualizar factor reducido
-                    f['prob'] = nuevo_prob
-                    f['variables'].remove(nodo)
-                
-                # Conservar solo factores no vacíos
-                if f['variables']:
-                    nuevos_factores.append(f)
-            
-            factores = nuevos_factores           # Actualizar lista de factores
-        
-        # Paso 3: Determinar orden de eliminación (si no se proporciona)
-        if orden_eliminacion is None:
-            vars_restantes = set()               # Variables por eliminar
-            for f in factores:
-                vars_restantes.update(f['variables'])
-            vars_restantes.discard(consulta[0])  # Conservar variable de consulta
-            orden_eliminacion = list(vars_restantes)
-        
-        # Paso 4: Eliminar variables una por una
-        for var in orden_eliminacion:            # Eliminar en orden especificado
-            factores = self.eliminar_variable(factores, var)
+        heuristica: "min-fill" o "min-degree" si no se da el orden
         
-        # Paso 5: Calcular probabilidad final
-        factor_final = factores[0]               # Factor resultante (solo consulta)
-        total = sum(factor_final['prob'].values())  # Probabilidad de la evidencia
-        
-        if total == 0:                           # Evitar división por cero
-            return 0.0
-        
-        # Calcular P(consulta,evidencias)
-        prob = 0.0
-        for asignacion, valor in factor_final['prob'].items():
-            if asignacion[0] == consulta[1]:     # Coincide con valor de consulta
-                prob += valor
-        
-        # Retornar P(consulta|evidencias) = P(consulta,evidencias)/P(evidencias)
-        return prob / total
+        Retorna P(consulta|evidencias) (0.0 si la evidencia es imposible)
+        """
+        nodo, valor = consulta
+        return self.distribucion(nodo, evidencias, orden_eliminacion, heuristica)[valor]
 
 # Ejemplo: Sistema de alarma por robo
 if __name__ == "__main__":
@@ -218,4 +168,26 @@ if __name__ == "__main__":
     
     # 5. Mostrar resultados
     print(f"\nProbabilidad de robo dado que Juan y María llaman:")
-    print(f"P(Robo=True | JuanLlama=True, MariaLlama=True) = {probabilidad:.6f}")
\ No newline at end of file
+    print(f"P(Robo=True | JuanLlama=True, MariaLlama=True) = {probabilidad:.6f}")
+    
+    # 6. Dominios con más de dos valores: Clima -> Tráfico -> Retraso
+    rm = RedBayesianaVE()
+    rm.agregar_nodo("Clima", ("Soleado", "Nublado", "Lluvioso"))
+    rm.agregar_nodo("Trafico", ("Bajo", "Medio", "Alto"))
+    rm.agregar_nodo("Retraso")
+    rm.agregar_relacion("Clima", "Trafico")
+    rm.agregar_relacion("Trafico", "Retraso")
+    rm.definir_probabilidad("Clima", {(): {"Soleado": 0.6, "Nublado": 0.3, "Lluvioso": 0.1}})
+    rm.definir_probabilidad("Trafico", {
+        ("Soleado",): {"Bajo": 0.6, "Medio": 0.3, "Alto": 0.1},
+        ("Nublado",): {"Bajo": 0.4, "Medio": 0.4, "Alto": 0.2},
+        ("Lluvioso",): {"Bajo": 0.1, "Medio": 0.3, "Alto": 0.6},
+    })
+    rm.definir_probabilidad("Retraso", {
+        ("Bajo",): {True: 0.05, False: 0.95},
+        ("Medio",): {True: 0.3, False: 0.7},
+        ("Alto",): {True: 0.8, False: 0.2},
+    })
+    print("\nP(Clima | Retraso=True):")
+    for valor, p in rm.distribucion("Clima", {"Retraso": True}).items():
+        print(f"  {valor}: {p:.6f}")
@@ -7,12 +7,21 @@ Created on Sat Apr 26 14:43:15 2025
 
 import random
 from collections import defaultdict
+import numpy as np
+from muestreo_vectorizado import MuestreadorVectorizado  # Muestreo por lotes con NumPy
 
 class MuestreoDirecto:
     def __init__(self, red_bayesiana):
         """Inicializa el muestreador con una red bayesiana existente"""
         self.red = red_bayesiana  # Almacena la red bayesiana
         self.nodos_ordenados = self.orden_topologico()  # Ordena los nodos para muestreo
+        self.muestreador = None  # CPTs compiladas (se crean en el primer uso)
+    
+    def compilar(self):
+        """Compila las CPTs de la red a arreglos (volver a llamar si la red cambia)"""
+        self.nodos_ordenados = self.orden_topologico()
+        self.muestreador = MuestreadorVectorizado([self.red.factor(n) for n in self.nodos_ordenados])
+        return self.muestreador
     
     def orden_topologico(self):
         """Calcula el orden topológico de los nodos (padres antes que hijos)"""
@@ -53,9 +62,49 @@ class MuestreoDirecto:
             
         return muestra
     
-    def inferencia(self, consulta, evidencias={}, n_muestras=10000):
+    def generar_muestras(self, n_muestras, semilla=None):
+        """
+        Genera muchas muestras a la vez (un sorteo por variable para todas)
+        
+        Args:
+            n_muestras: Número de muestras
+            semilla: Semilla del generador (opcional)
+            
+        Returns:
+            dict: {nodo: arreglo con el valor de cada muestra}
+        """
+        muestreador = self.muestreador or self.compilar()
+        indices, _ = muestreador.muestrear(n_muestras, np.random.default_rng(semilla))
+        return {n: np.array(self.red.nodos[n].valores)[indices[:, muestreador.columna[n]]]
+                for n in muestreador.variables}
+    
+    def inferencia(self, consulta, evidencias={}, n_muestras=10000, semilla=None, tam_lote=100000):
+        """
+        Realiza inferencia estadística por muestreo directo (con rechazo)
+        
+        Las muestras se generan por lotes vectorizados sobre las CPTs compiladas.
+        
+        Args:
+            consulta: Tupla (nodo, valor) que queremos estimar
+            evidencias: Diccionario {nodo: valor} de variables observadas
+            n_muestras: Número total de muestras a generar
+            semilla: Semilla del generador (opcional)
+            tam_lote: Muestras generadas por lote
+            
+        Returns:
+            float: Probabilidad estimada P(consulta|evidencias)
+        """
+        muestreador = self.muestreador or self.compilar()
+        indice = {n: self.red.nodos[n].valores.index(v) for n, v in evidencias.items()}
+        resultado = muestreador.rechazo(n_muestras, indice, semilla, tam_lote)
+        if resultado["aceptadas"] == 0:
+            return 0
+        nodo, valor = consulta
+        return float(resultado["marginales"][nodo][self.red.nodos[nodo].valores.index(valor)])
+    
+    def inferencia_una_a_una(self, consulta, evidencias={}, n_muestras=10000):
         """
-        Realiza inferencia estadística por muestreo directo
+        Muestreo directo generando una muestra cada vez (versión de referencia)
         
         Args:
             consulta: Tupla (nodo, valor) que queremos estimar
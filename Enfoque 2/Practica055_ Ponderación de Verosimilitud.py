@@ -7,7 +7,10 @@ Created on Sat Apr 26 14:43:16 2025
 
 # Importación de bibliotecas necesarias
 import random  # Para generación de números aleatorios
+import time  # Para comparar tiempos en el ejemplo
 from collections import defaultdict  # Para crear diccionarios con valores por defecto
+from factores import compilar_red  # Red de diccionarios -> factores NumPy
+from muestreo_vectorizado import MuestreadorVectorizado  # Muestreo por lotes con NumPy
 
 def likelihood_weighting(evidencia, red_bayesiana, n_muestras):
     """
@@ -61,9 +64,7 @@ def generar_muestra_ponderada(evidencia, red_bayesiana):
     peso = 1.0    # Inicializa el peso de la muestra
     
     # IMPORTANTE: Las variables deben procesarse en orden topológico (padres antes que hijos)
-    # En un caso real, debería calcularse automáticamente el orden topológico
-    # Aquí usamos un orden fijo como ejemplo
-    orden = ['A', 'B', 'C']  # Ejemplo: A es raíz, luego B, luego C
+    orden = orden_topologico(red_bayesiana)
     
     # Procesar cada variable en orden
     for variable in orden:
@@ -103,6 +104,53 @@ def generar_muestra_ponderada(evidencia, red_bayesiana):
     
     return muestra, peso
 
+def orden_topologico(red_bayesiana):
+    """
+    Ordena las variables de forma que cada padre aparezca antes que sus hijos.
+    
+    Args:
+        red_bayesiana (dict): Estructura completa de la red bayesiana
+        
+    Returns:
+        list: Variables en orden topológico
+    """
+    orden = []
+    pendientes = list(red_bayesiana)
+    while pendientes:
+        listas = [v for v in pendientes if all(p in orden for p in red_bayesiana[v]['padres'])]
+        if not listas:
+            raise ValueError(f"La red tiene ciclos: {pendientes}")
+        orden.extend(listas)
+        pendientes = [v for v in pendientes if v not in listas]
+    return orden
+
+def likelihood_weighting_vectorizado(evidencia, red_bayesiana, n_muestras, semilla=None,
+                                     tam_lote=100000):
+    """
+    Ponderación de verosimilitud con todas las muestras de un lote a la vez.
+    
+    La red se compila a CPTs en arreglos; cada variable se muestrea para el
+    lote completo con un solo sorteo y los pesos se reducen con NumPy.
+    
+    Args:
+        evidencia (dict): Variables observadas con sus valores {var: valor}
+        red_bayesiana (dict): Representación de la red bayesiana
+        n_muestras (int): Número de muestras a generar
+        semilla (int): Semilla para reproducir la ejecución
+        tam_lote (int): Muestras generadas por lote
+        
+    Returns:
+        dict: Distribución aproximada {(variable, valor): probabilidad}, mismo
+              formato que likelihood_weighting
+    """
+    factores, dominios = compilar_red(red_bayesiana)
+    indices = {var: dominios[var].index(valor) for var, valor in evidencia.items()}
+    resultado = MuestreadorVectorizado(factores).ponderacion_verosimilitud(
+        n_muestras, indices, semilla, tam_lote)
+    return {(var, valor): float(p)
+            for var, marginal in resultado['marginales'].items() if var not in evidencia
+            for valor, p in zip(dominios[var], marginal)}
+
 def muestrear_distribucion(prob_dist):
     """
     Muestrea un valor de una distribución discreta usando el método de transformada inversa.
@@ -165,4 +213,17 @@ if __name__ == "__main__":
     # Ordenamos los resultados para mostrarlos consistentemente
     for (variable, valor), prob in sorted(distribucion.items()):
         # Formateamos la salida con 4 decimales
-        print(f"P({variable}={valor} | evidencia) = {prob:.4f}")
\ No newline at end of file
+        print(f"P({variable}={valor} | evidencia) = {prob:.4f}")
+    
+    # Misma inferencia con muestras por lotes (y 100 veces más muestras)
+    inicio = time.perf_counter()
+    likelihood_weighting(evidencia, red_bayesiana, n_muestras)
+    t_uno = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    distribucion = likelihood_weighting_vectorizado(evidencia, red_bayesiana, 100 * n_muestras, semilla=0)
+    t_lotes = time.perf_counter() - inicio
+    print(f"\nVersión vectorizada con {100 * n_muestras} muestras:")
+    for (variable, valor), prob in sorted(distribucion.items()):
+        print(f"P({variable}={valor} | evidencia) = {prob:.4f}")
+    print(f"Muestras por segundo: {n_muestras / t_uno:.0f} (una a una) vs "
+          f"{100 * n_muestras / t_lotes:.0f} (por lotes)")
\ No newline at end of file
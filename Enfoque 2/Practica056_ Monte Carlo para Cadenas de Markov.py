@@ -8,6 +8,8 @@ Created on Sat Apr 26 15:05:57 2025
 # Importación de librerías necesarias
 import random  # Para generar números aleatorios
 from collections import defaultdict  # Para crear diccionarios con valores por defecto
+from factores import compilar_red  # Red de diccionarios -> factores NumPy
+from cadenas_gibbs import MuestreadorGibbs  # Gibbs vectorizado con varias cadenas
 
 # Función principal para realizar muestreo de Gibbs en una red bayesiana
 def muestreo_gibbs(red_bayesiana, evidencia, n_muestras, burn_in=100, lag=5):
@@ -36,7 +38,7 @@ def muestreo_gibbs(red_bayesiana, evidencia, n_muestras, burn_in=100, lag=5):
             muestra_actual[var] = evidencia[var]  # Asignar valor observado
         else:
             # Elegir valor aleatorio inicial para variables no observadas
-            valores_posibles = list(red_bayesiana[var]['tabla'][()].keys())
+            valores_posibles = list(next(iter(red_bayesiana[var]['tabla'].values())).keys())
             muestra_actual[var] = random.choice(valores_posibles)
     
     # Inicializar contador de frecuencias de muestras
@@ -149,6 +151,45 @@ def distribucion_condicional(variable, muestra, red_bayesiana):
     
     return distribucion  # Retornar distribución condicional normalizada
 
+# Función para muestreo de Gibbs con varias cadenas en paralelo
+def muestreo_gibbs_cadenas(red_bayesiana, evidencia, n_muestras, burn_in=100, lag=1,
+                           cadenas=8, procesos=None, rhat_max=1.01, ess_min=None,
+                           semilla=None):
+    """
+    Muestreo de Gibbs con K cadenas simultáneas y parada por convergencia.
+    
+    Las cadenas avanzan juntas como una matriz de índices; se detiene antes
+    de n_muestras cuando R-hat <= rhat_max y el tamaño efectivo >= ess_min.
+    
+    Args:
+        red_bayesiana (dict): Representación de la red bayesiana
+        evidencia (dict): Variables observadas con sus valores {var: valor}
+        n_muestras (int): Máximo de muestras por cadena
+        burn_in (int): Barridos iniciales descartados en cada cadena
+        lag (int): Barridos entre muestras guardadas
+        cadenas (int): Número de cadenas independientes
+        procesos (int): Procesos para repartir las cadenas (None = uno solo)
+        rhat_max (float): Umbral de R-hat para detenerse (None = no parar antes)
+        ess_min (float): Tamaño efectivo de muestra mínimo para detenerse
+        semilla (int): Semilla para reproducir la ejecución
+        
+    Returns:
+        tuple: (distribución {(var, valor): prob}, diagnóstico con rhat, ess,
+                muestras y convergio)
+    """
+    factores, dominios = compilar_red(red_bayesiana)
+    indices = {var: dominios[var].index(valor) for var, valor in evidencia.items()}
+    resultado = MuestreadorGibbs(factores, indices).muestrear(
+        n_muestras, cadenas=cadenas, burn_in=burn_in, lag=lag, rhat_max=rhat_max,
+        ess_min=ess_min, procesos=procesos, semilla=semilla)
+    
+    # Mismo formato que muestreo_gibbs: sólo variables no observadas
+    distribucion = {(var, valor): float(p)
+                    for var, marginal in resultado['marginales'].items() if var not in evidencia
+                    for valor, p in zip(dominios[var], marginal)}
+    diagnostico = {clave: resultado[clave] for clave in ('rhat', 'ess', 'muestras', 'convergio')}
+    return distribucion, diagnostico
+
 # Función auxiliar para muestrear un valor de una distribución discreta
 def muestrear_distribucion(prob_dist):
     """
@@ -209,3 +250,15 @@ if __name__ == "__main__":
     print("\nDistribución aproximada usando MCMC (Gibbs sampling):")
     for (variable, valor), prob in sorted(distribucion.items()):
         print(f"P({variable}={valor} | evidencia) = {prob:.4f}")
+    
+    # Mismo problema con 64 cadenas vectorizadas y parada por convergencia
+    distribucion, diagnostico = muestreo_gibbs_cadenas(
+        red_bayesiana, evidencia, n_muestras=100000, burn_in=100, cadenas=64,
+        rhat_max=1.01, ess_min=20000, semilla=0)
+    print(f"\nGibbs con 64 cadenas ({diagnostico['muestras']} muestras, "
+          f"convergió: {diagnostico['convergio']}):")
+    for (variable, valor), prob in sorted(distribucion.items()):
+        print(f"P({variable}={valor} | evidencia) = {prob:.4f}")
+    for variable in sorted(diagnostico['rhat']):
+        print(f"  {variable}: R-hat = {diagnostico['rhat'][variable]:.4f}, "
+              f"ESS = {diagnostico['ess'][variable]:.0f}")
@@ -14,6 +14,9 @@ from scipy.stats import norm
 # Importación de matplotlib para visualización
 import matplotlib.pyplot as plt
 
+# Filtrado, suavizado y Viterbi por lotes en escala logarítmica
+from hmm_vectorizado import HMMVectorizado, SuavizadoRetardoFijo, logsumexp, rellenar
+
 class HMM:
     """
     Implementación completa de un Modelo Oculto de Markov con:
@@ -37,6 +40,7 @@ class HMM:
         self.pi = pi  # Distribución inicial de estados
         self.N = A.shape[0]  # Número de estados ocultos
         self.M = B.shape[1]  # Número de observaciones posibles
+        self.motor = HMMVectorizado(A, B, pi)  # Núcleos por lotes en escala logarítmica
         
         # Validación de que los parámetros son consistentes
         self._validar_parametros()
@@ -62,27 +66,9 @@ class HMM:
                    alpha: Probabilidades de estado en cada tiempo
                    log_verosimilitud: Log-verosimilitud de la secuencia
         """
-        T = len(observaciones)  # Longitud de la secuencia
-        alpha = np.zeros((T, self.N))  # Matriz para probabilidades forward
-        c = np.zeros(T)  # Factores de normalización
-        
-        # Paso inicial (t=0)
-        alpha[0] = self.pi * self.B[:, observaciones[0]]  # Combinación inicial
-        c[0] = alpha[0].sum()  # Factor de normalización
-        alpha[0] /= c[0]  # Normalización
-        
-        # Pasos recursivos (t=1 a T-1)
-        for t in range(1, T):
-            # Calcula probabilidades no normalizadas
-            alpha[t] = self.B[:, observaciones[t]] * (alpha[t-1] @ self.A)
-            # Calcula factor de normalización
-            c[t] = alpha[t].sum()
-            # Normaliza las probabilidades
-            alpha[t] /= c[t]
-        
-        # Calcula log-verosimilitud sumando los logs de los factores de normalización
-        log_verosimilitud = np.sum(np.log(c))
-        return alpha, log_verosimilitud
+        # Lote de una sola secuencia en escala logarítmica
+        log_alpha, log_verosimilitud = self.motor.filtrado([observaciones])
+        return np.exp(log_alpha[0]), log_verosimilitud[0]
     
     def prediccion(self, alpha, k=1):
         """
@@ -115,28 +101,28 @@ class HMM:
         Returns:
             np.array: Probabilidades suavizadas gamma
         """
-        T = len(observaciones)  # Longitud de la secuencia
-        
-        # Paso forward (usa el algoritmo de filtrado)
-        alpha, _ = self.filtrado(observaciones)
-        
-        # Paso backward
-        beta = np.zeros((T, self.N))  # Matriz para probabilidades backward
-        beta[-1] = 1.0  # Inicialización en t=T
-        
-        # Recorrido hacia atrás (t=T-2 a t=0)
-        for t in range(T-2, -1, -1):
-            # Calcula probabilidades backward
-            beta[t] = (self.A * self.B[:, observaciones[t+1]] * beta[t+1]).sum(axis=1)
-            # Normalización numérica
-            beta[t] /= beta[t].sum()
-        
-        # Combinación de forward y backward
-        gamma = alpha * beta
-        # Normalización para obtener probabilidades válidas
-        gamma /= gamma.sum(axis=1, keepdims=True)
+        log_gamma, _ = self.motor.suavizado([observaciones])
+        return np.exp(log_gamma[0])
+    
+    def suavizado_retardo_fijo(self, observaciones, retardo):
+        """
+        Suavizado en línea: cada estado se estima con 'retardo' observaciones futuras
         
-        return gamma
+        Args:
+            observaciones (list): Secuencia de observaciones (llegan una a una)
+            retardo (int): Número de observaciones posteriores que se esperan
+            
+        Returns:
+            np.array: P(X_t | o_1..o_{t+retardo}) para cada t (los últimos con las que haya)
+        """
+        suavizador = SuavizadoRetardoFijo(self.motor, retardo)
+        gamma = []
+        for o in observaciones:
+            estimacion = suavizador.paso([o])  # None hasta tener 'retardo' observaciones futuras
+            if estimacion is not None:
+                gamma.append(estimacion[0])
+        gamma.extend(estimacion[0] for estimacion in suavizador.finalizar())
+        return np.exp(np.array(gamma))
     
     def algoritmo_viterbi(self, observaciones):
         """
@@ -148,37 +134,29 @@ class HMM:
         Returns:
             tuple: (secuencia_estados, probabilidad)
                    secuencia_estados: Índices de la secuencia más probable
-                   probabilidad: Probabilidad de dicha secuencia
+                   probabilidad: Probabilidad de dicha secuencia (normalizada entre los estados finales)
         """
-        T = len(observaciones)  # Longitud de la secuencia
-        delta = np.zeros((T, self.N))  # Matriz para maximización
-        psi = np.zeros((T, self.N), dtype=int)  # Matriz para backtracking
-        
-        # Inicialización (t=0)
-        delta[0] = self.pi * self.B[:, observaciones[0]]
-        delta[0] /= delta[0].sum()  # Normalización
-        
-        # Recursión (t=1 a T-1)
-        for t in range(1, T):
-            for j in range(self.N):
-                # Calcula probabilidades de transición
-                trans_prob = delta[t-1] * self.A[:, j]
-                # Guarda el estado más probable que lleva a j
-                psi[t, j] = np.argmax(trans_prob)
-                # Actualiza probabilidad máxima
-                delta[t, j] = trans_prob[psi[t, j]] * self.B[j, observaciones[t]]
-            # Normalización
-            delta[t] /= delta[t].sum()
-        
-        # Backtracking para encontrar la secuencia
-        estados = np.zeros(T, dtype=int)  # Almacenará la secuencia óptima
-        estados[-1] = np.argmax(delta[-1])  # Comienza por el último estado
-        
-        # Reconstruye la secuencia hacia atrás
-        for t in range(T-2, -1, -1):
-            estados[t] = psi[t+1, estados[t+1]]
+        estados, log_delta = self.motor.viterbi([observaciones])
+        log_delta = log_delta[0]
+        # Equivale a normalizar delta en cada paso: max(delta_T) / sum(delta_T)
+        return estados[0], np.exp(log_delta.max() - logsumexp(log_delta))
+    
+    def viterbi_lote(self, secuencias):
+        """
+        Viterbi para muchas secuencias (de distinta longitud) a la vez
         
-        return estados, np.max(delta[-1])
+        Args:
+            secuencias (list): Lista de secuencias de observaciones
+            
+        Returns:
+            tuple: (caminos, log_probabilidades)
+                   caminos: Secuencia de estados más probable de cada secuencia
+                   log_probabilidades: Log-probabilidad conjunta de cada camino
+        """
+        obs, longitudes = rellenar(secuencias)  # Matriz rellenada + longitudes reales
+        estados, log_delta = self.motor.viterbi(obs, longitudes)
+        caminos = [fila[:n] for fila, n in zip(estados, longitudes)]
+        return caminos, log_delta.max(axis=1)
 
 # Bloque principal de ejecución (ejemplo de uso)
 if __name__ == "__main__":
@@ -249,6 +227,12 @@ if __name__ == "__main__":
     print("Secuencia:", " -> ".join([estados[s] for s in secuencia]))
     print(f"Probabilidad: {prob:.6f}")
     
+    # 4.5 Suavizado en línea con retardo fijo
+    print("\n5. Suavizado con retardo fijo (1 observación futura):")
+    gamma_retardo = modelo.suavizado_retardo_fijo(obs_seq, retardo=1)
+    for t in range(len(observaciones)):
+        print(f"t={t}: {dict(zip(estados, gamma_retardo[t].round(3)))}")
+    
     # 5. Visualización gráfica de los resultados
     plt.figure(figsize=(10, 6))  # Tamaño de la figura
     
@@ -6,6 +6,7 @@ Created on Sat Apr 26 15:30:27 2025
 """
 
 import numpy as np
+from hmm_vectorizado import HMMVectorizado, rellenar  # Núcleos por lotes
 
 class HMM_Simple:
     def __init__(self, A, B, pi):
@@ -14,39 +15,27 @@ class HMM_Simple:
         self.B = B  # Matriz de emisión de observaciones
         self.pi = pi  # Distribución inicial de estados
         self.N = A.shape[0]  # Número de estados
+        self.motor = HMMVectorizado(A, B, pi)  # Hacia delante/atrás en escala logarítmica
         
     def forward(self, obs):
         """Paso hacia delante: calcula probabilidades de estado dado observaciones hasta el momento"""
-        T = len(obs)
-        alpha = np.zeros((T, self.N))
-        alpha[0] = self.pi * self.B[:, obs[0]]
-        
-        for t in range(1, T):
-            alpha[t] = self.B[:, obs[t]] * (alpha[t-1] @ self.A)
-            alpha[t] /= alpha[t].sum()  # Normalización
-            
-        return alpha
+        log_alpha, _ = self.motor.filtrado([obs])  # Escala logarítmica, normalizado en cada paso
+        return np.exp(log_alpha[0])
     
     def backward(self, obs):
         """Paso hacia atrás: calcula probabilidades de observaciones futuras dado el estado actual"""
-        T = len(obs)
-        beta = np.ones((T, self.N))
-        
-        for t in range(T-2, -1, -1):
-            beta[t] = (self.A * self.B[:, obs[t+1]] * beta[t+1]).sum(axis=1)
-            beta[t] /= beta[t].sum()  # Normalización
-            
-        return beta
+        return np.exp(self.motor.hacia_atras([obs])[0])
     
     def smooth(self, obs):
         """Algoritmo completo hacia delante-atrás para suavizado de estados"""
-        alpha = self.forward(obs)
-        beta = self.backward(obs)
-        
-        gamma = alpha * beta
-        gamma /= gamma.sum(axis=1, keepdims=True)  # Probabilidades suavizadas
-        
-        return gamma
+        log_gamma, _ = self.motor.suavizado([obs])
+        return np.exp(log_gamma[0])
+    
+    def smooth_batch(self, secuencias):
+        """Suavizado de muchas secuencias (de distinta longitud) a la vez"""
+        obs, longitudes = rellenar(secuencias)
+        log_gamma, _ = self.motor.suavizado(obs, longitudes)
+        return [np.exp(g[:n]) for g, n in zip(log_gamma, longitudes)]
 
 # Ejemplo de uso simplificado
 if __name__ == "__main__":
@@ -72,4 +61,9 @@ if __name__ == "__main__":
     
     print("Probabilidades suavizadas de estados:")
     for t, probs in enumerate(gamma):
-        print(f"Tiempo {t}: Soleado={probs[0]:.3f}, Lluvioso={probs[1]:.3f}")
\ No newline at end of file
+        print(f"Tiempo {t}: Soleado={probs[0]:.3f}, Lluvioso={probs[1]:.3f}")
+    
+    # Varias secuencias de golpe (se rellenan hasta la más larga)
+    lote = [[0], [1, 1, 0, 0], [0, 1]]
+    for s, g in zip(lote, modelo.smooth_batch(lote)):
+        print(f"Secuencia {s}: Soleado={g[:, 0].round(3)}")
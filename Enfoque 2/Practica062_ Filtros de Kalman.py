@@ -11,6 +11,12 @@ import numpy as np
 # Importación de matplotlib para visualización
 import matplotlib.pyplot as plt
 
+# Importación para medir tiempos en el ejemplo por lotes
+import time
+
+# Filtro por lotes, ganancia con Cholesky y régimen estacionario
+from kalman_vectorizado import KalmanVectorizado, resolver_cholesky
+
 class FiltroKalman:
     """
     Implementación completa de un Filtro de Kalman para sistemas lineales
@@ -25,9 +31,10 @@ class FiltroKalman:
         P: Matriz de covarianza del estado actual
         n: Dimensión del estado
         k: Dimensión de la observación
+        estacionario: (P_predicha, K, P) una vez que la ganancia ha convergido
     """
     
-    def __init__(self, A, H, Q, R, B=None, x0=None, P0=None):
+    def __init__(self, A, H, Q, R, B=None, x0=None, P0=None, tol=1e-10):
         """
         Inicializa el filtro de Kalman con las matrices del modelo
         
@@ -39,6 +46,7 @@ class FiltroKalman:
             B (np.array): Matriz de control opcional (n x m)
             x0 (np.array): Estado inicial (n x 1)
             P0 (np.array): Covarianza inicial del estado (n x n)
+            tol (float): Cambio relativo de la ganancia por debajo del cual se fija
         """
         # Asignación de matrices del modelo
         self.A = A  # Matriz de dinámica del sistema
@@ -55,6 +63,13 @@ class FiltroKalman:
         self.x = x0 if x0 is not None else np.zeros((self.n, 1))  # Estado inicial
         self.P = P0 if P0 is not None else np.eye(self.n)  # Covarianza inicial
         
+        # Régimen estacionario: el modelo no cambia, así que K converge y deja de
+        # hacer falta actualizar la covarianza
+        self.motor = KalmanVectorizado(A, H, Q, R, B)  # Núcleo por lotes
+        self.tol = tol
+        self.estacionario = None  # (P_predicha, K, P) cuando K ya no cambia
+        self._K_anterior = None  # Ganancia del paso anterior
+        
         # Historial para registro y visualización
         self.historial_estados = []  # Almacena todos los estados estimados
         self.historial_covarianzas = []  # Almacena todas las covarianzas
@@ -76,8 +91,11 @@ class FiltroKalman:
         if self.B is not None and u is not None:
             self.x += self.B @ u
         
-        # Predicción de la covarianza del estado
-        self.P = self.A @ self.P @ self.A.T + self.Q
+        # Predicción de la covarianza del estado (constante en régimen estacionario)
+        if self.estacionario is not None:
+            self.P = self.estacionario[0].copy()
+        else:
+            self.P = self.A @ self.P @ self.A.T + self.Q
         
         # Guardar en el historial
         self.historial_estados.append(self.x.copy())
@@ -101,18 +119,30 @@ class FiltroKalman:
         # Calcular la innovación (error entre observación y predicción)
         y = z - self.H @ self.x
         
-        # Calcular la covarianza de la innovación
-        S = self.H @ self.P @ self.H.T + self.R
-        
-        # Calcular la ganancia óptima de Kalman
-        K = self.P @ self.H.T @ np.linalg.inv(S)
-        
-        # Actualizar la estimación del estado
-        self.x = self.x + K @ y
-        
-        # Actualizar la covarianza del estado
-        I = np.eye(self.n)
-        self.P = (I - K @ self.H) @ self.P
+        if self.estacionario is not None:
+            # Ganancia y covarianza fijas: solo se corrige el estado
+            _, K, P = self.estacionario
+            self.x = self.x + K @ y
+            self.P = P.copy()
+        else:
+            # Covarianza de la innovación S y ganancia K = P H^T S^-1 (Cholesky, sin inversa)
+            S = self.H @ self.P @ self.H.T + self.R
+            K = resolver_cholesky(S, self.H @ self.P)[0].T
+            
+            # Actualizar la estimación del estado
+            self.x = self.x + K @ y
+            
+            # Actualizar la covarianza del estado
+            P_predicha = self.P
+            I = np.eye(self.n)
+            self.P = (I - K @ self.H) @ self.P
+            self.P = (self.P + self.P.T) / 2  # Simétrica: evita que el redondeo crezca si A es inestable
+            
+            # Si la ganancia ya no cambia, se fija junto con las covarianzas
+            if self._K_anterior is not None and \
+                    np.max(np.abs(K - self._K_anterior)) <= self.tol * np.max(np.abs(K)):
+                self.estacionario = (P_predicha, K, self.P.copy())
+            self._K_anterior = K
         
         # Guardar en el historial
         self.historial_estados.append(self.x.copy())
@@ -131,18 +161,47 @@ class FiltroKalman:
         Returns:
             list: Lista de tuplas (estado, covarianza) en cada paso
         """
+        if len(observaciones) == 0:
+            return []
+        res = self._filtrar_lote(observaciones, entradas)
+        
+        # Historial como en la versión paso a paso: predicción y actualización de cada paso
         resultados = []
         for t, z in enumerate(observaciones):
-            # Obtener entrada de control si existe
-            u = entradas[t] if entradas is not None else None
-            # Etapa de predicción
-            self.predecir(u)
-            # Etapa de actualización
-            self.actualizar(z)
-            # Guardar resultados
-            resultados.append((self.x.copy(), self.P.copy()))
+            self.historial_observaciones.append(np.array(z).copy())
+            for clave_x, clave_P in (("x_pred", "P_pred"), ("x", "P")):
+                self.historial_estados.append(res[clave_x][0, t].reshape(-1, 1))
+                self.historial_covarianzas.append(res[clave_P][t].copy())
+            resultados.append((self.historial_estados[-1].copy(), self.historial_covarianzas[-1].copy()))
+        
+        # El filtro queda en el último estado (listo para seguir paso a paso)
+        self.x, self.P = resultados[-1]
+        if res["paso_estacionario"] is not None:
+            self.estacionario = (res["P_pred"][-1].copy(), res["K"], res["P"][-1].copy())
         return resultados
     
+    def _filtrar_lote(self, observaciones, entradas=None):
+        """Filtra la secuencia como un lote de una pista partiendo del estado actual"""
+        Z = np.array([np.ravel(z) for z in observaciones])[None]  # (1 x T x k)
+        U = None
+        if entradas is not None and self.B is not None:
+            U = np.array([np.ravel(u) for u in entradas])[None]
+        return self.motor.filtrar(Z, np.ravel(self.x), self.P, U, tol=self.tol)
+    
+    def suavizar(self, observaciones, entradas=None):
+        """
+        Suavizador de Rauch-Tung-Striebel: estima cada estado con todas las observaciones
+        
+        Args:
+            observaciones (list): Lista de vectores de observación
+            entradas (list): Lista opcional de vectores de control
+            
+        Returns:
+            list: Lista de tuplas (estado, covarianza) suavizadas (no modifica el filtro)
+        """
+        res = self.motor.suavizar(self._filtrar_lote(observaciones, entradas))
+        return [(x.reshape(-1, 1), P) for x, P in zip(res["x"][0], res["P"])]
+    
     def graficar_resultados(self, estados_reales=None):
         """
         Visualiza los resultados del filtrado comparando con valores reales
@@ -243,5 +302,48 @@ if __name__ == "__main__":
     print(f"Estado final estimado:\n{filtro.x}")
     print(f"\nCovarianza final:\n{filtro.P}")
     
+    # 6.1 Suavizado RTS de la misma secuencia (desde el estado inicial)
+    suavizados = FiltroKalman(A, H, Q, R, x0=x0, P0=P0).suavizar(observaciones)
+    reales = np.array([x.flatten() for x in estados_reales])
+    filtrados = np.array([x.flatten() for x in filtro.historial_estados[1::2]])
+    error_filtro = np.sqrt(np.mean((filtrados[:, 0] - reales[:, 0]) ** 2))
+    error_rts = np.sqrt(np.mean((np.array([x.flatten() for x, _ in suavizados])[:, 0] - reales[:, 0]) ** 2))
+    print(f"\nError cuadrático medio de la posición: {error_filtro:.3f} (filtro) vs {error_rts:.3f} (RTS)")
+    
+    # 6.2 Miles de pistas a la vez con el mismo modelo
+    n_pistas, n_pasos_lote = 5000, 500
+    rng = np.random.default_rng(0)
+    ruido = rng.multivariate_normal(np.zeros(2), Q, size=(n_pistas, n_pasos_lote))
+    X = np.empty((n_pistas, n_pasos_lote, 2))
+    x_pista = np.tile(x0.ravel(), (n_pistas, 1))
+    for t in range(n_pasos_lote):
+        x_pista = x_pista @ A.T + ruido[:, t]
+        X[:, t] = x_pista
+    Z = X @ H.T + rng.normal(0, sigma_medicion, size=(n_pistas, n_pasos_lote, 1))
+    
+    # Referencia: pista a pista, paso a paso (se miden 20 y se extrapola)
+    inicio = time.perf_counter()
+    for i in range(20):
+        pista = FiltroKalman(A, H, Q, R, x0=x0, P0=P0)
+        for z in Z[i]:
+            pista.predecir()
+            pista.actualizar(z.reshape(-1, 1))
+    t_pista = (time.perf_counter() - inicio) / 20
+    
+    motor = KalmanVectorizado(A, H, Q, R)
+    for modo in (None, "detectar"):
+        inicio = time.perf_counter()
+        res = motor.filtrar(Z, x0.ravel(), P0, estacionario=modo)
+        t_lote = time.perf_counter() - inicio
+        print(f"\n{n_pistas} pistas x {n_pasos_lote} pasos (estacionario={modo}): {t_lote:.2f} s "
+              f"(pista a pista: {t_pista * n_pistas:.1f} s estimados)")
+    print(f"Ganancia fija desde el paso {res['paso_estacionario']}; "
+          f"diferencia con Riccati: {np.max(np.abs(res['K'] - motor.estacionario()[1])):.1e}")
+    inicio = time.perf_counter()
+    res_rts = motor.suavizar(res)
+    print(f"Suavizado RTS del lote: {time.perf_counter() - inicio:.2f} s")
+    print(f"Error cuadrático medio de la posición: {np.sqrt(np.mean((res['x'] - X)[..., 0] ** 2)):.3f} (filtro) vs "
+          f"{np.sqrt(np.mean((res_rts['x'] - X)[..., 0] ** 2)):.3f} (RTS)")
+    
     # 7. Visualización gráfica
     filtro.graficar_resultados(estados_reales)
\ No newline at end of file
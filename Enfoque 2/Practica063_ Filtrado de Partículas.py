@@ -8,108 +8,187 @@ Created on Sat Apr 26 15:30:28 2025
 # Importación de bibliotecas necesarias
 import numpy as np  # Para operaciones numéricas y matrices
 import matplotlib.pyplot as plt  # Para visualización
+from scipy.linalg import solve_triangular  # Para blanquear residuos con el factor de Cholesky
 from scipy.stats import norm, multivariate_normal  # Para distribuciones probabilísticas
 
+def _raiz_covarianza(cov):
+    """
+    Factor L con L @ L.T = cov (Cholesky, o raíz espectral si cov es semidefinida).
+    """
+    cov = np.atleast_2d(np.asarray(cov, dtype=float))
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        valores, vectores = np.linalg.eigh(cov)
+        return vectores * np.sqrt(np.clip(valores, 0, None))
+
+def _acumulada(pesos):
+    """Suma acumulada de pesos con el último valor forzado a 1 (evita índices fuera de rango)."""
+    acumulada = np.cumsum(pesos)
+    acumulada[-1] = 1.0
+    return acumulada
+
+def remuestreo_sistematico(pesos, rng):
+    """Un único desplazamiento aleatorio para N posiciones equiespaciadas."""
+    n = len(pesos)
+    posiciones = (np.arange(n) + rng.random()) / n
+    return np.searchsorted(_acumulada(pesos), posiciones, side='right')
+
+def remuestreo_estratificado(pesos, rng):
+    """Un desplazamiento aleatorio independiente en cada estrato [i/N, (i+1)/N)."""
+    n = len(pesos)
+    posiciones = (np.arange(n) + rng.random(n)) / n
+    return np.searchsorted(_acumulada(pesos), posiciones, side='right')
+
+def remuestreo_multinomial(pesos, rng):
+    """N extracciones independientes según los pesos."""
+    return np.searchsorted(_acumulada(pesos), rng.random(len(pesos)), side='right')
+
+def remuestreo_residual(pesos, rng):
+    """Copias deterministas floor(N*w) y el resto por muestreo multinomial de los residuos."""
+    n = len(pesos)
+    copias = np.floor(n * pesos).astype(np.int64)
+    indices = np.repeat(np.arange(n), copias)
+    faltan = n - len(indices)
+    if faltan:
+        residuos = n * pesos - copias
+        residuos /= residuos.sum()
+        extra = np.searchsorted(_acumulada(residuos), rng.random(faltan), side='right')
+        indices = np.concatenate([indices, extra])
+    return indices
+
+REMUESTREOS = {  # Estrategias de remuestreo disponibles
+    'sistematico': remuestreo_sistematico,
+    'estratificado': remuestreo_estratificado,
+    'residual': remuestreo_residual,
+    'multinomial': remuestreo_multinomial,
+}
+
 class FiltroParticulas:
     """
     Implementación del Filtro de Partículas (Sequential Monte Carlo)
     para estimación de estado en sistemas dinámicos.
+    
+    Todas las operaciones trabajan sobre el arreglo completo de partículas (N x d):
+    las funciones de transición y observación reciben y devuelven arreglos por lotes,
+    los pesos se llevan en escala logarítmica y el remuestreo sólo se dispara cuando
+    el tamaño efectivo de muestra (ESS) cae por debajo de umbral_ess * N.
     """
 
     def __init__(self, n_particulas, dim_estado, transicion_estado, modelo_observacion,
-                 ruido_proceso, ruido_observacion, x_inicial):
+                 ruido_proceso, ruido_observacion, x_inicial, remuestreo='sistematico',
+                 umbral_ess=0.5, por_particula=False, guardar_particulas=True, semilla=None):
+        """
+        Parámetros adicionales:
+        remuestreo: 'sistematico', 'estratificado', 'residual' o 'multinomial'
+        umbral_ess: Fracción de N bajo la cual se remuestrea (1.0 = en cada paso)
+        por_particula: True si f(x, u, dt) y h(x) sólo aceptan un vector de estado
+        guardar_particulas: Copiar las partículas en el historial (costoso con N grande)
+        semilla: Semilla del generador aleatorio
+        """
+        if remuestreo not in REMUESTREOS:
+            raise ValueError(f"Remuestreo desconocido: {remuestreo}")
         # Inicialización de parámetros del filtro
         self.n = n_particulas  # Número de partículas
         self.dim = dim_estado  # Dimensión del espacio de estados
-        self.f = transicion_estado  # Función de transición de estado
-        self.h = modelo_observacion  # Función de observación
+        if por_particula:  # Adapta funciones de un solo vector a lotes
+            self.f = lambda X, u, dt: np.array([transicion_estado(x, u, dt) for x in X])
+            self.h = lambda X: np.array([modelo_observacion(x) for x in X]).reshape(len(X), -1)
+        else:
+            self.f = transicion_estado  # Función de transición de estado (N x d -> N x d)
+            self.h = modelo_observacion  # Función de observación (N x d -> N x m)
         self.Q = ruido_proceso  # Covarianza del ruido del proceso
         self.R = ruido_observacion  # Covarianza del ruido de observación
+        self.raiz_Q = _raiz_covarianza(ruido_proceso)  # Ruido = normal estándar @ raiz_Q.T
+        # Cholesky de R (triangular inferior; R debe ser definida positiva para la densidad)
+        self.raiz_R = np.linalg.cholesky(np.atleast_2d(np.asarray(ruido_observacion, dtype=float)))
+        # log de la constante de normalización gaussiana de la observación
+        self.log_norm_R = (-0.5 * len(self.raiz_R) * np.log(2 * np.pi)
+                           - np.sum(np.log(np.abs(np.diag(self.raiz_R)))))
+        self.remuestreo = REMUESTREOS[remuestreo]
+        self.umbral_ess = umbral_ess
+        self.guardar_particulas = guardar_particulas
+        self.rng = np.random.default_rng(semilla)
         
         # Inicialización de partículas (distribución inicial)
-        self.particulas = np.random.multivariate_normal(
+        self.particulas = self.rng.multivariate_normal(
             mean=x_inicial,  # Centrado en el estado inicial
             cov=np.eye(dim_estado),  # Con cierta dispersión inicial
             size=n_particulas  # Número de partículas
         )
         # Inicialización de pesos (iguales al inicio)
+        self.log_pesos = np.full(n_particulas, -np.log(n_particulas))
         self.pesos = np.ones(n_particulas) / n_particulas  # Normalizados a sumar 1
         
         # Historial para guardar resultados
         self.historial_estimaciones = []  # Guarda las estimaciones de estado
         self.historial_particulas = []  # Guarda las partículas en cada paso
+        self.remuestreos = 0  # Veces que se remuestreó
 
     def predecir(self, u=None, dt=1.0):
         """
-        Fase de predicción: propaga las partículas según el modelo dinámico.
+        Fase de predicción: propaga todas las partículas según el modelo dinámico.
         """
-        # Para cada partícula en el conjunto
-        for i in range(self.n):
-            # Aplicar modelo dinámico (transición de estado)
-            self.particulas[i] = self.f(self.particulas[i], u, dt)
-            # Añadir ruido del proceso (exploración)
-            self.particulas[i] += multivariate_normal.rvs(
-                mean=np.zeros(self.dim),  # Ruido con media cero
-                cov=self.Q  # Covarianza del ruido del proceso
-            )
+        # Modelo dinámico sobre el lote completo
+        self.particulas = np.asarray(self.f(self.particulas, u, dt), dtype=float)
+        # Ruido del proceso para todas las partículas en una sola extracción
+        self.particulas += self.rng.standard_normal((self.n, self.dim)) @ self.raiz_Q.T
         
         # Guardar estado actual de las partículas para historial
-        self.historial_particulas.append(self.particulas.copy())
+        if self.guardar_particulas:
+            self.historial_particulas.append(self.particulas.copy())
+
+    def log_verosimilitud(self, z):
+        """
+        log p(z | x_i) gaussiano para todas las partículas a la vez.
+        """
+        z = np.atleast_1d(np.asarray(z, dtype=float)).ravel()
+        residuo = z - np.asarray(self.h(self.particulas), dtype=float).reshape(self.n, -1)
+        # Distancia de Mahalanobis resolviendo con el factor triangular de R
+        blanqueado = solve_triangular(self.raiz_R, residuo.T, lower=True)
+        return self.log_norm_R - 0.5 * np.einsum('ij,ij->j', blanqueado, blanqueado)
+
+    def ess(self):
+        """Tamaño efectivo de muestra 1 / sum(w_i^2)."""
+        return 1.0 / np.sum(self.pesos ** 2)
 
     def actualizar(self, z):
         """
         Fase de actualización: ajusta pesos según la observación actual.
         """
-        # Calcular nuevos pesos basados en la observación
-        for i in range(self.n):
-            # Calcular residuo (diferencia entre observación real y predicha)
-            residuo = z - self.h(self.particulas[i])
-            # Calcular verosimilitud (probabilidad de la observación dado el estado)
-            self.pesos[i] = multivariate_normal.pdf(
-                residuo, 
-                mean=np.zeros_like(z),  # Media cero (error)
-                cov=self.R  # Covarianza del ruido de observación
-            )
-        
-        # Evitar pesos cero para estabilidad numérica
-        self.pesos += 1e-300  # Pequeño valor epsilon
-        # Normalizar pesos para que sumen 1 (distribución de probabilidad)
-        self.pesos /= np.sum(self.pesos)
+        # Pesos en escala logarítmica: sin underflow aunque la verosimilitud sea diminuta
+        self.log_pesos = self.log_pesos + self.log_verosimilitud(z)
+        maximo = np.max(self.log_pesos)
+        if not np.isfinite(maximo):  # Ninguna partícula explica z: se reinicia uniforme
+            self.log_pesos = np.zeros(self.n)
+            maximo = 0.0
+        self.pesos = np.exp(self.log_pesos - maximo)
+        suma = np.sum(self.pesos)
+        self.pesos /= suma  # Normalizar pesos para que sumen 1
+        self.log_pesos -= maximo + np.log(suma)  # log-sum-exp: conserva los pesos diminutos
         
         # Calcular estimación actual como promedio ponderado
-        estimacion = np.average(self.particulas, weights=self.pesos, axis=0)
+        estimacion = self.pesos @ self.particulas
         # Guardar estimación en historial
         self.historial_estimaciones.append(estimacion)
         
-        # Realizar remuestreo para evitar degeneración
-        self._resample()
+        # Remuestreo sólo cuando los pesos degeneran
+        if self.ess() < self.umbral_ess * self.n:
+            self._resample()
         
         return estimacion  # Devolver la estimación actual
 
     def _resample(self):
         """
-        Remuestreo sistemático para evitar degeneración de partículas.
+        Remuestreo con la estrategia elegida (búsqueda binaria sobre la acumulada).
         """
-        # Generar posiciones estratificadas para remuestreo
-        posiciones = (np.arange(self.n) + np.random.random()) / self.n
-        # Inicializar índices de nuevas partículas
-        indices = np.zeros(self.n, dtype=int)
-        # Calcular suma acumulativa de pesos
-        cumsum = np.cumsum(self.pesos)
-        
-        # Algoritmo de remuestreo sistemático
-        i, j = 0, 0
-        while i < self.n:
-            if posiciones[i] < cumsum[j]:
-                indices[i] = j  # Seleccionar partícula j
-                i += 1
-            else:
-                j += 1
-        
+        indices = self.remuestreo(self.pesos, self.rng)
         # Reemplazar partículas según índices calculados
         self.particulas = self.particulas[indices]
         # Resetear pesos a uniformes
         self.pesos = np.ones(self.n) / self.n
+        self.log_pesos = np.full(self.n, -np.log(self.n))
+        self.remuestreos += 1
 
     def filtrar(self, observaciones, entradas=None, dt=1.0):
         """
@@ -172,15 +251,16 @@ if __name__ == "__main__":
     # 1. Definir funciones del modelo dinámico
     
     # Función de transición de estado (modelo de velocidad constante)
+    # x puede ser un estado (d) o el lote de partículas (N x d)
     def transicion_estado(x, u, dt):
         F = np.array([[1, dt],  # Matriz de transición
                      [0, 1]])
-        return F @ x  # Multiplicación matriz-vector
+        return x @ F.T  # F aplicada a cada fila
     
     # Función de observación (solo observamos la posición)
     def modelo_observacion(x):
         H = np.array([[1, 0]])  # Matriz de observación
-        return H @ x  # Multiplicación matriz-vector
+        return x @ H.T  # H aplicada a cada fila
     
     # 2. Configurar filtro de partículas
     
@@ -203,7 +283,10 @@ if __name__ == "__main__":
         modelo_observacion=modelo_observacion,
         ruido_proceso=ruido_proceso,
         ruido_observacion=ruido_observacion,
-        x_inicial=x_inicial
+        x_inicial=x_inicial,
+        remuestreo='sistematico',  # También 'estratificado', 'residual' o 'multinomial'
+        umbral_ess=0.5,  # Remuestrear cuando ESS < N/2
+        semilla=42
     )
     
     # 3. Generar datos de simulación
@@ -237,6 +320,7 @@ if __name__ == "__main__":
     print("\nResultados del filtrado de partículas:")
     print(f"Estimación final: {estimaciones[-1]}")
     print(f"Estado real final: {estados_reales[-1]}")
+    print(f"Remuestreos: {filtro.remuestreos} de {n_pasos} pasos")
     
     # 6. Visualizar resultados
     filtro.graficar_resultados(estados_reales)
\ No newline at end of file
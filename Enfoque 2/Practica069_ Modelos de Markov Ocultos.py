@@ -6,6 +6,7 @@ Created on Sat Apr 26 16:31:14 2025
 """
 
 import numpy as np  # Importa la librería NumPy para operaciones matriciales eficientes
+from concurrent.futures import ProcessPoolExecutor  # Paso E en paralelo entre procesos
 
 class HMM:
     def __init__(self, A, B, pi):
@@ -84,104 +85,186 @@ class HMM:
         
         return path  # Retorna la secuencia de estados óptima
 
-    def baum_welch(self, obs, max_iter=100, tol=1e-6):
+    def baum_welch(self, obs, max_iter=100, tol=1e-6, longitudes=None, procesos=None,
+                   tam_bloque=256):
         """
         Algoritmo Baum-Welch: Entrena el modelo HMM con datos observados
         
         Parámetros:
-        obs : Secuencia de observaciones para entrenamiento
+        obs : Secuencia de observaciones, lista de secuencias de distinto largo
+              o matriz rellenada (S x T) para entrenamiento
         max_iter : Máximo número de iteraciones permitidas
         tol : Tolerancia para determinar convergencia
+        longitudes : Largo real de cada fila si obs es una matriz rellenada
+        procesos : Procesos para el paso E en paralelo (None o 1 = sin paralelismo)
+        tam_bloque : Secuencias por bloque del paso E
         
         Retorna:
         Tupla con las matrices A, B y pi actualizadas
         """
-        T = len(obs)  # Longitud de la secuencia de entrenamiento
-        old_log_prob = -np.inf  # Inicializa la probabilidad logarítmica anterior
+        # Bloques de secuencias de largo parecido para rellenar lo mínimo
+        bloques = _bloques_por_longitud(obs, longitudes, tam_bloque,
+                                        4 * procesos if procesos and procesos > 1 else 1)
+        pool = None
+        if procesos and procesos > 1 and len(bloques) > 1:
+            # Cada trabajador recibe los bloques una sola vez; luego sólo viajan A, B y pi
+            pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                       initargs=(bloques,))
         
-        for _ in range(max_iter):  # Realiza hasta max_iter iteraciones
-            # Paso Forward con escalamiento para evitar underflow
-            alpha, c = self._forward_with_scaling(obs)
-            
-            # Paso Backward con escalamiento
-            beta = self._backward_with_scaling(obs, c)
-            
-            # Inicializa matrices para gamma y xi
-            gamma = np.zeros((T, self.N))  # gamma_t(i) = P(q_t=i|O,λ)
-            xi = np.zeros((T-1, self.N, self.N))  # xi_t(i,j) = P(q_t=i,q_{t+1}=j|O,λ)
-            
-            # Calcula xi y gamma
-            for t in range(T-1):
-                # Denominador para normalizar xi
-                denom = np.dot(np.dot(alpha[t, :], self.A) * self.B[:, obs[t+1]], beta[t+1, :])
-                for i in range(self.N):
-                    # Numerador para xi
-                    numer = alpha[t, i] * self.A[i, :] * self.B[:, obs[t+1]] * beta[t+1, :]
-                    xi[t, i, :] = numer / denom
-            
-            # Calcula gamma a partir de alpha y beta
-            gamma = alpha * beta / c.reshape(-1, 1)
-            
-            # Reestimación de parámetros
-            
-            # Distribución inicial: gamma en t=0
-            self.pi = gamma[0, :]
-            
-            # Matriz de transición A
-            for i in range(self.N):
-                denom = np.sum(gamma[:-1, i])  # Suma de gamma sobre todos los tiempos excepto el último
-                for j in range(self.N):
-                    self.A[i, j] = np.sum(xi[:, i, j]) / denom  # Suma xi sobre todos los tiempos
-            
-            # Matriz de emisión B
-            for j in range(self.N):
-                denom = np.sum(gamma[:, j])  # Suma de gamma sobre todos los tiempos
-                for k in range(self.M):
-                    # Suma gamma solo cuando la observación es k
-                    mask = np.array(obs) == k
-                    self.B[j, k] = np.sum(gamma[mask, j]) / denom
-            
-            # Verifica convergencia
-            log_prob = -np.sum(np.log(c))  # Calcula la probabilidad logarítmica
-            if log_prob - old_log_prob < tol:  # Si el cambio es menor que la tolerancia
-                break  # Termina el entrenamiento
-            old_log_prob = log_prob  # Actualiza la probabilidad anterior
+        old_log_prob = -np.inf  # Inicializa la probabilidad logarítmica anterior
+        try:
+            for _ in range(max_iter):  # Realiza hasta max_iter iteraciones
+                # Paso E: estadísticas suficientes sumadas sobre todas las secuencias
+                if pool is None:
+                    partes = [_paso_e(self.A, self.B, self.pi, bloque) for bloque in bloques]
+                else:
+                    partes = list(pool.map(_paso_e_trabajador,
+                                           [(self.A, self.B, self.pi, k) for k in range(len(bloques))]))
+                log_prob, suma_pi, suma_xi, suma_obs = [sum(x) for x in zip(*partes)]
+                
+                # Paso M: reestimación de parámetros
+                self.pi = suma_pi / np.sum(suma_pi)  # Distribución inicial: gamma en t=0
+                self.A = _normalizar_filas(suma_xi, self.A)  # sum_t xi / sum_t<T gamma
+                self.B = _normalizar_filas(suma_obs, self.B)  # sum_t gamma[o_t=k] / sum_t gamma
+                
+                # Verifica convergencia
+                if log_prob - old_log_prob < tol:  # Si el cambio es menor que la tolerancia
+                    break  # Termina el entrenamiento
+                old_log_prob = log_prob  # Actualiza la probabilidad anterior
+        finally:
+            if pool is not None:
+                pool.shutdown()
         
         return self.A, self.B, self.pi  # Retorna las matrices entrenadas
 
     def _forward_with_scaling(self, obs):
         """Implementación del forward con escalamiento para evitar underflow"""
-        T = len(obs)
-        alpha = np.zeros((T, self.N))  # Matriz alpha escalada
-        c = np.zeros(T)  # Factores de escalamiento
-        
-        # Paso inicial con escalamiento
-        alpha[0, :] = self.pi * self.B[:, obs[0]]
-        c[0] = 1.0 / np.sum(alpha[0, :])  # Factor de escalamiento
-        alpha[0, :] *= c[0]  # Aplica escalamiento
-        
-        # Paso de inducción con escalamiento
-        for t in range(1, T):
-            alpha[t, :] = np.dot(alpha[t-1, :], self.A) * self.B[:, obs[t]]
-            c[t] = 1.0 / np.sum(alpha[t, :])  # Calcula nuevo factor
-            alpha[t, :] *= c[t]  # Aplica escalamiento
-        
-        return alpha, c  # Retorna alpha escalada y factores
+        alpha, c = _forward_escalado(self.A, self.pi, self.B.T[np.asarray(obs)][None],
+                                     np.array([len(obs)]))
+        return alpha[0], c[0]  # Retorna alpha escalada y factores
 
     def _backward_with_scaling(self, obs, c):
         """Implementación del backward con escalamiento"""
-        T = len(obs)
-        beta = np.zeros((T, self.N))  # Matriz beta escalada
-        
-        # Inicialización
-        beta[T-1, :] = c[T-1]  # Usa el último factor de escalamiento
-        
-        # Paso de inducción hacia atrás con escalamiento
-        for t in range(T-2, -1, -1):
-            beta[t, :] = np.dot(self.A, self.B[:, obs[t+1]] * beta[t+1, :])
-            beta[t, :] *= c[t]  # Aplica el factor de escalamiento
-        
-        return beta  # Retorna beta escalada
+        beta = _backward_escalado(self.A, self.B.T[np.asarray(obs)][None], np.asarray(c)[None],
+                                  np.array([len(obs)]))
+        return beta[0]  # Retorna beta escalada
+
+
+# =========================================================================================
+# Paso E vectorizado sobre lotes de secuencias (también usado por los procesos trabajadores)
+# =========================================================================================
+
+def _forward_escalado(A, pi, E, L):
+    """
+    Forward escalado para S secuencias a la vez.
+    
+    Parámetros:
+    E : Emisiones b_j(o_t) por secuencia (S x T x N), cero en el relleno
+    L : Largo real de cada secuencia (S)
+    
+    Retorna:
+    alpha escalada (S x T x N) y factores c (S x T, 1 en el relleno)
+    """
+    S, T, N = E.shape
+    alpha = np.zeros((S, T, N))
+    c = np.ones((S, T))
+    a = pi * E[:, 0]
+    for t in range(T):  # Un único bucle en el tiempo; las secuencias van en paralelo
+        if t > 0:
+            a = (alpha[:, t-1] @ A) * E[:, t]
+        suma = a.sum(axis=1)
+        activa = t < L  # Secuencias que todavía no terminaron
+        c[activa, t] = 1.0 / suma[activa]
+        alpha[:, t] = a * c[:, t, None]  # En el relleno a = 0
+    return alpha, c
+
+def _backward_escalado(A, E, c, L):
+    """Backward escalado para S secuencias a la vez (beta_T = c_T en el último paso real)."""
+    S, T, N = E.shape
+    beta = np.zeros((S, T, N))
+    for t in range(T-1, -1, -1):
+        if t < T-1:
+            beta[:, t] = ((E[:, t+1] * beta[:, t+1]) @ A.T) * c[:, t, None]
+        ultimo = L - 1 == t
+        beta[ultimo, t] = c[ultimo, t, None]  # Inicialización en el último paso de cada secuencia
+    return beta
+
+def _paso_e(A, B, pi, bloque):
+    """
+    Estadísticas suficientes de Baum-Welch para un bloque rellenado.
+    
+    Parámetros:
+    bloque : (observaciones S x T rellenadas, largos S)
+    
+    Retorna:
+    (log P(O), sum gamma_1, sum_t xi, sum_t gamma por símbolo), todas sumables entre bloques
+    """
+    obs, L = bloque
+    E = B.T[obs]  # b_j(o_t): (S x T x N)
+    valido = np.arange(obs.shape[1]) < L[:, None]
+    E *= valido[:, :, None]  # El relleno no emite
+    alpha, c = _forward_escalado(A, pi, E, L)
+    beta = _backward_escalado(A, E, c, L)
+    
+    # xi sumada en (s, t) con un solo einsum: alpha_t(i) a_ij b_j(o_t+1) beta_t+1(j)
+    # (con este escalamiento el denominador P(O) ya vale 1)
+    suma_xi = A * np.einsum("sti,stj->ij", alpha[:, :-1], E[:, 1:] * beta[:, 1:])
+    gamma = alpha * beta / c[:, :, None]  # Cero en el relleno
+    
+    M = B.shape[1]
+    simbolos, g = obs[valido], gamma[valido]
+    suma_obs = np.stack([np.bincount(simbolos, weights=g[:, j], minlength=M)
+                         for j in range(A.shape[0])])
+    log_prob = -np.sum(np.log(c[valido]))
+    return log_prob, gamma[:, 0].sum(axis=0), suma_xi, suma_obs
+
+def _normalizar_filas(conteos, anterior):
+    """Normaliza cada fila; un estado nunca visitado conserva su fila anterior."""
+    total = conteos.sum(axis=1, keepdims=True)
+    return np.where(total > 0, conteos / np.where(total > 0, total, 1), anterior)
+
+def _bloques_por_longitud(obs, longitudes, tam_bloque, minimo_bloques=1):
+    """
+    Ordena las secuencias por largo y las agrupa en bloques rellenados.
+    
+    Parámetros:
+    obs : Secuencia, lista de secuencias o matriz rellenada (S x T)
+    longitudes : Largos reales si obs es una matriz rellenada (o None)
+    tam_bloque : Secuencias máximas por bloque
+    minimo_bloques : Bloques deseados como mínimo (reparto entre procesos)
+    
+    Retorna:
+    Lista de (observaciones rellenadas, largos)
+    """
+    if isinstance(obs, np.ndarray) and obs.ndim == 2:  # Matriz rellenada
+        L = np.full(len(obs), obs.shape[1]) if longitudes is None else np.asarray(longitudes)
+        secuencias = [fila[:l] for fila, l in zip(obs, L)]
+    elif len(obs) and np.ndim(obs[0]) == 0:  # Una sola secuencia
+        secuencias = [obs]
+    else:
+        secuencias = list(obs)
+    secuencias = [np.asarray(s, dtype=np.int64) for s in secuencias if len(s)]
+    orden = sorted(range(len(secuencias)), key=lambda k: len(secuencias[k]))
+    tam_bloque = max(1, min(tam_bloque, -(-len(orden) // minimo_bloques)))
+    bloques = []
+    for inicio in range(0, len(orden), tam_bloque):
+        grupo = [secuencias[k] for k in orden[inicio:inicio + tam_bloque]]
+        L = np.array([len(s) for s in grupo])
+        relleno = np.zeros((len(grupo), L.max()), dtype=np.int64)
+        for fila, s in enumerate(grupo):
+            relleno[fila, :len(s)] = s
+        bloques.append((relleno, L))
+    return bloques
+
+_BLOQUES = None  # Bloques del proceso trabajador
+
+def _iniciar_trabajador(bloques):
+    global _BLOQUES
+    _BLOQUES = bloques
+
+def _paso_e_trabajador(argumentos):
+    A, B, pi, k = argumentos
+    return _paso_e(A, B, pi, _BLOQUES[k])
 
 
 # Ejemplo de uso
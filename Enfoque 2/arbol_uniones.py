@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Árbol de uniones (junction tree) compilado para inferencia exacta repetida.
+
+La red se triangula una sola vez (orden min-fill de factores.py), las
+cliques maximales se unen en un árbol de máximo peso de separadores y cada
+CPT se asigna a una clique. La evidencia entra como vector de verosimilitud
+en la clique "hogar" de su variable, así que la forma de los potenciales
+nunca cambia.
+
+Los mensajes (Shafer-Shenoy) se calculan de forma perezosa y se guardan
+normalizados junto con su escala logarítmica. Al cambiar la evidencia de
+una variable sólo se invalidan los mensajes que salen de su clique hogar;
+el resto se reutiliza. Tras calibrar, cada marginal es una consulta a un
+diccionario.
+"""
+
+import math                                      # Escalas logarítmicas
+
+import numpy as np                               # Potenciales densos
+from factores import (Factor, grafo_interaccion,  # Factores NumPy con ejes con nombre
+                      multiplicar_y_sumar, orden_eliminacion)
+
+class ArbolUniones:
+    def __init__(self, factores, heuristica="min-fill"):
+        """
+        Compila los factores de una red (una CPT por variable).
+
+        Parámetros:
+            factores:   Factores de la red                (list)
+            heuristica: "min-fill" o "min-degree" para triangular (str)
+        """
+        self.tamanos = {}                        # Variable -> cardinalidad
+        for f in factores:
+            for v, n in zip(f.variables, f.tabla.shape):
+                self.tamanos[v] = n
+        self.cliques = self._triangular(factores, heuristica)
+        self.vecinos = self._conectar()
+        # Clique hogar de cada variable: la más pequeña que la contiene
+        self.hogar = {}
+        for v in self.tamanos:
+            candidatas = [i for i, c in enumerate(self.cliques) if v in c]
+            self.hogar[v] = min(candidatas, key=lambda i: self._peso(self.cliques[i]))
+
+        # Potencial base de cada clique: producto de los factores asignados
+        asignados = [[] for _ in self.cliques]
+        for f in factores:
+            alcance = set(f.variables)
+            i = min((i for i, c in enumerate(self.cliques) if alcance <= set(c)),
+                    key=lambda i: self._peso(self.cliques[i]))
+            asignados[i].append(f)
+        self.base = []
+        for clique, fs in zip(self.cliques, asignados):
+            unos = Factor(clique, np.ones([self.tamanos[v] for v in clique]))
+            self.base.append(multiplicar_y_sumar([unos] + fs))
+
+        self.verosimilitud = {}                  # Variable -> vector de evidencia
+        self._potencial = {}                     # Clique -> potencial con evidencia
+        self._mensajes = {}                      # (i, j) -> (Factor normalizado, log escala)
+        self._marginales = {}                    # Variable -> ndarray
+
+    def _peso(self, clique):
+        peso = 1
+        for v in clique:
+            peso *= self.tamanos[v]
+        return peso
+
+    def _triangular(self, factores, heuristica):
+        """Cliques maximales del grafo moral triangulado por eliminación."""
+        vecinos = grafo_interaccion(factores)
+        for v in self.tamanos:
+            vecinos.setdefault(v, set())
+        orden = orden_eliminacion(factores, list(self.tamanos), heuristica, self.tamanos)
+        orden += [v for v in self.tamanos if v not in orden]  # Variables aisladas
+        cliques = []
+        for v in orden:
+            clique = {v} | vecinos[v]
+            for a in vecinos[v]:                 # Relleno
+                vecinos[a].update(w for w in vecinos[v] if w != a)
+                vecinos[a].discard(v)
+            del vecinos[v]
+            if not any(clique <= c for c in cliques):
+                cliques.append(clique)
+        # Conserva un orden estable de variables dentro de cada clique
+        posicion = {v: i for i, v in enumerate(self.tamanos)}
+        return [tuple(sorted(c, key=posicion.get)) for c in cliques
+                if not any(c < otra for otra in cliques)]
+
+    def _conectar(self):
+        """Árbol (o bosque) de máximo peso de separadores con Kruskal."""
+        n = len(self.cliques)
+        aristas = sorted(((len(set(self.cliques[i]) & set(self.cliques[j])), i, j)
+                          for i in range(n) for j in range(i + 1, n)), reverse=True)
+        raiz = list(range(n))
+
+        def buscar(x):
+            while raiz[x] != x:
+                raiz[x] = raiz[raiz[x]]
+                x = raiz[x]
+            return x
+
+        vecinos = [[] for _ in range(n)]
+        for peso, i, j in aristas:
+            if peso == 0:
+                break                            # Componentes independientes
+            ri, rj = buscar(i), buscar(j)
+            if ri != rj:
+                raiz[ri] = rj
+                vecinos[i].append(j)
+                vecinos[j].append(i)
+        self.componentes = {}                    # Representante -> cliques de la componente
+        for i in range(n):
+            self.componentes.setdefault(buscar(i), []).append(i)
+        return vecinos
+
+    # ------------------------------------------------------------------
+    # Evidencia
+    # ------------------------------------------------------------------
+
+    def observar(self, variable, indice):
+        """
+        Fija (o retira con indice=None) la evidencia dura de una variable.
+
+        Parámetros:
+            variable: Nombre de la variable               (str)
+            indice:   Índice del valor observado o None   (int/None)
+        """
+        if indice is None:
+            self.observar_verosimilitud(variable, None)
+        else:
+            vector = np.zeros(self.tamanos[variable])
+            vector[indice] = 1.0
+            self.observar_verosimilitud(variable, vector)
+
+    def observar_verosimilitud(self, variable, vector):
+        """Evidencia blanda: multiplica la variable por un vector de verosimilitud."""
+        anterior = self.verosimilitud.get(variable)
+        if vector is None:
+            if anterior is None:
+                return
+            del self.verosimilitud[variable]
+        else:
+            vector = np.asarray(vector, dtype=float)
+            if anterior is not None and np.array_equal(anterior, vector):
+                return                           # Misma evidencia: nada que recalcular
+            self.verosimilitud[variable] = vector
+        self._invalidar(self.hogar[variable])
+
+    def fijar_evidencia(self, evidencia):
+        """
+        Reemplaza toda la evidencia dura; sólo se invalida lo que cambia.
+
+        Parámetros:
+            evidencia: {variable: índice observado}     (dict)
+        """
+        for v in list(self.verosimilitud):
+            if v not in evidencia:
+                self.observar(v, None)
+        for v, indice in evidencia.items():
+            self.observar(v, indice)
+
+    def _invalidar(self, clique):
+        """Borra el potencial de la clique y los mensajes que salen de ella."""
+        self._potencial.pop(clique, None)
+        self._marginales.clear()
+        pila = [(clique, None)]
+        while pila:
+            i, previo = pila.pop()
+            for j in self.vecinos[i]:
+                if j != previo:
+                    self._mensajes.pop((i, j), None)
+                    pila.append((j, i))
+
+    # ------------------------------------------------------------------
+    # Paso de mensajes
+    # ------------------------------------------------------------------
+
+    def _potencial_con_evidencia(self, i):
+        if i not in self._potencial:
+            factores = [self.base[i]]
+            factores += [Factor((v,), vector) for v, vector in self.verosimilitud.items()
+                         if self.hogar[v] == i]
+            self._potencial[i] = multiplicar_y_sumar(factores) if len(factores) > 1 else factores[0]
+        return self._potencial[i]
+
+    def _mensaje(self, i, j):
+        """Mensaje de la clique i a la j: (Factor sobre el separador, log escala)."""
+        clave = (i, j)
+        if clave not in self._mensajes:
+            pila = [clave]                       # Recorrido iterativo (sin límite de recursión)
+            while pila:
+                a, b = pila[-1]
+                faltan = [(k, a) for k in self.vecinos[a]
+                          if k != b and (k, a) not in self._mensajes]
+                if faltan:
+                    pila.extend(faltan)
+                    continue
+                pila.pop()
+                if (a, b) in self._mensajes:
+                    continue
+                entrantes = [self._mensajes[(k, a)] for k in self.vecinos[a] if k != b]
+                separador = set(self.cliques[a]) & set(self.cliques[b])
+                eliminar = [v for v in self.cliques[a] if v not in separador]
+                mensaje = multiplicar_y_sumar([self._potencial_con_evidencia(a)]
+                                              + [m for m, _ in entrantes], eliminar)
+                total = mensaje.tabla.sum()
+                escala = sum(e for _, e in entrantes)
+                if total > 0:
+                    mensaje = Factor(mensaje.variables, mensaje.tabla / total)
+                    escala += math.log(total)
+                else:
+                    escala = -math.inf
+                self._mensajes[(a, b)] = (mensaje, escala)
+        return self._mensajes[clave]
+
+    def creencia(self, i):
+        """
+        Creencia no normalizada de una clique y su log escala.
+
+        Retorna:
+            (Factor sobre la clique, log escala)        (tuple)
+        """
+        entrantes = [self._mensaje(k, i) for k in self.vecinos[i]]
+        creencia = multiplicar_y_sumar([self._potencial_con_evidencia(i)]
+                                       + [m for m, _ in entrantes])
+        return creencia, sum(e for _, e in entrantes)
+
+    def calibrar(self):
+        """Calcula todos los mensajes pendientes y todas las marginales."""
+        for v in self.tamanos:
+            self.marginal(v)
+
+    def marginal(self, variable):
+        """
+        P(variable | evidencia) como arreglo normalizado (ceros si la
+        evidencia es imposible, como la eliminación de variables).
+
+        Retorna:
+            Distribución sobre los índices del dominio  (ndarray)
+        """
+        if variable not in self._marginales:
+            if not self._marginales and self.log_probabilidad_evidencia() == -math.inf:
+                # P(e) = 0 en alguna componente: la conjunta con la evidencia es nula
+                for v, n in self.tamanos.items():
+                    self._marginales[v] = np.zeros(n)
+                return self._marginales[variable]
+            i = self.hogar[variable]
+            creencia, _ = self.creencia(i)
+            tabla = creencia.marginalizar([v for v in creencia.variables if v != variable]).tabla
+            total = tabla.sum()
+            self._marginales[variable] = tabla / total if total > 0 else tabla
+        return self._marginales[variable]
+
+    def log_probabilidad_evidencia(self):
+        """log P(evidencia) (-inf si es imposible)."""
+        total = 0.0
+        for cliques in self.componentes.values():
+            creencia, escala = self.creencia(cliques[0])
+            suma = creencia.tabla.sum()
+            if suma <= 0 or escala == -math.inf:
+                return -math.inf
+            total += escala + math.log(suma)
+        return total
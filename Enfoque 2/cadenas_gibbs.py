@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Muestreo de Gibbs vectorizado con varias cadenas y diagnósticos de convergencia.
+
+El estado de K cadenas es una matriz entera (K x n_variables) de índices de
+valor. Para cada variable no observada se precalculan, una sola vez, los
+factores de su manta de Markov (su CPT y las de sus hijos) en escala
+logarítmica junto con los pasos de índice de cada eje; actualizar una
+variable en las K cadenas es entonces una suma de lecturas de arreglos y un
+muestreo categórico vectorizado.
+
+El muestreo avanza por bloques. Tras cada bloque se calculan R-hat
+(Gelman-Rubin entre cadenas) y el tamaño efectivo de muestra (medias por
+lotes) para cada indicador variable=valor, y el muestreo se detiene en
+cuanto se alcanza la convergencia pedida. Los grupos de cadenas pueden
+repartirse entre procesos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor  # Grupos de cadenas en paralelo
+
+import numpy as np                               # Estado de las cadenas y tablas
+
+class MuestreadorGibbs:
+    def __init__(self, factores, evidencia=None):
+        """
+        Compila los factores para muestrear.
+
+        Parámetros:
+            factores:  Factores de la red (CPTs y, si hay, factores de verosimilitud) (list)
+            evidencia: {variable: índice observado}    (dict, opcional)
+        """
+        self.evidencia = dict(evidencia or {})
+        self.tamanos = {}                        # Variable -> cardinalidad
+        for f in factores:
+            for v, n in zip(f.variables, f.tabla.shape):
+                self.tamanos[v] = n
+        self.variables = list(self.tamanos)      # Columna de cada variable en el estado
+        self.columna = {v: i for i, v in enumerate(self.variables)}
+        self.libres = [v for v in self.variables if v not in self.evidencia]
+        # Desplazamiento de cada variable libre en el vector de indicadores
+        self.desplazamiento = {}
+        total = 0
+        for v in self.libres:
+            self.desplazamiento[v] = total
+            total += self.tamanos[v]
+        self.n_indicadores = total
+
+        # Manta de Markov de cada variable libre: (tabla log plana, columnas, pasos, paso propio)
+        with np.errstate(divide="ignore"):
+            compilados = [(np.log(f.tabla).ravel(),
+                           np.array([self.columna[v] for v in f.variables], dtype=np.intp),
+                           np.array([int(np.prod(f.tabla.shape[i + 1:], dtype=np.int64))
+                                     for i in range(len(f.variables))], dtype=np.intp))
+                          for f in factores if f.variables]
+        self.manta = {}
+        for v in self.libres:
+            c = self.columna[v]
+            entradas = []
+            for log_tabla, columnas, pasos in compilados:
+                if c in columnas:
+                    propio = pasos[columnas == c].sum()  # Una variable puede repetirse en un eje
+                    otros = columnas != c
+                    entradas.append((log_tabla, columnas[otros], pasos[otros], propio))
+            self.manta[v] = entradas
+
+    def estado_inicial(self, cadenas, rng):
+        """Estado aleatorio uniforme con la evidencia fijada (cadenas x variables)."""
+        estado = np.empty((cadenas, len(self.variables)), dtype=np.intp)
+        for v, c in self.columna.items():
+            if v in self.evidencia:
+                estado[:, c] = self.evidencia[v]
+            else:
+                estado[:, c] = rng.integers(self.tamanos[v], size=cadenas)
+        return estado
+
+    def _actualizar(self, estado, v, rng):
+        """Muestrea la variable v en todas las cadenas a la vez."""
+        n = self.tamanos[v]
+        log_p = np.zeros((estado.shape[0], n))
+        for log_tabla, columnas, pasos, propio in self.manta[v]:
+            base = estado[:, columnas] @ pasos if len(columnas) else np.zeros(estado.shape[0], np.intp)
+            log_p += log_tabla[base[:, None] + np.arange(n) * propio]
+        maximo = log_p.max(axis=1, keepdims=True)
+        maximo[~np.isfinite(maximo)] = 0.0       # Estado imposible: se muestrea uniforme
+        p = np.exp(log_p - maximo)
+        p[(p.sum(axis=1) == 0)] = 1.0
+        acumulada = np.cumsum(p, axis=1)
+        u = rng.random(estado.shape[0]) * acumulada[:, -1]
+        estado[:, self.columna[v]] = np.minimum((acumulada < u[:, None]).sum(axis=1), n - 1)
+
+    def quemar(self, estado, rng, barridos):
+        """Avanza las cadenas sin guardar muestras (burn-in)."""
+        for _ in range(barridos):
+            for v in self.libres:
+                self._actualizar(estado, v, rng)
+
+    def barrer(self, estado, rng, muestras, lag=1):
+        """
+        Avanza las cadenas y cuenta los indicadores de las muestras guardadas.
+
+        Parámetros:
+            estado:   Estado de las cadenas, se modifica en el lugar (ndarray)
+            rng:      Generador aleatorio              (np.random.Generator)
+            muestras: Muestras a guardar por cadena    (int)
+            lag:      Barridos entre muestras guardadas (int)
+
+        Retorna:
+            Conteos por cadena (cadenas x indicadores) (ndarray)
+        """
+        conteos = np.zeros((estado.shape[0], self.n_indicadores), dtype=np.int64)
+        filas = np.arange(estado.shape[0])
+        for _ in range(muestras):
+            self.quemar(estado, rng, lag)
+            for v in self.libres:
+                np.add.at(conteos, (filas, self.desplazamiento[v] + estado[:, self.columna[v]]), 1)
+        return conteos
+
+    def muestrear(self, n_muestras, cadenas=4, burn_in=100, lag=1, tam_bloque=500,
+                  rhat_max=1.01, ess_min=None, procesos=None, semilla=None):
+        """
+        Ejecuta varias cadenas hasta n_muestras por cadena o hasta converger.
+
+        Parámetros:
+            n_muestras: Máximo de muestras guardadas por cadena (int)
+            cadenas:    Número de cadenas independientes (int)
+            burn_in:    Barridos descartados al inicio  (int)
+            lag:        Barridos entre muestras guardadas (int)
+            tam_bloque: Muestras por cadena entre diagnósticos (int)
+            rhat_max:   Umbral de R-hat para parar (None = no parar por R-hat) (float)
+            ess_min:    Tamaño efectivo mínimo para parar (None = no exigirlo) (float)
+            procesos:   Procesos para repartir las cadenas (None = en este proceso) (int)
+            semilla:    Semilla de los generadores      (int, opcional)
+
+        Retorna:
+            dict con "marginales" {variable: ndarray}, "rhat" y "ess" {variable: float}
+            (peor valor entre sus indicadores), "muestras" (total guardado) y
+            "convergio" (bool)
+        """
+        semillas = np.random.SeedSequence(semilla)
+        grupos = np.array_split(np.arange(cadenas), max(1, min(procesos or 1, cadenas)))
+        grupos = [g for g in grupos if len(g)]
+        rngs = [np.random.default_rng(s) for s in semillas.spawn(len(grupos))]
+        estados = [self.estado_inicial(len(g), rng) for g, rng in zip(grupos, rngs)]
+
+        pool = None
+        if procesos and len(grupos) > 1:
+            pool = ProcessPoolExecutor(max_workers=len(grupos), initializer=_iniciar_trabajador,
+                                       initargs=(self,))
+
+        def avanzar(muestras):
+            """Un bloque en todos los grupos; retorna los conteos (cadenas x indicadores)."""
+            if pool is None:
+                partes = [self.barrer(e, rng, muestras, lag) for e, rng in zip(estados, rngs)]
+            else:
+                resultados = list(pool.map(_barrer_trabajador,
+                                           [(e, rng, muestras, lag) for e, rng in zip(estados, rngs)]))
+                for k, (e, rng, conteos) in enumerate(resultados):
+                    estados[k], rngs[k] = e, rng
+                partes = [conteos for _, _, conteos in resultados]
+            return np.vstack(partes)
+
+        medias_bloque = []                       # Medias por cadena de cada bloque completo
+        totales = np.zeros((cadenas, self.n_indicadores), dtype=np.int64)
+        guardadas = 0
+        diagnostico = {"rhat": np.ones(self.n_indicadores), "ess": np.zeros(self.n_indicadores)}
+        convergio = False
+        try:
+            if burn_in and pool is None:
+                for e, rng in zip(estados, rngs):
+                    self.quemar(e, rng, burn_in)
+            elif burn_in:
+                quemados = list(pool.map(_quemar_trabajador,
+                                         [(e, rng, burn_in) for e, rng in zip(estados, rngs)]))
+                for k, (e, rng) in enumerate(quemados):
+                    estados[k], rngs[k] = e, rng
+            while guardadas < n_muestras:
+                bloque = min(tam_bloque, n_muestras - guardadas)
+                conteos = avanzar(bloque)
+                totales += conteos
+                guardadas += bloque
+                if bloque == tam_bloque:
+                    medias_bloque.append(conteos / bloque)
+                if guardadas >= 2 * tam_bloque and self.n_indicadores:
+                    diagnostico = diagnosticos(totales, guardadas, medias_bloque, tam_bloque)
+                    convergio = ((rhat_max is None or diagnostico["rhat"].max() <= rhat_max)
+                                 and (ess_min is None or diagnostico["ess"].min() >= ess_min))
+                    if convergio and (rhat_max is not None or ess_min is not None):
+                        break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        marginales, rhat, ess = {}, {}, {}
+        conjunto = totales.sum(axis=0) / max(cadenas * guardadas, 1)
+        for v in self.variables:
+            if v in self.evidencia:
+                marginales[v] = np.eye(self.tamanos[v])[self.evidencia[v]]
+                continue
+            tramo = slice(self.desplazamiento[v], self.desplazamiento[v] + self.tamanos[v])
+            marginales[v] = conjunto[tramo]
+            rhat[v] = float(diagnostico["rhat"][tramo].max())
+            ess[v] = float(diagnostico["ess"][tramo].min())
+        return {"marginales": marginales, "rhat": rhat, "ess": ess,
+                "muestras": cadenas * guardadas, "convergio": convergio}
+
+def diagnosticos(totales, n, medias_bloque, tam_bloque):
+    """
+    R-hat y tamaño efectivo de muestra de cada indicador variable=valor.
+
+    Parámetros:
+        totales:       Conteos acumulados por cadena (cadenas x indicadores) (ndarray)
+        n:             Muestras guardadas por cadena   (int)
+        medias_bloque: Medias por cadena de cada bloque completo (list de ndarray)
+        tam_bloque:    Muestras por bloque              (int)
+
+    Retorna:
+        {"rhat": ndarray, "ess": ndarray}             (dict)
+    """
+    cadenas = totales.shape[0]
+    medias = totales / n                         # Media de cada cadena
+    # Varianza dentro de cadenas (exacta para indicadores) y entre cadenas
+    W = (medias * (1 - medias) * n / max(n - 1, 1)).mean(axis=0)
+    B_n = medias.var(axis=0, ddof=1) if cadenas > 1 else np.zeros(totales.shape[1])
+    var_mas = (n - 1) / n * W + B_n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rhat = np.where(W > 0, np.sqrt(var_mas / W), np.where(B_n > 0, np.inf, 1.0))
+    # Varianza asintótica por medias de lotes
+    lotes = np.array(medias_bloque)
+    total = cadenas * n
+    if len(lotes) >= 2:
+        sigma2 = tam_bloque * ((lotes - medias) ** 2).sum(axis=(0, 1)) / (cadenas * (len(lotes) - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ess = np.where(sigma2 > 0, np.minimum(total * W / sigma2, total), total)
+    else:
+        ess = np.zeros(totales.shape[1])
+    return {"rhat": rhat, "ess": ess}
+
+# ----------------------------------------------------------------------
+# Trabajadores del pool (el muestreador se copia una vez por proceso)
+# ----------------------------------------------------------------------
+
+_MUESTREADOR = None
+
+def _iniciar_trabajador(muestreador):
+    global _MUESTREADOR
+    _MUESTREADOR = muestreador
+
+def _barrer_trabajador(args):
+    estado, rng, muestras, lag = args
+    conteos = _MUESTREADOR.barrer(estado, rng, muestras, lag)
+    return estado, rng, conteos
+
+def _quemar_trabajador(args):
+    estado, rng, barridos = args
+    _MUESTREADOR.quemar(estado, rng, barridos)
+    return estado, rng
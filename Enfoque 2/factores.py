@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Factores de probabilidad sobre arreglos NumPy con ejes con nombre.
+
+Un Factor guarda una tupla de variables y un arreglo denso con un eje por
+variable (en ese orden). El producto y la marginalización se hacen con una
+sola llamada a np.einsum, la evidencia se aplica como un corte de índices y
+el orden de eliminación se elige con las heurísticas min-fill o min-degree.
+Los dominios pueden tener cualquier número de valores.
+"""
+
+import numpy as np                               # Tablas densas y einsum
+
+class Factor:
+    def __init__(self, variables, tabla):
+        """
+        Factor phi(variables).
+
+        Parámetros:
+            variables: Nombres de las variables, uno por eje (iterable)
+            tabla:     Arreglo con tabla.ndim == len(variables) (array)
+        """
+        self.variables = tuple(variables)
+        self.tabla = np.asarray(tabla, dtype=float)
+        if self.tabla.ndim != len(self.variables):
+            raise ValueError(f"La tabla tiene {self.tabla.ndim} ejes para {len(self.variables)} variables")
+
+    def __repr__(self):
+        return f"Factor({', '.join(map(str, self.variables))}; forma={self.tabla.shape})"
+
+    def reducir(self, evidencia):
+        """
+        Fija variables observadas por índice (corte del arreglo).
+
+        Parámetros:
+            evidencia: {variable: índice del valor observado} (dict)
+
+        Retorna:
+            Factor sin los ejes observados              (Factor)
+        """
+        if not any(v in evidencia for v in self.variables):
+            return self
+        corte = tuple(evidencia[v] if v in evidencia else slice(None) for v in self.variables)
+        return Factor([v for v in self.variables if v not in evidencia], self.tabla[corte])
+
+    def marginalizar(self, variables):
+        """Suma sobre las variables dadas."""
+        ejes = tuple(i for i, v in enumerate(self.variables) if v in variables)
+        return Factor([v for v in self.variables if v not in variables], self.tabla.sum(axis=ejes))
+
+    def maximizar(self, variables):
+        """Máximo sobre las variables dadas (para MPE)."""
+        ejes = tuple(i for i, v in enumerate(self.variables) if v in variables)
+        return Factor([v for v in self.variables if v not in variables], self.tabla.max(axis=ejes))
+
+    def normalizar(self):
+        """Factor con suma 1 (sin cambios si la suma es 0)."""
+        total = self.tabla.sum()
+        return Factor(self.variables, self.tabla / total if total > 0 else self.tabla)
+
+    def transponer(self, variables):
+        """Reordena los ejes según la lista de variables dada."""
+        return Factor(variables, np.transpose(self.tabla, [self.variables.index(v) for v in variables]))
+
+def multiplicar_y_sumar(factores, eliminar=()):
+    """
+    Producto de factores marginalizando variables, en una sola llamada a einsum.
+
+    Parámetros:
+        factores: Factores a multiplicar               (list)
+        eliminar: Variables a sumar en el resultado    (iterable)
+
+    Retorna:
+        Factor producto sin las variables eliminadas   (Factor)
+    """
+    eliminar = set(eliminar)
+    etiquetas = {}                               # Variable -> etiqueta entera de einsum
+    operandos = []
+    for f in factores:
+        operandos.append(f.tabla)
+        operandos.append([etiquetas.setdefault(v, len(etiquetas)) for v in f.variables])
+    salida = [v for v in etiquetas if v not in eliminar]
+    if len(etiquetas) > 52:                      # Límite de etiquetas de einsum
+        raise ValueError("El producto tiene demasiadas variables para einsum")
+    tabla = np.einsum(*operandos, [etiquetas[v] for v in salida],
+                      optimize=len(factores) > 2)
+    return Factor(salida, tabla)
+
+def multiplicar(*factores):
+    """Producto de factores (unión de sus variables)."""
+    return multiplicar_y_sumar(factores)
+
+def grafo_interaccion(factores):
+    """Grafo moral: variables vecinas si comparten algún factor."""
+    vecinos = {}
+    for f in factores:
+        for v in f.variables:
+            vecinos.setdefault(v, set()).update(w for w in f.variables if w != v)
+    return vecinos
+
+def orden_eliminacion(factores, eliminar, heuristica="min-fill", tamanos=None):
+    """
+    Orden voraz de eliminación sobre el grafo de interacción.
+
+    Parámetros:
+        factores:   Factores del problema              (list)
+        eliminar:   Variables que hay que eliminar     (iterable)
+        heuristica: "min-fill" (aristas añadidas) o "min-degree" (vecinos) (str)
+        tamanos:    {variable: cardinalidad} para desempatar por peso (dict, opcional)
+
+    Retorna:
+        Lista de variables en orden de eliminación     (list)
+    """
+    if heuristica not in ("min-fill", "min-degree"):
+        raise ValueError(f"Heurística desconocida: {heuristica}")
+    vecinos = grafo_interaccion(factores)
+    pendientes = [v for v in eliminar if v in vecinos]
+    posicion = {v: i for i, v in enumerate(pendientes)}  # Desempate estable
+    tamanos = tamanos or {}
+
+    def costo(v):
+        n = vecinos[v]
+        if heuristica == "min-fill":
+            lista = list(n)
+            relleno = sum(1 for i, a in enumerate(lista) for b in lista[i + 1:]
+                          if b not in vecinos[a])
+        else:
+            relleno = len(n)
+        peso = 1
+        for w in n:
+            peso *= tamanos.get(w, 2)
+        return (relleno, peso, posicion[v])
+
+    orden = []
+    restantes = set(pendientes)
+    while restantes:
+        v = min(restantes, key=costo)
+        for a in vecinos[v]:                     # Conecta a sus vecinos (relleno)
+            vecinos[a].update(w for w in vecinos[v] if w != a)
+            vecinos[a].discard(v)
+        del vecinos[v]
+        restantes.discard(v)
+        orden.append(v)
+    return orden
+
+def eliminar_variable(factores, variable):
+    """
+    Multiplica los factores que mencionan la variable y la suma.
+
+    Retorna:
+        Nueva lista de factores                        (list)
+    """
+    relevantes = [f for f in factores if variable in f.variables]
+    if not relevantes:
+        return factores
+    resto = [f for f in factores if variable not in f.variables]
+    return resto + [multiplicar_y_sumar(relevantes, (variable,))]
+
+def eliminacion_variables(factores, consulta, evidencia=None, orden=None, heuristica="min-fill"):
+    """
+    P(consulta | evidencia) por eliminación de variables.
+
+    Parámetros:
+        factores:   Factores de la red (una CPT por nodo) (list)
+        consulta:   Variables de consulta              (iterable)
+        evidencia:  {variable: índice observado}       (dict, opcional)
+        orden:      Orden de eliminación (None = heurística) (list, opcional)
+        heuristica: "min-fill" o "min-degree"          (str)
+
+    Retorna:
+        Factor normalizado sobre las variables de consulta (Factor)
+    """
+    consulta = list(consulta)
+    evidencia = evidencia or {}
+    factores = [f.reducir(evidencia) for f in factores]
+    constantes = [f for f in factores if not f.variables]  # Factores ya escalares
+    factores = [f for f in factores if f.variables]
+    if orden is None:
+        tamanos = {v: n for f in factores for v, n in zip(f.variables, f.tabla.shape)}
+        ocultas = [v for v in tamanos if v not in consulta]
+        orden = orden_eliminacion(factores, ocultas, heuristica, tamanos)
+    for variable in orden:
+        factores = eliminar_variable(factores, variable)
+    resultado = multiplicar_y_sumar(factores + constantes)
+    resultado = resultado.marginalizar([v for v in resultado.variables if v not in consulta])
+    faltan = [v for v in consulta if v not in resultado.variables]
+    if faltan:
+        raise ValueError(f"Variables de consulta sin factores: {faltan}")
+    return resultado.transponer(consulta).normalizar()
+
+def compilar_red(red_bayesiana):
+    """
+    Convierte una red {var: {'padres': [...], 'tabla': {(valores_padres): {valor: prob}}}}
+    en una CPT Factor por variable (eje 0 = variable, resto = padres).
+
+    Parámetros:
+        red_bayesiana: Red en formato de diccionarios  (dict)
+
+    Retorna:
+        (lista de factores, {variable: lista de valores}) (tuple)
+    """
+    # Dominio de cada variable: valores en el orden en que aparecen en su tabla
+    dominios = {}
+    for var, nodo in red_bayesiana.items():
+        valores = []
+        for dist in nodo['tabla'].values():
+            valores.extend(v for v in dist if v not in valores)
+        dominios[var] = valores
+
+    factores = []
+    for var, nodo in red_bayesiana.items():
+        padres = nodo['padres']
+        tabla = np.zeros([len(dominios[var])] + [len(dominios[p]) for p in padres])
+        for valores_padres, dist in nodo['tabla'].items():
+            fila = tuple(dominios[p].index(v) for p, v in zip(padres, valores_padres))
+            for valor, prob in dist.items():
+                tabla[(dominios[var].index(valor),) + fila] = prob
+        factores.append(Factor([var] + list(padres), tabla))
+    return factores, dominios
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Inferencia en HMMs discretos por lotes y en escala logarítmica.
+
+Un lote son S secuencias de observaciones rellenadas hasta la misma
+longitud T (matriz S x T de índices) con la longitud real de cada una.
+Cada núcleo recorre el tiempo una sola vez y en cada paso procesa todas
+las secuencias a la vez:
+
+    filtrado:  log α_t = log B[:, o_t] + logsumexp_i(log α_{t-1}(i) + log A[i, :])
+    suavizado: log β_t = logsumexp_j(log A[:, j] + log B[j, o_{t+1}] + log β_{t+1}(j))
+    viterbi:   log δ_t = log B[:, o_t] + max_i(log δ_{t-1}(i) + log A[i, :])
+
+El logsumexp se hace desplazando por el máximo de cada fila y
+multiplicando por A con un producto matricial; α y β se normalizan en cada
+paso (la log-verosimilitud acumula las constantes), así que ninguna
+secuencia se desborda por larga que sea. En los pasos de relleno los
+mensajes se copian del paso anterior y los punteros de Viterbi son la
+identidad, de modo que el final de cada secuencia queda en la última
+columna sin casos especiales.
+
+SuavizadoRetardoFijo da, en línea, P(X_{t-d} | o_1..o_t) para un lote de
+flujos que llegan paso a paso.
+"""
+
+from collections import deque                    # Ventana del suavizado en línea
+import numpy as np                               # Lotes de mensajes como matrices
+
+def logsumexp(x, axis=-1):
+    """log Σ exp(x) a lo largo de un eje, estable (filas de -inf dan -inf)."""
+    m = np.max(x, axis=axis, keepdims=True)
+    m = np.where(np.isfinite(m), m, 0.0)
+    with np.errstate(divide="ignore"):
+        return np.squeeze(np.log(np.exp(x - m).sum(axis=axis, keepdims=True)) + m, axis=axis)
+
+def rellenar(secuencias, relleno=0):
+    """
+    Agrupa secuencias de distinta longitud en una matriz rellenada.
+
+    Parámetros:
+        secuencias: Secuencias de índices de observación  (list)
+        relleno:    Valor de las posiciones vacías        (int)
+
+    Retorna:
+        (observaciones S x T, longitudes S)               (tuple)
+    """
+    longitudes = np.fromiter((len(s) for s in secuencias), dtype=np.intp, count=len(secuencias))
+    obs = np.full((len(secuencias), longitudes.max(initial=0)), relleno, dtype=np.intp)
+    for i, s in enumerate(secuencias):
+        obs[i, :len(s)] = s
+    return obs, longitudes
+
+class HMMVectorizado:
+    def __init__(self, A, B, pi):
+        """
+        Parámetros:
+            A:  Transiciones P(X_t = j | X_{t-1} = i), (N x N) (ndarray)
+            B:  Emisiones P(o | X = i), (N x M)               (ndarray)
+            pi: Distribución inicial, (N)                    (ndarray)
+        """
+        self.A = np.asarray(A, dtype=float)
+        self.B = np.asarray(B, dtype=float)
+        self.pi = np.asarray(pi, dtype=float)
+        self.N, self.M = self.B.shape
+        with np.errstate(divide="ignore"):       # Probabilidades nulas -> -inf
+            self.log_A = np.log(self.A)
+            self.log_B_T = np.ascontiguousarray(np.log(self.B).T)  # (M x N): fila por observación
+            self.log_pi = np.log(self.pi)
+        # Tipo entero más pequeño que guarda un estado (punteros de Viterbi)
+        self.tipo_puntero = np.min_scalar_type(max(self.N - 1, 0))
+
+    # ------------------------------------------------------------------
+    # Pasos elementales sobre un lote (n x N)
+    # ------------------------------------------------------------------
+
+    def _normalizar(self, log_m):
+        """Resta el logsumexp de cada fila; devuelve (mensaje, constante)."""
+        c = logsumexp(log_m, axis=1)
+        return log_m - np.where(np.isfinite(c), c, 0.0)[:, None], c
+
+    def _por_matriz(self, log_m, M):
+        """log(exp(log_m) @ M) con desplazamiento por el máximo de cada fila."""
+        m = log_m.max(axis=1, keepdims=True)
+        m = np.where(np.isfinite(m), m, 0.0)
+        with np.errstate(divide="ignore"):
+            return np.log(np.exp(log_m - m) @ M) + m
+
+    def inicio(self, o):
+        """log α_1 normalizado y log P(o_1) para un lote de primeras observaciones."""
+        return self._normalizar(self.log_pi + self.log_B_T[o])
+
+    def avanzar(self, log_alpha, o, activas=None):
+        """
+        Un paso del filtrado: log α_t a partir de log α_{t-1} y o_t.
+
+        Parámetros:
+            log_alpha: Mensajes normalizados (n x N)           (ndarray)
+            o:         Observación de cada secuencia (n)       (ndarray int)
+            activas:   Secuencias con observación en t (n bool, opcional)
+
+        Retorna:
+            (log α_t normalizado, log P(o_t | o_1..o_{t-1}))   (tuple)
+        """
+        nuevo, c = self._normalizar(self._por_matriz(log_alpha, self.A) + self.log_B_T[o])
+        if activas is not None:                  # Relleno: se copia el mensaje anterior
+            nuevo = np.where(activas[:, None], nuevo, log_alpha)
+            c = np.where(activas, c, 0.0)
+        return nuevo, c
+
+    def retroceder(self, log_beta, o_siguiente, activas=None):
+        """
+        Un paso hacia atrás: log β_t a partir de log β_{t+1} y o_{t+1}.
+
+        Parámetros:
+            log_beta:    Mensajes de t+1 (n x N)                (ndarray)
+            o_siguiente: Observación de t+1 en cada secuencia (n) (ndarray int)
+            activas:     Secuencias con observación en t+1 (n bool, opcional)
+
+        Retorna:
+            log β_t normalizado (n x N)                         (ndarray)
+        """
+        nuevo, _ = self._normalizar(self._por_matriz(self.log_B_T[o_siguiente] + log_beta, self.A.T))
+        if activas is not None:                  # Fuera de la secuencia β = 1 (log 0)
+            nuevo = np.where(activas[:, None], nuevo, 0.0)
+        return nuevo
+
+    # ------------------------------------------------------------------
+    # Núcleos por lotes
+    # ------------------------------------------------------------------
+
+    def _preparar(self, obs, longitudes):
+        obs = np.atleast_2d(np.asarray(obs, dtype=np.intp))
+        S, T = obs.shape
+        longitudes = np.full(S, T) if longitudes is None else np.asarray(longitudes)
+        if (longitudes < 1).any():
+            raise ValueError("Todas las secuencias necesitan al menos una observación")
+        return obs, longitudes, np.arange(T) < longitudes[:, None]
+
+    def filtrado(self, obs, longitudes=None):
+        """
+        Algoritmo hacia delante para un lote de secuencias.
+
+        Parámetros:
+            obs:        Observaciones rellenadas (S x T)        (ndarray int)
+            longitudes: Longitud real de cada secuencia (S, opcional; T)
+
+        Retorna:
+            (log P(X_t | o_1..o_t) en (S x T x N), log-verosimilitud (S)) (tuple);
+            en el relleno se repite el último mensaje
+        """
+        obs, longitudes, mascara = self._preparar(obs, longitudes)
+        S, T = obs.shape
+        log_alpha = np.empty((S, T, self.N))
+        log_alpha[:, 0], log_ver = self.inicio(obs[:, 0])
+        for t in range(1, T):
+            log_alpha[:, t], c = self.avanzar(log_alpha[:, t - 1], obs[:, t], mascara[:, t])
+            log_ver = log_ver + c
+        return log_alpha, log_ver
+
+    def hacia_atras(self, obs, longitudes=None):
+        """Mensajes log β normalizados (S x T x N); 0 en el último paso y en el relleno."""
+        obs, longitudes, mascara = self._preparar(obs, longitudes)
+        S, T = obs.shape
+        log_beta = np.zeros((S, T, self.N))
+        for t in range(T - 2, -1, -1):
+            log_beta[:, t] = self.retroceder(log_beta[:, t + 1], obs[:, t + 1], mascara[:, t + 1])
+        return log_beta
+
+    def suavizado(self, obs, longitudes=None):
+        """
+        Algoritmo hacia delante-atrás para un lote de secuencias.
+
+        Retorna:
+            (log P(X_t | o_1..o_T) en (S x T x N), log-verosimilitud (S)) (tuple);
+            en el relleno se repite el último paso
+        """
+        log_alpha, log_ver = self.filtrado(obs, longitudes)
+        log_gamma, _ = self._normalizar((log_alpha + self.hacia_atras(obs, longitudes)).reshape(-1, self.N))
+        return log_gamma.reshape(log_alpha.shape), log_ver
+
+    def viterbi(self, obs, longitudes=None):
+        """
+        Secuencia de estados más probable de cada secuencia del lote.
+
+        Parámetros:
+            obs:        Observaciones rellenadas (S x T)        (ndarray int)
+            longitudes: Longitud real de cada secuencia (S, opcional; T)
+
+        Retorna:
+            (estados S x T con -1 en el relleno, log δ_T (S x N): log de la
+             probabilidad conjunta del mejor camino que acaba en cada estado) (tuple)
+        """
+        obs, longitudes, mascara = self._preparar(obs, longitudes)
+        S, T = obs.shape
+        punteros = np.empty((T, S, self.N), dtype=self.tipo_puntero)
+        identidad = np.arange(self.N, dtype=self.tipo_puntero)
+        log_delta = self.log_pi + self.log_B_T[obs[:, 0]]
+        escala = np.zeros(S)                     # Desplazamientos acumulados (δ acotado)
+        for t in range(1, T):
+            puntuacion = log_delta[:, :, None] + self.log_A       # (S, i, j)
+            mejor = puntuacion.argmax(axis=1)                    # (S, j)
+            nuevo = np.take_along_axis(puntuacion, mejor[:, None, :], axis=1)[:, 0] + self.log_B_T[obs[:, t]]
+            activas = mascara[:, t]
+            punteros[t] = np.where(activas[:, None], mejor, identidad)
+            m = nuevo.max(axis=1)
+            m = np.where(np.isfinite(m) & activas, m, 0.0)
+            log_delta = np.where(activas[:, None], nuevo - m[:, None], log_delta)
+            escala += m
+        estados = np.empty((S, T), dtype=np.intp)
+        estados[:, -1] = log_delta.argmax(axis=1)
+        filas = np.arange(S)
+        for t in range(T - 1, 0, -1):            # Vuelta atrás de todo el lote a la vez
+            estados[:, t - 1] = punteros[t][filas, estados[:, t]]
+        estados[~mascara] = -1
+        return estados, log_delta + escala[:, None]
+
+# ----------------------------------------------------------------------
+# Suavizado en línea con retardo fijo
+# ----------------------------------------------------------------------
+
+class SuavizadoRetardoFijo:
+    def __init__(self, hmm, retardo):
+        """
+        Suavizado en línea de un lote de flujos: tras recibir o_t se emite
+        P(X_{t-d} | o_1..o_t), con d = retardo. Guarda sólo los d+1 últimos
+        mensajes hacia delante y observaciones; cada paso cuesta d pasos
+        hacia atrás sobre la ventana.
+
+        Parámetros:
+            hmm:     Modelo                                   (HMMVectorizado)
+            retardo: Pasos de observaciones futuras por estimación (int)
+        """
+        self.hmm = hmm
+        self.retardo = retardo
+        self.alfas = deque(maxlen=retardo + 1)   # log α de t-d..t
+        self.obs = deque(maxlen=retardo + 1)     # o de t-d..t
+        self.log_verosimilitud = None
+
+    def _suavizar(self, k):
+        """log P(X | o_1..o_t) del k-ésimo mensaje de la ventana."""
+        log_beta = np.zeros_like(self.alfas[k])
+        for o in list(self.obs)[:k:-1]:          # o_t, ..., o_{k+1} de la ventana
+            log_beta = self.hmm.retroceder(log_beta, o)
+        return self.hmm._normalizar(self.alfas[k] + log_beta)[0]
+
+    def paso(self, o):
+        """
+        Recibe la observación actual de cada flujo.
+
+        Parámetros:
+            o: Observación de cada flujo del lote (n)          (ndarray int)
+
+        Retorna:
+            log P(X_{t-d} | o_1..o_t) (n x N), o None mientras t < d
+        """
+        o = np.asarray(o, dtype=np.intp)
+        if self.alfas:
+            log_alpha, c = self.hmm.avanzar(self.alfas[-1], o)
+            self.log_verosimilitud = self.log_verosimilitud + c
+        else:
+            log_alpha, self.log_verosimilitud = self.hmm.inicio(o)
+        self.alfas.append(log_alpha)
+        self.obs.append(o)
+        return self._suavizar(0) if len(self.alfas) == self.retardo + 1 else None
+
+    def finalizar(self):
+        """Estimaciones pendientes al terminar los flujos (los últimos d pasos), (d x n x N)."""
+        inicio = 1 if len(self.alfas) == self.retardo + 1 else 0
+        return np.array([self._suavizar(k) for k in range(inicio, len(self.alfas))])
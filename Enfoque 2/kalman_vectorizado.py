@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Filtro de Kalman y suavizador RTS para muchas pistas a la vez.
+
+Las S pistas comparten el modelo lineal (A, B, H, Q, R) y se apilan en
+matrices: medias (S x n), observaciones (S x T x k). La covarianza es una
+sola matriz (n x n) si todas las pistas parten de la misma P0 (no depende de
+los datos, así que se calcula una vez por paso para todas) o una pila
+(S x n x n) si cada pista tiene la suya; el mismo código sirve para ambos
+casos por difusión de NumPy.
+
+La ganancia K = P Hᵀ S⁻¹ se obtiene factorizando S = L Lᵀ (Cholesky,
+vectorizado sobre la pila) y resolviendo por sustitución, sin invertir
+matrices; L da también el log-determinante de la log-verosimilitud. Como
+el modelo es invariante en el tiempo, P y K convergen a la solución de la
+ecuación de Riccati discreta: al detectar la convergencia (o desde el
+principio, resolviendo la ecuación) se dejan de actualizar covarianzas y
+cada paso es solo una multiplicación de las medias por K.
+"""
+
+import numpy as np                               # Pistas apiladas como matrices
+from scipy.linalg import solve_discrete_are      # Covarianza estacionaria (Riccati)
+from scipy.linalg.lapack import dpotrf, dpotrs   # Cholesky de una sola matriz
+
+def _sustitucion_adelante(L, b):
+    """Resuelve L Y = b con L triangular inferior (..., k, k) y b (..., k, m)."""
+    k = L.shape[-1]
+    y = np.empty(np.broadcast_shapes(L.shape[:-2], b.shape[:-2]) + b.shape[-2:])
+    for i in range(k):                           # k es pequeño: bucle sobre filas, lote vectorizado
+        y[..., i, :] = (b[..., i, :] - (L[..., i, :i, None] * y[..., :i, :]).sum(axis=-2)) / L[..., i, i, None]
+    return y
+
+def _sustitucion_atras(L, y):
+    """Resuelve Lᵀ X = y con L triangular inferior (..., k, k) y y (..., k, m)."""
+    k = L.shape[-1]
+    x = np.empty_like(y)
+    for i in reversed(range(k)):
+        x[..., i, :] = (y[..., i, :] - (L[..., i + 1:, i, None] * x[..., i + 1:, :]).sum(axis=-2)) / L[..., i, i, None]
+    return x
+
+def resolver_cholesky(M, b):
+    """
+    Resuelve M X = b para una pila de matrices simétricas definidas positivas.
+
+    Parámetros:
+        M: Matrices (..., k, k)                          (ndarray)
+        b: Términos independientes (..., k, m)           (ndarray)
+
+    Retorna:
+        (X, L) con M = L Lᵀ                              (tuple)
+    """
+    if np.ndim(M) == 2 and np.ndim(b) == 2:      # Una sola matriz: LAPACK sin envoltorios
+        L, info = dpotrf(np.asarray(M, dtype=float), lower=1)
+        if info != 0:
+            raise np.linalg.LinAlgError("La matriz no es definida positiva")
+        return dpotrs(L, np.asarray(b, dtype=float), lower=1)[0], L
+    L = np.linalg.cholesky(M)
+    return _sustitucion_atras(L, _sustitucion_adelante(L, b)), L
+
+class KalmanVectorizado:
+    def __init__(self, A, H, Q, R, B=None):
+        """
+        Parámetros:
+            A: Transición del estado (n x n)             (ndarray)
+            H: Observación (k x n)                       (ndarray)
+            Q: Covarianza del ruido del proceso (n x n)  (ndarray)
+            R: Covarianza del ruido de medición (k x k)  (ndarray)
+            B: Control (n x m), opcional                 (ndarray)
+        """
+        self.A = np.asarray(A, dtype=float)
+        self.H = np.asarray(H, dtype=float)
+        self.Q = np.asarray(Q, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.B = None if B is None else np.asarray(B, dtype=float)
+        self.n = self.A.shape[0]
+        self.k = self.H.shape[0]
+        self._estacionario = None                # (P_pred, K^T, L, P) de Riccati, calculado bajo demanda
+
+    def _ganancia(self, P_pred):
+        """(Kᵀ, L, P) de la actualización a partir de la covarianza predicha."""
+        HP = self.H @ P_pred                                      # (..., k, n)
+        KT, L = resolver_cholesky(HP @ self.H.T + self.R, HP)     # Kᵀ = S⁻¹ H P
+        P = P_pred - np.swapaxes(KT, -1, -2) @ HP                 # P = (I - K H) P_pred
+        # Se simetriza: si no, el error antisimétrico de redondeo crece con
+        # cada A P Aᵀ cuando ρ(A) > 1 y P deja de ser definida positiva
+        return KT, L, (P + np.swapaxes(P, -1, -2)) / 2
+
+    def estacionario(self):
+        """
+        Solución de la ecuación de Riccati discreta.
+
+        Retorna:
+            (P_pred, K, P): covarianza predicha, ganancia y covarianza
+            actualizada del régimen estacionario          (tuple)
+        """
+        if self._estacionario is None:
+            P_pred = solve_discrete_are(self.A.T, self.H.T, self.Q, self.R)
+            self._estacionario = (P_pred,) + self._ganancia(P_pred)
+        P_pred, KT, _, P = self._estacionario
+        return P_pred, KT.T, P
+
+    def filtrar(self, Z, x0, P0, U=None, estacionario="detectar", tol=1e-10):
+        """
+        Filtra un lote de pistas.
+
+        Parámetros:
+            Z:            Observaciones (S x T x k)                       (ndarray)
+            x0:           Estado inicial (S x n) o común (n)              (ndarray)
+            P0:           Covarianza inicial común (n x n) o por pista (S x n x n) (ndarray)
+            U:            Controles (S x T x m) o comunes (T x m), opcional (ndarray)
+            estacionario: "detectar" (fija K cuando deja de cambiar), "riccati"
+                          (K estacionaria desde el principio) o None   (str)
+            tol:          Cambio relativo máximo de K para darla por convergida (float)
+
+        Retorna:
+            dict con "x", "x_pred" (S x T x n); "P", "P_pred" ((T x n x n)
+            o (S x T x n x n)); "K", última ganancia ((n x k) o (S x n x k));
+            "log_verosimilitud" (S) y "paso_estacionario" (primer paso con K
+            fija, o None)
+        """
+        Z = np.asarray(Z, dtype=float)
+        S, T, _ = Z.shape
+        x = np.broadcast_to(np.asarray(x0, dtype=float).reshape(-1, self.n), (S, self.n))
+        P = np.asarray(P0, dtype=float)
+        Z = np.ascontiguousarray(np.moveaxis(Z, 1, 0))            # Por tiempo: Z[t] contiguo
+        # Se guarda por tiempo (cada paso escribe un bloque contiguo) y se devuelve por pista
+        xs, xs_pred = np.empty((T, S, self.n)), np.empty((T, S, self.n))
+        Ps, Ps_pred = np.empty((T,) + P.shape), np.empty((T,) + P.shape)
+        log_verosimilitud = np.zeros(S)
+        res = {"paso_estacionario": None}
+        if estacionario == "riccati":                             # P0 solo fija la forma de P
+            self.estacionario()
+            P_pred, KT, L, P_inf = self._estacionario
+            P_pred, P = np.broadcast_to(P_pred, P.shape), np.broadcast_to(P_inf, P.shape)
+            res["paso_estacionario"] = 0
+        fijo = estacionario == "riccati"
+        KT_anterior = None
+        for t in range(T):
+            # Predicción
+            x_pred = x @ self.A.T
+            if U is not None and self.B is not None:
+                x_pred = x_pred + np.asarray(U)[..., t, :] @ self.B.T
+            if not fijo:
+                P_pred = self.A @ P @ self.A.T + self.Q
+                KT, L, P = self._ganancia(P_pred)
+                if estacionario == "detectar" and KT_anterior is not None and \
+                        np.max(np.abs(KT - KT_anterior)) <= tol * np.max(np.abs(KT)):
+                    fijo = True                  # A partir de aquí no se tocan las covarianzas
+                    res["paso_estacionario"] = t + 1
+                KT_anterior = KT
+            # Actualización: x = x_pred + K (z - H x_pred) para todas las pistas
+            innovacion = Z[t] - x_pred @ self.H.T                     # (S x k)
+            x = x_pred + (innovacion[..., None, :] @ KT)[..., 0, :]
+            # log N(innovación; 0, L Lᵀ)
+            w = _sustitucion_adelante(L, innovacion[..., None])[..., 0]
+            log_verosimilitud -= 0.5 * (np.sum(w ** 2, axis=-1) + self.k * np.log(2 * np.pi)) \
+                + np.sum(np.log(np.diagonal(L, axis1=-2, axis2=-1)), axis=-1)
+            xs[t], xs_pred[t], Ps[t], Ps_pred[t] = x, x_pred, P, P_pred
+        res.update(x=np.moveaxis(xs, 0, 1), x_pred=np.moveaxis(xs_pred, 0, 1),
+                   P=np.moveaxis(Ps, 0, -3), P_pred=np.moveaxis(Ps_pred, 0, -3),
+                   K=np.swapaxes(KT, -1, -2), log_verosimilitud=log_verosimilitud)
+        return res
+
+    def suavizar(self, res):
+        """
+        Suavizador de Rauch-Tung-Striebel sobre el resultado de filtrar.
+
+        Parámetros:
+            res: Resultado de filtrar                   (dict)
+
+        Retorna:
+            dict con "x" (S x T x n) y "P" (como en res) suavizados
+        """
+        x, P, x_pred, P_pred = res["x"], res["P"], res["x_pred"], res["P_pred"]
+        T = x.shape[1]
+        xs, Ps = x.copy(), P.copy()
+        fijo = res["paso_estacionario"]
+        GT = None
+        for t in range(T - 2, -1, -1):
+            # G = P_t Aᵀ P_pred_{t+1}⁻¹; con P y P_pred constantes, G también lo es
+            if GT is None or fijo is None or t < fijo:
+                GT, _ = resolver_cholesky(P_pred[..., t + 1, :, :], self.A @ P[..., t, :, :])
+            xs[:, t] = x[:, t] + ((xs[:, t + 1] - x_pred[:, t + 1])[..., None, :] @ GT)[..., 0, :]
+            Ps[..., t, :, :] = P[..., t, :, :] + np.swapaxes(GT, -1, -2) @ (
+                Ps[..., t + 1, :, :] - P_pred[..., t + 1, :, :]) @ GT
+        return {"x": xs, "P": Ps}
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Muestreo hacia adelante vectorizado: rechazo y ponderación de verosimilitud.
+
+La red (una CPT por variable, con la variable en el eje 0 y los padres en
+los siguientes) se compila una vez en orden topológico: cada CPT queda como
+una matriz (configuraciones de padres x valores) acumulada por filas. Una
+variable se muestrea para N muestras a la vez leyendo la fila de cada
+muestra (índice plano de las columnas de sus padres) y comparando con N
+uniformes. Los pesos de la evidencia se acumulan en escala logarítmica y se
+reducen con NumPy; las muestras se generan por lotes para acotar la memoria.
+"""
+
+import numpy as np                               # Muestras como matrices de índices
+
+class MuestreadorVectorizado:
+    def __init__(self, factores):
+        """
+        Compila las CPTs de una red bayesiana.
+
+        Parámetros:
+            factores: Una CPT por variable, eje 0 = variable, resto = padres (list)
+        """
+        padres = {f.variables[0]: f.variables[1:] for f in factores}
+        cpt = {f.variables[0]: f for f in factores}
+        self.variables = []                      # Orden topológico
+        pendientes = list(padres)
+        while pendientes:
+            listas = [v for v in pendientes if all(p in self.variables for p in padres[v])]
+            if not listas:
+                raise ValueError(f"La red tiene ciclos o padres sin CPT: {pendientes}")
+            self.variables.extend(listas)
+            pendientes = [v for v in pendientes if v not in listas]
+        self.columna = {v: i for i, v in enumerate(self.variables)}
+        self.tamanos = {v: cpt[v].tabla.shape[0] for v in self.variables}
+
+        self.padres = {}                         # Variable -> columnas de sus padres
+        self.pasos = {}                          # Variable -> pasos del índice de configuración
+        self.tablas = {}                         # Variable -> (configuraciones x valores)
+        self.acumuladas = {}
+        for v in self.variables:
+            f = cpt[v]
+            forma_padres = f.tabla.shape[1:]
+            self.padres[v] = np.array([self.columna[p] for p in padres[v]], dtype=np.intp)
+            self.pasos[v] = np.array([int(np.prod(forma_padres[i + 1:], dtype=np.int64))
+                                      for i in range(len(forma_padres))], dtype=np.intp)
+            tabla = np.moveaxis(f.tabla, 0, -1).reshape(-1, self.tamanos[v])
+            self.tablas[v] = tabla
+            # Umbrales por valor (valores x configuraciones), contiguos para leer por columna
+            self.acumuladas[v] = np.ascontiguousarray(np.cumsum(tabla, axis=1).T)
+
+    def _configuracion(self, muestras, v):
+        """Fila de la CPT de v que corresponde a cada muestra (None si no tiene padres)."""
+        if len(self.padres[v]) == 0:
+            return None
+        fila = muestras[:, self.padres[v][0]] * self.pasos[v][0]
+        for c, paso in zip(self.padres[v][1:], self.pasos[v][1:]):
+            fila += muestras[:, c] * paso
+        return fila
+
+    def _sortear(self, v, fila, u):
+        """Índice del valor de v para cada uniforme u (búsqueda en la fila acumulada)."""
+        acumulada = self.acumuladas[v]
+        if fila is None:                         # Raíz: umbrales escalares
+            u = u * acumulada[-1, 0]
+            valor = (u >= acumulada[0, 0]).astype(np.intp)
+            for k in range(1, len(acumulada) - 1):
+                valor += u >= acumulada[k, 0]
+        else:
+            u = u * acumulada[-1][fila]          # Filas sin normalizar (o vacías)
+            valor = (u >= acumulada[0][fila]).astype(np.intp)
+            for k in range(1, len(acumulada) - 1):
+                valor += u >= acumulada[k][fila]
+        return valor
+
+    def muestrear(self, n, rng, evidencia=None):
+        """
+        Genera n muestras hacia adelante; la evidencia se fija y pondera.
+
+        Parámetros:
+            n:         Número de muestras               (int)
+            rng:       Generador aleatorio              (np.random.Generator)
+            evidencia: {variable: índice observado}     (dict, opcional)
+
+        Retorna:
+            (muestras n x variables, log pesos de cada muestra) (tuple)
+        """
+        evidencia = evidencia or {}
+        muestras = np.empty((n, len(self.variables)), dtype=np.intp, order="F")  # Columnas contiguas
+        log_pesos = np.zeros(n)
+        for v in self.variables:
+            fila = self._configuracion(muestras, v)
+            c = self.columna[v]
+            if v in evidencia:                   # Fija el valor y multiplica el peso
+                muestras[:, c] = evidencia[v]
+                probs = self.tablas[v][:, evidencia[v]]
+                with np.errstate(divide="ignore"):
+                    log_pesos += np.log(probs[0] if fila is None else probs[fila])
+            else:                                # Un sorteo categórico para todas las muestras
+                muestras[:, c] = self._sortear(v, fila, rng.random(n))
+        return muestras, log_pesos
+
+    def _conteos(self, muestras, pesos=None):
+        """Suma de pesos (o conteo) de cada valor, por variable."""
+        return {v: np.bincount(muestras[:, self.columna[v]], weights=pesos,
+                               minlength=self.tamanos[v]).astype(float)
+                for v in self.variables}
+
+    def ponderacion_verosimilitud(self, n_muestras, evidencia=None, semilla=None, tam_lote=100000):
+        """
+        Marginales P(variable | evidencia) por ponderación de verosimilitud.
+
+        Parámetros:
+            n_muestras: Número total de muestras        (int)
+            evidencia:  {variable: índice observado}    (dict, opcional)
+            semilla:    Semilla del generador           (int, opcional)
+            tam_lote:   Muestras por lote vectorizado   (int)
+
+        Retorna:
+            dict con "marginales" {variable: ndarray} y "ess" (tamaño efectivo
+            de muestra de Kish, (suma w)^2 / suma w^2)
+        """
+        rng = np.random.default_rng(semilla)
+        sumas = {v: np.zeros(self.tamanos[v]) for v in self.variables}
+        escala = -np.inf                         # Máximo log peso visto (para reescalar)
+        suma_w = suma_w2 = 0.0
+        for inicio in range(0, n_muestras, tam_lote):
+            muestras, log_pesos = self.muestrear(min(tam_lote, n_muestras - inicio), rng, evidencia)
+            maximo = log_pesos.max()
+            if maximo == -np.inf:                # Lote entero incompatible con la evidencia
+                continue
+            if maximo > escala:                  # Reescala lo acumulado al nuevo máximo
+                factor = np.exp(escala - maximo)
+                for v in sumas:
+                    sumas[v] *= factor
+                suma_w *= factor
+                suma_w2 *= factor ** 2
+                escala = maximo
+            pesos = np.exp(log_pesos - escala)
+            for v, conteo in self._conteos(muestras, pesos).items():
+                sumas[v] += conteo
+            suma_w += pesos.sum()
+            suma_w2 += (pesos ** 2).sum()
+        marginales = {v: s / suma_w if suma_w > 0 else s for v, s in sumas.items()}
+        return {"marginales": marginales, "ess": suma_w ** 2 / suma_w2 if suma_w2 > 0 else 0.0}
+
+    def rechazo(self, n_muestras, evidencia=None, semilla=None, tam_lote=100000):
+        """
+        Marginales P(variable | evidencia) por muestreo con rechazo.
+
+        Parámetros:
+            n_muestras: Número total de muestras generadas (int)
+            evidencia:  {variable: índice observado}    (dict, opcional)
+            semilla:    Semilla del generador           (int, opcional)
+            tam_lote:   Muestras por lote vectorizado   (int)
+
+        Retorna:
+            dict con "marginales" {variable: ndarray} y "aceptadas" (int)
+        """
+        evidencia = evidencia or {}
+        rng = np.random.default_rng(semilla)
+        sumas = {v: np.zeros(self.tamanos[v]) for v in self.variables}
+        aceptadas = 0
+        for inicio in range(0, n_muestras, tam_lote):
+            muestras, _ = self.muestrear(min(tam_lote, n_muestras - inicio), rng)
+            consistentes = np.ones(len(muestras), dtype=bool)
+            for v, indice in evidencia.items():
+                consistentes &= muestras[:, self.columna[v]] == indice
+            muestras = muestras[consistentes]
+            aceptadas += len(muestras)
+            for v, conteo in self._conteos(muestras).items():
+                sumas[v] += conteo
+        marginales = {v: s / aceptadas if aceptadas else s for v, s in sumas.items()}
+        return {"marginales": marginales, "aceptadas": aceptadas}
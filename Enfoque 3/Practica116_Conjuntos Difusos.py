@@ -18,6 +18,7 @@ Este código incluye:
 from typing import Dict, List, Tuple, Callable                  # Importa tipos para type hints
 import numpy as np                                             # Para operaciones numéricas
 import matplotlib.pyplot as plt                                # Para graficar funciones
+from motor_difuso import MotorDifuso, triangular, trapezoidal  # Motor compilado y funciones vectorizadas
 
 # =============================================================================
 # 1. DEFINICIÓN DE CONJUNTOS DIFUSOS
@@ -51,13 +52,8 @@ class FuzzySet:
         return ax
 
 # Funciones de pertenencia comunes
-def triangular(a: float, b: float, c: float) -> Callable[[float], float]:
-    """Crea una función de pertenencia triangular"""
-    return lambda x: max(min((x-a)/(b-a), (c-x)/(c-b)), 0)    # Función triangular con vértices a,b,c
-
-def trapezoidal(a: float, b: float, c: float, d: float) -> Callable[[float], float]:
-    """Crea una función de pertenencia trapezoidal"""
-    return lambda x: max(min((x-a)/(b-a), 1, (d-x)/(d-c)), 0) # Función trapezoidal con puntos a,b,c,d
+# triangular(a, b, c) y trapezoidal(a, b, c, d) vienen de motor_difuso: aceptan
+# escalares o arreglos y hombros verticales como triangular(0, 0, 5)
 
 def gaussian(mean: float, sigma: float) -> Callable[[float], float]:
     """Crea una función de pertenencia gaussiana"""
@@ -104,71 +100,45 @@ class FuzzyInferenceSystem:
         self.input_sets: Dict[str, Dict[str, FuzzySet]] = {}   # Variables de entrada {var: {set: FuzzySet}}
         self.output_sets: Dict[str, Dict[str, FuzzySet]] = {}  # Variables de salida {var: {set: FuzzySet}}
         self.rules: List[str] = []                             # Lista de reglas en formato "IF X THEN Y"
+        self._engine = None                                    # Motor compilado (se rehace si el sistema cambia)
     
     def add_input_variable(self, name: str, sets: Dict[str, FuzzySet]):
         """Añade una variable de entrada con sus conjuntos difusos"""
         self.input_sets[name] = sets                           # Almacena conjuntos por nombre de variable
+        self._engine = None                                    # Invalida el motor compilado
     
     def add_output_variable(self, name: str, sets: Dict[str, FuzzySet]):
         """Añade una variable de salida con sus conjuntos difusos"""
         self.output_sets[name] = sets                          # Almacena conjuntos por nombre de variable
+        self._engine = None                                    # Invalida el motor compilado
     
     def add_rule(self, rule: str):
         """Añade una regla difusa"""
         self.rules.append(rule)                                # Agrega regla a la lista
+        self._engine = None                                    # Invalida el motor compilado
+    
+    def compile(self, points: int = 100) -> MotorDifuso:
+        """Analiza las reglas una vez y precalcula las curvas de salida"""
+        self._engine = MotorDifuso(
+            {var: {name: s.membership_func for name, s in sets.items()}
+             for var, sets in self.input_sets.items()},
+            {var: (next(iter(sets.values())).domain,           # Dominio del primer conjunto
+                   {name: s.membership_func for name, s in sets.items()})
+             for var, sets in self.output_sets.items()},
+            self.rules, points)
+        return self._engine
     
     def evaluate(self, inputs: Dict[str, float]) -> Dict[str, float]:
         """
         Evalúa el sistema con valores de entrada concretos.
         """
-        # 1. Fuzzificación
-        fuzzified = {}                                         # Diccionario para resultados
-        for var, value in inputs.items():                      # Para cada variable de entrada
-            fuzzified[var] = {}                                # Inicializa sub-diccionario
-            for set_name, set_ in self.input_sets[var].items(): # Para cada conjunto difuso
-                fuzzified[var][set_name] = set_(value)         # Calcula grado de pertenencia
-        
-        # 2. Evaluación de reglas
-        rule_outputs = []                                      # Almacena salidas de reglas
-        for rule in self.rules:                                # Para cada regla
-            if "AND" in rule:                                  # Si es regla con AND
-                parts = rule.split(" AND ")                    # Divide la regla
-                # Evaluar condiciones
-                activation = min(                             # Toma el mínimo (AND difuso)
-                    fuzzified[parts[0].split()[1]][parts[0].split()[0]],  # Valor primer conjunto
-                    fuzzified[parts[1].split()[1]][parts[1].split()[0]]   # Valor segundo conjunto
-                )
-            else:                                              # Si es regla simple
-                part = rule.split("IF ")[1].split(" THEN")[0]  # Extrae parte de condición
-                var, set_name = part.split()                   # Separa variable y conjunto
-                activation = fuzzified[var][set_name]          # Obtiene grado de pertenencia
-            
-            # Obtener conjunto de salida
-            output_part = rule.split("THEN ")[1]               # Extrae parte de conclusión
-            output_var, output_set = output_part.split()       # Separa variable y conjunto de salida
-            rule_outputs.append((output_var, output_set, activation))  # Guarda resultado
-        
-        # 3. Agregación y 4. Defuzzificación
-        outputs = {}                                           # Diccionario para resultados finales
-        for var in self.output_sets:                           # Para cada variable de salida
-            # Crear conjunto agregado
-            x_vals = np.linspace(*self.output_sets[var][list(self.output_sets[var].keys())[0]].domain, 100)
-            aggregated = np.zeros_like(x_vals)                 # Inicializa array de ceros
-            
-            for output_var, output_set, activation in rule_outputs:  # Para cada salida de regla
-                if output_var == var:                           # Si corresponde a esta variable
-                    y_vals = [min(activation, self.output_sets[var][output_set](x)) for x in x_vals]
-                    aggregated = np.maximum(aggregated, y_vals)  # Agrega con operador máximo
-            
-            # Calcular centroide (defuzzificación)
-            if np.sum(aggregated) > 0:                         # Si hay área bajo la curva
-                centroid = np.sum(x_vals * aggregated) / np.sum(aggregated)  # Calcula centro de masa
-            else:
-                centroid = np.mean(x_vals)                     # Valor medio como fallback
-            
-            outputs[var] = centroid                            # Almacena resultado
-        
-        return outputs                                         # Retorna valores defuzzificados
+        return (self._engine or self.compile()).evaluar(inputs)  # Lote de tamaño 1
+    
+    def evaluate_batch(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Evalúa muchas entradas a la vez: {variable: arreglo de N valores}.
+        """
+        return (self._engine or self.compile()).evaluar_lote(inputs)
 
 # =============================================================================
 # 4. EJEMPLOS DE APLICACIÓN
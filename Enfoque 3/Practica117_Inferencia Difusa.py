@@ -16,8 +16,10 @@ Este código implementa:
 """
 
 from typing import Dict, List, Tuple, Callable
+import time
 import numpy as np
 import matplotlib.pyplot as plt
+from motor_difuso import MotorDifuso, triangular, trapezoidal
 
 # =============================================================================
 # 1. DEFINICIÓN DE CONJUNTOS DIFUSOS
@@ -55,14 +57,8 @@ class ConjuntoDifuso:
         ax.legend()
         return ax
 
-# Funciones de pertenencia predefinidas
-def triangular(a: float, b: float, c: float) -> Callable[[float], float]:
-    """Genera función de pertenencia triangular"""
-    return lambda x: max(min((x-a)/(b-a), (c-x)/(c-b)), 0)
-
-def trapezoidal(a: float, b: float, c: float, d: float) -> Callable[[float], float]:
-    """Genera función de pertenencia trapezoidal"""
-    return lambda x: max(min((x-a)/(b-a), 1, (d-x)/(d-c)), 0)
+# Funciones de pertenencia predefinidas: triangular y trapezoidal de motor_difuso
+# (vectorizadas, admiten hombros verticales como triangular(0, 0, 5))
 
 # =============================================================================
 # 2. MOTOR DE INFERENCIA DIFUSA
@@ -82,18 +78,36 @@ class SistemaInferenciaDifusa:
         self.entradas: Dict[str, Dict[str, ConjuntoDifuso]] = {}
         self.salidas: Dict[str, Dict[str, ConjuntoDifuso]] = {}
         self.reglas: List[str] = []
+        self.motor = None  # Motor compilado (se rehace si cambian variables o reglas)
     
     def agregar_variable_entrada(self, nombre: str, conjuntos: Dict[str, ConjuntoDifuso]):
         """Registra una variable de entrada con sus conjuntos difusos"""
         self.entradas[nombre] = conjuntos
+        self.motor = None
     
     def agregar_variable_salida(self, nombre: str, conjuntos: Dict[str, ConjuntoDifuso]):
         """Registra una variable de salida con sus conjuntos difusos"""
         self.salidas[nombre] = conjuntos
+        self.motor = None
     
     def agregar_regla(self, regla: str):
         """Añade una regla difusa al sistema"""
         self.reglas.append(regla)
+        self.motor = None
+    
+    def compilar(self, puntos: int = 100) -> MotorDifuso:
+        """
+        Analiza las reglas una sola vez y precalcula las curvas de salida
+        sobre una malla de `puntos` valores.
+        """
+        self.motor = MotorDifuso(
+            {var: {nombre: c.funcion for nombre, c in conjuntos.items()}
+             for var, conjuntos in self.entradas.items()},
+            {var: (next(iter(conjuntos.values())).dominio,
+                   {nombre: c.funcion for nombre, c in conjuntos.items()})
+             for var, conjuntos in self.salidas.items()},
+            self.reglas, puntos)
+        return self.motor
     
     def evaluar(self, valores_entrada: Dict[str, float]) -> Dict[str, float]:
         """
@@ -103,53 +117,19 @@ class SistemaInferenciaDifusa:
         3. Agregación de resultados
         4. Defuzzificación
         """
-        # Paso 1: Fuzzificación
-        valores_difusos = {}
-        for var, valor in valores_entrada.items():
-            valores_difusos[var] = {}
-            for nombre, conjunto in self.entradas[var].items():
-                valores_difusos[var][nombre] = conjunto.calcular_pertenencia(valor)
-        
-        # Paso 2: Evaluación de reglas
-        activaciones = []
-        for regla in self.reglas:
-            # Parseo simplificado de reglas
-            partes = regla.split()
-            var_entrada = partes[1]
-            conjunto_entrada = partes[2]
-            var_salida = partes[5]
-            conjunto_salida = partes[6]
-            
-            # Obtener grado de activación
-            grado = valores_difusos[var_entrada][conjunto_entrada]
-            activaciones.append((var_salida, conjunto_salida, grado))
+        return (self.motor or self.compilar()).evaluar(valores_entrada)
+    
+    def evaluar_lote(self, valores_entrada: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Evalúa muchos controladores a la vez.
         
-        # Paso 3: Agregación y 4: Defuzzificación (centroide)
-        resultados = {}
-        for var in self.salidas:
-            # Generar universo de discurso
-            dominio = next(iter(self.salidas[var].values())).dominio
-            x = np.linspace(*dominio, 100)
-            
-            # Inicializar superficie de salida agregada
-            superficie_salida = np.zeros_like(x)
+        Args:
+            valores_entrada: {variable: arreglo con un valor por controlador}
             
-            # Aplicar todas las reglas relevantes
-            for var_salida, conjunto_salida, grado in activaciones:
-                if var_salida == var:
-                    conjunto = self.salidas[var][conjunto_salida]
-                    y = np.array([min(grado, conjunto.calcular_pertenencia(xi)) for xi in x])
-                    superficie_salida = np.maximum(superficie_salida, y)
-            
-            # Calcular centroide (defuzzificación)
-            if np.sum(superficie_salida) > 0:
-                centroide = np.sum(x * superficie_salida) / np.sum(superficie_salida)
-            else:
-                centroide = np.mean(dominio)
-            
-            resultados[var] = centroide
-        
-        return resultados
+        Returns:
+            {variable de salida: arreglo de valores defuzzificados}
+        """
+        return (self.motor or self.compilar()).evaluar_lote(valores_entrada)
 
 # =============================================================================
 # 3. EJEMPLO PRÁCTICO: CONTROL DE TEMPERATURA
@@ -262,7 +242,26 @@ def demostrar_sistema_propinas():
         resultado = fis.evaluar(caso)
         print(f"Servicio: {caso['servicio']}, Comida: {caso['comida']} -> Propina: {resultado['propina']:.1f}%")
 
+def demostrar_lote(n: int = 10000):
+    """Evalúa n controladores de propinas en un solo lote"""
+    fis = configurar_sistema_propinas()
+    rng = np.random.default_rng(0)
+    casos = {"servicio": rng.uniform(0, 10, n), "comida": rng.uniform(0, 10, n)}
+    
+    inicio = time.perf_counter()
+    propinas = fis.evaluar_lote(casos)["propina"]
+    t_lote = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for i in range(min(n, 1000)):
+        fis.evaluar({"servicio": casos["servicio"][i], "comida": casos["comida"][i]})
+    t_uno = (time.perf_counter() - inicio) / min(n, 1000)
+    
+    print(f"\nLote de {n} controladores: {t_lote * 1000:.1f} ms "
+          f"({t_uno * n * 1000:.1f} ms evaluando de uno en uno)")
+    print(f"Propina media: {propinas.mean():.1f}%, mín {propinas.min():.1f}%, máx {propinas.max():.1f}%")
+
 if __name__ == "__main__":
     print("=== SISTEMA DE INFERENCIA DIFUSA ===")
     demostrar_control_temperatura()
-    demostrar_sistema_propinas()
\ No newline at end of file
+    demostrar_sistema_propinas()
+    demostrar_lote()
\ No newline at end of file
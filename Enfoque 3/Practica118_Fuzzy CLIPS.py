@@ -14,6 +14,7 @@ Implementación de un sistema híbrido que combina:
 
 from typing import Dict, List, Tuple, Set, Callable, Union
 import numpy as np
+from motor_difuso import pertenencia_lote, triangular, trapezoidal
 
 # =============================================================================
 # 1. DEFINICIÓN DE LOS COMPONENTES BÁSICOS
@@ -38,14 +39,8 @@ class ConjuntoDifuso:
         """Calcula el grado de pertenencia para un valor x"""
         return self.funcion(x)
 
-# Funciones de pertenencia predefinidas
-def triangular(a: float, b: float, c: float) -> Callable[[float], float]:
-    """Crea una función de pertenencia triangular"""
-    return lambda x: max(min((x-a)/(b-a), (c-x)/(c-b)), 0)
-
-def trapezoidal(a: float, b: float, c: float, d: float) -> Callable[[float], float]:
-    """Crea una función de pertenencia trapezoidal"""
-    return lambda x: max(min((x-a)/(b-a), 1, (d-x)/(d-c)), 0)
+# Funciones de pertenencia predefinidas: triangular y trapezoidal de motor_difuso
+# (vectorizadas, admiten hombros verticales)
 
 # =============================================================================
 # 2. MOTOR DE INFERENCIA HÍBRIDO
@@ -62,12 +57,15 @@ class FuzzyCLIPS:
     def __init__(self):
         # Base de hechos tradicional
         self.hechos: Set[Hecho] = set()
+        self.indice_hechos: Set[Tuple[str, str]] = set()  # (nombre, valor) para búsqueda O(1)
         
-        # Variables difusas y sus conjuntos
+        # Variables difusas, sus conjuntos y su valor nítido actual
         self.variables_difusas: Dict[str, Dict[str, ConjuntoDifuso]] = {}
+        self.valores: Dict[str, float] = {}
         
-        # Reglas del sistema (parte izquierda y derecha)
+        # Reglas del sistema (parte izquierda y derecha) y su forma ya analizada
         self.reglas: List[Tuple[List[str], List[str]]] = []
+        self.reglas_compiladas: List[Tuple[List[tuple], List[tuple]]] = []
         
         # Parámetros del sistema
         self.umbral_activacion: float = 0.5
@@ -75,6 +73,13 @@ class FuzzyCLIPS:
     def agregar_hecho(self, hecho: Hecho):
         """Añade un hecho a la base de conocimiento"""
         self.hechos.add(hecho)
+        self.indice_hechos.add((hecho.nombre, str(hecho.valor)))
+    
+    def establecer_valor(self, variable: str, valor: float):
+        """Fija el valor nítido actual de una variable difusa"""
+        if variable not in self.variables_difusas:
+            raise ValueError(f"Variable difusa no definida: {variable}")
+        self.valores[variable] = valor
     
     def definir_variable_difusa(self, nombre: str, conjuntos: Dict[str, ConjuntoDifuso]):
         """Registra una variable difusa con sus conjuntos"""
@@ -89,6 +94,42 @@ class FuzzyCLIPS:
             consecuente: Lista de acciones/conclusiones
         """
         self.reglas.append((antecedente, consecuente))
+        self.reglas_compiladas.append(([self.compilar_condicion(c) for c in antecedente],
+                                       [self.compilar_accion(a) for a in consecuente]))
+    
+    def compilar_condicion(self, condicion: str) -> tuple:
+        """
+        Analiza una condición una sola vez:
+        - ("hecho", nombre, valor)          para "(nombre valor)"
+        - ("difusa", variable, conjunto)    para "variable ES conjunto"
+        - ("comparacion", izq, op, der)     para "a > b" o "a < b"
+        - ("falsa",)                        si no se reconoce
+        """
+        if condicion.startswith("(") and condicion.endswith(")"):
+            nombre, valor = condicion[1:-1].split()
+            return ("hecho", nombre, valor)
+        elif " ES " in condicion:
+            variable, _, conjunto = condicion.partition(" ES ")
+            return ("difusa", variable, conjunto)
+        for op in (">", "<"):
+            if op in condicion:
+                izq, der = condicion.split(op)
+                return ("comparacion", izq.strip(), op, der.strip())
+        return ("falsa",)
+    
+    def compilar_accion(self, accion: str) -> tuple:
+        """Analiza una acción: ("assert", nombre, valor), ("difusa", variable, conjunto) u ("otra", texto)"""
+        if accion.startswith("(assert ") and accion.endswith(")"):
+            nombre, valor = accion[8:-1].split()
+            return ("assert", nombre, valor)
+        elif " ES " in accion:
+            variable, _, conjunto = accion.partition(" ES ")
+            return ("difusa", variable, conjunto)
+        return ("otra", accion)
+    
+    def _operando(self, texto: str) -> float:
+        """Valor de una variable difusa conocida o número literal"""
+        return self.valores[texto] if texto in self.valores else float(texto)
     
     def fuzzificar(self, variable: str, valor: float) -> Dict[str, float]:
         """
@@ -116,42 +157,66 @@ class FuzzyCLIPS:
         - Condición difusa
         - Comparación numérica
         """
+        return self.evaluar_compilada(self.compilar_condicion(condicion))
+    
+    def evaluar_compilada(self, condicion: tuple) -> float:
+        """Evalúa una condición ya analizada con compilar_condicion"""
+        tipo = condicion[0]
+        
         # Caso 1: Hecho booleano tradicional (ej. "(hecho verdadero)")
-        if condicion.startswith("(") and condicion.endswith(")"):
-            nombre, valor = condicion[1:-1].split()
-            for hecho in self.hechos:
-                if hecho.nombre == nombre and str(hecho.valor) == valor:
-                    return 1.0
-            return 0.0
+        if tipo == "hecho":
+            return 1.0 if condicion[1:] in self.indice_hechos else 0.0
         
         # Caso 2: Condición difusa (ej. "temperatura ES caliente")
-        elif " ES " in condicion:
-            variable, _, conjunto = condicion.partition(" ES ")
-            if variable in self.variables_difusas and conjunto in self.variables_difusas[variable]:
-                # Esto sería reemplazado por el valor actual de la variable
-                # En una implementación real necesitaríamos el valor actual
-                return 0.5  # Valor de ejemplo
-            else:
+        elif tipo == "difusa":
+            _, variable, conjunto = condicion
+            conjuntos = self.variables_difusas.get(variable, {})
+            if conjunto not in conjuntos:
                 return 0.0
+            if variable not in self.valores:
+                return 0.5  # Sin valor actual de la variable: grado neutro
+            return float(conjuntos[conjunto].pertenencia(self.valores[variable]))
         
         # Caso 3: Comparación numérica (ej. "valor > 10")
-        elif ">" in condicion:
-            var, val = condicion.split(">")
-            # Implementación simplificada
-            return 1.0 if float(var) > float(val) else 0.0
-        elif "<" in condicion:
-            var, val = condicion.split("<")
-            return 1.0 if float(var) < float(val) else 0.0
+        elif tipo == "comparacion":
+            _, izq, op, der = condicion
+            a, b = self._operando(izq), self._operando(der)
+            return 1.0 if (a > b if op == ">" else a < b) else 0.0
         
         return 0.0
     
+    def activaciones_lote(self, valores: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Grado de activación de cada regla para N conjuntos de valores nítidos
+        a la vez (p. ej. N controladores que comparten la base de hechos).
+        
+        Args:
+            valores: {variable difusa: arreglo de N valores}
+            
+        Returns:
+            Matriz (N x reglas) de activaciones (mínimo del antecedente)
+        """
+        n = len(next(iter(valores.values()))) if valores else 1
+        activaciones = np.ones((n, len(self.reglas_compiladas)))
+        for r, (antecedente, _) in enumerate(self.reglas_compiladas):
+            for condicion in antecedente:
+                if condicion[0] == "difusa" and condicion[1] in valores:
+                    _, variable, conjunto = condicion
+                    funcion = self.variables_difusas.get(variable, {}).get(conjunto)
+                    grado = (pertenencia_lote(funcion.funcion, np.asarray(valores[variable], dtype=float))
+                             if funcion else 0.0)
+                else:  # Condiciones que no dependen del lote
+                    grado = self.evaluar_compilada(condicion)
+                np.minimum(activaciones[:, r], grado, out=activaciones[:, r])
+        return activaciones
+    
     def ejecutar(self):
         """Ejecuta el ciclo de inferencia del sistema"""
-        for antecedente, consecuente in self.reglas:
+        for antecedente, consecuente in self.reglas_compiladas:
             # Evaluar todas las condiciones del antecedente
             activacion = 1.0
             for cond in antecedente:
-                grado = self.evaluar_condicion(cond)
+                grado = self.evaluar_compilada(cond)
                 activacion = min(activacion, grado)
                 if activacion == 0:
                     break  # No point continuing if any condition fails
@@ -160,29 +225,29 @@ class FuzzyCLIPS:
             if activacion >= self.umbral_activacion:
                 self.ejecutar_consecuente(consecuente, activacion)
     
-    def ejecutar_consecuente(self, acciones: List[str], grado_activacion: float):
+    def ejecutar_consecuente(self, acciones: List[Union[str, tuple]], grado_activacion: float):
         """
         Ejecuta las acciones de la parte derecha de una regla
         
         Args:
-            acciones: Lista de acciones a ejecutar
+            acciones: Lista de acciones (texto o ya analizadas con compilar_accion)
             grado_activacion: Grado con el que se activó la regla
         """
         for accion in acciones:
+            if isinstance(accion, str):
+                accion = self.compilar_accion(accion)
+            
             # Caso 1: Añadir hecho tradicional
-            if accion.startswith("(assert ") and accion.endswith(")"):
-                hecho_str = accion[8:-1]
-                nombre, valor = hecho_str.split()
-                self.agregar_hecho(Hecho(nombre, valor))
+            if accion[0] == "assert":
+                self.agregar_hecho(Hecho(accion[1], accion[2]))
             
             # Caso 2: Modificar variable difusa (simplificado)
-            elif " ES " in accion:
-                variable, _, conjunto = accion.partition(" ES ")
-                print(f"Establecer {variable} a {conjunto} con grado {grado_activacion}")
+            elif accion[0] == "difusa":
+                print(f"Establecer {accion[1]} a {accion[2]} con grado {grado_activacion}")
             
             # Otros casos podrían incluir acciones de salida, etc.
             else:
-                print(f"Ejecutando acción: {accion}")
+                print(f"Ejecutando acción: {accion[1]}")
 
 # =============================================================================
 # 3. EJEMPLOS DE USO
@@ -222,9 +287,18 @@ def ejemplo_control_clima():
         ["(assert ventanas cerradas)", "activar calefaccion"]
     )
     
-    # 4. Ejecutar el sistema (simulación)
+    # 4. Ejecutar el sistema con las lecturas actuales
     print("\nEjecutando sistema de control climático...")
+    sistema.establecer_valor("temperatura", 32)
+    sistema.establecer_valor("humedad", 85)
     sistema.ejecutar()
+    
+    # 5. Activación de las reglas para varios sensores a la vez
+    lecturas = {"temperatura": np.array([18.0, 26.0, 32.0, 38.0]),
+                "humedad": np.array([40.0, 70.0, 85.0, 95.0])}
+    activaciones = sistema.activaciones_lote(lecturas)
+    for i, (t, h) in enumerate(zip(lecturas["temperatura"], lecturas["humedad"])):
+        print(f"Sensor {i}: {t:.0f}°C, {h:.0f}% -> activación de reglas {np.round(activaciones[i], 2)}")
 
 def ejemplo_diagnostico_medico():
     """Sistema de diagnóstico médico con componentes difusos y booleanos"""
@@ -4,8 +4,12 @@
 from typing import Dict, List, Set, Optional, Tuple, Callable  # Tipos para type hints
 from dataclasses import dataclass                             # Para clases de datos
 from enum import Enum, auto                                   # Para enumeraciones
-import heapq                                                  # Para colas de prioridad
 from collections import deque                                 # Para colas FIFO
+import os                                                     # Rutas de módulos
+import sys                                                    # Ruta de importación
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Enfoque 1"))
+from busqueda_informada import MotorBusqueda                  # Motor A*/UCS/voraz compartido
 
 class TipoBusqueda(Enum):                                     # Enumeración de algoritmos
     """Tipos de algoritmos de búsqueda en espacio de estados"""
@@ -195,40 +199,50 @@ class BuscadorEspacioEstados:                               # Clase buscador
         
         return None                                         # No solución
     
-    def _busqueda_costo_uniforme(self, max_estados: int) -> Optional[Estado]: # UCS
+    def _busqueda_mejor_primero(self, max_estados: int, modo: str) -> Optional[Estado]: # Motor
         """
-        Búsqueda de costo uniforme (UCS) - óptima para costos variables
+        Ejecuta el motor compartido y enlaza el camino encontrado como Estados
         
         Args:
             max_estados (int): Límite de estados a generar # Límite
+            modo (str): "uniforme", "voraz" o "a*"         # Prioridad usada
             
         Returns:
             Optional[Estado]: Estado objetivo o None       # Solución
         """
-        frontera = []                                      # Cola de prioridad
-        heapq.heappush(frontera, (0, self.problema.estado_inicial)) # Iniciar con costo 0
-        
-        explorados = {}                                    # Diccionario de explorados
-        explorados[self.problema.estado_inicial.id] = 0    # Guardar costo inicial
+        problema = self.problema                           # Problema a resolver
+        
+        def sucesores(estado):                             # (acción, sucesor, costo)
+            for accion, sucesor in problema.sucesores(estado):
+                yield accion, sucesor, problema.costo_accion(estado, accion, sucesor)
+        
+        motor = MotorBusqueda(sucesores, problema.heuristica, modo, # Estados internados
+                              clave=lambda estado: estado.id)       # por su id
+        meta = motor.buscar(problema.estado_inicial, problema.es_objetivo, max_estados)
+        problema.estados_generados = motor.generados       # Actualizar contador
+        if meta is None:
+            return None                                     # No solución
+        
+        anterior = None                                    # Sólo el camino final se
+        for nodo in motor.nodos_camino(meta):              # materializa con padres
+            estado = motor.estados[nodo]
+            estado.padre = anterior                        # Asignar padre
+            estado.accion = motor.acciones[motor.accion[nodo]] if anterior else None
+            estado.costo = motor.g[nodo]                   # Costo acumulado
+            anterior = estado
+        return anterior                                    # Estado objetivo
+    
+    def _busqueda_costo_uniforme(self, max_estados: int) -> Optional[Estado]: # UCS
+        """
+        Búsqueda de costo uniforme (UCS) - óptima para costos variables
         
-        while frontera and self.problema.estados_generados < max_estados: # Mientras haya frontera
-            _, estado_actual = heapq.heappop(frontera)      # Sacar de menor costo
-            
-            if self.problema.es_objetivo(estado_actual):   # Si es objetivo
-                return estado_actual                       # Retornar solución
+        Args:
+            max_estados (int): Límite de estados a generar # Límite
             
-            for accion, sucesor in self.problema.sucesores(estado_actual): # Sucesores
-                nuevo_costo = estado_actual.costo + self.problema.costo_accion(estado_actual, accion, sucesor) # Calcular costo
-                
-                if sucesor.id not in explorados or nuevo_costo < explorados[sucesor.id]: # Si es mejor
-                    explorados[sucesor.id] = nuevo_costo    # Actualizar costo
-                    sucesor.costo = nuevo_costo             # Asignar costo
-                    sucesor.padre = estado_actual           # Asignar padre
-                    sucesor.accion = accion                 # Asignar acción
-                    heapq.heappush(frontera, (nuevo_costo, sucesor)) # Añadir a frontera
-                    self.problema.estados_generados += 1    # Incrementar contador
-        
-        return None                                         # No solución
+        Returns:
+            Optional[Estado]: Estado objetivo o None       # Solución
+        """
+        return self._busqueda_mejor_primero(max_estados, "uniforme") # f = g
     
     def _busqueda_avara(self, max_estados: int) -> Optional[Estado]: # Avara
         """
@@ -240,26 +254,7 @@ class BuscadorEspacioEstados:                               # Clase buscador
         Returns:
             Optional[Estado]: Estado objetivo o None       # Solución
         """
-        frontera = []                                      # Cola de prioridad
-        heapq.heappush(frontera, (self.problema.heuristica(self.problema.estado_inicial), self.problema.estado_inicial)) # Iniciar con heurística
-        
-        explorados = set()                                 # Conjunto de explorados
-        explorados.add(self.problema.estado_inicial.id)    # Marcar inicial como explorado
-        
-        while frontera and self.problema.estados_generados < max_estados: # Mientras haya frontera
-            _, estado_actual = heapq.heappop(frontera)     # Sacar mejor heurística
-            
-            if self.problema.es_objetivo(estado_actual):   # Si es objetivo
-                return estado_actual                       # Retornar solución
-            
-            for accion, sucesor in self.problema.sucesores(estado_actual): # Sucesores
-                if sucesor.id not in explorados:           # Si no explorado
-                    explorados.add(sucesor.id)              # Marcar como explorado
-                    h = self.problema.heuristica(sucesor)   # Calcular heurística
-                    heapq.heappush(frontera, (h, sucesor))  # Añadir a frontera
-                    self.problema.estados_generados += 1    # Incrementar contador
-        
-        return None                                         # No solución
+        return self._busqueda_mejor_primero(max_estados, "voraz")    # f = h
     
     def _busqueda_a_estrella(self, max_estados: int) -> Optional[Estado]: # A*
         """
@@ -271,32 +266,7 @@ class BuscadorEspacioEstados:                               # Clase buscador
         Returns:
             Optional[Estado]: Estado objetivo o None       # Solución
         """
-        frontera = []                                      # Cola de prioridad
-        f = self.problema.heuristica(self.problema.estado_inicial) # f = h (g=0 inicial)
-        heapq.heappush(frontera, (f, self.problema.estado_inicial)) # Iniciar con f
-        
-        explorados = {}                                    # Diccionario de explorados
-        explorados[self.problema.estado_inicial.id] = 0    # Guardar costo inicial
-        
-        while frontera and self.problema.estados_generados < max_estados: # Mientras haya frontera
-            _, estado_actual = heapq.heappop(frontera)      # Sacar menor f
-            
-            if self.problema.es_objetivo(estado_actual):    # Si es objetivo
-                return estado_actual                       # Retornar solución
-            
-            for accion, sucesor in self.problema.sucesores(estado_actual): # Sucesores
-                nuevo_costo = estado_actual.costo + self.problema.costo_accion(estado_actual, accion, sucesor) # Calcular g
-                
-                if sucesor.id not in explorados or nuevo_costo < explorados[sucesor.id]: # Si es mejor
-                    explorados[sucesor.id] = nuevo_costo    # Actualizar costo
-                    sucesor.costo = nuevo_costo             # Asignar costo
-                    sucesor.padre = estado_actual           # Asignar padre
-                    sucesor.accion = accion                 # Asignar acción
-                    f = nuevo_costo + self.problema.heuristica(sucesor) # f = g + h
-                    heapq.heappush(frontera, (f, sucesor))  # Añadir a frontera
-                    self.problema.estados_generados += 1    # Incrementar contador
-        
-        return None                                         # No solución
+        return self._busqueda_mejor_primero(max_estados, "a*")       # f = g + h
     
     def reconstruir_camino(self, estado: Estado) -> List[Tuple[str, Estado]]: # Reconstruir
         """
@@ -5,7 +5,16 @@ from typing import Dict, List, Optional, Set, Tuple      # Type hints for better
 from dataclasses import dataclass                        # Decorator for creating classes with less boilerplate
 from enum import Enum, auto                              # For creating enumerations
 import math                                              # Mathematical functions
+import os                                                # Path to the shared inference modules
 import random                                            # Random number generation
+import sys                                               # Module search path
+
+import numpy as np                                       # Dense probability tables
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Enfoque 2"))
+from arbol_uniones import ArbolUniones                   # Compiled junction tree
+from cadenas_gibbs import MuestreadorGibbs               # Vectorized multi-chain Gibbs
+from factores import Factor                              # NumPy factors with named axes
 
 class TipoVariable(Enum):                                # Enumeration for variable types
     """Tipos de variables en el modelo probabilista"""   # Docstring for the enum
@@ -57,6 +66,8 @@ class ModeloProbabilista:                                # Main probabilistic mo
         self.observaciones: Dict[str, Observacion] = {}  # Dictionary of observations
         self.utilidades: Dict[Tuple, float] = {}         # Utility functions
         self.historial: List[str] = []                   # Operation history log
+        self._arbol: Optional[ArbolUniones] = None       # Compiled junction tree (lazy)
+        self.diagnostico_mcmc: Dict[str, object] = {}    # R-hat/ESS of the last MCMC run
     
     def agregar_variable(self, var: Variable) -> bool:   # Add variable method
         """
@@ -73,6 +84,7 @@ class ModeloProbabilista:                                # Main probabilistic mo
                 return False                           # Return failure
                 
         self.variables[var.nombre] = var               # Add variable to dictionary
+        self._arbol = None                             # Network changed: recompile
         self.historial.append(f"Añadida variable {var.nombre}")  # Log operation
         return True                                    # Return success
     
@@ -137,7 +149,10 @@ class ModeloProbabilista:                                # Main probabilistic mo
     
     def _inferencia_enum(self, objetivo: str) -> Dict[str, float]:  # Exact inference
         """
-        Inferencia por enumeración exacta (método exacto pero costoso)  # Method docstring
+        Inferencia exacta sobre el árbol de uniones compilado  # Method docstring
+        
+        La red se compila una sola vez; entre consultas sólo se recalculan los
+        mensajes afectados por las observaciones que cambiaron.
         
         Args:
             objetivo (str): Variable objetivo
@@ -145,33 +160,66 @@ class ModeloProbabilista:                                # Main probabilistic mo
         Returns:
             Dict[str, float]: Distribución de probabilidad
         """
-        var = self.variables[objetivo]               # Get target variable
-        prob = {valor: 0.0 for valor in var.dominio} # Initialize probabilities
-        total = 0.0                                  # Normalization factor
+        arbol = self._compilar()                     # Build or reuse the tree
+        for v in list(arbol.verosimilitud):          # Drop retracted observations
+            if v not in self.observaciones:
+                arbol.observar_verosimilitud(v, None)
+        for v, obs in self.observaciones.items():    # Sync current observations
+            arbol.observar_verosimilitud(v, self._vector_observacion(obs))
+        
+        marginal = arbol.marginal(objetivo)          # Cached after calibration
+        return dict(zip(self.variables[objetivo].dominio, marginal.tolist()))
+    
+    def _compilar(self) -> ArbolUniones:             # Compile network
+        """
+        Convierte cada variable en un factor y compila el árbol de uniones  # Method docstring
         
-        vars_ocultas = [v for v in self.variables if v not in self.observaciones and v != objetivo]  # Hidden vars
+        Returns:
+            ArbolUniones: Árbol compilado (se reutiliza hasta que cambie la red)
+        """
+        if self._arbol is None:
+            self._arbol = ArbolUniones(self._factores())
+        return self._arbol
+    
+    def _factores(self) -> List[Factor]:             # Network as factors
+        """
+        Convierte la tabla de cada variable en un Factor (ejes: variable, padres...)  # Method docstring
         
-        from itertools import product                # Import for Cartesian product
-        for valores_ocultas in product(*[self.variables[v].dominio for v in vars_ocultas]):  # All combinations
-            asignacion = {}                         # Current assignment
-            for i, v in enumerate(vars_ocultas):    # Build full assignment
-                asignacion[v] = valores_ocultas[i]
-            for v, obs in self.observaciones.items():  # Add observations
-                asignacion[v] = obs.valor
-                
-            p_conjunta = self._probabilidad_conjunta(asignacion)  # Joint probability
+        Returns:
+            List[Factor]: Un factor por variable
+        """
+        factores = []
+        for var in self.variables.values():         # One CPT per variable
+            forma = [len(var.dominio)] + [len(self.variables[p].dominio) for p in var.padres]
+            if not var.distribucion:            # No distribution (decisions): uniform
+                tabla = np.full(forma, 1.0 / len(var.dominio))
+            else:                               # Missing parent rows stay at zero
+                tabla = np.zeros(forma)
+                for padres_vals, probs in var.distribucion.items():
+                    try:
+                        fila = tuple(self.variables[p].dominio.index(val)
+                                     for p, val in zip(var.padres, padres_vals))
+                    except ValueError:          # Row for a value outside the domain
+                        continue
+                    tabla[(slice(None),) + fila] = probs
+            factores.append(Factor([var.nombre] + var.padres, tabla))
+        return factores
+    
+    def _vector_observacion(self, obs: Observacion) -> np.ndarray:  # Evidence vector
+        """
+        Verosimilitud de una observación sobre el dominio de su variable  # Method docstring
+        
+        Args:
+            obs (Observacion): Observación registrada
             
-            for valor in var.dominio:               # For each target value
-                asignacion[objetivo] = valor        # Set target value
-                p_cond = self._probabilidad_conjunta(asignacion) / p_conjunta if p_conjunta > 0 else 0  # Conditional
-                prob[valor] += p_cond              # Accumulate
-                total += p_cond                    # Update total
-        
-        if total > 0:                              # Normalize if needed
-            for valor in prob:
-                prob[valor] /= total
-                
-        return prob                                # Return distribution
+        Returns:
+            np.ndarray: 1 en el valor observado (certeza < 1: evidencia blanda)
+        """
+        dominio = self.variables[obs.variable].dominio
+        vector = np.full(len(dominio), 1.0 - obs.certeza if obs.certeza < 1 else 0.0)
+        if obs.valor in dominio:                     # Unknown value: impossible evidence
+            vector[dominio.index(obs.valor)] = obs.certeza if obs.certeza < 1 else 1.0
+        return vector
     
     def _muestreo_directo(self, objetivo: str, n_muestras: int) -> Dict[str, float]:  # Direct sampling
         """
@@ -193,42 +241,38 @@ class ModeloProbabilista:                                # Main probabilistic mo
         
         return {v: c/n_muestras for v, c in conteo.items()}  # Normalize counts
     
-    def _mcmc(self, objetivo: str, n_muestras: int) -> Dict[str, float]:  # MCMC method
+    def _mcmc(self, objetivo: str, n_muestras: int, cadenas: int = 4,
+              procesos: Optional[int] = None) -> Dict[str, float]:  # MCMC method
         """
-        Inferencia por MCMC (Gibbs sampling)        # Method docstring
+        Inferencia por MCMC (Gibbs) con varias cadenas vectorizadas  # Method docstring
+        
+        Las cadenas se detienen antes de n_muestras si R-hat ya es <= 1.01;
+        el diagnóstico queda en self.diagnostico_mcmc.
         
         Args:
             objetivo (str): Variable objetivo
-            n_muestras (int): Número de muestras a generar
+            n_muestras (int): Número máximo de muestras (entre todas las cadenas)
+            cadenas (int): Cadenas independientes
+            procesos (Optional[int]): Procesos para repartir las cadenas
             
         Returns:
             Dict[str, float]: Distribución de probabilidad aproximada
         """
-        asignacion = {}                             # Initialize assignment
-        vars_ocultas = [v for v in self.variables if v not in self.observaciones]  # Hidden vars
-        
-        for v in vars_ocultas:                     # Random initialization
-            asignacion[v] = random.choice(self.variables[v].dominio)
-        for v, obs in self.observaciones.items():   # Set observed values
-            asignacion[v] = obs.valor
-        
-        conteo = {valor: 0 for valor in self.variables[objetivo].dominio}  # Initialize counts
-        
-        for _ in range(n_muestras):                 # Generate samples
-            for v in vars_ocultas:                  # Sample each hidden var
-                if v == objetivo:                   # Skip target for now
-                    continue
-                    
-                dist = self._distribucion_condicional(v, asignacion)  # Get conditional
-                nuevo_valor = random.choices(list(dist.keys()), weights=list(dist.values()))[0]  # Sample
-                asignacion[v] = nuevo_valor         # Update assignment
-            
-            dist = self._distribucion_condicional(objetivo, asignacion)  # Sample target
-            valor_objetivo = random.choices(list(dist.keys()), weights=list(dist.values()))[0]
-            asignacion[objetivo] = valor_objetivo
-            conteo[valor_objetivo] += 1             # Count
-        
-        return {v: c/n_muestras for v, c in conteo.items()}  # Normalize counts
+        factores = self._factores()                  # CPTs as arrays
+        evidencia = {}                               # Hard evidence (clamped columns)
+        for v, obs in self.observaciones.items():
+            if obs.certeza >= 1 and obs.valor in self.variables[v].dominio:
+                evidencia[v] = self.variables[v].dominio.index(obs.valor)
+            else:                                    # Soft evidence: likelihood factor
+                factores.append(Factor([v], self._vector_observacion(obs)))
+        
+        por_cadena = max(1, -(-n_muestras // cadenas))  # Samples per chain (ceil)
+        resultado = MuestreadorGibbs(factores, evidencia).muestrear(
+            por_cadena, cadenas=cadenas, burn_in=100, tam_bloque=max(1, min(500, por_cadena // 4)),
+            procesos=procesos)
+        self.diagnostico_mcmc = {clave: resultado[clave] for clave in ("rhat", "ess", "muestras", "convergio")}
+        marginal = resultado["marginales"][objetivo]
+        return dict(zip(self.variables[objetivo].dominio, marginal.tolist()))
     
     def _generar_muestra(self) -> Dict[str, str]:   # Generate random sample
         """
@@ -6,7 +6,9 @@ Created on [Fecha]
 """
 
 import math                          # Para funciones matemáticas (log2)
+import time                          # Para medir el entrenamiento en el ejemplo
 from collections import Counter      # Para contar frecuencias de clases
+import numpy as np                   # Columnas codificadas y tablas de contingencia
 
 class NodoDecision:                  # Clase que representa un nodo del árbol
     """Nodo de un árbol de decisión, puede ser nodo interno u hoja"""
@@ -54,43 +56,206 @@ def ganancia_informacion(datos, atributo, etiqueta_nombre="clase"):
     # 3. Ganancia = entropía_total - entropía_atributo
     return entropia_total - entropia_atributo
 
-def id3(datos, atributos, etiqueta_nombre="clase", default=None):
-    """Algoritmo ID3 para construir árboles de decisión de forma recursiva"""
-    # Caso base 1: Todos los ejemplos son de la misma clase
-    etiquetas = [d[etiqueta_nombre] for d in datos]
-    if len(set(etiquetas)) == 1:     # Si solo hay una clase única
-        return NodoDecision(resultado=etiquetas[0])  # Crea nodo hoja
-    
-    # Caso base 2: No quedan atributos para dividir
-    if not atributos:                # Si no hay más atributos
-        conteo = Counter(etiquetas)   # Usa la clase más frecuente
-        return NodoDecision(resultado=conteo.most_common(1)[0][0])
-    
-    # 1. Seleccionar el mejor atributo (mayor ganancia de información)
-    mejor_atributo = max(
-        atributos, 
-        key=lambda a: ganancia_informacion(datos, a, etiqueta_nombre)
-    )
-    
-    # 2. Crear nodo con el mejor atributo
-    nodo = NodoDecision(atributo=mejor_atributo)
-    
-    # 3. Dividir por cada valor del atributo
-    valores = {d[mejor_atributo] for d in datos}  # Valores únicos del atributo
-    nuevos_atributos = [a for a in atributos if a != mejor_atributo]  # Atributos restantes
-    
-    for valor in valores:             # Para cada valor posible del atributo
-        subdatos = [d for d in datos if d[mejor_atributo] == valor]  # Filtra datos
+def codificar(datos, atributos, etiqueta_nombre="clase", categorias=None, clases=None):
+    """
+    Convierte una lista de diccionarios en columnas enteras (una sola vez)
+    
+    Si se pasan categorias/clases (las del entrenamiento), los valores no
+    vistos se codifican como -1.
+    
+    Returns:
+        (X, y, categorias, clases): X (n x atributos) int, y (n,) int o None,
+        categorias [lista de valores por atributo], clases [lista de clases]
+    """
+    nuevas = categorias is None
+    if nuevas:
+        categorias = [[] for _ in atributos]
+    X = np.empty((len(datos), len(atributos)), dtype=np.int64)
+    for j, atributo in enumerate(atributos):
+        codigos = {v: i for i, v in enumerate(categorias[j])}
+        for i, d in enumerate(datos):
+            valor = d[atributo]
+            if valor not in codigos:
+                if not nuevas:
+                    X[i, j] = -1     # Valor no visto en entrenamiento
+                    continue
+                codigos[valor] = len(categorias[j])
+                categorias[j].append(valor)
+            X[i, j] = codigos[valor]
+    y = None
+    if datos and etiqueta_nombre in datos[0]:
+        if clases is None:
+            clases = list(dict.fromkeys(d[etiqueta_nombre] for d in datos))
+        codigos = {c: i for i, c in enumerate(clases)}
+        y = np.array([codigos.get(d[etiqueta_nombre], -1) for d in datos], dtype=np.int64)
+    return X, y, categorias, clases
+
+def entropia_conteos(conteos):       # Entropía de muchas distribuciones a la vez
+    """Entropía (bits) de cada fila de una matriz de conteos por clase"""
+    conteos = np.asarray(conteos, dtype=float)
+    total = conteos.sum(axis=-1, keepdims=True)
+    p = conteos / np.where(total > 0, total, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=-1)
+
+class ArbolID3:
+    """
+    Entrenador ID3/C4.5 sobre columnas enteras
+    
+    Cada nodo trabaja con un arreglo de índices de filas; la ganancia de
+    cada atributo sale de su tabla de contingencia (valor x clase), que se
+    obtiene con un solo np.bincount. El árbol se guarda en arreglos planos
+    (atributo, clase, primer hijo) y se predice por lotes.
+    """
+    
+    def __init__(self, criterio="ganancia", profundidad_max=None, min_muestras=1):
+        """
+        Args:
+            criterio: "ganancia" (ID3) o "razon" (razón de ganancia, C4.5)
+            profundidad_max: Profundidad máxima (None = sin límite)
+            min_muestras: Muestras mínimas para dividir un nodo
+        """
+        if criterio not in ("ganancia", "razon"):
+            raise ValueError(f"Criterio desconocido: {criterio}")
+        self.criterio = criterio
+        self.profundidad_max = profundidad_max
+        self.min_muestras = min_muestras
+    
+    def entrenar(self, datos, atributos, etiqueta_nombre="clase"):
+        """Codifica la lista de diccionarios y entrena"""
+        X, y, categorias, clases = codificar(datos, atributos, etiqueta_nombre)
+        self.atributos = list(atributos)
+        self.categorias, self.clases = categorias, clases
+        return self.entrenar_codificado(X, y, [len(c) for c in categorias], len(clases))
+    
+    def _mayoritaria(self, y_nodo, conteo):
+        """Clase más frecuente; en empate, la que aparece primero (como Counter)"""
+        candidatas = np.flatnonzero(conteo == conteo.max())
+        if len(candidatas) == 1:
+            return int(candidatas[0])
+        return int(y_nodo[np.isin(y_nodo, candidatas)][0])
+    
+    def entrenar_codificado(self, X, y, n_valores, n_clases):
+        """
+        Construye el árbol desde columnas enteras
+        
+        Args:
+            X: Matriz (n x atributos) de códigos de valor
+            y: Arreglo (n,) de códigos de clase
+            n_valores: Número de valores de cada atributo
+            n_clases: Número de clases
+        """
+        self.n_valores = list(n_valores)
+        atributo, clase, primer_hijo, hijos = [], [], [], []
         
-        # Caso base 3: Subconjunto vacío (usar clase mayoritaria)
-        if not subdatos:
-            conteo = Counter(etiquetas)
-            nodo.ramas[valor] = NodoDecision(resultado=conteo.most_common(1)[0][0])
-        else:
-            # Llamada recursiva para construir subárbol
-            nodo.ramas[valor] = id3(subdatos, nuevos_atributos, etiqueta_nombre, default)
-    
-    return nodo                       # Devuelve el nodo construido
+        def nuevo_nodo(idx):
+            conteo = np.bincount(y[idx], minlength=n_clases)
+            atributo.append(-1)
+            clase.append(self._mayoritaria(y[idx], conteo))
+            primer_hijo.append(-1)
+            return len(atributo) - 1, conteo
+        
+        raiz, conteo_raiz = nuevo_nodo(np.arange(len(y)))
+        pila = [(raiz, np.arange(len(y)), list(range(X.shape[1])), conteo_raiz, 0)]
+        while pila:
+            nodo, idx, libres, conteo, profundidad = pila.pop()
+            # Casos base: una sola clase, sin atributos o límites de tamaño
+            if (np.count_nonzero(conteo) <= 1 or not libres or len(idx) < self.min_muestras
+                    or (self.profundidad_max is not None and profundidad >= self.profundidad_max)):
+                continue
+            
+            # Ganancia de cada atributo libre desde su tabla valor x clase
+            h_total = entropia_conteos(conteo)
+            puntajes, tablas = [], []
+            for a in libres:
+                tabla = np.bincount(X[idx, a] * n_clases + y[idx],
+                                    minlength=n_valores[a] * n_clases).reshape(n_valores[a], n_clases)
+                por_valor = tabla.sum(axis=1)
+                pesos = por_valor / len(idx)
+                ganancia = h_total - pesos @ entropia_conteos(tabla)
+                if self.criterio == "razon":
+                    division = entropia_conteos(por_valor)
+                    ganancia = ganancia / division if division > 0 else 0.0
+                puntajes.append(ganancia)
+                tablas.append(tabla)
+            k = int(np.argmax(puntajes))     # Primer máximo, como max() sobre la lista
+            a = libres[k]
+            
+            # Partición estable de los índices por valor del atributo
+            codigos = X[idx, a]
+            orden = idx[np.argsort(codigos, kind="stable")]
+            por_valor = tablas[k].sum(axis=1)
+            cortes = np.cumsum(por_valor)[:-1]
+            atributo[nodo] = a
+            primer_hijo[nodo] = len(hijos)
+            hijos.extend([-1] * n_valores[a])
+            restantes = libres[:k] + libres[k + 1:]
+            for valor, sub in enumerate(np.split(orden, cortes)):
+                if len(sub) == 0:            # Valor ausente en este nodo: sin rama
+                    continue
+                sub = np.sort(sub)           # Conserva el orden original de las filas
+                hijo, conteo_hijo = nuevo_nodo(sub)
+                hijos[primer_hijo[nodo] + valor] = hijo
+                pila.append((hijo, sub, restantes, conteo_hijo, profundidad + 1))
+        
+        self.atributo = np.array(atributo, dtype=np.int64)
+        self.clase = np.array(clase, dtype=np.int64)
+        self.primer_hijo = np.array(primer_hijo, dtype=np.int64)
+        self.hijos = np.array(hijos, dtype=np.int64)
+        return self
+    
+    def predecir_codificado(self, X):
+        """
+        Clases predichas para todas las filas a la vez (-1 si un valor no se vio)
+        
+        Todas las filas bajan un nivel por iteración sobre los arreglos planos.
+        """
+        n = len(X)
+        nodo = np.zeros(n, dtype=np.int64)
+        activas = np.arange(n)
+        resultado = np.full(n, -1, dtype=np.int64)
+        while len(activas):
+            actual = nodo[activas]
+            hoja = self.atributo[actual] < 0
+            resultado[activas[hoja]] = self.clase[actual[hoja]]
+            activas, actual = activas[~hoja], actual[~hoja]
+            valor = X[activas, self.atributo[actual]]
+            conocido = (valor >= 0) & (valor < np.array(self.n_valores)[self.atributo[actual]])
+            siguiente = np.full(len(activas), -1, dtype=np.int64)
+            siguiente[conocido] = self.hijos[self.primer_hijo[actual[conocido]] + valor[conocido]]
+            sigue = siguiente >= 0           # Rama inexistente: queda sin clasificar
+            nodo[activas[sigue]] = siguiente[sigue]
+            activas = activas[sigue]
+        return resultado
+    
+    def predecir(self, ejemplos):
+        """Clasifica una lista de diccionarios (None si un valor no se vio)"""
+        X, _, _, _ = codificar(ejemplos, self.atributos, categorias=self.categorias, clases=self.clases)
+        return [self.clases[c] if c >= 0 else None for c in self.predecir_codificado(X)]
+    
+    def a_nodos(self, nodo=0):
+        """Convierte los arreglos planos en NodoDecision (para imprimir o clasificar)"""
+        if self.atributo[nodo] < 0:
+            return NodoDecision(resultado=self.clases[self.clase[nodo]])
+        a = self.atributo[nodo]
+        raiz = NodoDecision(atributo=self.atributos[a])
+        for valor in range(self.n_valores[a]):
+            hijo = self.hijos[self.primer_hijo[nodo] + valor]
+            if hijo >= 0:
+                raiz.ramas[self.categorias[a][valor]] = self.a_nodos(hijo)
+        return raiz
+
+def id3(datos, atributos, etiqueta_nombre="clase", default=None):
+    """
+    Algoritmo ID3 para construir árboles de decisión
+    
+    Entrena con ArbolID3 (columnas enteras y tablas de contingencia) y
+    devuelve el árbol como NodoDecision. Para lotes grandes conviene usar
+    ArbolID3 directamente y predecir con predecir/predecir_codificado.
+    """
+    if not datos:                     # Sin datos: hoja con la clase por defecto
+        return NodoDecision(resultado=default)
+    return ArbolID3().entrenar(datos, atributos, etiqueta_nombre).a_nodos()
 
 def clasificar(ejemplo, arbol):       # Función para clasificar nuevos ejemplos
     """Clasifica un ejemplo usando el árbol de decisión"""
@@ -110,7 +275,17 @@ if __name__ == "__main__":            # Punto de entrada principal
         {"outlook": "sunny", "temp": "hot", "humidity": "high", "wind": "weak", "clase": "no"},
         {"outlook": "sunny", "temp": "hot", "humidity": "high", "wind": "strong", "clase": "no"},
         {"outlook": "overcast", "temp": "hot", "humidity": "high", "wind": "weak", "clase": "yes"},
-        # ... (resto de los datos del ejemplo)
+        {"outlook": "rain", "temp": "mild", "humidity": "high", "wind": "weak", "clase": "yes"},
+        {"outlook": "rain", "temp": "cool", "humidity": "normal", "wind": "weak", "clase": "yes"},
+        {"outlook": "rain", "temp": "cool", "humidity": "normal", "wind": "strong", "clase": "no"},
+        {"outlook": "overcast", "temp": "cool", "humidity": "normal", "wind": "strong", "clase": "yes"},
+        {"outlook": "sunny", "temp": "mild", "humidity": "high", "wind": "weak", "clase": "no"},
+        {"outlook": "sunny", "temp": "cool", "humidity": "normal", "wind": "weak", "clase": "yes"},
+        {"outlook": "rain", "temp": "mild", "humidity": "normal", "wind": "weak", "clase": "yes"},
+        {"outlook": "sunny", "temp": "mild", "humidity": "normal", "wind": "strong", "clase": "yes"},
+        {"outlook": "overcast", "temp": "mild", "humidity": "high", "wind": "strong", "clase": "yes"},
+        {"outlook": "overcast", "temp": "hot", "humidity": "normal", "wind": "weak", "clase": "yes"},
+        {"outlook": "rain", "temp": "mild", "humidity": "high", "wind": "strong", "clase": "no"},
     ]
 
     # Lista de atributos (excluyendo la clase)
@@ -125,4 +300,19 @@ if __name__ == "__main__":            # Punto de entrada principal
     nuevo_ejemplo = {"outlook": "sunny", "temp": "cool", 
                     "humidity": "high", "wind": "strong"}
     prediccion = clasificar(nuevo_ejemplo, arbol)
-    print(f"\nPredicción para {nuevo_ejemplo}: {prediccion}")
\ No newline at end of file
+    print(f"\nPredicción para {nuevo_ejemplo}: {prediccion}")
+    
+    # Entrenamiento sobre columnas enteras con un registro sintético grande
+    rng = np.random.default_rng(0)
+    n = 200000
+    X = np.column_stack([rng.integers(0, k, n) for k in (3, 3, 2, 2)])
+    y = ((X[:, 0] == 1) | ((X[:, 0] == 0) & (X[:, 2] == 1)) | ((X[:, 0] == 2) & (X[:, 3] == 0))).astype(np.int64)
+    y ^= (rng.random(n) < 0.05)      # 5% de ruido en las etiquetas
+    inicio = time.perf_counter()
+    modelo = ArbolID3().entrenar_codificado(X, y, [3, 3, 2, 2], 2)
+    t_entrenar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    acierto = np.mean(modelo.predecir_codificado(X) == y)
+    t_predecir = time.perf_counter() - inicio
+    print(f"\n{n} filas: entrenamiento {t_entrenar:.2f} s, predicción {t_predecir:.3f} s, "
+          f"{len(modelo.atributo)} nodos, acierto {acierto:.3f}")
\ No newline at end of file
@@ -1,16 +1,36 @@
 # -*- coding: utf-8 -*-                                                     # Define la codificación de caracteres del archivo como UTF-8
 import numpy as np                                                        # Importa la librería NumPy y la asigna al alias np
-from sklearn.linear_model import LinearRegression                         # Importa la clase LinearRegression del módulo sklearn.linear_model
-from collections import defaultdict                                      # Importa defaultdict desde el módulo collections
+import time                                                               # Importa time para medir tiempos en el ejemplo
+
+class ModeloLineal:                                                       # Define una clase para los modelos lineales de las hojas
+    """Modelo lineal y = X @ coef_ + intercept_ (misma interfaz que LinearRegression)""" # Documentación de la clase ModeloLineal
+    def __init__(self, coef, intercepto):                                 # Define el constructor de la clase
+        self.coef_ = coef                                                 # Coeficientes de cada atributo
+        self.intercept_ = intercepto                                      # Término independiente
+
+    def predict(self, X):                                                 # Define el método predict
+        """Predice un lote de filas"""                                    # Documentación del método predict
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_  # Producto matricial para todas las filas
+
+def ajustar_lineal(X, y):                                                 # Define la función ajustar_lineal
+    """Mínimos cuadrados con atributos centrados en la media del nodo"""  # Documentación de la función ajustar_lineal
+    media_x = X.mean(axis=0)                                              # Media de cada atributo
+    media_y = y.mean()                                                    # Media de la variable objetivo
+    Xc = X - media_x                                                      # Centrar antes de multiplicar evita la cancelación de XᵀX - n·x̄x̄ᵀ
+    cov_xx = Xc.T @ Xc                                                    # XᵀX centrada
+    cov_xy = Xc.T @ (y - media_y)                                         # Xᵀy centrada
+    coef = np.linalg.pinv(cov_xx) @ cov_xy                                # Solución de norma mínima (como lstsq)
+    return ModeloLineal(coef, media_y - media_x @ coef)                   # Retorna el modelo con su intercepto
 
 class NodoRegresion:                                                      # Define una clase llamada NodoRegresion
     """Nodo para árboles de regresión M5"""                                # Documentación de la clase NodoRegresion
-    def __init__(self, atributo=None, valor=None, ramas=None, modelo=None, valor_pred=None): # Define el constructor de la clase
+    def __init__(self, atributo=None, valor=None, ramas=None, modelo=None, valor_pred=None, umbral=None): # Define el constructor de la clase
         self.atributo = atributo                                        # Atributo para dividir (None en hojas)
         self.valor = valor                                              # Valor del atributo que lleva a este nodo
         self.ramas = ramas or {}                                        # Subárboles {valor: nodo}
         self.modelo = modelo                                            # Modelo lineal (en hojas)
         self.valor_pred = valor_pred                                    # Valor constante (para hojas simples)
+        self.umbral = umbral                                            # Umbral de la división (x <= umbral va a la primera rama)
 
     def __str__(self, nivel=0):                                         # Define la representación en string del objeto
         """Representación visual del árbol"""                             # Documentación del método __str__
@@ -32,65 +52,145 @@ def error_cuadratico_medio(y):                                          # Define
     media = np.mean(y)                                                 # Calcula la media de y
     return np.mean((y - media)**2)                                     # Calcula el error cuadrático medio
 
+def mejor_umbral(x_ordenado, y_ordenado):                               # Define la función mejor_umbral
+    """Mejor división x <= umbral de un atributo ya ordenado, en O(n)"""  # Documentación de la función mejor_umbral
+    # Con sumas prefijas de y e y² el error de cada lado es Σy² - (Σy)²/n # Todos los cortes se evalúan a la vez
+    # Retorna (reducción del ECM, filas a la izquierda) o (-inf, 0)       # Valor de retorno
+    n = len(y_ordenado)                                                # Número de muestras del nodo
+    yc = y_ordenado - y_ordenado.mean()                                # Centrar evita la cancelación con y desplazada
+    s1 = np.cumsum(yc)                                                 # Sumas prefijas de y (centrada)
+    s2 = np.cumsum(yc ** 2)                                            # Sumas prefijas de y² (centrada)
+    izq = np.arange(1, n)                                              # Filas a la izquierda de cada corte
+    sse_izq = s2[:-1] - s1[:-1] ** 2 / izq                             # Error cuadrático de la izquierda
+    sse_der = (s2[-1] - s2[:-1]) - (s1[-1] - s1[:-1]) ** 2 / (n - izq) # Error cuadrático de la derecha
+    sse_total = s2[-1] - s1[-1] ** 2 / n                               # Error cuadrático sin dividir
+    valido = x_ordenado[1:] > x_ordenado[:-1]                          # Sólo se corta entre valores distintos
+    if not valido.any():                                               # Si el atributo es constante en el nodo
+        return -np.inf, 0                                              # No hay división posible
+    reduccion = np.where(valido, sse_total - sse_izq - sse_der, -np.inf) / n # Reducción del ECM de cada corte
+    k = int(np.argmax(reduccion))                                      # Primer mejor corte
+    return reduccion[k], k + 1                                         # Retorna la reducción y el tamaño de la izquierda
+
 def mejor_division(X, y, atributos):                                    # Define la función mejor_division
-    """Encuentra el mejor atributo y valor para dividir"""                # Documentación de la función mejor_division
+    """Encuentra el mejor atributo y umbral para dividir (x <= umbral)""" # Documentación de la función mejor_division
     mejor_atributo = None                                              # Inicializa el mejor atributo como None
-    mejor_valor = None                                                 # Inicializa el mejor valor como None
+    mejor_valor = None                                                 # Inicializa el mejor umbral como None
     mejor_reduccion = -np.inf                                          # Inicializa la mejor reducción como infinito negativo
 
-    for atributo in atributos:                                         # Itera sobre los atributos
-        valores = np.unique(X[:, atributos.index(atributo)])           # Obtiene los valores únicos del atributo en X
+    for j, atributo in enumerate(atributos):                           # Itera sobre los atributos (columna j de X)
+        orden = np.argsort(X[:, j], kind="stable")                     # Ordena la columna una sola vez
+        x_ord = X[orden, j]                                            # Valores ordenados del atributo
+        reduccion, k = mejor_umbral(x_ord, y[orden])                   # Evalúa todos los cortes con sumas prefijas
+        if reduccion > mejor_reduccion:                                # Si la reducción actual es mejor que la mejor reducción encontrada
+            mejor_reduccion = reduccion                                # Actualiza la mejor reducción
+            mejor_atributo = atributo                                  # Actualiza el mejor atributo
+            mejor_valor = (x_ord[k - 1] + x_ord[k]) / 2                # Umbral en el punto medio entre valores vecinos
 
-        for valor in valores:                                           # Itera sobre los valores del atributo
-            mascara = X[:, atributos.index(atributo)] == valor         # Crea una máscara booleana para el valor del atributo
-            y_izq = y[mascara]                                           # Divide y en la parte izquierda
-            y_der = y[~mascara]                                          # Divide y en la parte derecha
+    return mejor_atributo, mejor_valor                                  # Retorna el mejor atributo y el mejor umbral
 
-            reduccion = error_cuadratico_medio(y) - (                  # Calcula la reducción del error
-                (len(y_izq)/len(y)) * error_cuadratico_medio(y_izq) +
-                (len(y_der)/len(y)) * error_cuadratico_medio(y_der)
-            )
+class ArbolM5:                                                          # Define la clase ArbolM5
+    """Árbol de regresión M5 con divisiones por umbral y hojas lineales""" # Documentación de la clase ArbolM5
+    # Cada atributo se ordena una sola vez en la raíz y los hijos heredan   # Partición estable de los órdenes
+    # esos órdenes filtrados: buscar la división es un barrido con sumas    # prefijas por atributo
+    # El árbol se guarda en arreglos planos y se predice por lotes          # Arreglos de índices por las ramas
 
-            if reduccion > mejor_reduccion:                            # Si la reducción actual es mejor que la mejor reducción encontrada
-                mejor_reduccion = reduccion                              # Actualiza la mejor reducción
-                mejor_atributo = atributo                                # Actualiza el mejor atributo
-                mejor_valor = valor                                      # Actualiza el mejor valor
+    def __init__(self, min_muestras=5, max_profundidad=5):             # Define el constructor de la clase
+        self.min_muestras = min_muestras                               # Muestras mínimas para dividir un nodo
+        self.max_profundidad = max_profundidad                         # Profundidad máxima del árbol
 
-    return mejor_atributo, mejor_valor                                  # Retorna el mejor atributo y el mejor valor
+    def entrenar(self, X, y):                                          # Define el método entrenar
+        """Construye el árbol para X (n x atributos) e y (n,)"""       # Documentación del método entrenar
+        X = np.asarray(X, dtype=float)                                 # Matriz de atributos en punto flotante
+        y = np.asarray(y, dtype=float)                                 # Variable objetivo en punto flotante
+        n, m = X.shape                                                 # Número de muestras y de atributos
+        self.n_atributos = m                                           # Guarda el número de atributos
+        self.atributo, self.umbral = [], []                            # Atributo y umbral de cada nodo (-1 en hojas)
+        self.izquierdo, self.derecho = [], []                          # Hijos de cada nodo (-1 en hojas)
+        self.coef, self.intercepto = [], []                            # Modelo lineal de cada nodo
+        ordenes = [np.argsort(X[:, j], kind="stable") for j in range(m)] # Un ordenamiento por atributo, una sola vez
+        self._construir(X, y, ordenes, 0)                              # Construye desde la raíz
+        self.atributo = np.array(self.atributo, dtype=np.intp)         # Convierte las listas en arreglos planos
+        self.umbral = np.array(self.umbral)                            # Umbral de cada nodo (nan en hojas)
+        self.izquierdo = np.array(self.izquierdo, dtype=np.intp)       # Hijo izquierdo de cada nodo
+        self.derecho = np.array(self.derecho, dtype=np.intp)           # Hijo derecho de cada nodo
+        self.coef = np.array(self.coef).reshape(-1, m)                 # Coeficientes: una fila por nodo
+        self.intercepto = np.array(self.intercepto)                    # Intercepto de cada nodo
+        return self                                                    # Retorna el árbol entrenado
 
-def m5(X, y, atributos, min_muestras=5, max_profundidad=5):              # Define la función m5
-    """Algoritmo M5 para árboles de regresión"""                         # Documentación de la función m5
-    # Caso base 1: Muy pocas muestras                                   # Comentario para el caso base 1
-    if len(y) < min_muestras or max_profundidad == 0:                  # Si el número de muestras es menor que el mínimo o la profundidad máxima es 0
-        modelo = LinearRegression().fit(X, y)                           # Ajusta un modelo de regresión lineal a los datos
-        return NodoRegresion(modelo=modelo)                             # Retorna un nodo hoja con el modelo lineal
+    def _nuevo_nodo(self):                                             # Define el método _nuevo_nodo
+        """Reserva un nodo vacío (hoja) y retorna su índice"""         # Documentación del método _nuevo_nodo
+        for lista, inicial in ((self.atributo, -1), (self.umbral, np.nan), (self.izquierdo, -1), # Cada arreglo
+                               (self.derecho, -1), (self.coef, np.zeros(self.n_atributos)),      # con su valor
+                               (self.intercepto, 0.0)):        # Valores iniciales de una hoja
+            lista.append(inicial)                                      # Reserva una posición en cada arreglo
+        return len(self.atributo) - 1                                  # Retorna el índice del nodo
 
-    # Caso base 2: Todos los valores iguales                             # Comentario para el caso base 2
-    if np.all(y == y[0]):                                               # Si todos los valores en y son iguales
-        return NodoRegresion(valor_pred=y[0])                           # Retorna un nodo hoja con el valor de predicción constante
+    def _construir(self, X, y, ordenes, profundidad):                  # Define el método _construir
+        """Construye el subárbol de las filas ordenes[0]; retorna el índice del nodo""" # Documentación del método _construir
+        nodo = self._nuevo_nodo()                                      # Crea el nodo
+        idx = ordenes[0]                                               # Filas del nodo
+        y_nodo = y[idx]                                                # Valores objetivo del nodo
+        if len(idx) >= self.min_muestras and profundidad < self.max_profundidad and not np.all(y_nodo == y_nodo[0]): # Si el nodo se puede dividir
+            mejor = (-np.inf, None, 0)                                 # (reducción, atributo, filas a la izquierda)
+            for j, orden in enumerate(ordenes):                        # Barre cada atributo ya ordenado
+                reduccion, k = mejor_umbral(X[orden, j], y[orden])     # Mejor corte del atributo
+                if reduccion > mejor[0]:                               # Si mejora la mejor reducción
+                    mejor = (reduccion, j, k)                          # Actualiza el mejor corte
+            reduccion, j, k = mejor                                    # Desempaqueta el mejor corte
+            if j is not None:                                          # Si hay división posible
+                x_ord = X[ordenes[j], j]                               # Valores ordenados del atributo elegido
+                self.atributo[nodo] = j                                # Guarda el atributo
+                self.umbral[nodo] = (x_ord[k - 1] + x_ord[k]) / 2      # Umbral en el punto medio
+                va_izq = np.zeros(len(X), dtype=bool)                  # Máscara de filas de la izquierda
+                va_izq[ordenes[j][:k]] = True                          # Marca las k primeras filas del orden elegido
+                izq = [o[va_izq[o]] for o in ordenes]                  # Partición estable: siguen ordenados
+                der = [o[~va_izq[o]] for o in ordenes]                 # Filas de la derecha, también ordenadas
+                self.izquierdo[nodo] = self._construir(X, y, izq, profundidad + 1) # Subárbol izquierdo
+                self.derecho[nodo] = self._construir(X, y, der, profundidad + 1)   # Subárbol derecho
+                return nodo                                            # Retorna el nodo de división
 
-    # 1. Encontrar la mejor división                                    # Comentario para el paso 1
-    mejor_atrib, mejor_val = mejor_division(X, y, atributos)           # Encuentra el mejor atributo y valor para dividir
+        # Hoja: modelo lineal con los atributos centrados del nodo      # Comentario para el caso hoja
+        if np.all(y_nodo == y_nodo[0]):                                # Todos los valores iguales: hoja constante
+            self.intercepto[nodo] = y_nodo[0]                          # Predice ese valor constante
+        else:                                                          # Si los valores varían
+            modelo = ajustar_lineal(X[idx], y_nodo)                    # Ajusta el modelo lineal de la hoja
+            self.coef[nodo], self.intercepto[nodo] = modelo.coef_, modelo.intercept_ # Guarda el modelo en los arreglos
+        return nodo                                                    # Retorna el índice de la hoja
 
-    if mejor_atrib is None:                                            # Si no se encontró división útil
-        modelo = LinearRegression().fit(X, y)                           # Ajusta un modelo de regresión lineal a los datos
-        return NodoRegresion(modelo=modelo)                             # Retorna un nodo hoja con el modelo lineal
+    def predecir_lote(self, X):                                        # Define el método predecir_lote
+        """Predice todas las filas de X enviando arreglos de índices por el árbol""" # Documentación del método predecir_lote
+        X = np.asarray(X, dtype=float)                                 # Matriz de atributos en punto flotante
+        pred = np.empty(len(X))                                        # Predicciones
+        pila = [(0, np.arange(len(X)))]                                # (nodo, filas que llegan a él)
+        while pila:                                                    # Mientras queden nodos por visitar
+            nodo, idx = pila.pop()                                     # Siguiente nodo y sus filas
+            if len(idx) == 0:                                          # Ninguna fila llega a este nodo
+                continue                                               # No hay nada que predecir
+            j = self.atributo[nodo]                                    # Atributo de división (-1 en hojas)
+            if j < 0:                                                  # Hoja: modelo lineal para todas sus filas
+                pred[idx] = X[idx] @ self.coef[nodo] + self.intercepto[nodo] # Predicción vectorizada de la hoja
+            else:                                                      # División: reparte las filas
+                va_izq = X[idx, j] <= self.umbral[nodo]                # Filas que van a la izquierda
+                pila.append((self.izquierdo[nodo], idx[va_izq]))       # Encola el hijo izquierdo
+                pila.append((self.derecho[nodo], idx[~va_izq]))        # Encola el hijo derecho
+        return pred                                                    # Retorna las predicciones
 
-    # 2. Crear nodo con la división                                     # Comentario para el paso 2
-    nodo = NodoRegresion(atributo=mejor_atrib)                          # Crea un nuevo nodo con el mejor atributo
-    idx_atrib = atributos.index(mejor_atrib)                           # Obtiene el índice del mejor atributo
+    def a_nodos(self, atributos, nodo=0):                              # Define el método a_nodos
+        """Convierte los arreglos planos en NodoRegresion (para imprimir)""" # Documentación del método a_nodos
+        j = self.atributo[nodo]                                        # Atributo de división (-1 en hojas)
+        if j < 0:                                                      # Hoja
+            if not self.coef[nodo].any():                              # Hoja constante
+                return NodoRegresion(valor_pred=self.intercepto[nodo]) # Hoja con valor constante
+            return NodoRegresion(modelo=ModeloLineal(self.coef[nodo], self.intercepto[nodo])) # Hoja con modelo lineal
+        u = self.umbral[nodo]                                          # Umbral de la división
+        return NodoRegresion(atributo=atributos[j], umbral=u, ramas={  # Nodo de división
+            f"<= {u:g}": self.a_nodos(atributos, self.izquierdo[nodo]),  # Rama x <= umbral
+            f"> {u:g}": self.a_nodos(atributos, self.derecho[nodo])})    # Rama x > umbral
 
-    # 3. Dividir el dataset                                            # Comentario para el paso 3
-    mascara = X[:, idx_atrib] == mejor_val                             # Crea una máscara booleana para el mejor valor del atributo
-    X_izq, y_izq = X[mascara], y[mascara]                               # Divide X e y en la parte izquierda
-    X_der, y_der = X[~mascara], y[~mascara]                             # Divide X e y en la parte derecha
-
-    # 4. Construir subárboles recursivamente                            # Comentario para el paso 4
-    nuevos_atributos = [a for a in atributos if a != mejor_atrib]      # Crea una lista de atributos sin el mejor atributo
-    nodo.ramas[mejor_val] = m5(X_izq, y_izq, nuevos_atributos, min_muestras, max_profundidad-1) # Construye el subárbol izquierdo recursivamente
-    nodo.ramas[f"no_{mejor_val}"] = m5(X_der, y_der, nuevos_atributos, min_muestras, max_profundidad-1) # Construye el subárbol derecho recursivamente
-
-    return nodo                                                        # Retorna el nodo construido
+def m5(X, y, atributos, min_muestras=5, max_profundidad=5):              # Define la función m5
+    """Algoritmo M5 para árboles de regresión (entrena con ArbolM5)"""   # Documentación de la función m5
+    arbol = ArbolM5(min_muestras, max_profundidad).entrenar(X, y)      # Entrena sobre columnas ordenadas una vez
+    return arbol.a_nodos(atributos)                                    # Retorna el árbol como NodoRegresion
 
 def predecir(x, arbol, atributos):                                     # Define la función predecir
     """Realiza una predicción con el árbol M5"""                        # Documentación de la función predecir
@@ -101,6 +201,9 @@ def predecir(x, arbol, atributos):                                     # Define
     else:                                                          # Si el nodo es un nodo de división
         idx_atrib = atributos.index(arbol.atributo)                   # Obtiene el índice del atributo de división
         valor = x[idx_atrib]                                           # Obtiene el valor del atributo en el punto de datos
+        if arbol.umbral is not None:                                 # Si la división es por umbral
+            izquierda, derecha = arbol.ramas.values()                 # Ramas x <= umbral y x > umbral
+            return predecir(x, izquierda if valor <= arbol.umbral else derecha, atributos) # Sigue la rama del umbral
         if valor in arbol.ramas:                                     # Si el valor existe como una rama
             return predecir(x, arbol.ramas[valor], atributos)          # Llama a predecir recursivamente en la rama correspondiente
         else:                                                      # Si el valor no existe como una rama
@@ -141,4 +244,18 @@ if __name__ == "__main__":                                                 # Blo
     nueva_casa = [110, 3, "centro"]                                   # Define los datos de una nueva casa
     nueva_casa_numerico = [110, 3, zonas["centro"]]                     # Convierte los atributos de la nueva casa a numérico
     prediccion = predecir(nueva_casa_numerico, arbol_m5, atributos)    # Realiza la predicción para la nueva casa
-    print(f"\nPredicción para {nueva_casa}: ${prediccion:,.2f}")        # Imprime la predicción
\ No newline at end of file
+    print(f"\nPredicción para {nueva_casa}: ${prediccion:,.2f}")        # Imprime la predicción
+
+    # Atributos continuos: entrenamiento y predicción por lotes         # Comentario para el ejemplo grande
+    rng = np.random.default_rng(0)                                     # Generador aleatorio con semilla fija
+    X_grande = rng.uniform(0, 100, size=(50000, 4))                    # 50000 filas con 4 atributos continuos
+    y_grande = np.where(X_grande[:, 0] > 50, 3 * X_grande[:, 1], 100 - X_grande[:, 2]) + rng.normal(0, 1, 50000) # Objetivo por tramos con ruido
+    inicio = time.perf_counter()                                       # Inicio del entrenamiento
+    modelo = ArbolM5(min_muestras=20, max_profundidad=6).entrenar(X_grande, y_grande) # Entrena el árbol
+    t_entrenar = time.perf_counter() - inicio                          # Tiempo de entrenamiento
+    inicio = time.perf_counter()                                       # Inicio de la predicción
+    pred = modelo.predecir_lote(X_grande)                              # Predice todas las filas a la vez
+    t_predecir = time.perf_counter() - inicio                          # Tiempo de predicción
+    ecm = np.mean((pred - y_grande) ** 2)                              # Error cuadrático medio de entrenamiento
+    print(f"\n50000 filas continuas: entrenamiento {t_entrenar:.2f} s, predicción {t_predecir:.3f} s, " # Imprime tiempos,
+          f"{len(modelo.atributo)} nodos, ECM {ecm:.2f}")                # tamaño del árbol y error
\ No newline at end of file
@@ -1,17 +1,124 @@
 from collections import defaultdict  # Importa defaultdict para crear diccionarios con valores por defecto
-from itertools import combinations  # Importa combinations para generar combinaciones de elementos
+from concurrent.futures import ProcessPoolExecutor  # Evaluación de literales candidatos en paralelo
+from itertools import product  # Importa product para generar los argumentos de los literales
+import math  # Logaritmos de la ganancia FOIL
+import random  # Datos sintéticos del ejemplo grande
+import time  # Medición de tiempos en el ejemplo
+
+class BaseRelacional:
+    """
+    Relaciones de fondo indexadas por posición de argumento
+
+    Para cada relación y cada posición se guarda un índice hash
+    {valor: conjunto de hechos}; los hechos que coinciden con los argumentos
+    ya ligados de un literal son la intersección de esos conjuntos.
+    """
+
+    def __init__(self, relaciones):
+        """
+        Args:
+            relaciones (dict): {nombre: [(hecho1), (hecho2)]}
+        """
+        self.hechos = {rel: set(map(tuple, hechos)) for rel, hechos in relaciones.items()}  # Conjuntos para pruebas de pertenencia
+        self.aridad = {rel: len(next(iter(hechos))) if hechos else 0 for rel, hechos in self.hechos.items()}
+        self.indices = {}  # {relación: [ {valor: hechos} por posición ]}
+        for rel, hechos in self.hechos.items():
+            indice = [defaultdict(set) for _ in range(self.aridad[rel])]
+            for hecho in hechos:
+                for posicion, valor in enumerate(hecho):
+                    indice[posicion][valor].add(hecho)
+            self.indices[rel] = [dict(i) for i in indice]  # Sin defaultdict: las consultas no crean entradas
+
+    def coincidentes(self, rel, fijos):
+        """
+        Hechos de una relación con valores dados en algunas posiciones
+
+        Args:
+            rel (str): Nombre de la relación
+            fijos (dict): {posición: valor}
+        """
+        if len(fijos) == self.aridad[rel]:  # Literal totalmente ligado: prueba de pertenencia
+            hecho = tuple(fijos[i] for i in range(self.aridad[rel]))
+            return (hecho,) if hecho in self.hechos[rel] else ()
+        if not fijos:
+            return self.hechos[rel]
+        conjuntos = sorted((self.indices[rel][i].get(v, ()) for i, v in fijos.items()), key=len)
+        resultado = conjuntos[0]
+        for conjunto in conjuntos[1:]:  # Intersección empezando por el conjunto más pequeño
+            if not resultado:
+                break
+            resultado = resultado & conjunto
+        return resultado
+
+    def extender(self, tuplas, columnas, literal):
+        """
+        Extiende tuplas de ligaduras con un literal
+
+        Args:
+            tuplas (list): Tuplas de valores, una columna por variable
+            columnas (dict): {variable: columna} de las tuplas
+            literal (tuple): (relación, var1, var2, ...) o ('=', var1, var2)
+
+        Returns:
+            (nuevas tuplas, mapa de bits de las tuplas de entrada que tienen al menos una extensión)
+        """
+        cubiertas = bytearray(len(tuplas))  # 1 si la tupla de entrada se extiende
+        nuevas = []
+        if literal[0] == '=':  # Igualdad entre variables ya ligadas: sólo filtra
+            a, b = columnas[literal[1]], columnas[literal[2]]
+            for i, t in enumerate(tuplas):
+                if t[a] == t[b]:
+                    cubiertas[i] = 1
+                    nuevas.append(t)
+            return nuevas, cubiertas
+
+        rel, argumentos = literal[0], literal[1:]
+        ligadas = [(p, columnas[v]) for p, v in enumerate(argumentos) if v in columnas]
+        libres = []  # Variables nuevas en orden de aparición
+        for v in argumentos:
+            if v not in columnas and v not in libres:
+                libres.append(v)
+        posiciones = [[p for p, w in enumerate(argumentos) if w == v] for v in libres]
+        cache = {}  # Valores ligados -> valores de las variables nuevas
+        for i, t in enumerate(tuplas):
+            clave = tuple(t[c] for _, c in ligadas)
+            if clave not in cache:
+                hechos = self.coincidentes(rel, {p: valor for (p, _), valor in zip(ligadas, clave)})
+                cache[clave] = [tuple(h[ps[0]] for ps in posiciones) for h in hechos
+                                if all(h[q] == h[ps[0]] for ps in posiciones for q in ps[1:])]
+            if cache[clave]:
+                cubiertas[i] = 1
+                nuevas.extend(t + extra for extra in cache[clave])
+        return nuevas, cubiertas
+
+def ganancia_foil(base, literal, columnas, pos, neg):
+    """
+    Ganancia FOIL de añadir un literal: t * (log2(p1/(p1+n1)) - log2(p0/(p0+n0)))
+
+    t es el número de tuplas positivas que siguen cubiertas (mapa de bits).
+    """
+    nuevos_pos, cubiertas = base.extender(pos, columnas, literal)
+    t = cubiertas.count(1)  # Tuplas positivas con al menos una extensión
+    if t == 0:
+        return -1  # Si no cubre ningún ejemplo positivo, la ganancia es -1
+    nuevos_neg, _ = base.extender(neg, columnas, literal)
+    p0, n0 = len(pos), len(neg)  # Tuplas antes de añadir el literal
+    p1, n1 = len(nuevos_pos), len(nuevos_neg)  # Tuplas después de añadir el literal
+    return t * (math.log2(p1 / (p1 + n1)) - math.log2(p0 / (p0 + n0)))
 
 class FOIL:
     """Implementación del algoritmo FOIL (First Order Inductive Learner)"""
 
-    def __init__(self, max_literales=4, min_cobertura=5):
+    def __init__(self, max_literales=4, min_cobertura=5, procesos=None):
         """
         Args:
             max_literales (int): Máximo de literales en cada cláusula
             min_cobertura (int): Mínimo de ejemplos positivos a cubrir
+            procesos (int): Procesos para evaluar literales candidatos (None = en este proceso)
         """
         self.max_literales = max_literales  # Inicializa el máximo número de literales por cláusula
         self.min_cobertura = min_cobertura  # Inicializa el mínimo número de ejemplos positivos que una cláusula debe cubrir
+        self.procesos = procesos  # Número de procesos trabajadores
         self.clausulas = []  # Almacena las cláusulas aprendidas (reglas lógicas)
 
     def entrenar(self, ejemplos_pos, ejemplos_neg, relaciones, atributos):
@@ -22,153 +129,199 @@ class FOIL:
             ejemplos_pos (list): Ejemplos positivos (hechos objetivo)
             ejemplos_neg (list): Ejemplos negativos
             relaciones (dict): Diccionario de relaciones de fondo {nombre: [(hecho1), (hecho2)]}
-            atributos (dict): Tipos y valores de los atributos {variable: tipo}
+            atributos (dict): Tipos de las variables {variable: tipo}; las primeras son las de la cabeza
         """
         self.relaciones = relaciones  # Almacena las relaciones de fondo (conocimiento del dominio)
         self.atributos = atributos  # Almacena los tipos de los atributos (metadatos)
+        self.base = BaseRelacional(relaciones)  # Índices hash por posición de argumento
 
         # Convertir ejemplos a formato de conjunto para búsquedas rápidas
         self.pos_set = set(ejemplos_pos)  # Convierte los ejemplos positivos a un conjunto para operaciones eficientes
         self.neg_set = set(ejemplos_neg)  # Convierte los ejemplos negativos a un conjunto
-
-        # Aprender cláusulas hasta cubrir todos los positivos
-        while len(self.pos_set) > 0:  # Mientras queden ejemplos positivos por cubrir
-            clausula = self._aprender_clausula()  # Aprende una nueva cláusula (regla)
-            if clausula is None:
-                break  # No se pudo encontrar una cláusula válida
-            self.clausulas.append(clausula)  # Agrega la cláusula aprendida a la lista de cláusulas
-
-            # Eliminar los ejemplos positivos cubiertos por esta cláusula
-            cubiertos = set()  # Conjunto para almacenar los ejemplos positivos cubiertos por la cláusula actual
-            for ejemplo in self.pos_set:  # Itera sobre los ejemplos positivos restantes
-                if self._cubre(clausula, ejemplo):  # Si la cláusula cubre el ejemplo
-                    cubiertos.add(ejemplo)  # Agrega el ejemplo al conjunto de ejemplos cubiertos
-            self.pos_set -= cubiertos  # Elimina los ejemplos cubiertos del conjunto de ejemplos positivos
-
-            print(f"\nCláusula aprendida: {self._formatear_clausula(clausula)}")  # Imprime la cláusula aprendida en un formato legible
-            print(f"Cubre {len(cubiertos)} ejemplos positivos")  # Imprime el número de ejemplos positivos cubiertos por la cláusula
+        ejemplo = next(iter(self.pos_set))
+        self.objetivo = ejemplo[0]  # Nombre de la relación objetivo
+        self.variables_cabeza = list(atributos)[:len(ejemplo) - 1]  # Variables de la cabeza
+
+        self._pool = None
+        if self.procesos and self.procesos > 1:  # La base se copia una vez por proceso
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos, initializer=_iniciar_trabajador,
+                                             initargs=(self.base,))
+        try:
+            # Aprender cláusulas hasta cubrir todos los positivos
+            while len(self.pos_set) > 0:  # Mientras queden ejemplos positivos por cubrir
+                clausula = self._aprender_clausula()  # Aprende una nueva cláusula (regla)
+                if clausula is None:
+                    break  # No se pudo encontrar una cláusula válida
+                self.clausulas.append(clausula)  # Agrega la cláusula aprendida a la lista de cláusulas
+
+                # Eliminar los ejemplos positivos cubiertos por esta cláusula
+                cubiertos = set()  # Conjunto para almacenar los ejemplos positivos cubiertos por la cláusula actual
+                for ejemplo in self.pos_set:  # Itera sobre los ejemplos positivos restantes
+                    if self._cubre(clausula, ejemplo):  # Si la cláusula cubre el ejemplo
+                        cubiertos.add(ejemplo)  # Agrega el ejemplo al conjunto de ejemplos cubiertos
+                self.pos_set -= cubiertos  # Elimina los ejemplos cubiertos del conjunto de ejemplos positivos
+
+                print(f"\nCláusula aprendida: {self._formatear_clausula(clausula)}")  # Imprime la cláusula aprendida en un formato legible
+                print(f"Cubre {len(cubiertos)} ejemplos positivos")  # Imprime el número de ejemplos positivos cubiertos por la cláusula
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
 
     def _aprender_clausula(self):
         """Aprende una nueva cláusula Horn"""
-        # Inicializar con cabeza de cláusula (target)
-        target = next(iter(self.pos_set)) if self.pos_set else None  # Selecciona el primer ejemplo positivo restante como cabeza de la cláusula
-        if not target:
-            return None  # Si no hay ejemplos positivos restantes, no se puede aprender una cláusula
-
-        # Inicializar cláusula
+        # Inicializar cláusula con la cabeza objetivo(X, Y, ...)
         clausula = {
-            'cabeza': target,  # La cabeza de la cláusula es el hecho objetivo que se quiere aprender
+            'cabeza': (self.objetivo,) + tuple(self.variables_cabeza),  # La cabeza de la cláusula es la relación objetivo
             'cuerpo': [],  # El cuerpo de la cláusula (inicialmente vacío) contiene las condiciones
-            'variables': self._extraer_variables(target),  # Extrae las variables del hecho objetivo (cabeza)
-            'ejemplos_pos': set(self.pos_set),  # Conjunto de ejemplos positivos que la cláusula debe cubrir
-            'ejemplos_neg': set(self.neg_set)  # Conjunto de ejemplos negativos que la cláusula no debe cubrir
+            'variables': {v: i for i, v in enumerate(self.variables_cabeza)},  # Columna de cada variable en las tuplas
+            'ejemplos_pos': sorted(e[1:] for e in self.pos_set),  # Tuplas de ligaduras positivas
+            'ejemplos_neg': sorted(e[1:] for e in self.neg_set)  # Tuplas de ligaduras negativas
         }
 
-        # Añadir literales hasta satisfacer criterios
-        while len(clausula['cuerpo']) < self.max_literales:  # Mientras no se haya alcanzado el máximo de literales
-            mejor_literal = None  # Inicializa el mejor literal encontrado hasta ahora
-            mejor_ganancia = -1  # Inicializa la mejor ganancia (calidad) encontrada hasta ahora
-            mejores_ejemplos = None  # Inicializa los mejores conjuntos de ejemplos positivos y negativos
-
-            # Generar candidatos de literales
+        # Añadir literales mientras la cláusula cubra negativos
+        while clausula['ejemplos_neg'] and len(clausula['cuerpo']) < self.max_literales:
+            # Generar y evaluar los literales candidatos
             literales_candidatos = self._generar_literales_candidatos(clausula)  # Genera posibles literales para añadir al cuerpo de la cláusula
-
-            # Evaluar cada literal candidato
-            for literal in literales_candidatos:  # Itera sobre cada literal candidato
-                ganancia, nuevos_pos, nuevos_neg = self._evaluar_literal(clausula, literal)  # Evalúa el literal usando FOIL-Gain
-                if ganancia > mejor_ganancia:  # Si la ganancia es mejor que la mejor ganancia encontrada hasta ahora
-                    mejor_ganancia = ganancia  # Actualiza la mejor ganancia
-                    mejor_literal = literal  # Actualiza el mejor literal
-                    mejores_ejemplos = (nuevos_pos, nuevos_neg)  # Actualiza los mejores conjuntos de ejemplos
-
-            # Si no hay ganancia, terminar
-            if mejor_literal is None or mejor_ganancia <= 0:  # Si no se encontró un literal que mejore la cláusula
+            ganancias = self._evaluar_literales(clausula, literales_candidatos)  # Ganancia FOIL de cada candidato
+            if not ganancias or max(ganancias) <= 0:  # Si no se encontró un literal que mejore la cláusula
                 break  # Termina la búsqueda de literales para esta cláusula
+            mejor_literal = literales_candidatos[ganancias.index(max(ganancias))]  # Primer literal con la mejor ganancia
 
-            # Añadir el mejor literal a la cláusula
+            # Añadir el mejor literal a la cláusula y extender las tuplas
+            columnas = clausula['variables']
+            clausula['ejemplos_pos'], _ = self.base.extender(clausula['ejemplos_pos'], columnas, mejor_literal)
+            clausula['ejemplos_neg'], _ = self.base.extender(clausula['ejemplos_neg'], columnas, mejor_literal)
             clausula['cuerpo'].append(mejor_literal)  # Agrega el mejor literal al cuerpo de la cláusula
-            clausula['ejemplos_pos'] = mejores_ejemplos[0]  # Actualiza los ejemplos positivos cubiertos por la cláusula
-            clausula['ejemplos_neg'] = mejores_ejemplos[1]  # Actualiza los ejemplos negativos cubiertos por la cláusula
-
-            # Actualizar variables en la cláusula
-            clausula['variables'].update(self._extraer_variables(mejor_literal))  # Actualiza el conjunto de variables presentes en la cláusula
+            for v in mejor_literal[1:]:  # Las variables nuevas ocupan las siguientes columnas
+                if v not in columnas:
+                    columnas[v] = len(columnas)
 
             # Si cubre muy pocos positivos, descartar
-            if len(clausula['ejemplos_pos']) < self.min_cobertura:  # Si la cláusula cubre menos ejemplos positivos que el mínimo requerido
+            k = len(self.variables_cabeza)
+            if len({t[:k] for t in clausula['ejemplos_pos']}) < self.min_cobertura:  # Ejemplos distintos cubiertos
                 return None  # Descarta la cláusula (no es suficientemente general)
 
         return clausula if len(clausula['ejemplos_neg']) == 0 else None  # Devuelve la cláusula si no cubre ningún ejemplo negativo, de lo contrario devuelve None
 
+    def _evaluar_literales(self, clausula, literales):
+        """Ganancia FOIL de cada literal, repartiendo los candidatos entre procesos si hay pool"""
+        args = (clausula['variables'], clausula['ejemplos_pos'], clausula['ejemplos_neg'])
+        if self._pool is None or len(literales) < 2 * self.procesos:
+            return [ganancia_foil(self.base, literal, *args) for literal in literales]
+        grupos = [literales[i::self.procesos] for i in range(self.procesos)]  # Un grupo por proceso
+        resultados = list(self._pool.map(_evaluar_trabajador, [(grupo,) + args for grupo in grupos]))
+        ganancias = [None] * len(literales)
+        for i, parte in enumerate(resultados):  # Restaura el orden original (desempate estable)
+            ganancias[i::self.procesos] = parte
+        return ganancias
+
     def _generar_literales_candidatos(self, clausula):
         """Genera posibles literales para añadir al cuerpo de la cláusula"""
         candidatos = []  # Lista para almacenar los literales candidatos
-        vars_clausula = clausula['variables']  # Variables presentes en la cláusula actual
+        vars_clausula = list(clausula['variables'])  # Variables presentes en la cláusula actual
+        libres = [v for v in self.atributos if v not in clausula['variables']]  # Nombres para variables nuevas
 
         # Literales con relaciones existentes
-        for rel, hechos in self.relaciones.items():  # Itera sobre las relaciones de fondo
-            # Determinar aridad de la relación
-            aridad = len(hechos[0]) if hechos else 0  # Obtiene la aridad (número de argumentos) de la relación
-
-            # Generar combinaciones de variables
-            for vars_combo in combinations(vars_clausula.keys(), aridad):  # Genera todas las combinaciones posibles de variables con la aridad de la relación
-                # Crear nuevo literal
-                nuevo_literal = (rel,) + tuple(vars_combo)  # Crea un nuevo literal con el nombre de la relación y la combinación de variables
-                candidatos.append(nuevo_literal)  # Agrega el literal candidato a la lista
+        for rel in self.base.hechos:  # Itera sobre las relaciones de fondo
+            aridad = self.base.aridad[rel]  # Obtiene la aridad (número de argumentos) de la relación
+            nuevas = (libres + [f"V{i}" for i in range(len(clausula['variables']), len(clausula['variables']) + aridad)])[:aridad - 1]
+            for argumentos in product(vars_clausula + nuevas, repeat=aridad):
+                usadas = [v for v in argumentos if v in nuevas]
+                if len(usadas) == aridad:
+                    continue  # Al menos una variable ya ligada
+                # Variables nuevas en orden canónico (evita literales equivalentes por renombrado)
+                orden = list(dict.fromkeys(usadas))
+                if orden != nuevas[:len(orden)]:
+                    continue
+                nuevo_literal = (rel,) + argumentos  # Crea un nuevo literal con el nombre de la relación y sus variables
+                if nuevo_literal not in clausula['cuerpo']:
+                    candidatos.append(nuevo_literal)  # Agrega el literal candidato a la lista
 
         # Literales de igualdad entre variables
-        for var1, var2 in combinations(vars_clausula.keys(), 2):  # Genera todas las combinaciones posibles de 2 variables
-            if vars_clausula[var1] == vars_clausula[var2]:  # Mismo tipo
-                candidatos.append(('=', var1, var2))  # Agrega un literal de igualdad entre las variables
+        for i, var1 in enumerate(vars_clausula):  # Genera todas las parejas posibles de variables
+            for var2 in vars_clausula[i + 1:]:
+                if self.atributos.get(var1) == self.atributos.get(var2):  # Mismo tipo
+                    if ('=', var1, var2) not in clausula['cuerpo']:
+                        candidatos.append(('=', var1, var2))  # Agrega un literal de igualdad entre las variables
         return candidatos  # Devuelve la lista de literales candidatos
 
-    def _evaluar_literal(self, clausula, literal):
-        """Evalúa un literal candidato usando la métrica FOIL-Gain"""
-        nuevos_pos = set()  # Conjunto para almacenar los ejemplos positivos cubiertos por la cláusula con el nuevo literal
-        nuevos_neg = set()  # Conjunto para almacenar los ejemplos negativos cubiertos por la cláusula con el nuevo literal
-
-        # Filtrar ejemplos que satisfacen el nuevo literal
-        for ejemplo in clausula['ejemplos_pos']:  # Itera sobre los ejemplos positivos cubiertos por la cláusula actual
-            if self._satisface(ejemplo, clausula['variables'], literal):  # Si el ejemplo satisface el literal
-                nuevos_pos.add(ejemplo)  # Agrega el ejemplo a los nuevos ejemplos positivos
-
-        for ejemplo in clausula['ejemplos_neg']:  # Itera sobre los ejemplos negativos cubiertos por la cláusula actual
-            if self._satisface(ejemplo, clausula['variables'], literal):  # Si el ejemplo satisface el literal
-                nuevos_neg.add(ejemplo)  # Agrega el ejemplo a los nuevos ejemplos negativos
-
-        # Calcular FOIL-Gain
-        if not nuevos_pos:
-            return -1, None, None  # Si no cubre ningún ejemplo positivo, la ganancia es -1
-
-        t0 = len(clausula['ejemplos_pos'])  # Número de ejemplos positivos cubiertos por la cláusula antes de añadir el literal
-        t1 = len(nuevos_pos)  # Número de ejemplos positivos cubiertos por la cláusula después de añadir el literal
-        p0 = len(clausula['ejemplos_pos']) - len(clausula['ejemplos_neg'])  # Precisión de la cláusula antes de añadir el literal
-        p1 = len(nuevos_pos) - len(nuevos_neg)  # Precisión de la cláusula después de añadir el literal
-
-        ganancia = t1 * (np.log2(p1/t1) - np.log2(p0/t0)) if t1 > 0 else -1  # Calcula la ganancia de información de FOIL
-        return ganancia, nuevos_pos, nuevos_neg  # Devuelve la ganancia y los nuevos conjuntos de ejemplos
-
-    def _satisface(self, ejemplo, variables, literal):
-        """Verifica si un ejemplo satisface un literal con variables"""
-        # Implementación simplificada (en realidad necesitarías unificación)
-        # Esta es una versión muy simplificada para el ejemplo
-        return True  # En una implementación real, harías unificación lógica aquí
-
     def _cubre(self, clausula, ejemplo):
-        """Determina si una cláusula cubre un ejemplo"""
-        # Verificación simplificada
-        return ejemplo == clausula['cabeza']  # En realidad necesitarías resolución lógica
+        """Determina si una cláusula cubre un ejemplo (prueba del cuerpo sobre los índices)"""
+        if ejemplo[0] != clausula['cabeza'][0]:
+            return False
+        tuplas = [tuple(ejemplo[1:])]  # Ligaduras de las variables de la cabeza
+        columnas = {v: i for i, v in enumerate(clausula['cabeza'][1:])}
+        for literal in clausula['cuerpo']:
+            tuplas, _ = self.base.extender(tuplas, columnas, literal)
+            if not tuplas:
+                return False
+            for v in literal[1:]:
+                if v not in columnas:
+                    columnas[v] = len(columnas)
+        return True
+
+    def predecir(self, ejemplo):
+        """Verdadero si alguna cláusula aprendida cubre el ejemplo"""
+        return any(self._cubre(c, ejemplo) for c in self.clausulas)
 
     def _formatear_clausula(self, clausula):
         """Formatea una cláusula para visualización"""
         cabeza_str = f"{clausula['cabeza'][0]}({','.join(clausula['cabeza'][1:])})"  # Formatea la cabeza de la cláusula
-        cuerpo_str = ", ".join(f"{lit[0]}({','.join(lit[1:])})" if len(lit) > 1 else lit[0]
-                                 for lit in clausula['cuerpo'])  # Formatea el cuerpo de la cláusula
+        cuerpo_str = ", ".join(f"{lit[1]} = {lit[2]}" if lit[0] == '=' else f"{lit[0]}({','.join(lit[1:])})"
+                               for lit in clausula['cuerpo'])  # Formatea el cuerpo de la cláusula
         return f"{cabeza_str} :- {cuerpo_str}" if cuerpo_str else cabeza_str  # Devuelve la cláusula formateada en notación lógica
 
     def __str__(self):
         """Representación legible del modelo aprendido"""
         return "\n".join(self._formatear_clausula(c) for c in self.clausulas)  # Devuelve una representación en cadena de todas las cláusulas aprendidas
 
+# ----------------------------------------------------------------------
+# Trabajadores del pool (la base indexada se copia una vez por proceso)
+# ----------------------------------------------------------------------
+
+_BASE = None
+
+def _iniciar_trabajador(base):
+    global _BASE
+    _BASE = base
+
+def _evaluar_trabajador(args):
+    literales, columnas, pos, neg = args
+    return [ganancia_foil(_BASE, literal, columnas, pos, neg) for literal in literales]
+
+def familias_sinteticas(n_familias, semilla=0):
+    """Genera relaciones padre/madre de varias generaciones y los ejemplos de 'abuelo'"""
+    rng = random.Random(semilla)
+    padre, madre = [], []
+    for f in range(n_familias):
+        generacion = [(f"h{f}_0", f"m{f}_0")]  # Parejas (hombre, mujer) de la generación actual
+        contador = 1
+        for _ in range(3):
+            siguiente = []
+            for hombre, mujer in generacion:
+                for _ in range(rng.randint(1, 3)):
+                    hijo = f"p{f}_{contador}"
+                    contador += 1
+                    padre.append((hombre, hijo))
+                    madre.append((mujer, hijo))
+                    if rng.random() < 0.5:  # El hijo forma pareja y tiene descendencia
+                        siguiente.append((hijo, f"m{f}_{contador}"))
+                        contador += 1
+            generacion = siguiente or generacion
+    hijos = defaultdict(list)
+    for p, h in padre:
+        hijos[p].append(h)
+    positivos = [('abuelo', a, n) for a, h in padre for n in hijos.get(h, [])]
+    personas = sorted({x for hecho in padre + madre for x in hecho})
+    conjunto = set(positivos)
+    negativos = set()
+    while len(negativos) < 2 * len(positivos):  # Parejas al azar que no son abuelo/nieto
+        ejemplo = ('abuelo', rng.choice(personas), rng.choice(personas))
+        if ejemplo not in conjunto:
+            negativos.add(ejemplo)
+    return {'padre': padre, 'madre': madre}, positivos, sorted(negativos)
+
 # ==================== Ejemplo de Uso ====================
 if __name__ == "__main__":
     print("=== Ejemplo FOIL: Aprender relación 'abuelo' ===")
@@ -196,3 +349,12 @@ if __name__ == "__main__":
 
     print("\n=== Modelo Final Aprendido ===")
     print(foil)  # Imprime el modelo aprendido (las cláusulas lógicas)
+
+    # Base grande: miles de hechos, literales evaluados en dos procesos
+    relaciones, ejemplos_pos, ejemplos_neg = familias_sinteticas(2000)
+    n_hechos = sum(len(h) for h in relaciones.values())
+    print(f"\n=== {n_hechos} hechos, {len(ejemplos_pos)} positivos, {len(ejemplos_neg)} negativos ===")
+    inicio = time.perf_counter()
+    foil = FOIL(max_literales=3, min_cobertura=2, procesos=2)
+    foil.entrenar(ejemplos_pos, ejemplos_neg, relaciones, atributos)
+    print(f"Tiempo de entrenamiento: {time.perf_counter() - inicio:.2f} s")
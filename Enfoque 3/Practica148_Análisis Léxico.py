@@ -6,9 +6,12 @@ Implementa un analizador léxico básico que:
 """
 
 # ============ IMPORTACIONES ============
-import re  # Para expresiones regulares
+import os  # Para borrar el archivo temporal del ejemplo
+import tempfile  # Para comparar tokenize_file con Lexer.tokenize
+import time  # Para medir el rendimiento en el ejemplo
 from enum import Enum, auto  # Para tipos de tokens
-from typing import List, Tuple, Optional  # Para anotaciones de tipo
+from typing import Iterator, List, Tuple  # Para anotaciones de tipo
+from motor_lexico import MotorLexico  # Expresión maestra compilada una sola vez
 
 # ============ DEFINICIÓN DE TIPOS ============
 class TokenType(Enum):
@@ -55,6 +58,10 @@ TOKEN_PATTERNS = [
     (r'\s+', TokenType.WHITESPACE),
 ]
 
+# Todos los patrones en una sola expresión regular (se compila al importar)
+MOTOR = MotorLexico(TOKEN_PATTERNS, ignorar=(TokenType.COMMENT, TokenType.WHITESPACE),
+                    tipo_error=TokenType.ERROR)
+
 # ============ CLASE LEXER ============
 class Lexer:
     """Analizador léxico que convierte código fuente en tokens"""
@@ -79,45 +86,16 @@ class Lexer:
         Returns:
             Lista de tokens reconocidos
         """
-        while self.position < len(self.source_code):  # Itera sobre el código fuente hasta el final
-            # Intenta hacer match con cada patrón de token
-            matched = False  # Indica si se encontró un token para la posición actual
-
-            for pattern, token_type in TOKEN_PATTERNS:  # Itera sobre los patrones de tokens definidos
-                regex = re.compile(pattern)  # Compila la expresión regular del patrón
-                match = regex.match(self.source_code, self.position)  # Intenta encontrar el patrón desde la posición actual
-
-                if match:  # Si se encontró una coincidencia
-                    value = match.group(0)  # Obtiene el valor del texto que coincide con el patrón
-                    start_pos = (self.line, self.column)  # Guarda la posición inicial del token
-
-                    # Actualiza la posición de línea y columna
-                    lines = value.split('\n')  # Divide el valor del token por saltos de línea
-                    if len(lines) > 1:  # Si el token contiene saltos de línea
-                        self.line += len(lines) - 1  # Actualiza el número de línea
-                        self.column = len(lines[-1]) + 1  # La columna es la longitud de la última línea + 1
-                    else:
-                        self.column += len(value)  # Si no hay saltos de línea, la columna se incrementa por la longitud del token
-
-                    self.position = match.end()  # Avanza la posición del cursor al final del token encontrado
-
-                    # Ignora comentarios y espacios en blanco
-                    if token_type not in (TokenType.COMMENT, TokenType.WHITESPACE):  # Si el token no es un comentario o espacio
-                        end_pos = (self.line, self.column - 1)  # Guarda la posición final del token
-                        self.tokens.append((token_type, value, start_pos))  # Agrega el token a la lista de tokens
-
-                    matched = True  # Marca que se encontró un token
-                    break  # Sale del bucle interno (no necesita probar otros patrones)
-
-            if not matched:  # Si no se encontró ningún token
-                # Carácter no reconocido - error léxico
-                error_char = self.source_code[self.position]  # Obtiene el carácter no reconocido
-                error_pos = (self.line, self.column)  # Guarda la posición del error
-                self.tokens.append((TokenType.ERROR, error_char, error_pos))  # Agrega un token de error a la lista
-                self.position += 1  # Avanza el cursor una posición
-                self.column += 1
+        self.tokens = list(self.iter_tokens())  # Una sola pasada con la expresión maestra
+        self.position = len(self.source_code)  # El cursor queda al final del código
+        self.line = self.source_code.count('\n') + 1  # Línea final
+        self.column = len(self.source_code) - (self.source_code.rfind('\n') + 1) + 1  # Columna final
         return self.tokens  # Devuelve la lista de tokens encontrados
 
+    def iter_tokens(self) -> Iterator[Token]:
+        """Produce los tokens de forma perezosa (sin comentarios ni espacios)"""
+        return MOTOR.tokenizar(self.source_code)
+
     def print_tokens(self):
         """Muestra los tokens encontrados con formato"""
         print(f"{'TOKEN':<15} {'VALOR':<20} {'POSICIÓN':<10}")  # Imprime el encabezado de la tabla
@@ -125,6 +103,15 @@ class Lexer:
         for token_type, value, (line, col) in self.tokens:  # Itera sobre la lista de tokens
             print(f"{token_type.name:<15} {repr(value):<20} ({line}:{col})")  # Imprime cada token con su tipo, valor y posición
 
+def tokenize_file(path: str) -> Iterator[Token]:
+    """
+    Tokeniza un archivo de forma perezosa usando mmap
+
+    Args:
+        path: Ruta del archivo de código fuente (UTF-8)
+    """
+    return MOTOR.tokenizar_archivo(path)
+
 # ============ EJEMPLO DE USO ============
 if __name__ == "__main__":
     # Código de ejemplo para analizar
@@ -152,3 +139,19 @@ if __name__ == "__main__":
     print("\nTokens encontrados:")  # Imprime una etiqueta
     lexer.print_tokens()  # Imprime los tokens encontrados con formato
 
+    # Rendimiento con un código fuente de varios megabytes
+    big_code = SAMPLE_CODE * 20000  # Unos 4 MB de código
+    start = time.perf_counter()
+    n_tokens = len(Lexer(big_code).tokenize())
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(big_code) / 1e6:.1f} MB -> {n_tokens} tokens en {elapsed:.2f} s")
+
+    # El archivo (mmap) debe dar los mismos tokens que el texto, también fuera de ASCII
+    texto_unicode = "let ñandú = ú99;\n// ¿comentario?\nmúsica = 'ó' + x1;\n"
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".js", delete=False) as tmp:
+        tmp.write(texto_unicode)
+    try:
+        assert list(tokenize_file(tmp.name)) == Lexer(texto_unicode).tokenize()
+    finally:
+        os.remove(tmp.name)
+    print("tokenize_file coincide con Lexer.tokenize en texto no ASCII")
@@ -7,8 +7,9 @@ con capacidades de parsing y generación de oraciones.
 
 # ============ IMPORTACIONES ============
 from typing import List, Dict, Tuple, Optional, Set  # Tipos para type hints
-from enum import Enum                                # Para enumeraciones
+from enum import Enum, auto                          # Para enumeraciones
 import random                                       # Para generación aleatoria
+from motor_lexico import MotorLexico                # Lexer con expresión maestra
 
 # ============ DEFINICIÓN DE TIPOS ============
 class TokenType(Enum):                              # Enumeración de tipos de tokens
@@ -69,49 +70,19 @@ class DcgLexer:                                    # Analizador léxico
     
     def tokenize(self) -> List[Token]:            # Método principal
         """Convierte el texto en una lista de tokens"""
-        while self.pos < len(self.text):          # Mientras haya texto
-            current_char = self.text[self.pos]    # Carácter actual
-            
-            # Ignorar espacios en blanco
-            if current_char.isspace():            # Si es espacio
-                self._handle_whitespace(current_char) # Manejar espacio
-                continue                          # Continuar
-                
-            # Manejar signos de puntuación
-            if current_char in {'.', ',', ';'}:   # Si es puntuación
-                self.tokens.append((TokenType.PUNCTUATION, current_char, (self.line, self.column))) # Añadir token
-                self.pos += 1                     # Avanzar posición
-                self.column += 1                  # Avanzar columna
-                continue                         # Continuar
-                
-            # Extraer palabras completas
-            word = self._extract_word()           # Obtener palabra
-            
-            # Clasificar la palabra
-            token_type = self._classify_word(word) # Determinar tipo
-            self.tokens.append((token_type, word, (self.line, self.column - len(word)))) # Añadir token
+        for token_type, value, position in _MOTOR.tokenizar(self.text): # Una pasada con la expresión maestra
+            if token_type == "PALABRA":           # Si es una palabra
+                value = value.lower()             # Palabra en minúsculas
+                token_type = self._classify_word(value) # Determinar tipo
+            self.tokens.append((token_type, value, position)) # Añadir token
             
         # Añadir token EOF
+        self.pos = len(self.text)                 # Posición final
+        self.line = self.text.count('\n') + 1     # Línea final
+        self.column = self.pos - (self.text.rfind('\n') + 1) + 1 # Columna final
         self.tokens.append((TokenType.EOF, "", (self.line, self.column))) # Añadir fin
         return self.tokens                        # Retornar tokens
     
-    def _handle_whitespace(self, char: str) -> None: # Manejo de espacios
-        """Maneja caracteres de espacio en blanco"""
-        if char == '\n':                          # Si es salto de línea
-            self.line += 1                        # Incrementar línea
-            self.column = 1                       # Resetear columna
-        else:                                     # Otro espacio
-            self.column += 1                      # Incrementar columna
-        self.pos += 1                             # Avanzar posición
-    
-    def _extract_word(self) -> str:               # Extracción de palabra
-        """Extrae una palabra completa del texto"""
-        start_pos = self.pos                      # Posición inicial
-        while self.pos < len(self.text) and self.text[self.pos].isalpha(): # Mientras sea letra
-            self.pos += 1                         # Avanzar posición
-            self.column += 1                      # Avanzar columna
-        return self.text[start_pos:self.pos].lower() # Retornar palabra en minúsculas
-    
     def _classify_word(self, word: str) -> TokenType: # Clasificación
         """
         Clasifica una palabra según su tipo gramatical
@@ -137,6 +108,14 @@ class DcgLexer:                                    # Analizador léxico
         # Por defecto, considerar como sustantivo
         return TokenType.NOUN                     # Retornar sustantivo
 
+# Patrones del lexer: puntuación, palabras (letras Unicode) y espacios;
+# los caracteres no reconocidos se descartan
+_MOTOR = MotorLexico([
+    (r'[.,;]', TokenType.PUNCTUATION),            # Signos de puntuación
+    (r'[^\W\d_]+', "PALABRA"),                    # Palabras completas
+    (r'\s+', "ESPACIO"),                          # Espacios en blanco
+], ignorar=("ESPACIO",))
+
 # ============ CLASE PARSER DCG ============
 class DcgParser:                                  # Analizador sintáctico
     """Implementación de un parser para Gramáticas Causales Definidas"""
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de inferencia difusa Mamdani compilado para evaluar lotes de entradas.
+
+Las reglas se analizan una sola vez y quedan como una tabla de índices:
+cada regla es una disyunción (OR) de conjunciones (AND) de columnas de la
+matriz de pertenencias de entrada, y apunta a un conjunto de salida. Las
+curvas de los conjuntos de salida se muestrean una vez sobre una malla fija.
+Evaluar un lote de N entradas es entonces:
+    1. Fuzzificación: una matriz (N x conjuntos de entrada)
+    2. Activación: mínimo por conjunción, máximo por regla
+    3. Agregación: máximo sobre reglas de min(activación, curva)
+    4. Defuzzificación: centroide sobre la malla
+todo con operaciones NumPy sobre el lote completo.
+
+Sintaxis de reglas (español o inglés):
+    SI servicio ES pobre O comida ES mala ENTONCES propina ES baja
+    IF comida IS decente AND servicio IS bueno THEN propina IS media
+"""
+
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+# =============================================================================
+# 1. FUNCIONES DE PERTENENCIA VECTORIZADAS
+# =============================================================================
+
+class FuncionPertenencia:
+    """
+    Función de pertenencia lineal por tramos que acepta escalares o arreglos.
+
+    Atributos:
+        puntos: Vértices (x, y) de la función, para inspección o graficado
+    """
+
+    def __init__(self, subida: Tuple[float, float], bajada: Tuple[float, float]):
+        self.subida = subida                     # (inicio, fin) del tramo creciente
+        self.bajada = bajada                     # (inicio, fin) del tramo decreciente
+        self.puntos = [(subida[0], 0.0), (subida[1], 1.0), (bajada[0], 1.0), (bajada[1], 0.0)]
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        a, b = self.subida
+        c, d = self.bajada
+        # Un tramo de ancho cero es un escalón (hombro del conjunto)
+        sube = (x - a) / (b - a) if b > a else (x >= a).astype(float)
+        baja = (d - x) / (d - c) if d > c else (x <= d).astype(float)
+        mu = np.clip(np.minimum(sube, baja), 0.0, 1.0)
+        return float(mu) if mu.ndim == 0 else mu
+
+def triangular(a: float, b: float, c: float) -> FuncionPertenencia:
+    """Genera función de pertenencia triangular (admite a == b o b == c)"""
+    return FuncionPertenencia((a, b), (b, c))
+
+def trapezoidal(a: float, b: float, c: float, d: float) -> FuncionPertenencia:
+    """Genera función de pertenencia trapezoidal (admite hombros verticales)"""
+    return FuncionPertenencia((a, b), (c, d))
+
+def pertenencia_lote(funcion: Callable, x: np.ndarray) -> np.ndarray:
+    """
+    Evalúa una función de pertenencia sobre un arreglo.
+
+    Las funciones vectorizadas (FuncionPertenencia, o lambdas con np.exp) se
+    llaman una vez; las que sólo aceptan escalares se evalúan punto a punto.
+    """
+    try:
+        y = np.asarray(funcion(x), dtype=float)
+        if y.shape == x.shape:
+            return y
+    except (TypeError, ValueError):              # max()/min() de Python sobre arreglos
+        pass
+    return np.fromiter((funcion(xi) for xi in x.ravel()), dtype=float, count=x.size).reshape(x.shape)
+
+# =============================================================================
+# 2. ANÁLISIS DE REGLAS
+# =============================================================================
+
+SI = {"SI", "IF"}
+ES = {"ES", "IS"}
+Y = {"Y", "AND"}
+O = {"O", "OR"}
+ENTONCES = {"ENTONCES", "THEN"}
+
+def parsear_regla(regla: str) -> Tuple[List[List[Tuple[str, str]]], List[Tuple[str, str]]]:
+    """
+    Analiza una regla difusa.
+
+    Returns:
+        (antecedente como lista OR de listas AND de (variable, conjunto),
+         consecuentes como lista de (variable, conjunto))
+    """
+    tokens = regla.split()
+    if not tokens or tokens[0] not in SI:
+        raise ValueError(f"La regla debe empezar con SI/IF: {regla!r}")
+    corte = next((i for i, t in enumerate(tokens) if t in ENTONCES), None)
+    if corte is None:
+        raise ValueError(f"La regla no tiene ENTONCES/THEN: {regla!r}")
+
+    def clausulas(parte: List[str], conectores: set) -> List[List[Tuple[str, str]]]:
+        grupos, actual, i = [], [], 0
+        while i < len(parte):
+            if len(parte) - i < 3 or parte[i + 1] not in ES:
+                raise ValueError(f"Se esperaba 'variable ES conjunto' en: {regla!r}")
+            actual.append((parte[i], parte[i + 2]))
+            i += 3
+            if i < len(parte):
+                if parte[i] in O and O <= conectores:
+                    grupos.append(actual)
+                    actual = []
+                elif parte[i] not in Y:
+                    raise ValueError(f"Conector desconocido {parte[i]!r} en: {regla!r}")
+                i += 1
+        grupos.append(actual)
+        return grupos
+
+    antecedente = clausulas(tokens[1:corte], Y | O)
+    consecuentes = clausulas(tokens[corte + 1:], Y)[0]
+    return antecedente, consecuentes
+
+# =============================================================================
+# 3. MOTOR COMPILADO
+# =============================================================================
+
+class MotorDifuso:
+    """
+    Sistema Mamdani compilado (mín/máx y centroide) para lotes de entradas.
+
+    Atributos:
+        entradas: Nombres de las variables de entrada, en el orden de columnas
+        salidas: Nombres de las variables de salida
+        mallas: {salida: puntos x de la malla de defuzzificación}
+    """
+
+    def __init__(self, entradas: Dict[str, Dict[str, Callable]],
+                 salidas: Dict[str, Tuple[Tuple[float, float], Dict[str, Callable]]],
+                 reglas: List[str], puntos: int = 100):
+        """
+        Args:
+            entradas: {variable: {conjunto: función de pertenencia}}
+            salidas: {variable: (dominio, {conjunto: función de pertenencia})}
+            reglas: Reglas en texto (ver parsear_regla)
+            puntos: Puntos de la malla de salida
+        """
+        self.entradas = list(entradas)
+        self.funciones = []                      # Columna -> (variable, función)
+        columna = {}
+        for var, conjuntos in entradas.items():
+            for nombre, funcion in conjuntos.items():
+                columna[(var, nombre)] = len(self.funciones)
+                self.funciones.append((var, funcion))
+        self.unos = len(self.funciones)          # Columna constante 1 (relleno del mínimo)
+
+        # Tabla de conjunciones: filas de índices de columna, rellenas con la columna de unos
+        conjunciones, regla_de, salida_de = [], [], []
+        for r, texto in enumerate(reglas):
+            antecedente, consecuentes = parsear_regla(texto)
+            for conjuncion in antecedente:
+                indices = []
+                for var, nombre in conjuncion:
+                    if (var, nombre) not in columna:
+                        raise ValueError(f"Conjunto de entrada desconocido {var} ES {nombre} en: {texto!r}")
+                    indices.append(columna[(var, nombre)])
+                conjunciones.append(indices)
+                regla_de.append(r)
+            for var, nombre in consecuentes:
+                if var not in salidas or nombre not in salidas[var][1]:
+                    raise ValueError(f"Conjunto de salida desconocido {var} ES {nombre} en: {texto!r}")
+                salida_de.append((r, var, nombre))
+        ancho = max((len(c) for c in conjunciones), default=1)
+        self.conjunciones = np.full((len(conjunciones), ancho), self.unos, dtype=np.intp)
+        for i, indices in enumerate(conjunciones):
+            self.conjunciones[i, :len(indices)] = indices
+        self.regla_de = np.array(regla_de, dtype=np.intp)
+        self.n_reglas = len(reglas)
+
+        # Curvas de salida sobre la malla: una fila por (regla, consecuente) de cada salida
+        self.salidas = list(salidas)
+        self.mallas, self.curvas, self.reglas_salida = {}, {}, {}
+        for var, (dominio, conjuntos) in salidas.items():
+            x = np.linspace(dominio[0], dominio[1], puntos)
+            usos = [(r, nombre) for r, v, nombre in salida_de if v == var]
+            self.mallas[var] = x
+            self.reglas_salida[var] = np.array([r for r, _ in usos], dtype=np.intp)
+            self.curvas[var] = (np.array([pertenencia_lote(conjuntos[nombre], x) for _, nombre in usos])
+                                if usos else np.zeros((0, puntos)))
+
+    def fuzzificar(self, valores: Dict[str, np.ndarray]) -> np.ndarray:
+        """Matriz de pertenencias (N x conjuntos de entrada + columna de unos)."""
+        faltan = [v for v in self.entradas if v not in valores]
+        if faltan:
+            raise ValueError(f"Faltan valores de entrada: {faltan}")
+        n = len(np.atleast_1d(valores[self.entradas[0]])) if self.entradas else 1
+        grados = np.ones((n, self.unos + 1))
+        for j, (var, funcion) in enumerate(self.funciones):
+            grados[:, j] = pertenencia_lote(funcion, np.atleast_1d(np.asarray(valores[var], dtype=float)))
+        return grados
+
+    def activaciones(self, grados: np.ndarray) -> np.ndarray:
+        """Grado de activación de cada regla (N x reglas)."""
+        por_conjuncion = grados[:, self.conjunciones].min(axis=2)  # AND = mínimo
+        activacion = np.zeros((grados.shape[0], self.n_reglas))
+        for k in range(por_conjuncion.shape[1]):                  # OR = máximo
+            r = self.regla_de[k]
+            np.maximum(activacion[:, r], por_conjuncion[:, k], out=activacion[:, r])
+        return activacion
+
+    def evaluar_lote(self, valores: Dict[str, np.ndarray], tam_lote: int = 4096) -> Dict[str, np.ndarray]:
+        """
+        Evalúa N entradas a la vez.
+
+        Args:
+            valores: {variable de entrada: arreglo de N valores}
+            tam_lote: Entradas procesadas juntas (acota la memoria de la agregación)
+
+        Returns:
+            {variable de salida: arreglo de N valores defuzzificados}
+        """
+        activacion = self.activaciones(self.fuzzificar(valores))
+        n = activacion.shape[0]
+        resultados = {}
+        for var in self.salidas:
+            x, curvas = self.mallas[var], self.curvas[var]
+            centroides = np.empty(n)
+            for inicio in range(0, n, tam_lote):
+                act = activacion[inicio:inicio + tam_lote, self.reglas_salida[var]]
+                if curvas.shape[0]:
+                    agregada = np.minimum(act[:, :, None], curvas[None]).max(axis=1)
+                else:
+                    agregada = np.zeros((act.shape[0], len(x)))
+                masa = agregada.sum(axis=1)
+                con_masa = masa > 0
+                centroides[inicio:inicio + len(act)] = np.where(
+                    con_masa, (agregada @ x) / np.where(con_masa, masa, 1.0), x.mean())
+            resultados[var] = centroides
+        return resultados
+
+    def evaluar(self, valores: Dict[str, float]) -> Dict[str, float]:
+        """Evalúa una sola entrada (lote de tamaño 1)."""
+        return {var: float(y[0]) for var, y in self.evaluar_lote({v: [valores[v]] for v in valores}).items()}
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Analizador léxico de una sola pasada basado en una expresión regular maestra.
+
+Los patrones (expresión, tipo) se compilan una sola vez en una alternancia
+con un grupo con nombre por patrón, en el mismo orden de prioridad: en cada
+posición gana el primer patrón que coincide, igual que probarlos uno por
+uno. Una última alternativa de un carácter marca los errores léxicos, así
+que finditer recorre el texto sin huecos. Línea y columna salen de los
+desplazamientos de los saltos de línea, calculados una vez, con búsqueda
+binaria.
+
+Los tokens se producen de forma perezosa. La entrada binaria (bytes o el
+mmap de tokenizar_archivo) se decodifica como UTF-8 y se analiza con la misma
+expresión sobre str: una expresión sobre bytes haría \\w, \\s y \\b ASCII y
+daría otros tokens para el texto no ASCII.
+"""
+
+import bisect
+import mmap
+import re
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+# Token: (tipo, valor, (línea, columna))
+Token = Tuple[Any, str, Tuple[int, int]]
+
+class MotorLexico:
+    """
+    Lexer compilado a partir de una lista ordenada de patrones.
+
+    Atributos:
+        regex: Expresión maestra sobre str
+    """
+
+    def __init__(self, patrones: Iterable[Tuple[str, Any]], ignorar: Iterable[Any] = (),
+                 tipo_error: Optional[Any] = None, banderas: int = 0):
+        """
+        Args:
+            patrones: Lista ordenada de (expresión regular, tipo de token)
+            ignorar: Tipos que no se emiten (espacios, comentarios)
+            tipo_error: Tipo para caracteres no reconocidos (None = se descartan)
+            banderas: Banderas de re para toda la expresión
+        """
+        self.tipos = []                          # Grupo T<i> -> tipo del patrón i
+        alternativas = []
+        for i, (patron, tipo) in enumerate(patrones):
+            re.compile(patron)                   # Error claro si un patrón es inválido
+            alternativas.append(f"(?P<T{i}>{patron})")
+            self.tipos.append(tipo)
+        self.ignorar = set(ignorar)
+        self.tipo_error = tipo_error
+        maestra = "|".join(alternativas)
+        self.regex = re.compile(f"{maestra}|(?P<ERROR>[\\s\\S])" if maestra else "(?P<ERROR>[\\s\\S])", banderas)
+        # Número de grupo -> tipo emitido (None si se ignora); m.lastindex es el grupo externo
+        self._tipos = [None] * (self.regex.groups + 1)
+        for nombre, numero in self.regex.groupindex.items():
+            tipo = self.tipo_error if nombre == "ERROR" else self.tipos[int(nombre[1:])]
+            if tipo not in self.ignorar:
+                self._tipos[numero] = tipo
+
+    def tokenizar(self, texto) -> Iterator[Token]:
+        """
+        Produce los tokens de un str, bytes o mmap, en orden.
+
+        Args:
+            texto: Código fuente (str) o contenido binario UTF-8 (bytes/mmap)
+        """
+        if not isinstance(texto, str):
+            texto = str(texto, "utf-8", "replace")  # Mismos tokens y columnas que sobre str
+        tipos = self._tipos
+        saltos = []                              # Desplazamiento de cada salto de línea
+        inicio = texto.find("\n")
+        while inicio != -1:
+            saltos.append(inicio)
+            inicio = texto.find("\n", inicio + 1)
+        saltos.append(len(texto))                # Centinela
+
+        linea, inicio_linea = 0, 0               # Los tokens llegan en orden: avance incremental
+        for m in self.regex.finditer(texto):
+            tipo = tipos[m.lastindex]
+            if tipo is None:
+                continue
+            inicio = m.start()
+            if saltos[linea] < inicio:
+                linea = bisect.bisect_left(saltos, inicio, linea)  # Saltos antes del token
+                inicio_linea = saltos[linea - 1] + 1
+            yield (tipo, m.group(), (linea + 1, inicio - inicio_linea + 1))
+
+    def tokenizar_archivo(self, ruta: str) -> Iterator[Token]:
+        """
+        Produce los tokens de un archivo UTF-8 mapeado en memoria.
+
+        El mapa se decodifica de una vez en un solo str (todo el texto queda
+        en memoria); por trozos, un token que cruzara un corte podría cambiar.
+        """
+        with open(ruta, "rb") as archivo:
+            if archivo.seek(0, 2) == 0:          # mmap no admite archivos vacíos
+                return
+            with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                yield from self.tokenizar(mapa)
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from indice_autos import IndiceAutos, resolver_lote
 import sys
 
 # =========================================================================================
@@ -142,6 +143,7 @@ class ExpertSystem:
     def __init__(self, knowledge_base):
         """Inicializa el sistema con la Base de Conocimiento."""
         self.knowledge_base = knowledge_base
+        self.indice = IndiceAutos(knowledge_base) # Base de Conocimiento compilada (rangos y máscaras)
         self.facts = {} # Memoria de trabajo (Base de Hechos)
 
     def _get_price_range(self, budget_level):
@@ -221,29 +223,19 @@ class ExpertSystem:
         """
         self.facts = facts
         trazabilidad = []
-        autos_candidatos = self.knowledge_base
         
         # -----------------------------------------------------------------------
-        # PASO 1: FILTRADO POR RESTRICCIONES RÍGIDAS
+        # PASO 1: FILTRADO POR RESTRICCIONES RÍGIDAS (búsquedas por rango en el índice)
         # -----------------------------------------------------------------------
         
-        # REGLA 1: Presupuesto
+        # REGLA 1: Presupuesto y REGLA 2: Capacidad Mínima
         presupuesto_min, presupuesto_max = self._get_price_range(self.facts.get("presupuesto"))
-        autos_filtrados = [
-            car for car in autos_candidatos 
-            if car["precio_min"] >= presupuesto_min and car["precio_min"] <= presupuesto_max
-        ]
-        trazabilidad.append(f"REGLA 1: Presupuesto '{self.facts.get('presupuesto')}' ({self._format_currency(presupuesto_min)} - {self._format_currency(presupuesto_max)}). Autos restantes: {len(autos_filtrados)}")
-
-        # REGLA 2: Capacidad Mínima
         capacidad_minima = self.facts.get("capacidad_minima", 5)
-        autos_filtrados = [
-            car for car in autos_filtrados 
-            if car["capacidad_max"] >= capacidad_minima
-        ]
-        trazabilidad.append(f"REGLA 2: Capacidad mínima de {capacidad_minima} personas. Autos restantes: {len(autos_filtrados)}")
+        en_presupuesto, candidatos = self.indice.filtrar(presupuesto_min, presupuesto_max, capacidad_minima)
+        trazabilidad.append(f"REGLA 1: Presupuesto '{self.facts.get('presupuesto')}' ({self._format_currency(presupuesto_min)} - {self._format_currency(presupuesto_max)}). Autos restantes: {en_presupuesto}")
+        trazabilidad.append(f"REGLA 2: Capacidad mínima de {capacidad_minima} personas. Autos restantes: {len(candidatos)}")
         
-        if not autos_filtrados:
+        if len(candidatos) == 0:
             return {"recommendations": [], "trazabilidad": trazabilidad}
 
         # -----------------------------------------------------------------------
@@ -253,8 +245,18 @@ class ExpertSystem:
         primary_use_tag = self._get_use_tag(self.facts.get("uso_principal"))
         trazabilidad.append(f"REGLA 3: Priorizando autos con el tag clave: '{primary_use_tag}' (Uso Principal: {self.facts.get('uso_principal')}).")
         
+        # Puntuación vectorizada y selección de los 3 mejores sin ordenar todo
+        mejores = self.indice.mejores(
+            candidatos,
+            self.facts.get("motor_preferido", "Gasolina"),
+            self.facts.get("estilo_preferido", "Clásico"),
+            primary_use_tag,
+            k=3
+        )
+        
+        # Sólo los ganadores generan sus razones detalladas
         scored_cars = []
-        for car in autos_filtrados:
+        for car in mejores:
             car_reasons = []
             score = self._score_car_detailed(car, primary_use_tag, car_reasons)
             scored_cars.append({
@@ -262,12 +264,15 @@ class ExpertSystem:
                 "score": score,
                 "detail_reasons": car_reasons
             })
-            
-        # Ordenar por puntuación descendente
-        scored_cars.sort(key=lambda x: x['score'], reverse=True)
         
-        # Devolver solo los 3 mejores
-        return {"recommendations": scored_cars[:3], "trazabilidad": trazabilidad} 
+        return {"recommendations": scored_cars, "trazabilidad": trazabilidad}
+
+    def inferir_lote(self, lista_facts):
+        """
+        Inferencia por lotes: un resultado por cada conjunto de hechos.
+        Los conjuntos repetidos se resuelven una sola vez y comparten resultado.
+        """
+        return resolver_lote(lista_facts, self.inferir)
 
 
 # =========================================================================================
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de carga local para servicio_recomendacion.
+
+Abre varios clientes TCP concurrentes que envían hechos aleatorios (con las
+mismas opciones que ofrece la GUI) y reporta la latencia p50/p99 y el
+rendimiento en peticiones por segundo. Sin --host levanta el servicio en
+este mismo proceso, opcionalmente con un catálogo sintético grande.
+
+Uso:
+    python carga_recomendacion.py --clientes 32 --peticiones 200 --autos 50000
+    python carga_recomendacion.py --host 127.0.0.1 --puerto 8765
+"""
+
+import argparse                                      # Argumentos de línea de comandos
+import asyncio                                       # Clientes concurrentes
+import json                                          # Peticiones JSON
+import math                                          # Rango del percentil
+import random                                        # Hechos aleatorios
+import time                                          # Medición de latencias
+
+from servicio_recomendacion import ServicioRecomendacion, cargar_catalogo, cargar_modulo, VARIANTE
+
+# Opciones de la GUI (CarExpertSystemApp)
+PRESUPUESTOS = ["Bajo", "Medio", "Alto"]
+USOS = ["Familiar", "Urbano", "Aventura", "Trabajo", "Deportivo"]
+ESTILOS = ["Clásico", "Deportivo", "Moderno", "Robusto", "Único"]
+MOTORES = ["Gasolina", "Híbrido", "Eléctrico"]
+
+def hechos_aleatorios(rng):
+    """Un conjunto de hechos como los que produce la GUI."""
+    return {
+        "presupuesto": rng.choice(PRESUPUESTOS),
+        "capacidad_minima": rng.randint(2, 8),
+        "uso_principal": rng.choice(USOS),
+        "estilo_preferido": rng.choice(ESTILOS),
+        "motor_preferido": rng.choice(MOTORES),
+    }
+
+def catalogo_sintetico(base, n, rng):
+    """
+    Replica un catálogo variando precio, capacidad y seguridad.
+
+    Parámetros:
+        base: Catálogo original                        (list)
+        n:    Número de autos a generar                (int)
+        rng:  Generador aleatorio                      (random.Random)
+
+    Retorna:
+        Catálogo de n autos                            (list)
+    """
+    autos = []
+    for i in range(n):
+        car = dict(rng.choice(base))
+        car["modelo"] = f"{car['modelo']} #{i}"
+        car["precio_min"] = max(5000, int(car["precio_min"] * rng.uniform(0.7, 1.3)))
+        car["capacidad_max"] = max(2, car["capacidad_max"] + rng.randint(-1, 1))
+        car["seguridad"] = min(5, max(1, car["seguridad"] + rng.randint(-1, 1)))
+        autos.append(car)
+    return autos
+
+def percentil(valores, p):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores:
+        return float("nan")
+    k = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[k]
+
+async def _cliente(host, puerto, peticiones, rng, latencias):
+    """Un cliente: envía sus peticiones de una en una y mide cada respuesta."""
+    reader, writer = await asyncio.open_connection(host, puerto)
+    errores = 0
+    try:
+        for _ in range(peticiones):
+            linea = json.dumps(hechos_aleatorios(rng), ensure_ascii=False).encode("utf-8") + b"\n"
+            inicio = time.perf_counter()
+            writer.write(linea)
+            await writer.drain()
+            respuesta = await reader.readline()
+            latencias.append(time.perf_counter() - inicio)
+            if not respuesta or "error" in json.loads(respuesta):
+                errores += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return errores
+
+async def medir(host, puerto, clientes=16, peticiones=100, semilla=0):
+    """
+    Lanza la carga contra un servicio ya escuchando.
+
+    Parámetros:
+        host:       Dirección del servicio            (str)
+        puerto:     Puerto del servicio               (int)
+        clientes:   Conexiones concurrentes           (int)
+        peticiones: Peticiones por cliente            (int)
+        semilla:    Semilla de los hechos aleatorios  (int)
+
+    Retorna:
+        Resumen con latencias (ms) y rendimiento      (dict)
+    """
+    latencias = []
+    inicio = time.perf_counter()
+    errores = await asyncio.gather(*(
+        _cliente(host, puerto, peticiones, random.Random(semilla * 1000003 + i), latencias)
+        for i in range(clientes)))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "errores": sum(errores),
+        "segundos": segundos,
+        "por_segundo": len(latencias) / max(segundos, 1e-9),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "max_ms": latencias[-1] * 1000 if latencias else float("nan"),
+    }
+
+async def _principal(args):
+    servicio = servidor = None
+    host, puerto = args.host, args.puerto
+    if host is None:                                 # Servicio en este mismo proceso
+        rng = random.Random(args.semilla)
+        base = cargar_catalogo(args.catalogo) if args.catalogo else cargar_modulo(VARIANTE).CAR_DATASET
+        catalogo = catalogo_sintetico(base, args.autos, rng) if args.autos else base
+        servicio = ServicioRecomendacion(catalogo, max_lote=args.max_lote)
+        servidor = await servicio.servir("127.0.0.1", 0)
+        host, puerto = "127.0.0.1", servidor.sockets[0].getsockname()[1]
+        print(f"Servicio local con {len(catalogo)} autos en el puerto {puerto}")
+    try:
+        resumen = await medir(host, puerto, args.clientes, args.peticiones, args.semilla)
+    finally:
+        if servidor is not None:
+            servidor.close()
+            await servidor.wait_closed()
+            await servicio.cerrar()
+
+    print(f"Peticiones: {resumen['peticiones']} ({resumen['errores']} con error) "
+          f"en {resumen['segundos']:.2f} s")
+    print(f"Rendimiento: {resumen['por_segundo']:.1f} peticiones/s")
+    print(f"Latencia: p50 {resumen['p50_ms']:.2f} ms, p99 {resumen['p99_ms']:.2f} ms, "
+          f"máx {resumen['max_ms']:.2f} ms")
+    if servicio is not None and servicio.lotes:
+        print(f"Micro-lotes: {servicio.lotes} (promedio {servicio.atendidas / servicio.lotes:.1f} peticiones)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga aleatoria contra el servicio de recomendación.")
+    parser.add_argument("--host", default=None, help="Servicio remoto (por defecto se levanta uno local)")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--clientes", type=int, default=16, help="Conexiones concurrentes")
+    parser.add_argument("--peticiones", type=int, default=100, help="Peticiones por cliente")
+    parser.add_argument("--catalogo", help="Catálogo .json o script con CAR_DATASET (servicio local)")
+    parser.add_argument("--autos", type=int, default=0, help="Tamaño del catálogo sintético (servicio local)")
+    parser.add_argument("--max-lote", type=int, default=256, help="Peticiones por micro-lote (servicio local)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(_principal(args))
+
+if __name__ == "__main__":
+    main()
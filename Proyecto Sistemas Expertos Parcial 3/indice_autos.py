@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Índice compilado de la Base de Conocimiento de automóviles.
+
+Se construye una sola vez por catálogo y lo comparten todas las variantes de
+ExpertSystem:
+    - Precios ordenados: la Regla 1 (presupuesto) es un rango por búsqueda binaria.
+    - Cubetas de capacidad: para cada capacidad distinta, máscara de los autos
+      que la alcanzan; la Regla 2 sólo recorre el tramo de precio ya acotado.
+    - Columnas de puntuación (motor, estilo, seguridad) y una máscara por tag,
+      así las reglas suaves se evalúan sobre todos los candidatos a la vez.
+Los mejores k se eligen sin ordenar a todos los candidatos y con el mismo
+desempate que el sort estable original (orden de la Base de Conocimiento).
+"""
+
+import numpy as np                                   # Columnas y máscaras vectorizadas
+
+# Pesos de las reglas suaves (los mismos que _score_car_detailed)
+PUNTOS_MOTOR = {"Eléctrico": 7, "Híbrido": 5, "Gasolina": 2}
+PUNTOS_ESTILO = 4
+PUNTOS_USO = 3
+PUNTOS_SEGURIDAD = 2
+
+class IndiceAutos:
+    """Base de Conocimiento compilada a arreglos ordenados por precio."""
+
+    def __init__(self, knowledge_base):
+        """
+        Compila el catálogo.
+
+        Parámetros:
+            knowledge_base: Lista de autos (dicts de CAR_DATASET) (list)
+        """
+        self.autos = list(knowledge_base)
+        n = len(self.autos)
+        precios = np.array([car["precio_min"] for car in self.autos], dtype=float)
+        self.orden = np.argsort(precios, kind="stable")  # Posición -> índice en la base
+        self.precios = precios[self.orden]
+        autos = [self.autos[i] for i in self.orden]
+
+        capacidades = np.array([car["capacidad_max"] for car in autos], dtype=float)
+        self.umbrales = np.unique(capacidades)       # Capacidades distintas, ascendentes
+        self.cubetas = [capacidades >= c for c in self.umbrales]
+
+        electrico = np.array([bool(car["electricidad"]) for car in autos], dtype=bool)
+        hibrido = np.array([bool(car["hibrido"]) for car in autos], dtype=bool)
+        self.puntos_motor = {                        # Regla 3.1 por preferencia
+            "Eléctrico": np.where(electrico, PUNTOS_MOTOR["Eléctrico"], 0),
+            "Híbrido": np.where(hibrido, PUNTOS_MOTOR["Híbrido"], 0),
+            "Gasolina": np.where(~hibrido & ~electrico, PUNTOS_MOTOR["Gasolina"], 0),
+        }
+        self.codigo_estilo = {}                      # Regla 3.2: estilo -> código entero
+        self.estilos = np.array([self.codigo_estilo.setdefault(car["estilo"], len(self.codigo_estilo))
+                                 for car in autos], dtype=np.int32)
+        self.mascaras_tag = {}                       # Regla 3.3: tag -> máscara de autos
+        for posicion, car in enumerate(autos):
+            for tag in car["tags"]:
+                if tag not in self.mascaras_tag:
+                    self.mascaras_tag[tag] = np.zeros(n, dtype=bool)
+                self.mascaras_tag[tag][posicion] = True
+        self.puntos_seguridad = np.array(            # Bonus implícito de seguridad
+            [PUNTOS_SEGURIDAD if car["seguridad"] == 5 else 0 for car in autos], dtype=np.int64)
+        self._filtros = {}                           # (min, max, capacidad) -> resultado
+
+    def filtrar(self, presupuesto_min, presupuesto_max, capacidad_minima):
+        """
+        Aplica las reglas rígidas (presupuesto y capacidad) con búsquedas por rango.
+
+        Parámetros:
+            presupuesto_min:  Precio mínimo incluido       (float)
+            presupuesto_max:  Precio máximo incluido       (float)
+            capacidad_minima: Plazas mínimas               (int)
+
+        Retorna:
+            (autos dentro del presupuesto, posiciones que cumplen ambas reglas) (tuple)
+        """
+        clave = (presupuesto_min, presupuesto_max, capacidad_minima)
+        resultado = self._filtros.get(clave)
+        if resultado is None:
+            desde = int(np.searchsorted(self.precios, presupuesto_min, side="left"))
+            hasta = int(np.searchsorted(self.precios, presupuesto_max, side="right"))
+            hasta = max(desde, hasta)
+            cubeta = int(np.searchsorted(self.umbrales, capacidad_minima, side="left"))
+            if cubeta == len(self.umbrales):         # Nadie alcanza esa capacidad
+                posiciones = np.empty(0, dtype=np.int64)
+            elif cubeta == 0:                        # Todos la alcanzan
+                posiciones = np.arange(desde, hasta)
+            else:
+                posiciones = desde + np.flatnonzero(self.cubetas[cubeta][desde:hasta])
+            resultado = (hasta - desde, posiciones)
+            if len(self._filtros) >= 1024:           # Memo acotada para lotes
+                self._filtros.clear()
+            self._filtros[clave] = resultado
+        return resultado
+
+    def puntuar(self, posiciones, motor_pref, estilo_pref, primary_use_tag):
+        """
+        Evalúa las reglas suaves para varios autos a la vez.
+
+        Parámetros:
+            posiciones:      Posiciones en el orden por precio (ndarray)
+            motor_pref:      Motor preferido               (str)
+            estilo_pref:     Estilo preferido              (str)
+            primary_use_tag: Tag clave del uso principal   (str)
+
+        Retorna:
+            Puntuación de cada posición                   (ndarray)
+        """
+        puntos = self.puntos_seguridad[posiciones].copy()
+        motor = self.puntos_motor.get(motor_pref)
+        if motor is not None:
+            puntos += motor[posiciones]
+        codigo = self.codigo_estilo.get(estilo_pref)
+        if codigo is not None:
+            puntos += PUNTOS_ESTILO * (self.estilos[posiciones] == codigo)
+        mascara = self.mascaras_tag.get(primary_use_tag)
+        if mascara is not None:
+            puntos += PUNTOS_USO * mascara[posiciones]
+        return puntos
+
+    def mejores(self, posiciones, motor_pref, estilo_pref, primary_use_tag, k=3):
+        """
+        Los k autos de mayor puntuación; los empates conservan el orden de la base.
+
+        Parámetros:
+            posiciones:      Candidatos ya filtrados       (ndarray)
+            motor_pref:      Motor preferido               (str)
+            estilo_pref:     Estilo preferido              (str)
+            primary_use_tag: Tag clave del uso principal   (str)
+            k:               Número de recomendaciones     (int)
+
+        Retorna:
+            Autos recomendados, del mejor al peor          (list)
+        """
+        if k <= 0 or len(posiciones) == 0:
+            return []
+        puntos = self.puntuar(posiciones, motor_pref, estilo_pref, primary_use_tag)
+        indices = self.orden[posiciones]
+        # Clave única: más puntos primero y, a igualdad, menor índice en la base
+        clave = -puntos * (len(self.autos) + 1) + indices
+        if len(clave) > k:                           # Selección parcial O(n)
+            elegidos = np.argpartition(clave, k - 1)[:k]
+            clave, indices = clave[elegidos], indices[elegidos]
+        return [self.autos[i] for i in indices[np.argsort(clave)]]
+
+def resolver_lote(lista_facts, inferir):
+    """
+    Responde muchos conjuntos de hechos con un mismo motor de inferencia.
+
+    Los conjuntos de hechos repetidos (habituales: pocas opciones por pregunta)
+    se infieren una sola vez y comparten el mismo resultado; los rangos de
+    presupuesto/capacidad ya consultados se reutilizan desde el índice.
+
+    Parámetros:
+        lista_facts: Conjuntos de hechos, uno por usuario (iterable)
+        inferir:     facts -> resultado de la inferencia  (callable)
+
+    Retorna:
+        Un resultado por conjunto de hechos, en orden     (list)
+    """
+    resultados, memo = [], {}
+    for facts in lista_facts:
+        try:
+            clave = frozenset(facts.items())
+        except TypeError:                            # Hechos con valores no hashables
+            resultados.append(inferir(dict(facts)))
+            continue
+        if clave not in memo:
+            memo[clave] = inferir(dict(facts))
+        resultados.append(memo[clave])
+    return resultados
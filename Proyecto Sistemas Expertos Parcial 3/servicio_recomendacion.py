@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio de recomendación sin interfaz gráfica.
+
+Expone el ExpertSystem de "Sistema ex6.py" (u otra variante) como servicio
+importable con un bucle asyncio y JSON de entrada/salida, sin depender de
+CarExpertSystemApp ni de una pantalla.
+
+Protocolo (una línea JSON por petición y por respuesta):
+    {"presupuesto": "Medio", "capacidad_minima": 5, "uso_principal": "Familiar",
+     "estilo_preferido": "Clásico", "motor_preferido": "Gasolina"}
+    {"lote": [hechos, hechos, ...]}
+La respuesta tiene la misma forma que ExpertSystem.inferir
+({"recommendations": [...], "trazabilidad": [...]}), una lista de ellas
+para un lote, o {"error": "..."} si los hechos no son válidos.
+
+Las peticiones concurrentes se agrupan en micro-lotes y se resuelven con
+ExpertSystem.inferir_lote.
+
+Uso:
+    python servicio_recomendacion.py --puerto 8765
+    python servicio_recomendacion.py --stdin < peticiones.jsonl
+    python servicio_recomendacion.py --catalogo "Sistema Experto de Recomendación de Automóviles.py"
+"""
+
+import argparse                                      # Argumentos de línea de comandos
+import asyncio                                       # Bucle de peticiones
+import importlib.util                                # Carga de módulos con espacios en el nombre
+import json                                          # Entrada/salida JSON
+import os                                            # Rutas relativas a esta carpeta
+import sys                                           # Flujos estándar
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+VARIANTE = os.path.join(CARPETA, "Sistema ex6.py")   # ExpertSystem por defecto
+CAMPOS_TEXTO = ["presupuesto", "uso_principal", "estilo_preferido", "motor_preferido"]
+
+def cargar_modulo(ruta):
+    """
+    Importa un script de la carpeta aunque su nombre tenga espacios.
+
+    Parámetros:
+        ruta: Ruta al archivo .py                      (str)
+
+    Retorna:
+        Módulo cargado (su bloque __main__ no se ejecuta) (module)
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0].replace(" ", "_")
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+def cargar_catalogo(ruta):
+    """
+    Lee una Base de Conocimiento desde un .json o desde un script con CAR_DATASET.
+
+    Parámetros:
+        ruta: Archivo del catálogo                     (str)
+
+    Retorna:
+        Lista de autos                                 (list)
+    """
+    if ruta.lower().endswith(".json"):
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    return cargar_modulo(ruta).CAR_DATASET
+
+def validar_hechos(facts):
+    """
+    Misma validación que CarExpertSystemApp._get_current_facts, sin widgets.
+
+    Parámetros:
+        facts: Hechos recibidos                        (dict)
+
+    Retorna:
+        Hechos normalizados                            (dict)
+    """
+    if not isinstance(facts, dict):
+        raise ValueError("Los hechos deben ser un objeto JSON.")
+    hechos = {clave: facts.get(clave) for clave in CAMPOS_TEXTO}
+    if any(not hechos[clave] for clave in CAMPOS_TEXTO):
+        raise ValueError("Complete todas las opciones de selección.")
+    try:
+        hechos["capacidad_minima"] = int(facts.get("capacidad_minima", 5))
+    except (TypeError, ValueError):
+        raise ValueError("Asegúrese de que la capacidad sea un número válido.")
+    if hechos["capacidad_minima"] < 2:
+        raise ValueError("La capacidad mínima debe ser 2 o más.")
+    return hechos
+
+class ServicioRecomendacion:
+    """ExpertSystem detrás de una cola asyncio con micro-lotes."""
+
+    def __init__(self, knowledge_base=None, variante=VARIANTE, max_lote=256):
+        """
+        Parámetros:
+            knowledge_base: Catálogo (None = CAR_DATASET de la variante) (list)
+            variante:       Script que define ExpertSystem (str)
+            max_lote:       Peticiones máximas por micro-lote (int)
+        """
+        modulo = cargar_modulo(variante)
+        if knowledge_base is None:
+            knowledge_base = modulo.CAR_DATASET
+        self.sistema = modulo.ExpertSystem(knowledge_base)
+        self.max_lote = max_lote
+        self.cola = None                             # Se crea dentro del bucle de eventos
+        self._despachador = None
+        self.atendidas = self.lotes = 0              # Estadísticas
+
+    def recomendar(self, facts):
+        """Inferencia síncrona de un conjunto de hechos ya validado o no."""
+        return self.sistema.inferir(validar_hechos(facts))
+
+    def recomendar_lote(self, lista_facts):
+        """Inferencia síncrona de muchos conjuntos de hechos."""
+        return self.sistema.inferir_lote([validar_hechos(f) for f in lista_facts])
+
+    async def iniciar(self):
+        """Arranca el despachador de micro-lotes en el bucle actual."""
+        if self._despachador is None:
+            self.cola = asyncio.Queue()
+            self._despachador = asyncio.create_task(self._despachar())
+
+    async def cerrar(self):
+        """Detiene el despachador."""
+        if self._despachador is not None:
+            self._despachador.cancel()
+            try:
+                await self._despachador
+            except asyncio.CancelledError:
+                pass
+            self._despachador = None
+
+    async def _despachar(self):
+        """Vacía la cola en lotes: todo lo que llegó mientras se atendía el lote anterior."""
+        while True:
+            pendientes = [await self.cola.get()]
+            while len(pendientes) < self.max_lote and not self.cola.empty():
+                pendientes.append(self.cola.get_nowait())
+            try:
+                resultados = self.sistema.inferir_lote([hechos for hechos, _ in pendientes])
+            except Exception as e:                   # El error llega a cada petición, no al bucle
+                for _, futuro in pendientes:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            for (_, futuro), resultado in zip(pendientes, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+            self.atendidas += len(pendientes)
+            self.lotes += 1
+            await asyncio.sleep(0)                   # Deja pasar a los clientes
+
+    async def resolver(self, facts):
+        """
+        Encola un conjunto de hechos y espera su recomendación.
+
+        Parámetros:
+            facts: Hechos de un usuario                (dict)
+
+        Retorna:
+            Resultado de ExpertSystem.inferir          (dict)
+        """
+        hechos = validar_hechos(facts)
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((hechos, futuro))
+        return await futuro
+
+    async def atender(self, linea):
+        """
+        Atiende una petición JSON y retorna la respuesta JSON (una línea).
+
+        Parámetros:
+            linea: Petición serializada                (str)
+
+        Retorna:
+            Respuesta serializada                      (str)
+        """
+        try:
+            peticion = json.loads(linea)
+            if isinstance(peticion, dict) and "lote" in peticion:
+                if not isinstance(peticion["lote"], list):
+                    raise ValueError("'lote' debe ser una lista de hechos.")
+                respuesta = list(await asyncio.gather(
+                    *(self.resolver(facts) for facts in peticion["lote"])))
+            else:
+                respuesta = await self.resolver(peticion)
+        except json.JSONDecodeError as e:
+            respuesta = {"error": f"JSON inválido: {e.msg}"}
+        except ValueError as e:
+            respuesta = {"error": str(e)}
+        except Exception as e:                       # Fallo interno: la conexión sigue viva
+            respuesta = {"error": f"Ocurrió un error inesperado: {e}"}
+        return json.dumps(respuesta, ensure_ascii=False)
+
+    async def _conexion(self, reader, writer):
+        """Una conexión TCP: petición por línea, respuesta por línea."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                respuesta = await self.atender(linea.decode("utf-8"))
+                writer.write(respuesta.encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host="127.0.0.1", puerto=8765):
+        """
+        Abre el servidor TCP de líneas JSON.
+
+        Retorna:
+            Servidor asyncio ya escuchando (puerto 0 = uno libre) (asyncio.Server)
+        """
+        await self.iniciar()
+        return await asyncio.start_server(self._conexion, host, puerto)
+
+    async def servir_stdin(self, entrada=sys.stdin, salida=sys.stdout):
+        """Atiende líneas JSON de la entrada estándar hasta EOF."""
+        await self.iniciar()
+        loop = asyncio.get_running_loop()
+        while True:
+            linea = await loop.run_in_executor(None, entrada.readline)
+            if not linea:
+                break
+            if linea.strip():
+                salida.write(await self.atender(linea) + "\n")
+                salida.flush()
+        await self.cerrar()
+
+async def _principal(args):
+    catalogo = cargar_catalogo(args.catalogo) if args.catalogo else None
+    servicio = ServicioRecomendacion(catalogo, args.variante, args.max_lote)
+    if args.stdin:
+        await servicio.servir_stdin()
+        return
+    servidor = await servicio.servir(args.host, args.puerto)
+    direcciones = ", ".join(str(s.getsockname()) for s in servidor.sockets)
+    print(f"Servicio de recomendación escuchando en {direcciones}", file=sys.stderr)
+    async with servidor:
+        await servidor.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio JSON del sistema experto de autos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--stdin", action="store_true", help="Líneas JSON por entrada/salida estándar")
+    parser.add_argument("--catalogo", help="Catálogo .json o script con CAR_DATASET")
+    parser.add_argument("--variante", default=VARIANTE, help="Script que define ExpertSystem")
+    parser.add_argument("--max-lote", type=int, default=256, help="Peticiones por micro-lote")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_principal(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import json
+from indice_autos import IndiceAutos, resolver_lote
 
 # =========================================================================================
 # 1. BASE DE CONOCIMIENTO (Knowledge Base) - Dataset de Automóviles
@@ -81,6 +82,7 @@ class ExpertSystem:
     def __init__(self, knowledge_base):
         """Inicializa el sistema con la Base de Conocimiento."""
         self.knowledge_base = knowledge_base
+        self.indice = IndiceAutos(knowledge_base) # Base de Conocimiento compilada (rangos y máscaras)
         # Base de Hechos (Working Memory) - Se llena con la entrada del usuario
         self.facts = {}
         self.reasons = [] # Trazabilidad de la inferencia
@@ -143,31 +145,21 @@ class ExpertSystem:
         Aplica reglas (Hard y Soft) a la Base de Conocimiento usando la Base de Hechos.
         """
         self.reasons = [] # Limpiar razones
-        autos_candidatos = self.knowledge_base
         
         print("\n--- 🧠 Motor de Inferencia Ejecutándose ---")
 
         # -----------------------------------------------------------------------
-        # ETAPA 1: FILTRADO POR REGLAS RÍGIDAS (Hard Constraints)
+        # ETAPA 1: FILTRADO POR REGLAS RÍGIDAS (búsquedas por rango en el índice)
         # -----------------------------------------------------------------------
         
-        # REGLA 1: Presupuesto
+        # REGLA 1: Presupuesto y REGLA 2: Capacidad Mínima
         presupuesto_min, presupuesto_max = self._get_price_range(self.facts.get("presupuesto"))
-        autos_filtrados = [
-            car for car in autos_candidatos 
-            if car["precio_min"] >= presupuesto_min and car["precio_min"] <= presupuesto_max
-        ]
-        self.reasons.append(f"✅ REGLA 1: Se aplicó filtro de presupuesto '{self.facts.get('presupuesto')}' (${presupuesto_min:,} - ${presupuesto_max:,}). Autos restantes: {len(autos_filtrados)}")
-
-        # REGLA 2: Capacidad Mínima
         capacidad_minima = self.facts.get("capacidad_minima", 5)
-        autos_filtrados = [
-            car for car in autos_filtrados 
-            if car["capacidad_max"] >= capacidad_minima
-        ]
-        self.reasons.append(f"✅ REGLA 2: Se aplicó filtro de capacidad mínima de {capacidad_minima} personas. Autos restantes: {len(autos_filtrados)}")
+        en_presupuesto, candidatos = self.indice.filtrar(presupuesto_min, presupuesto_max, capacidad_minima)
+        self.reasons.append(f"✅ REGLA 1: Se aplicó filtro de presupuesto '{self.facts.get('presupuesto')}' (${presupuesto_min:,} - ${presupuesto_max:,}). Autos restantes: {en_presupuesto}")
+        self.reasons.append(f"✅ REGLA 2: Se aplicó filtro de capacidad mínima de {capacidad_minima} personas. Autos restantes: {len(candidatos)}")
         
-        if not autos_filtrados:
+        if len(candidatos) == 0:
             return [], self.reasons # No hay autos que cumplan las restricciones básicas
 
         # -----------------------------------------------------------------------
@@ -177,23 +169,39 @@ class ExpertSystem:
         primary_use_tag = self._get_use_tag(self.facts.get("uso_principal"))
         self.reasons.append(f"✨ Priorizando autos con el tag: '{primary_use_tag}' (Uso Principal: {self.facts.get('uso_principal')}).")
         
+        # Puntuación vectorizada y selección de los 3 mejores sin ordenar todo
+        mejores = self.indice.mejores(
+            candidatos,
+            self.facts.get("motor_preferido", "Gasolina"),
+            self.facts.get("estilo_preferido", "Clásico"),
+            primary_use_tag,
+            k=3
+        )
+        
         scored_cars = []
-        for car in autos_filtrados:
+        for car in mejores:
             car_reasons = []
-            # Necesitamos re-implementar _score_car para que no use la lista reasons global
+            # Sólo los ganadores generan sus razones detalladas
             score = self._score_car_detailed(car, primary_use_tag, car_reasons)
             scored_cars.append({
                 "car": car,
                 "score": score,
                 "detail_reasons": car_reasons
             })
-            
-        # Ordenar por puntuación descendente
-        scored_cars.sort(key=lambda x: x['score'], reverse=True)
         
         self.reasons.append(f"✅ REGLA FINAL: Autos puntuados y ordenados. Se recomiendan los 3 mejores.")
 
-        return scored_cars[:3], self.reasons # Devolver solo el top 3
+        return scored_cars, self.reasons # Solo el top 3
+
+    def inferir_lote(self, lista_facts):
+        """
+        Inferencia por lotes: un par (top 3, trazabilidad) por cada conjunto de hechos.
+        Los conjuntos repetidos se resuelven una sola vez y comparten resultado.
+        """
+        def inferir_hechos(facts):
+            self.facts = facts
+            return self.inferir()
+        return resolver_lote(lista_facts, inferir_hechos)
 
     def _score_car_detailed(self, car, primary_use_tag, car_reasons):
         """Versión detallada de puntuación para mostrar los puntos de cada auto."""
@@ -9,7 +9,7 @@ from tkinter import messagebox, simpledialog # Importa módulos específicos de
 import random # Importa el módulo 'random' para seleccionar el auto secreto al azar.
 import json # Importa el módulo 'json' para manejar la lectura y escritura de datos.
 import os # Importa el módulo 'os' para interactuar con el sistema operativo (verificar archivos).
-from collections import Counter # Importa 'Counter' para contar frecuencias de elementos (clave para la IA).
+import math # Importa 'math' para la cota log2 de la búsqueda con anticipación.
 
 # Define la ruta del archivo de conocimiento persistente
 FILEPATH = 'catalogo_autos.json' # Define una constante con el nombre del archivo JSON de datos.
@@ -36,6 +36,11 @@ class AdivinaQuienCarro: # Define la clase principal que contiene toda la lógic
         
         self.auto_secreto = None # Almacenará el auto seleccionado por el juego para ser adivinado.
         self.candidatos_restantes = [] # Lista de autos que cumplen con las respuestas dadas (filtrado por la IA).
+        self.mascara_candidatos = 0 # Bitset de candidatos: el bit i representa al auto i del catálogo.
+        self.bits_valor = {} # Bitset por par (atributo, valor normalizado) del catálogo compilado.
+        self.preguntas = [] # Lista de (atributo, valor, bitset, orden del atributo) compilada del catálogo.
+        self.cache_division = {} # Memo de la mejor división 50/50 por subconjunto: (atributo, valor).
+        self.cache_anticipada = {} # Memo por (subconjunto, profundidad): (costo esperado, pregunta).
         
         self.cargar_conocimiento() # Llama al método para intentar cargar el catálogo desde el archivo JSON.
         self.actualizar_claves() # Llama al método para obtener los atributos disponibles de los autos.
@@ -69,6 +74,40 @@ class AdivinaQuienCarro: # Define la clase principal que contiene toda la lógic
         if self.catalogo_autos: # Verifica que el catálogo de autos no esté vacío.
             # Asume que el primer elemento es representativo. Excluye 'nombre'.
             self.claves_atributos = sorted([k for k in self.catalogo_autos[0].keys() if k != 'nombre']) # Obtiene las claves del primer auto, excluye 'nombre', y las ordena.
+        self.compilar_catalogo() # Recompila los bitsets con las claves vigentes.
+
+    @staticmethod # Método que no depende de la instancia.
+    def normalizar_valor(valor): # Define la normalización común de valores del catálogo.
+        """Convierte un valor a la forma usada en las comparaciones (texto en minúsculas).""" # Docstring del método.
+        return str(valor).lower() # Misma regla que el filtrado original: str(valor).lower().
+
+    def compilar_catalogo(self): # Define el método que compila el catálogo en bitsets.
+        """Crea un bitset por (atributo, valor): cada división es un popcount y cada respuesta un AND.""" # Docstring del método.
+        self.bits_valor = {} # Reinicia los bitsets por par atributo/valor.
+        self.preguntas = [] # Reinicia la lista ordenada de preguntas posibles.
+        for atributo in self.claves_atributos: # Recorre los atributos en orden alfabético (como la IA original).
+            for i, auto in enumerate(self.catalogo_autos): # Recorre cada auto con su posición (bit).
+                clave = (atributo, self.normalizar_valor(auto.get(atributo))) # Par atributo/valor normalizado.
+                if clave not in self.bits_valor: # Primera aparición: registra la pregunta en orden.
+                    self.bits_valor[clave] = 0 # Inicializa el bitset vacío.
+                    self.preguntas.append(clave) # Guarda el par para recorrerlo después.
+                self.bits_valor[clave] |= 1 << i # Enciende el bit del auto i.
+        orden = {a: k for k, a in enumerate(self.claves_atributos)} # Posición de cada atributo para desempatar.
+        self.preguntas = [(a, v, self.bits_valor[(a, v)], orden[a]) for a, v in self.preguntas] # Adjunta bitset y orden.
+        self.mascara_total = (1 << len(self.catalogo_autos)) - 1 # Bitset con todo el catálogo.
+        self.mascara_candidatos &= self.mascara_total # Ajusta los candidatos al catálogo vigente.
+        self.cache_division = {} # Los memos sólo son válidos para este catálogo.
+        self.cache_anticipada = {} # Se reinician ambos al recompilar.
+
+    def sincronizar_candidatos(self): # Define el método que reconstruye la lista visible de candidatos.
+        """Genera candidatos_restantes a partir del bitset, en el orden del catálogo.""" # Docstring del método.
+        mascara = self.mascara_candidatos # Copia local del bitset.
+        restantes = [] # Lista de autos que siguen en juego.
+        while mascara: # Mientras queden bits encendidos.
+            bajo = mascara & -mascara # Aísla el bit encendido más bajo.
+            restantes.append(self.catalogo_autos[bajo.bit_length() - 1]) # Añade el auto correspondiente.
+            mascara ^= bajo # Apaga ese bit.
+        self.candidatos_restantes = restantes # Publica la lista para la interfaz.
             
     def reiniciar_juego(self): # Define el método para configurar una nueva partida.
         """Restablece el estado de la partida.""" # Docstring del método.
@@ -76,6 +115,7 @@ class AdivinaQuienCarro: # Define la clase principal que contiene toda la lógic
             return False # Devuelve False indicando que no se pudo reiniciar.
             
         self.auto_secreto = random.choice(self.catalogo_autos) # Elige un auto al azar del catálogo como el auto secreto.
+        self.mascara_candidatos = self.mascara_total # Todos los autos vuelven a ser candidatos.
         self.candidatos_restantes = list(self.catalogo_autos) # Inicializa la lista de candidatos con todos los autos del catálogo.
         return True # Devuelve True indicando que el juego se inició correctamente.
 
@@ -97,38 +137,73 @@ class AdivinaQuienCarro: # Define la clase principal que contiene toda la lógic
         else: # Formato genérico para el resto de los atributos (color, tipo, país).
             return f"¿Es de {attr_display} con el valor '{valor}'?" # Pregunta genérica.
 
-    def sugerir_pregunta_optima(self): # Define el método de la IA para sugerir la mejor pregunta.
+    def sugerir_pregunta_optima(self, profundidad=1): # Define el método de la IA para sugerir la mejor pregunta.
         """ # Docstring del método.
         [Lógica de la IA] Encuentra el par atributo/valor que maximiza la entropía # Explica el objetivo de la lógica.
-        (divide la lista más cerca de 50/50). # Explica el principio de máxima ganancia de información (división 50/50).
+        (divide la lista más cerca de 50/50). Con profundidad > 1 mira varias # Explica la anticipación opcional.
+        preguntas hacia delante y minimiza el número esperado de preguntas restantes. # Criterio con anticipación.
         """ # Cierra el docstring.
-        N = len(self.candidatos_restantes) # Obtiene el número total de candidatos restantes.
-        if N <= 1: # Si solo queda 1 o 0 candidatos, no hay pregunta que hacer.
+        mascara = self.mascara_candidatos # Subconjunto actual como bitset.
+        if mascara & (mascara - 1) == 0: # Si solo queda 1 o 0 candidatos, no hay pregunta que hacer.
             return None, None, None # Devuelve None para indicar que no hay sugerencia.
-            
-        mejor_pregunta = None # Inicializa la variable para almacenar el mejor par (atributo, valor).
-        min_desviacion = N  # Inicializa la desviación mínima con el número total de candidatos (el peor caso posible).
-
-        for atributo in self.claves_atributos: # Itera sobre todos los atributos disponibles ('color', 'tipo', etc.).
-            # 1. Contar la frecuencia de cada valor para este atributo en el subconjunto
-            conteo_valores = Counter(str(auto.get(atributo)).lower() for auto in self.candidatos_restantes) # Cuenta cuántos autos tienen cada valor para el atributo actual.
-
-            for valor, cuenta in conteo_valores.items(): # Itera sobre cada valor único y su conteo para el atributo.
-                # 2. Calcular la desviación del punto de división ideal (N / 2)
-                desviacion = abs(cuenta - N / 2) # Calcula qué tan lejos está la división de ser 50/50.
-                
-                # 3. Minimizar la desviación
-                if desviacion < min_desviacion: # Si esta desviación es menor que la mínima encontrada hasta ahora...
-                    min_desviacion = desviacion # ...actualiza la desviación mínima.
-                    mejor_pregunta = (atributo, valor) # ...almacena este par como la mejor pregunta.
-                    
+        if profundidad <= 1: # Criterio original: la división más cercana a 50/50.
+            mejor_pregunta = self._mejor_division(mascara) # Consulta (o calcula y memoriza) la mejor división.
+        else: # Criterio con anticipación de varios pasos.
+            mejor_pregunta = (self._mejor_anticipada(mascara, profundidad)[1] # Pregunta que minimiza el costo esperado.
+                              or self._mejor_division(mascara)) # Autos indistinguibles: se usa el criterio 50/50.
         if mejor_pregunta: # Si se encontró una mejor pregunta (siempre que N > 1).
             atributo, valor = mejor_pregunta # Desempaqueta el par atributo/valor.
             pregunta_formateada = self.formatear_pregunta(atributo, valor) # Formatea la pregunta para mostrarla al usuario.
             return atributo, valor, pregunta_formateada # Devuelve el atributo, el valor y la pregunta legible.
-            
         return None, None, None # En caso de que algo falle, devuelve None.
 
+    def _mejor_division(self, mascara): # Define la búsqueda de la división más equilibrada.
+        """Par (atributo, valor) cuya división de 'mascara' queda más cerca de 50/50 (memorizado).""" # Docstring del método.
+        if mascara in self.cache_division: # Si ya se calculó para este subconjunto...
+            return self.cache_division[mascara] # ...se reutiliza sin recorrer el catálogo.
+        N = mascara.bit_count() # Número de candidatos (popcount).
+        mejor_pregunta = None # Inicializa la variable para almacenar el mejor par (atributo, valor).
+        mejor_orden = (N, 0, 0) # (desviación, atributo, primer candidato): desempate igual que el Counter original.
+        for atributo, valor, bits, orden_atributo in self.preguntas: # Recorre todas las preguntas compiladas.
+            si = mascara & bits # Autos del subconjunto con ese valor: un AND.
+            if si == 0: # El valor no aparece entre los candidatos.
+                continue # No es una división posible.
+            desviacion = abs(si.bit_count() - N / 2) # Popcount: qué tan lejos está la división de ser 50/50.
+            orden = (desviacion, orden_atributo, (si & -si).bit_length()) # El valor que aparece antes gana el empate.
+            if orden < mejor_orden: # Si esta división es mejor que la mínima encontrada hasta ahora...
+                mejor_orden = orden # ...actualiza el criterio mínimo.
+                mejor_pregunta = (atributo, valor) # ...almacena este par como la mejor pregunta.
+        self.cache_division[mascara] = mejor_pregunta # Memoriza el resultado para este subconjunto.
+        return mejor_pregunta # Devuelve el mejor par.
+
+    def _mejor_anticipada(self, mascara, profundidad): # Define la búsqueda con anticipación.
+        """ # Docstring del método.
+        Número esperado de preguntas para aislar un auto de 'mascara' y la pregunta que lo logra. # Qué calcula.
+        Al agotar la profundidad se estima con log2(N), la cota de la teoría de la información. # Estimación en las hojas.
+        """ # Cierra el docstring.
+        N = mascara.bit_count() # Número de candidatos (popcount).
+        if N <= 1: # Un solo candidato: no hacen falta más preguntas.
+            return 0.0, None # Costo cero, sin pregunta.
+        if profundidad == 0: # Se acabó la anticipación.
+            return math.log2(N), None # Estimación optimista del costo restante.
+        clave = (mascara, profundidad) # Clave del memo: subconjunto y profundidad.
+        if clave in self.cache_anticipada: # Si ya se calculó...
+            return self.cache_anticipada[clave] # ...se reutiliza.
+        mejor = (float('inf'), None) # Mejor (costo esperado, pregunta) hasta ahora.
+        vistos = set() # Divisiones equivalentes ya evaluadas.
+        for atributo, valor, bits, _ in self.preguntas: # Recorre todas las preguntas compiladas.
+            si = mascara & bits # Candidatos que responderían SÍ.
+            if si == 0 or si == mascara or si in vistos: # Pregunta inútil o división repetida.
+                continue # Se descarta.
+            vistos.add(si) # Marca la división como evaluada.
+            no = mascara ^ si # Candidatos que responderían NO.
+            costo = 1 + (si.bit_count() * self._mejor_anticipada(si, profundidad - 1)[0] # Rama SÍ ponderada.
+                         + no.bit_count() * self._mejor_anticipada(no, profundidad - 1)[0]) / N # Rama NO ponderada.
+            if costo < mejor[0]: # Si mejora el costo esperado...
+                mejor = (costo, (atributo, valor)) # ...se guarda como la mejor opción.
+        self.cache_anticipada[clave] = mejor # Memoriza el resultado.
+        return mejor # Devuelve (costo esperado, pregunta).
+
     def manejar_pregunta(self, atributo, valor): # Define el método para procesar la pregunta del usuario.
         """Aplica la pregunta del usuario al auto secreto y filtra los candidatos.""" # Docstring del método.
         
@@ -143,22 +218,18 @@ class AdivinaQuienCarro: # Define la clase principal que contiene toda la lógic
             elif valor_norm in ('no', 'n'): # Si el usuario responde 'no'.
                 valor_norm = 'false' # Normaliza el valor para comparar con el dato True/False en el catálogo.
                 
-        secreto_valor = str(self.auto_secreto.get(atributo)).lower() # Obtiene el valor del atributo en el auto secreto y lo normaliza.
+        secreto_valor = self.normalizar_valor(self.auto_secreto.get(atributo)) # Obtiene el valor del atributo en el auto secreto y lo normaliza.
         
         # Determinar respuesta
         es_cierto = (secreto_valor == valor_norm) # Comprueba si el valor del auto secreto coincide con el valor preguntado.
 
-        # 2. Filtrado
+        # 2. Filtrado con bitsets
+        bits = self.bits_valor.get((atributo, valor_norm), 0) # Autos del catálogo con ese valor (0 si ninguno).
         if es_cierto: # Si la respuesta al usuario es SÍ.
-            self.candidatos_restantes = [ # La nueva lista de candidatos son solo los autos que cumplen la condición:
-                auto for auto in self.candidatos_restantes # Itera sobre los candidatos actuales.
-                if str(auto.get(atributo)).lower() == valor_norm # Si el valor del auto coincide con el valor preguntado.
-            ] # Fin de la lista por comprensión.
+            self.mascara_candidatos &= bits # Conserva solo los autos que cumplen la condición.
         else: # Si la respuesta al usuario es NO.
-            self.candidatos_restantes = [ # La nueva lista de candidatos son solo los autos que NO cumplen la condición:
-                auto for auto in self.candidatos_restantes # Itera sobre los candidatos actuales.
-                if str(auto.get(atributo)).lower() != valor_norm # Si el valor del auto NO coincide con el valor preguntado.
-            ] # Fin de la lista por comprensión.
+            self.mascara_candidatos &= ~bits # Conserva solo los autos que NO cumplen la condición.
+        self.sincronizar_candidatos() # Actualiza la lista visible de candidatos.
         
         return es_cierto, len(self.candidatos_restantes) # Devuelve la respuesta (booleano) y la cantidad de candidatos restantes.
 